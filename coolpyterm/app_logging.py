@@ -0,0 +1,180 @@
+"""
+Diagnostic logging
+
+Every module gets a per-subsystem logger from get_logger() instead of calling
+print(). Messages use %-style arguments so nothing is formatted unless the
+record is actually emitted:
+
+    log = get_logger('ssh')
+    log.debug("received %d bytes", len(data))
+
+Levels are set once at startup with configure(), from the --log option or
+the COOLPYTERM_LOG environment variable, e.g.
+
+    COOLPYTERM_LOG=info                      default
+    COOLPYTERM_LOG=warning,ssh=debug         quiet, except the SSH subsystem
+    COOLPYTERM_LOG=trace,render=off          everything but render chatter
+    COOLPYTERM_LOG=off                       nothing at all
+
+"off" uses logging.disable(), so a disabled call returns after one integer
+comparison. Per-chunk and per-key messages are TRACE level and guarded with
+
+    if __debug__ and log.isEnabledFor(TRACE):
+        log.log(TRACE, "received %d chars: %r", len(data), data[:50])
+
+so their arguments are not even evaluated unless tracing, and python -O
+compiles them out entirely.
+
+A rate limiter on the handler collapses bursts of the same message (a
+repeating error in a reader loop, say) into one line per interval plus a
+count of what was suppressed.
+
+This is separate from log_handler.SessionLogger, which writes the session
+transcript.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+
+
+TRACE = 5
+logging.addLevelName(TRACE, 'TRACE')
+
+ROOT = 'coolpyterm'
+
+SUBSYSTEMS = (
+    'app',       # windows, menus, startup and shutdown
+    'terminal',  # pyte feed, scrollback, resize
+    'render',    # OpenGL widget, shaders, textures
+    'input',     # key handling and paste
+    'ssh',       # SSH backend, reader thread, keys
+    'pty',       # local shell backends
+    'session',   # session logs and recordings
+    'config',    # settings, themes, connection profiles
+    'perf',      # benchmark, HUD, latency
+)
+
+LEVELS = {
+    'trace': TRACE,
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+    'off': logging.CRITICAL + 1,
+}
+
+DEFAULT_SPEC = 'info'
+ENV_VAR = 'COOLPYTERM_LOG'
+
+_handler = None
+
+
+def get_logger(subsystem):
+    """
+    Logger for one subsystem (see SUBSYSTEMS)
+
+    Unknown names raise ValueError: their messages would silently miss the
+    per-subsystem levels set by --log and the settings.
+    """
+    if subsystem not in SUBSYSTEMS:
+        raise ValueError(f"Unknown log subsystem '{subsystem}' (expected one of {', '.join(SUBSYSTEMS)})")
+    return logging.getLogger(f"{ROOT}.{subsystem}")
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let at most `burst` records with the same logger and message template
+    through per `interval` seconds; the next one that passes reports how many
+    were dropped in between
+    """
+
+    def __init__(self, burst=5, interval=1.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._windows = {}  # (logger name, msg) -> [window start, count, suppressed]
+
+    def filter(self, record):
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if len(self._windows) > 4096:
+                    self._windows.clear()
+            else:
+                window[1] += 1
+                if window[1] > self.burst:
+                    window[2] += 1
+                    return False
+                suppressed = 0
+
+        if suppressed:
+            record.msg = f"{record.msg} [{suppressed} similar messages suppressed]"
+        return True
+
+
+def parse_spec(spec):
+    """
+    Parse "level[,subsystem=level...]" into (default level, {subsystem: level})
+
+    Unknown level names raise ValueError.
+    """
+    default = LEVELS[DEFAULT_SPEC]
+    overrides = {}
+    for part in (spec or DEFAULT_SPEC).split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        name, _, level = part.rpartition('=')
+        if level not in LEVELS:
+            raise ValueError(f"Unknown log level '{level}' (expected one of {', '.join(LEVELS)})")
+        if name:
+            overrides[name] = LEVELS[level]
+        else:
+            default = LEVELS[level]
+    return default, overrides
+
+
+def configure(spec=None, stream=None, rate_limit=True):
+    """
+    Install the console handler and set levels; safe to call again
+
+    spec defaults to $COOLPYTERM_LOG, then 'info'.
+    """
+    global _handler
+
+    if spec is None:
+        spec = os.environ.get(ENV_VAR, DEFAULT_SPEC)
+    try:
+        default, overrides = parse_spec(spec)
+    except ValueError as e:
+        sys.stderr.write(f"{e}; using '{DEFAULT_SPEC}'\n")
+        default, overrides = parse_spec(DEFAULT_SPEC)
+
+    root = logging.getLogger(ROOT)
+    if _handler is not None:
+        root.removeHandler(_handler)
+    _handler = logging.StreamHandler(stream or sys.stdout)
+    _handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)-5s [%(name)s] %(message)s'))
+    if rate_limit:
+        _handler.addFilter(RateLimitFilter())
+    root.addHandler(_handler)
+    root.propagate = False
+    root.setLevel(default)
+
+    for subsystem in SUBSYSTEMS:
+        get_logger(subsystem).setLevel(overrides.get(subsystem, logging.NOTSET))
+    for name, level in overrides.items():
+        if name not in SUBSYSTEMS:
+            logging.getLogger(f"{ROOT}.{name}").setLevel(level)
+
+    # Everything off: short-circuit every logger before it looks at levels
+    everything_off = default > logging.CRITICAL and all(level > logging.CRITICAL for level in overrides.values())
+    logging.disable(logging.CRITICAL if everything_off else logging.NOTSET)
+    return root
@@ -1,5 +1,5 @@
 """
-Backend Factory - integrates Windows terminal backends with your existing SSH backend
+Backend Factory - integrates Windows and POSIX terminal backends with your existing SSH backend
 Drop-in replacement for your current backend creation logic
 """
 
@@ -13,7 +13,7 @@ def create_backend(connection_config, parent_widget):
         parent_widget: Parent widget for the backend
 
     Returns:
-        Backend instance (SSHBackend or WindowsTerminalBackend)
+        Backend instance (SSHBackend, WindowsTerminalBackend or PosixTerminalBackend)
     """
     connection_type = connection_config.get('connection_type', 'ssh')
 
@@ -27,7 +27,14 @@ def create_backend(connection_config, parent_widget):
             password=connection_config.get('password'),
             port=connection_config.get('port', 22),
             key_path=connection_config.get('key_path'),
-            parent_widget=parent_widget
+            parent_widget=parent_widget,
+            key_passphrase=connection_config.get('key_passphrase'),
+            allow_agent=connection_config.get('allow_agent', False),
+            look_for_keys=connection_config.get('look_for_keys', False),
+            transport_profile=connection_config.get('transport_profile'),
+            window_size=connection_config.get('window_size'),
+            max_packet_size=connection_config.get('max_packet_size'),
+            compress=connection_config.get('compress')
         )
 
     elif connection_type in ['cmd', 'powershell', 'wsl']:
@@ -45,6 +52,32 @@ def create_backend(connection_config, parent_widget):
         except ImportError as e:
             raise Exception(f"Windows terminal support not available: {e}")
 
+    elif connection_type == 'replay':
+        # Playback of a recorded session
+        from coolpyterm.session_recorder import ReplayBackend
+
+        return ReplayBackend(
+            recording_path=connection_config['recording_path'],
+            speed=connection_config.get('speed', 1.0),
+            max_idle=connection_config.get('max_idle'),
+            parent_widget=parent_widget
+        )
+
+    elif connection_type == 'posix':
+        # Native PTY local shell on Linux/macOS
+        try:
+            from coolpyterm.posixptyshellreader import PosixTerminalBackend
+
+            return PosixTerminalBackend(
+                shell_path=connection_config.get('shell_path'),
+                working_dir=connection_config.get('working_dir'),
+                env_vars=connection_config.get('env_vars', {}),
+                startup_command=connection_config.get('startup_command'),
+                parent_widget=parent_widget
+            )
+        except ImportError as e:
+            raise Exception(f"POSIX terminal support not available: {e}")
+
     else:
         raise ValueError(f"Unsupported connection type: {connection_type}")
 
@@ -54,7 +87,7 @@ def get_backend_requirements(connection_type):
     Get the requirements for a specific backend type
 
     Args:
-        connection_type: 'ssh', 'cmd', 'powershell', or 'wsl'
+        connection_type: 'ssh', 'cmd', 'powershell', 'wsl' or 'posix'
 
     Returns:
         Dict with requirement info
@@ -83,6 +116,12 @@ def get_backend_requirements(connection_type):
             'dependencies': ['pywinpty'],
             'platforms': ['Windows'],
             'description': 'Windows Subsystem for Linux'
+        },
+        'posix': {
+            'available': False,
+            'dependencies': [],
+            'platforms': ['Linux', 'Darwin'],
+            'description': 'Local shell on a native pseudo-terminal'
         }
     }
 
@@ -110,6 +149,15 @@ def get_backend_requirements(connection_type):
                 req['available'] = False
                 req['error'] = 'pywinpty not installed. Install with: pip install pywinpty'
 
+    elif connection_type == 'posix':
+        try:
+            import pty
+            import termios
+            req['available'] = True
+        except ImportError:
+            req['available'] = False
+            req['error'] = 'POSIX pseudo-terminals not available on this platform'
+
     return req
 
 
@@ -120,7 +168,7 @@ def check_all_backend_availability():
     Returns:
         Dict mapping backend type to availability info
     """
-    backend_types = ['ssh', 'cmd', 'powershell', 'wsl']
+    backend_types = ['ssh', 'cmd', 'powershell', 'wsl', 'posix']
     availability = {}
 
     for backend_type in backend_types:
@@ -156,7 +204,7 @@ def get_available_connection_types():
 
 # NEW CODE:
 connection_config = {
-    'connection_type': 'ssh',  # or 'cmd', 'powershell', 'wsl'
+    'connection_type': 'ssh',  # or 'cmd', 'powershell', 'wsl', 'posix'
     'hostname': host,
     'username': username,
     'password': password,
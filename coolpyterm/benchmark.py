@@ -0,0 +1,485 @@
+"""
+Headless replay benchmark for the parse -> grid -> texture pipeline
+
+Runs terminal workloads through a real TerminalWithHardwareGrid on an
+offscreen Qt surface and reports throughput, per-stage time and peak memory:
+
+    feed       VT parsing (the engine's feed)
+    snapshot   collecting the changed rows into a published frame
+    apply      GUI side: copying changed rows into the grid, mapping colors
+    rasterize  QPainter rendering of the grid into the text image
+    upload     texture upload (only when an OpenGL context is available)
+
+Workloads are synthetic byte streams shaped like common sessions (large cat,
+ls -lR, top refresh, vim scrolling, compiler output, network device show
+dumps) or any recording made with File > Record Session.
+
+The terminal's parser worker is not started, so it parses inline and every
+stage runs on this thread in turn, which keeps the stage timings comparable.
+Each workload runs once per terminal engine (--engine, default: all), so
+the engines are compared on the same byte streams.
+
+    python -m coolpyterm.benchmark
+    python -m coolpyterm.benchmark --workload top --workload vim_scroll --scale 2
+    python -m coolpyterm.benchmark --engine fast
+    python -m coolpyterm.benchmark --recording recordings/session.cptrec
+    python -m coolpyterm.benchmark --save-baseline bench/baseline.json
+    python -m coolpyterm.benchmark --baseline bench/baseline.json --tolerance 0.15
+
+With --baseline the exit status is 1 when any workload regresses.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from coolpyterm.app_logging import configure as configure_logging
+from coolpyterm.vt_session import ENGINES
+
+
+STAGES = ('feed', 'snapshot', 'apply', 'rasterize', 'upload')
+
+WORDS = ("interface", "GigabitEthernet", "packet", "buffer", "render", "terminal", "retro",
+         "phosphor", "scanline", "session", "channel", "kernel", "process", "address",
+         "vlan", "route", "config", "status", "error", "warning", "output", "input")
+
+
+# --- Workload generators ---------------------------------------------------
+# Each returns the full byte stream; chunking happens in the runner so every
+# workload is delivered the way a backend reader would deliver it.
+
+def _sentence(rng, width):
+    words = []
+    length = 0
+    while length < width:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:width]
+
+
+def workload_cat(scale, rng):
+    """Plain text scrolling past, like cat of a large log file"""
+    lines = [f"{i:6d}  {_sentence(rng, rng.randint(20, 70))}" for i in range(3000 * scale)]
+    return ("\r\n".join(lines) + "\r\n").encode()
+
+
+def workload_ls_lr(scale, rng):
+    """Colorized ls -lR: directory headers, totals and colored names"""
+    out = []
+    for d in range(150 * scale):
+        out.append(f"./src/module{d}:\r\ntotal {rng.randint(8, 400)}\r\n")
+        for _ in range(rng.randint(5, 20)):
+            is_dir = rng.random() < 0.3
+            name = rng.choice(WORDS) + ("" if is_dir else rng.choice((".py", ".c", ".h", ".txt")))
+            color = "01;34" if is_dir else rng.choice(("0", "01;32", "00;36"))
+            out.append(f"{'d' if is_dir else '-'}rwxr-xr-x  2 scott staff {rng.randint(10, 99999):>6} "
+                       f"Jan {rng.randint(1, 28):2d} 12:{rng.randint(0, 59):02d} "
+                       f"\x1b[{color}m{name}\x1b[0m\r\n")
+        out.append("\r\n")
+    return "".join(out).encode()
+
+
+def workload_top(scale, rng):
+    """Full-screen top refreshes on the alternate screen"""
+    out = ["\x1b[?1049h\x1b[H\x1b[2J"]
+    for frame in range(300 * scale):
+        out.append("\x1b[H")
+        out.append(f"top - 12:{frame % 60:02d}:01 up 3 days, load average: "
+                   f"{rng.random() * 4:.2f}, {rng.random() * 4:.2f}, {rng.random() * 4:.2f}\x1b[K\r\n")
+        out.append(f"Tasks: {rng.randint(200, 300)} total,   1 running\x1b[K\r\n")
+        out.append(f"%Cpu(s): {rng.random() * 100:4.1f} us, {rng.random() * 10:4.1f} sy\x1b[K\r\n")
+        out.append("\x1b[K\r\n")
+        out.append("\x1b[7m    PID USER      PR  NI    VIRT    RES  %CPU  %MEM COMMAND          \x1b[0m\r\n")
+        for _ in range(18):
+            out.append(f"{rng.randint(1, 99999):7d} scott     20   0 {rng.randint(1000, 999999):7d} "
+                       f"{rng.randint(100, 99999):6d} {rng.random() * 100:5.1f} {rng.random() * 10:5.1f} "
+                       f"\x1b[1m{rng.choice(WORDS):<16}\x1b[0m\x1b[K\r\n")
+        out.append("\x1b[J")
+    out.append("\x1b[?1049l")
+    return "".join(out).encode()
+
+
+def workload_vim_scroll(scale, rng):
+    """Scrolling a file in vim: scroll region, line inserts and status updates"""
+    out = ["\x1b[?1049h\x1b[H\x1b[2J\x1b[1;23r"]
+    for row in range(1, 24):
+        out.append(f"\x1b[{row};1H\x1b[33m{row:4d} \x1b[0m{_sentence(rng, 60)}")
+    for line in range(24, 24 + 1500 * scale):
+        # Scroll the region up one line and draw the new bottom line
+        out.append(f"\x1b[23;1H\n\x1b[33m{line:4d} \x1b[0m")
+        out.append(f"\x1b[1m{rng.choice(('def', 'class', 'return', 'if'))}\x1b[0m {_sentence(rng, 50)}")
+        out.append(f"\x1b[24;1H\x1b[7m coolpyterm.py  {line},1  {line * 100 // (24 + 1500 * scale)}% \x1b[0m\x1b[K")
+    out.append("\x1b[r\x1b[?1049l")
+    return "".join(out).encode()
+
+
+def workload_compiler(scale, rng):
+    """Colored gcc-style diagnostics with source excerpts and carets"""
+    out = []
+    for i in range(800 * scale):
+        severity, color = rng.choice((("error", "01;31"), ("warning", "01;35"), ("note", "01;36")))
+        line = rng.randint(1, 2000)
+        col = rng.randint(1, 40)
+        out.append(f"\x1b[01m\x1b[Ksrc/{rng.choice(WORDS)}.c:{line}:{col}:\x1b[m\x1b[K "
+                   f"\x1b[{color}m\x1b[K{severity}:\x1b[m\x1b[K {_sentence(rng, 50)}\r\n")
+        out.append(f" {line:4d} |     {_sentence(rng, 40)};\r\n")
+        out.append(f"      | {' ' * col}\x1b[01;32m\x1b[K^~~~~\x1b[m\x1b[K\r\n")
+    return "".join(out).encode()
+
+
+def workload_show_dump(scale, rng):
+    """Network device show output paged with --More-- prompts"""
+    out = []
+    for i in range(1500 * scale):
+        if i % 4 == 0:
+            out.append(f"interface GigabitEthernet1/0/{i % 48 + 1}\r\n")
+        else:
+            out.append(f" {_sentence(rng, rng.randint(20, 60))}\r\n")
+        if i % 23 == 22:
+            # Pager prompt followed by the backspaces that erase it
+            out.append(" --More-- " + "\b" * 10 + " " * 10 + "\b" * 10)
+    return "".join(out).encode()
+
+
+WORKLOADS = {
+    'cat': workload_cat,
+    'ls_lR': workload_ls_lr,
+    'top': workload_top,
+    'vim_scroll': workload_vim_scroll,
+    'compiler': workload_compiler,
+    'show_dump': workload_show_dump,
+}
+
+
+def chunk_stream(data, chunk_size):
+    """Split a stream the way a reader thread's recv() would"""
+    return [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+def load_recording_chunks(path):
+    """Output chunks of a session recording, in their recorded sizes"""
+    from coolpyterm.session_recorder import read_recording, OUTPUT
+
+    _, events = read_recording(path)
+    return [payload for _, kind, payload in events if kind == OUTPUT]
+
+
+# --- Runner ----------------------------------------------------------------
+
+class StageTimer:
+    """Accumulates wall time for wrapped callables by stage name"""
+
+    def __init__(self):
+        self.ns = dict.fromkeys(STAGES + ('texture',), 0)
+        self.calls = dict.fromkeys(self.ns, 0)
+
+    def wrap(self, name, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.ns[name] += time.perf_counter_ns() - start
+                self.calls[name] += 1
+        return timed
+
+
+class PipelineBenchmark:
+    """Drives one terminal instance through workloads and collects stage timings"""
+
+    def __init__(self, cols=80, rows=24, frame_interval=1 / 60, engine='pyte'):
+        from PyQt6.QtGui import QColor
+        from coolpyterm.cpt import TerminalWithHardwareGrid
+
+        self.engine = engine
+        self.cols = cols
+        self.rows = rows
+        self.frame_interval = frame_interval
+
+        with quiet_output():
+            self.terminal = TerminalWithHardwareGrid(log_file=None, parse_mode='inline', engine=engine)
+            grid = self.terminal.grid_widget
+            # Frames are driven by the benchmark, not the 16ms animation timer
+            grid.animation_timer.stop()
+            grid.cursor_timer.stop()
+
+            self.terminal.show()
+            _process_events()
+
+            grid.resize_grid(cols, rows)
+            self.terminal.cols = cols
+            self.terminal.rows = rows
+            self.terminal.parser.resize(cols, rows)
+            self.terminal.applied_size = (cols, rows)
+
+            self.gl_available = grid.text_texture is not None
+            if grid.text_image is None:
+                # No GL context: rasterize into an image of the same size
+                grid.ensure_text_image().fill(QColor(0, 0, 0))
+
+        self._originals = {}
+
+    def _instrument(self, timer):
+        terminal = self.terminal
+        grid = terminal.grid_widget
+        targets = (
+            (terminal.parser.session, 'feed', 'feed'),
+            (terminal.parser, '_publish', 'snapshot'),
+            (terminal, 'apply_frame', 'apply'),
+            (grid, 'render_grid_to_texture', 'rasterize'),
+            (grid, 'update_text_texture', 'texture'),
+        )
+        for obj, attr, stage in targets:
+            self._originals[(obj, attr)] = obj.__dict__.get(attr)
+            setattr(obj, attr, timer.wrap(stage, getattr(obj, attr)))
+
+    def _restore(self):
+        for (obj, attr), original in self._originals.items():
+            if original is None:
+                delattr(obj, attr)
+            else:
+                setattr(obj, attr, original)
+        self._originals.clear()
+
+    def _reset_terminal(self):
+        terminal = self.terminal
+        terminal.parser.reset()
+        terminal.scrollback_buffer.clear()
+        terminal.grid_widget.clear_screen()
+
+    def _render_frame(self):
+        grid = self.terminal.grid_widget
+        if self.gl_available:
+            grid.makeCurrent()
+            grid.update_text_texture()
+            grid.doneCurrent()
+        else:
+            grid.render_grid_to_texture()
+
+    def _replay(self, chunks):
+        """Feed every chunk through update_ui, rendering frames at the display rate"""
+        update_ui = self.terminal.update_ui
+        render_frame = self._render_frame
+        frames = 0
+        last_frame = time.perf_counter()
+        for chunk in chunks:
+            update_ui(chunk.decode('utf-8', errors='replace'))
+            now = time.perf_counter()
+            if now - last_frame >= self.frame_interval:
+                render_frame()
+                frames += 1
+                last_frame = now
+        render_frame()
+        return frames + 1
+
+    def run(self, name, chunks, measure_memory=True):
+        """Benchmark one workload and return its result dict"""
+        total_bytes = sum(len(c) for c in chunks)
+        timer = StageTimer()
+
+        with quiet_output():
+            self._reset_terminal()
+            self._instrument(timer)
+            try:
+                start = time.perf_counter()
+                frames = self._replay(chunks)
+                elapsed = time.perf_counter() - start
+            finally:
+                self._restore()
+
+            peak_kb = None
+            if measure_memory:
+                # Separate pass: tracemalloc overhead would distort the timings
+                self._reset_terminal()
+                tracemalloc.start()
+                try:
+                    self._replay(chunks)
+                    peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+                finally:
+                    tracemalloc.stop()
+
+        stage_ns = dict.fromkeys(STAGES, 0)
+        stage_ns['feed'] = timer.ns['feed']
+        # Inline, the frame is applied from inside _publish (frame_ready is a direct call)
+        stage_ns['snapshot'] = timer.ns['snapshot'] - timer.ns['apply']
+        stage_ns['apply'] = timer.ns['apply']
+        stage_ns['rasterize'] = timer.ns['rasterize']
+        if self.gl_available:
+            stage_ns['upload'] = timer.ns['texture'] - timer.ns['rasterize']
+
+        megabytes = max(total_bytes, 1) / (1024 * 1024)
+        return {
+            'workload': name,
+            'engine': self.engine,
+            'bytes': total_bytes,
+            'chunks': len(chunks),
+            'frames': frames,
+            'seconds': round(elapsed, 4),
+            'bytes_per_s': round(total_bytes / elapsed, 1) if elapsed else 0.0,
+            'chunks_per_s': round(len(chunks) / elapsed, 1) if elapsed else 0.0,
+            'stages_ms': {stage: round(ns / 1e6, 3) for stage, ns in stage_ns.items()},
+            'stages_ms_per_mb': {stage: round(ns / 1e6 / megabytes, 3) for stage, ns in stage_ns.items()},
+            'peak_memory_kb': peak_kb,
+            'gl': self.gl_available,
+        }
+
+    def close(self):
+        with quiet_output():
+            self.terminal.close()
+
+
+@contextlib.contextmanager
+def quiet_output():
+    """Silence diagnostic logging and stray prints so console I/O doesn't skew timings"""
+    previous = logging.root.manager.disable
+    logging.disable(logging.CRITICAL)
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        logging.disable(previous)
+
+
+def _process_events():
+    from PyQt6.QtWidgets import QApplication
+    QApplication.processEvents()
+
+
+# --- Baselines -------------------------------------------------------------
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return a list of human readable regressions against a saved baseline"""
+    # Baselines from before engines were selectable are pyte results
+    previous = {(r.get('engine', 'pyte'), r['workload']): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        base = previous.get((result['engine'], result['workload']))
+        if not base:
+            continue
+        name = f"{result['workload']} [{result['engine']}]"
+
+        if result['bytes_per_s'] < base['bytes_per_s'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {result['bytes_per_s'] / 1024:.0f} KiB/s "
+                               f"vs baseline {base['bytes_per_s'] / 1024:.0f} KiB/s")
+
+        base_total = sum(base['stages_ms_per_mb'].values()) or 1.0
+        for stage, value in result['stages_ms_per_mb'].items():
+            base_value = base['stages_ms_per_mb'].get(stage, 0.0)
+            # Ignore stages too small to measure reliably
+            if base_value < base_total * 0.02:
+                continue
+            if value > base_value * (1 + tolerance):
+                regressions.append(f"{name}: {stage} {value:.1f} ms/MiB "
+                                   f"vs baseline {base_value:.1f} ms/MiB")
+    return regressions
+
+
+def print_results(results):
+    header = f"{'workload':<12} {'engine':<6} {'KiB':>8} {'KiB/s':>9} {'chunks/s':>9} {'frames':>6} " + \
+             " ".join(f"{stage:>9}" for stage in STAGES) + f" {'peak KiB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        stages = " ".join(f"{r['stages_ms'][stage]:>9.1f}" for stage in STAGES)
+        peak = r['peak_memory_kb'] if r['peak_memory_kb'] is not None else '-'
+        print(f"{r['workload']:<12} {r['engine']:<6} {r['bytes'] / 1024:>8.0f} {r['bytes_per_s'] / 1024:>9.0f} "
+              f"{r['chunks_per_s']:>9.0f} {r['frames']:>6} {stages} {peak:>9}")
+    print("(stage columns are total milliseconds)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CoolPyTerm pipeline benchmark")
+    parser.add_argument('--workload', action='append', choices=sorted(WORKLOADS),
+                        help="Workload to run (repeatable, default: all)")
+    parser.add_argument('--recording', action='append', default=[],
+                        help="Session recording (.cptrec) to replay as a workload (repeatable)")
+    parser.add_argument('--engine', action='append', choices=sorted(ENGINES),
+                        help="Terminal engine to run (repeatable, default: all)")
+    parser.add_argument('--scale', type=int, default=1, help="Workload size multiplier")
+    parser.add_argument('--chunk-size', type=int, default=1024,
+                        help="Bytes per update_ui call for synthetic workloads")
+    parser.add_argument('--cols', type=int, default=80)
+    parser.add_argument('--rows', type=int, default=24)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-memory', action='store_true', help="Skip the peak memory pass")
+    parser.add_argument('--json', help="Write results to this JSON file")
+    parser.add_argument('--baseline', help="Compare against a saved baseline JSON file")
+    parser.add_argument('--save-baseline', help="Save results as a baseline JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="Allowed fractional slowdown before reporting a regression")
+    parser.add_argument('--log', metavar='SPEC', default='warning',
+                        help="Diagnostic log levels outside the timed sections (default: warning)")
+    args = parser.parse_args(argv)
+    configure_logging(args.log)
+
+    # Headless by default; an explicit QT_QPA_PLATFORM (e.g. xcb for real GL) wins
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    workloads = []
+    if args.recording:
+        for path in args.recording:
+            workloads.append((os.path.basename(path), load_recording_chunks(path)))
+    if args.workload or not args.recording:
+        for name in args.workload or WORKLOADS:
+            data = WORKLOADS[name](args.scale, random.Random(args.seed))
+            workloads.append((name, chunk_stream(data, args.chunk_size)))
+
+    results = []
+    for engine in args.engine or ENGINES:
+        bench = PipelineBenchmark(cols=args.cols, rows=args.rows, engine=engine)
+        if not bench.gl_available and not results:
+            print("No OpenGL context available - texture upload is not measured")
+        try:
+            for name, chunks in workloads:
+                print(f"Running {name} on {engine} ({sum(len(c) for c in chunks) / 1024:.0f} KiB, "
+                      f"{len(chunks)} chunks)...")
+                results.append(bench.run(name, chunks, measure_memory=not args.no_memory))
+        finally:
+            bench.close()
+
+    print()
+    print_results(results)
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'platform': app.platformName(),
+        'cols': args.cols,
+        'rows': args.rows,
+        'chunk_size': args.chunk_size,
+        'scale': args.scale,
+        'results': results,
+    }
+    for path in (args.json, args.save_baseline):
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,8 +12,13 @@ from PyQt6.QtGui import QFont, QIcon
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime
+import os
 import platform
 
+from coolpyterm.app_logging import get_logger
+
+log = get_logger('config')
+
 
 @dataclass
 class ConnectionProfile:
@@ -27,6 +32,12 @@ class ConnectionProfile:
     username: str = ""
     password: str = ""
     key_path: str = ""
+    allow_agent: bool = False     # Offer keys held by ssh-agent
+    look_for_keys: bool = False   # Probe ~/.ssh/id_* when no key file is set
+    transport_profile: str = "throughput"  # "throughput" or "legacy"
+    window_size: int = 0          # SSH channel window, 0 = profile default
+    max_packet_size: int = 0      # SSH max packet size, 0 = profile default
+    compress: bool = False        # zlib compression for slow links
 
     # Local terminal fields (new)
     shell_path: str = ""          # "cmd.exe", "powershell.exe", "wsl.exe"
@@ -77,7 +88,7 @@ class ConnectionProfile:
             return f"{self.username}@{self.hostname}:{self.port}"
         else:
             # Local terminal
-            shell_name = self.shell_path.replace('.exe', '').title()
+            shell_name = os.path.basename(self.shell_path).replace('.exe', '').title()
             if self.name:
                 return f"{self.name} ({shell_name})"
             return f"{shell_name} Terminal"
@@ -91,9 +102,25 @@ class ConnectionProfile:
                 'username': self.username,
                 'password': self.password,
                 'port': self.port,
-                'key_path': self.key_path if self.key_path else None
+                'key_path': self.key_path if self.key_path else None,
+                'allow_agent': self.allow_agent,
+                'look_for_keys': self.look_for_keys,
+                'transport_profile': self.transport_profile,
+                'window_size': self.window_size or None,
+                'max_packet_size': self.max_packet_size or None,
+                'compress': self.compress
             }
         else:
+            if platform.system() != "Windows":
+                # Linux/macOS shells all run on the native PTY backend
+                return {
+                    'connection_type': 'posix',
+                    'shell_path': self.shell_path,
+                    'working_dir': self.working_dir if self.working_dir else None,
+                    'startup_command': self.startup_command if self.startup_command else None,
+                    'env_vars': self.env_vars
+                }
+
             # Map shell paths to specific backend types for the factory
             shell_type_map = {
                 'cmd.exe': 'cmd',
@@ -190,7 +217,7 @@ def get_available_windows_shells():
                 if clean_line and len(clean_line) > 0:
                     valid_distributions.append(clean_line)
 
-            print(f"Found WSL distributions: {valid_distributions}")
+            log.debug("Found WSL distributions: %s", valid_distributions)
 
             # Add default WSL entry (uses default distribution)
             if valid_distributions:
@@ -216,7 +243,7 @@ def get_available_windows_shells():
                         })
 
     except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError) as e:
-        print(f"WSL not available or not accessible: {e}")
+        log.info("WSL not available or not accessible: %s", e)
 
     return shells
 
@@ -250,7 +277,7 @@ class ConnectionManager:
                 self.connection_history = history_data[:self.max_history]
 
         except Exception as e:
-            print(f"Error loading connections: {e}")
+            log.error("Error loading connections: %s", e)
             self.profiles = {}
             self.connection_history = []
 
@@ -267,7 +294,7 @@ class ConnectionManager:
             self.settings_manager.set('connections/history', self.connection_history)
 
         except Exception as e:
-            print(f"Error saving connections: {e}")
+            log.error("Error saving connections: %s", e)
 
     def add_profile(self, profile: ConnectionProfile) -> str:
         """Add a new connection profile"""
@@ -371,10 +398,8 @@ class ConnectionDialog(QDialog):
 
         self.connection_type_combo = QComboBox()
         # Simplified choices - just SSH or Local Shell
-        connection_types = ["SSH"]
-        if platform.system() == "Windows":
-            connection_types.append("Local Shell")
-        # Future: Add "Local Shell" for Linux/macOS too
+        # (winpty backends on Windows, native PTY on Linux/macOS)
+        connection_types = ["SSH", "Local Shell"]
 
         self.connection_type_combo.addItems(connection_types)
         self.connection_type_combo.currentTextChanged.connect(self.on_connection_type_changed)
@@ -421,6 +446,21 @@ class ConnectionDialog(QDialog):
         key_layout.addWidget(self.browse_key_btn)
         self.form_layout.addRow("Key File:", key_layout)
 
+        self.ssh_fields['allow_agent'] = QCheckBox("Use SSH agent")
+        self.form_layout.addRow(self.ssh_fields['allow_agent'])
+
+        self.ssh_fields['look_for_keys'] = QCheckBox("Try default keys in ~/.ssh")
+        self.form_layout.addRow(self.ssh_fields['look_for_keys'])
+
+        # Transport tuning - throughput first, legacy for old network gear
+        self.ssh_fields['transport_profile'] = QComboBox()
+        self.ssh_fields['transport_profile'].addItem("Throughput (modern ciphers first)", "throughput")
+        self.ssh_fields['transport_profile'].addItem("Legacy compatibility (CBC/SHA1)", "legacy")
+        self.form_layout.addRow("Transport:", self.ssh_fields['transport_profile'])
+
+        self.ssh_fields['compress'] = QCheckBox("Compression (slow links)")
+        self.form_layout.addRow(self.ssh_fields['compress'])
+
         # IMPROVED: Local shell fields with better shell selection
         self.local_fields = {}
 
@@ -508,10 +548,10 @@ class ConnectionDialog(QDialog):
                         shell['shell_path']  # Actual path: "cmd.exe"
                     )
 
-                print(f"Populated shell combo with {len(shells)} shells")
+                log.debug("Populated shell combo with %s shells", len(shells))
 
             except Exception as e:
-                print(f"Error populating shells: {e}")
+                log.error("Error populating shells: %s", e)
                 # Fallback if shell detection fails
                 fallback_shells = [
                     ("Command Prompt", "cmd.exe"),
@@ -520,12 +560,29 @@ class ConnectionDialog(QDialog):
                 ]
                 for display_name, shell_path in fallback_shells:
                     self.local_fields['shell_combo'].addItem(display_name, shell_path)
+        else:
+            try:
+                from coolpyterm.posixptyshellreader import get_available_posix_shells
+
+                shells = get_available_posix_shells()
+                for shell in shells:
+                    self.local_fields['shell_combo'].addItem(shell['name'], shell['shell_path'])
+
+                log.debug("Populated shell combo with %s shells", len(shells))
+
+            except Exception as e:
+                log.error("Error populating shells: %s", e)
+                self.local_fields['shell_combo'].addItem("sh", "/bin/sh")
 
     def on_connection_type_changed(self, connection_type):
         """Handle connection type change"""
         is_ssh = connection_type == "SSH"
 
         # Show/hide SSH fields
+        ssh_field_labels = {
+            'key_path': 'key file',
+            'transport_profile': 'transport'
+        }
         for field_name, widget in self.ssh_fields.items():
             widget.setVisible(is_ssh)
             # Find the corresponding label and hide it too
@@ -533,7 +590,7 @@ class ConnectionDialog(QDialog):
                 item = self.form_layout.itemAt(i, QFormLayout.ItemRole.LabelRole)
                 if item and item.widget():
                     label_text = item.widget().text().replace(":", "").lower()
-                    if field_name in label_text or (field_name == 'key_path' and 'key file' in label_text):
+                    if field_name in label_text or ssh_field_labels.get(field_name) == label_text:
                         item.widget().setVisible(is_ssh)
                         break
 
@@ -632,6 +689,11 @@ class ConnectionDialog(QDialog):
                 self.ssh_fields['port'].setValue(profile.port)
                 self.ssh_fields['password'].setText(profile.password)
                 self.ssh_fields['key_path'].setText(profile.key_path)
+                self.ssh_fields['allow_agent'].setChecked(profile.allow_agent)
+                self.ssh_fields['look_for_keys'].setChecked(profile.look_for_keys)
+                profile_index = self.ssh_fields['transport_profile'].findData(profile.transport_profile)
+                self.ssh_fields['transport_profile'].setCurrentIndex(max(0, profile_index))
+                self.ssh_fields['compress'].setChecked(profile.compress)
             else:
                 # Populate local terminal fields
                 # Find the combo box item with matching shell_path data
@@ -677,8 +739,17 @@ class ConnectionDialog(QDialog):
                 username=username,
                 port=self.ssh_fields['port'].value(),
                 password=self.ssh_fields['password'].text(),
-                key_path=self.ssh_fields['key_path'].text().strip()
+                key_path=self.ssh_fields['key_path'].text().strip(),
+                allow_agent=self.ssh_fields['allow_agent'].isChecked(),
+                look_for_keys=self.ssh_fields['look_for_keys'].isChecked(),
+                transport_profile=self.ssh_fields['transport_profile'].currentData(),
+                compress=self.ssh_fields['compress'].isChecked()
             )
+            # Keep advanced transport values that aren't exposed in the form
+            existing = self.connection_manager.get_profile(self.selected_profile_id) if self.selected_profile_id else None
+            if existing and existing.connection_type == 'ssh':
+                profile.window_size = existing.window_size
+                profile.max_packet_size = existing.max_packet_size
         else:
             # Get the actual shell path from combo box data, not display text
             combo_box = self.local_fields['shell_combo']
@@ -745,6 +816,10 @@ class ConnectionDialog(QDialog):
                 widget.clear()
             elif isinstance(widget, QSpinBox):
                 widget.setValue(22)
+            elif isinstance(widget, QCheckBox):
+                widget.setChecked(False)
+            elif isinstance(widget, QComboBox):
+                widget.setCurrentIndex(0)
 
         # Clear local fields
         for widget in self.local_fields.values():
@@ -771,8 +846,18 @@ class ConnectionDialog(QDialog):
                 'username': username,
                 'password': self.ssh_fields['password'].text(),
                 'port': self.ssh_fields['port'].value(),
-                'key_path': self.ssh_fields['key_path'].text().strip() or None
+                'key_path': self.ssh_fields['key_path'].text().strip() or None,
+                'allow_agent': self.ssh_fields['allow_agent'].isChecked(),
+                'look_for_keys': self.ssh_fields['look_for_keys'].isChecked(),
+                'transport_profile': self.ssh_fields['transport_profile'].currentData(),
+                'compress': self.ssh_fields['compress'].isChecked()
             }
+            # Window/packet sizes come from the selected profile when one is loaded
+            profile = self.connection_manager.get_profile(self.selected_profile_id) \
+                if self.selected_profile_id and self.connection_manager else None
+            if profile and profile.connection_type == 'ssh':
+                connection_config['window_size'] = profile.window_size or None
+                connection_config['max_packet_size'] = profile.max_packet_size or None
         else:
             # Get the actual shell path from combo box data, not display text
             combo_box = self.local_fields['shell_combo']
@@ -801,8 +886,11 @@ class ConnectionDialog(QDialog):
                 'wsl': 'wsl'
             }
 
-            # Handle WSL with distribution specification
-            backend_type = 'wsl' if 'wsl' in shell_path.lower() else shell_type_map.get(shell_path.lower(), 'cmd')
+            if platform.system() != "Windows":
+                backend_type = 'posix'
+            else:
+                # Handle WSL with distribution specification
+                backend_type = 'wsl' if 'wsl' in shell_path.lower() else shell_type_map.get(shell_path.lower(), 'cmd')
 
             connection_config = {
                 'connection_type': backend_type,
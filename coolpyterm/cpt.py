@@ -1,45 +1,81 @@
+import argparse
+import multiprocessing
 import os
 import sys
 import signal
 import atexit
+import uuid
+from datetime import datetime
 
-from PyQt6.QtWidgets import (QWidget, QApplication, QMainWindow, QVBoxLayout)
+from PyQt6.QtWidgets import (QWidget, QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QScrollBar,
+                             QTabWidget)
 from PyQt6.QtCore import QTimer, Qt, pyqtSlot, QRect, QThread
 from PyQt6.QtGui import QAction, QActionGroup, QFont, QFontMetrics, QColor, QPainter, QPen, QBrush, QImage, QKeySequence
-import pyte
-from pyte.screens import HistoryScreen
+from coolpyterm import tracing
+from coolpyterm.app_logging import configure as configure_logging, get_logger, TRACE
 from coolpyterm.backend_factory import create_backend
 
 from coolpyterm.connection_manager import ConnectionManager, ConnectionProfile, ConnectionDialog
 from coolpyterm.opengl_grid_widget import OpenGLRetroGridWidget
 
+log = get_logger('app')
+term_log = get_logger('terminal')
+input_log = get_logger('input')
+
 try:
     from OpenGL.GL import *
     OPENGL_AVAILABLE = True
 except ImportError:
-    print("PyOpenGL not available. Install with: pip install PyOpenGL PyOpenGL_accelerate")
+    log.warning("PyOpenGL not available. Install with: pip install PyOpenGL PyOpenGL_accelerate")
     OPENGL_AVAILABLE = False
 
 # Import your existing components
 from coolpyterm.ssh_backend import SSHBackend
 from coolpyterm.key_handler_ssh import KeyHandler
+from coolpyterm.latency import LatencyTracker
+from coolpyterm.log_handler import SessionLogger
+from coolpyterm.memory_stats import MemoryTracker, format_bytes, format_report, live_instances, terminal_memory_report
+from coolpyterm.session_recorder import SessionRecorder, export_asciicast
+from coolpyterm.paste_engine import PasteStreamer
+from coolpyterm.parser_pool import ProcessParser, shutdown_parser_pool
+from coolpyterm.parser_worker import ParserWorker
+from coolpyterm.scrollback import ScrollbackBuffer
+from coolpyterm.vt_session import line_cells
+from coolpyterm.profiler import ProfilingSession
 from coolpyterm.retro_theme_manager import RetroThemeManager
 from coolpyterm.settings_manager import SettingsManager, EnhancedTerminalMixin
+from coolpyterm.split_view import SplitTerminalView
+from coolpyterm.ssh_keys import set_key_cache_lifetime
 
 
 
 # Enhanced Connection Dialog with password field and actual connection logic
 from PyQt6.QtWidgets import (
-    QDialog, QVBoxLayout,  QMessageBox
+    QDialog, QVBoxLayout,  QMessageBox, QFileDialog, QInputDialog
 )
 
+# Smooth scrollback scrolling: each animation tick covers this share of the
+# remaining distance, and closer than SCROLL_SETTLE_LINES it lands
+SCROLL_ANIMATION_MS = 16
+SCROLL_EASING = 0.35
+SCROLL_SETTLE_LINES = 0.05
+
+# A size change reaches the parser and the PTY this long after the last
+# resize event, so a window drag resizes them once rather than per pixel
+RESIZE_DEBOUNCE_MS = 80
+
+# After a column change the scrollback is rewrapped this many lines per
+# event-loop pass, once the lines in view are done
+REFLOW_SLICE_LINES = 2000
+
 
 class TerminalWithHardwareGrid(QWidget):
     """
     Terminal widget using your grid approach with hardware acceleration
     """
 
-    def __init__(self, parent=None, ssh_config=None, log_file=None, font_size=12, theme_manager=None, **kwargs):
+    def __init__(self, parent=None, ssh_config=None, log_file=None, font_size=12, theme_manager=None,
+                 parse_mode='thread', parser_processes=0, engine='pyte', scrollback_lines=1000, **kwargs):
         """Updated initialization mentioning background glow"""
         super().__init__(parent)
         self.grid_widget = None
@@ -54,14 +90,68 @@ class TerminalWithHardwareGrid(QWidget):
             self.log_filename = log_file
         else:
             self.log_filename = None
+        # Session log writer thread, started on first use by a reader thread
+        self.session_logger = None
+        self.session_log_options = {}
+        # Raw byte recording, written to by backend reader threads while set
+        self.session_recorder = None
+        # Keystroke-to-photon probes, only while latency tracking is on
+        self.latency_tracker = None
+        self.latency_overlay_timer = None
+        # Performance HUD counters (owned by the grid widget), only while shown
+        self.perf_hud = None
         self.debug_counter = 0
 
+        # Identifies the connection in tab titles and diagnostics file names
+        self.session_id = uuid.uuid4().hex[:8]
+        self.connection_type = None
+        self.session_title = "New Session"
+
+        # Background tab: pyte keeps parsing, the grid and GL side sleep
+        self.render_suspended = False
+        self._redraw_pending = False
+        self.gl_release_idle_ms = 0  # 0 = keep GL resources while in the background
+        self.gl_release_timer = QTimer(self)
+        self.gl_release_timer.setSingleShot(True)
+        self.gl_release_timer.timeout.connect(self._release_gl_resources)
+
         # Initialize required attributes
         self.initial_buffer = ""
-        self.scroll_offset = 0
         self.in_alternate_screen = False
-        self.scrollback_buffer = []
-        self.max_scrollback_size = 1000
+        # Known before the parser starts: a frame hands over at most this many
+        # scrolled lines, and a parser process holds back at most this many
+        self.max_scrollback_size = max(1, scrollback_lines)
+        self.scrollback_buffer = ScrollbackBuffer(self.max_scrollback_size)
+
+        # Local scrollback view: scroll_position is how many lines the view
+        # sits above the live screen (fractional mid-animation or on
+        # touchpads), scroll_offset its whole part, scroll_target where a
+        # smooth scroll is heading
+        self.scroll_offset = 0
+        self.scroll_position = 0.0
+        self.scroll_target = 0.0
+        self.smooth_scrolling = True
+        self.wheel_lines = 3
+        self.scroll_timer = QTimer(self)
+        self.scroll_timer.setInterval(SCROLL_ANIMATION_MS)
+        self.scroll_timer.timeout.connect(self._animate_scroll)
+
+        # Size the parser and the PTY were last resized to; the grid follows
+        # the widget at once, they follow when resize_timer fires
+        self.applied_size = (80, 24)
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(RESIZE_DEBOUNCE_MS)
+        self.resize_timer.timeout.connect(self._apply_resize)
+        self.reflow_timer = QTimer(self)
+        self.reflow_timer.setInterval(0)
+        self.reflow_timer.timeout.connect(self._reflow_slice)
+
+        # Paste streaming - chunk size and optional per-line pacing for slow CLIs
+        self.paste_chunk_size = 4096
+        self.paste_line_delay_ms = 0
+        self.paste_progress_threshold = 64 * 1024  # Show progress above this many characters
+        self.active_paste = None
 
         # Theme manager setup
         self.theme_manager = theme_manager or RetroThemeManager()
@@ -75,21 +165,46 @@ class TerminalWithHardwareGrid(QWidget):
                 font_size=font_size,
                 theme_manager=self.theme_manager
             )
-            print(f"Created OpenGL grid widget for terminal {self.widget_id}")
+            term_log.debug("Created OpenGL grid widget for terminal %s", self.widget_id)
 
         # Layout
-        layout = QVBoxLayout(self)
+        layout = QHBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
         layout.addWidget(self.grid_widget)
 
+        # Scrollback scrollbar; its value is the top line of the view, so the
+        # bottom is the live screen
+        self.scrollbar = QScrollBar(Qt.Orientation.Vertical, self)
+        self.scrollbar.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.scrollbar.setRange(0, 0)
+        self.scrollbar.valueChanged.connect(self._on_scrollbar_moved)
+        layout.addWidget(self.scrollbar)
+
         # Terminal state
         self.rows = 24
         self.cols = 80
 
-        # Pyte components - same as your original approach
-        self.screen = HistoryScreen(self.cols, self.rows)
-        self.stream = self._create_safe_pyte_stream()
-        self._patch_pyte_compatibility()
+        # VT parsing runs in a worker thread (or, in 'process' mode, a parser
+        # process) that owns the pyte screen; the GUI thread only applies the
+        # frames it publishes. 'inline' parses on the caller's thread.
+        if parse_mode == 'process':
+            self.parser = ProcessParser(self.cols, self.rows, engine, parser_processes, parent=self)
+        else:
+            self.parser = ParserWorker(self.cols, self.rows, engine, parent=self)
+        self.parser.trace_key = id(self)
+        self.parser.scrollback_limit = self.max_scrollback_size
+        self.parser.frame_ready.connect(self.on_frame_ready)
+        if parse_mode != 'inline':
+            self.parser.start()
+
+        # The screen as of the last applied frame
+        self.frame_rows = {}
+        self.frame_cursor = (0, 0)
+        self.bracketed_paste = False
+        self.history_lines = 0
+        self._frame_colors = {}
+        self._frame_colors_theme = None
 
         # SSH backend setup - WILL BE SET LATER via connect_to_ssh
         self.ssh_backend = None
@@ -101,7 +216,7 @@ class TerminalWithHardwareGrid(QWidget):
         # Resize handling
         self.grid_widget.resizeEvent = self.on_grid_resize
 
-        print("Terminal initialized - ready for SSH connection")
+        term_log.debug("Terminal initialized - ready for SSH connection")
 
     # Add these methods to your TerminalWithHardwareGrid class in cpt.py
     # Add them after your existing connect_to_ssh method
@@ -112,7 +227,7 @@ class TerminalWithHardwareGrid(QWidget):
             return False
 
         try:
-            print(f"Connecting to local terminal: {connection_config}")
+            term_log.info("Connecting to local terminal: %s", connection_config)
 
             # Import and use the backend factory
             from coolpyterm.backend_factory import create_backend
@@ -121,37 +236,35 @@ class TerminalWithHardwareGrid(QWidget):
             self.ssh_backend = create_backend(connection_config, self)
 
             # Connect signals (same as SSH)
-            self.ssh_backend.send_output.connect(self.update_ui)
+            self.attach_output(self.ssh_backend)
             self.ssh_backend.connection_established.connect(self.on_local_terminal_connected)
             self.ssh_backend.connection_failed.connect(self.on_local_terminal_failed)
 
-            print("Local terminal backend established successfully")
+            term_log.info("Local terminal backend established successfully")
             return True
 
         except Exception as e:
-            print(f"Failed to establish local terminal backend: {e}")
-            import traceback
-            traceback.print_exc()
+            term_log.exception("Failed to establish local terminal backend: %s", e)
             QMessageBox.critical(None, "Connection Failed", f"Failed to connect to local terminal:\n{str(e)}")
             self.ssh_backend = None
             return False
 
     def on_local_terminal_connected(self):
         """Handle successful local terminal connection"""
-        print("Local terminal connected successfully!")
+        term_log.info("Local terminal connected successfully!")
 
     def on_local_terminal_failed(self, error_msg):
         """Handle failed local terminal connection"""
-        print(f"Local terminal connection failed: {error_msg}")
+        term_log.error("Local terminal connection failed: %s", error_msg)
         QMessageBox.critical(None, "Terminal Connection Failed", f"Failed to connect to terminal:\n{error_msg}")
 
     def on_ssh_connected(self):
         """Handle successful SSH connection"""
-        print("SSH connected successfully!")
+        term_log.info("SSH connected successfully!")
 
     def on_ssh_failed(self, error_msg):
         """Handle failed SSH connection"""
-        print(f"SSH connection failed: {error_msg}")
+        term_log.error("SSH connection failed: %s", error_msg)
         QMessageBox.critical(None, "SSH Connection Failed", f"Failed to connect to SSH server:\n{error_msg}")
 
 
@@ -162,7 +275,7 @@ class TerminalWithHardwareGrid(QWidget):
             return False
 
         try:
-            print(f"Connecting to SSH: {ssh_config['username']}@{ssh_config['hostname']}:{ssh_config['port']}")
+            term_log.info("Connecting to SSH: %s@%s:%s", ssh_config['username'], ssh_config['hostname'], ssh_config['port'])
 
             self.ssh_backend = SSHBackend(
                 host=ssh_config['hostname'],
@@ -171,366 +284,405 @@ class TerminalWithHardwareGrid(QWidget):
                 port=ssh_config.get('port', 22),
                 key_path=ssh_config.get('key_path'),
                 parent_widget=self,
-                parent=self
+                parent=self,
+                key_passphrase=ssh_config.get('key_passphrase'),
+                allow_agent=ssh_config.get('allow_agent', False),
+                look_for_keys=ssh_config.get('look_for_keys', False),
+                transport_profile=ssh_config.get('transport_profile'),
+                window_size=ssh_config.get('window_size'),
+                max_packet_size=ssh_config.get('max_packet_size'),
+                compress=ssh_config.get('compress')
             )
-            self.ssh_backend.send_output.connect(self.update_ui)
-            print("SSH backend established successfully")
+            self.attach_output(self.ssh_backend)
+            term_log.info("SSH backend established successfully")
             return True
 
         except Exception as e:
-            print(f"Failed to establish SSH backend: {e}")
+            term_log.error("Failed to establish SSH backend: %s", e)
             QMessageBox.critical(None, "Connection Failed", f"Failed to connect to SSH server:\n{str(e)}")
             self.ssh_backend = None
             return False
 
-    def _create_safe_pyte_stream(self):
-        """Create a pyte stream with improved error handling"""
-        try:
-            stream = pyte.ByteStream()
-            stream.attach(self.screen)
-
-            original_feed = stream.feed
-
-            def safe_feed(data):
-                if self._is_closing:
-                    return
-                try:
-                    return original_feed(data)
-                except TypeError as e:
-                    if 'unexpected keyword argument' in str(e):
-                        print(f"Pyte compatibility error (continuing): {e}")
-                        return
-                    else:
-                        raise
-                except Exception as e:
-                    print(f"Pyte feed error (continuing): {e}")
-                    return
-
-            stream.feed = safe_feed
-            return stream
-
-        except Exception as e:
-            print(f"Failed to create safe pyte stream: {e}")
-            stream = pyte.ByteStream()
-            stream.attach(self.screen)
-            return stream
-
-    def _patch_pyte_compatibility(self):
-        """Comprehensive pyte compatibility patch"""
-        try:
-            original_sgr = self.screen.select_graphic_rendition
-
-            def patched_sgr(*args, **kwargs):
-                if self._is_closing:
-                    return None
-                kwargs.pop('private', None)
-                kwargs.pop('intermediate', None)
-                try:
-                    return original_sgr(*args, **kwargs)
-                except Exception as e:
-                    print(f"SGR error (continuing): {e}")
-                    return None
-
-            self.screen.select_graphic_rendition = patched_sgr
-
-            methods_to_patch = ['set_mode', 'reset_mode', 'set_margins', 'cursor_position']
-
-            for method_name in methods_to_patch:
-                if hasattr(self.screen, method_name):
-                    original_method = getattr(self.screen, method_name)
-
-                    def create_patched_method(orig_method, name):
-                        def patched_method(*args, **kwargs):
-                            if self._is_closing:
-                                return None
-                            kwargs.pop('private', None)
-                            kwargs.pop('intermediate', None)
-                            try:
-                                return orig_method(*args, **kwargs)
-                            except Exception as e:
-                                print(f"{name} error (continuing): {e}")
-                                return None
-                        return patched_method
-
-                    setattr(self.screen, method_name, create_patched_method(original_method, method_name))
-
-            print("Applied comprehensive pyte compatibility patches")
-
-        except Exception as e:
-            print(f"Pyte patch failed: {e}")
-
     def on_grid_resize(self, event):
-        """Handle grid widget resize - PROPERLY FIXED"""
+        """Handle grid widget resize - PROPERLY FIXED
+
+        Installed as the grid's resizeEvent, so it runs the grid's own handler
+        (GL surface and resize_grid) first; event is None when a split view
+        has already resized the grid.
+        """
+        if event is not None:
+            OpenGLRetroGridWidget.resizeEvent(self.grid_widget, event)
         if self._is_closing:
             return
 
-        print(f"Terminal {self.widget_id} resize called")
+        term_log.debug("Terminal %s resize called", self.widget_id)
 
         new_cols = self.grid_widget.cols
         new_rows = self.grid_widget.rows
 
         # Only update if actually changed
         if new_cols == self.cols and new_rows == self.rows:
-            print(f"Terminal {self.widget_id} - no size change, ignoring")
+            term_log.debug("Terminal %s - no size change, ignoring", self.widget_id)
             return
 
-        print(f"Terminal {self.widget_id} resize: {self.cols}x{self.rows} -> {new_cols}x{new_rows}")
+        term_log.debug("Terminal %s resize: %sx%s -> %sx%s", self.widget_id, self.cols, self.rows, new_cols, new_rows)
 
         self.cols = new_cols
         self.rows = new_rows
+        self.resize_timer.start()
+
+        self.redraw()
 
-        # Resize the pyte screen
-        self.screen.resize(new_rows, new_cols)
+    def _apply_resize(self):
+        """Resize the parser and the PTY to the grid, once a resize has settled"""
+        size = (self.cols, self.rows)
+        if self._is_closing or size == self.applied_size:
+            return
+        old_cols = self.applied_size[0]
+        self.applied_size = size
+        cols, rows = size
+        term_log.debug("Terminal %s applying resize to %sx%s", self.widget_id, cols, rows)
+
+        # The parser rewraps the screen; lines it pushes off land after these
+        if cols != old_cols:
+            self._reflow_scrollback(cols)
+
+        # Resize the pyte screen, after the output already queued for it
+        self.parser.resize(cols, rows)
+
+        if self.session_recorder is not None:
+            self.session_recorder.record_resize(cols, rows)
 
         # Notify SSH backend
-        if self.ssh_backend and not self._is_closing:
-            pty_data = f"cols:{new_cols}::rows:{new_rows}"
+        if self.ssh_backend:
+            pty_data = f"cols:{cols}::rows:{rows}"
             self.ssh_backend.set_pty_size(pty_data)
 
-        self.redraw()
+    def attach_output(self, backend):
+        """Feed a backend's output straight to the parser, from the backend's reader thread"""
+        backend.send_output.connect(self.update_ui, Qt.ConnectionType.DirectConnection)
 
     @pyqtSlot(str)
     def update_ui(self, data):
-        """Update UI with SSH data - uses your grid approach"""
+        """Queue backend output for the parser worker; safe to call from any thread"""
         if self._is_closing:
             return
 
-        print(f"Received data: {data[:50]}...")
+        if __debug__ and term_log.isEnabledFor(TRACE):
+            term_log.log(TRACE, "Received data: %r", data[:50])
+
+        self.parser.feed(data)
 
-        # Convert string to bytes for pyte
-        data_bytes = data.encode('utf-8')
-        self.stream.feed(data_bytes)
+    def on_frame_ready(self):
+        """GUI thread: apply everything the parser published since the last frame"""
+        if self._is_closing:
+            return
+        frame = self.parser.take_frame()
+        if frame is None:
+            return
 
-        # Handle escape sequences
-        self.handle_escape_sequences(data)
+        with tracing.span('apply_frame', 'gui', rows=len(frame.rows), chars=frame.chars):
+            self.apply_frame(frame)
 
-        # Handle scrollback
-        if not self.in_alternate_screen:
-            while len(self.screen.dirty) > 0:
-                line_index = self.screen.dirty.pop()
-                if line_index < len(self.screen.buffer):
-                    line = self.screen.buffer[line_index]
-                    self.add_to_scrollback(line)
+        if self.perf_hud is not None:
+            self.perf_hud.chars_ingested(frame.chars, frame.rows.keys())
+        if self.latency_tracker is not None:
+            self.latency_tracker.mark_parsed()
 
-        # Redraw screen
-        self.redraw()
+    def apply_frame(self, frame):
+        """Update the GUI's copy of the screen and copy the changed rows into the grid"""
+        previous = self.frame_rows
+        if frame.full:
+            self.frame_rows = dict(frame.rows)
+        else:
+            self.frame_rows = {**previous, **frame.rows}
+        for y in [y for y in self.frame_rows if y >= frame.lines]:
+            del self.frame_rows[y]
+        self.frame_cursor = frame.cursor
+        self.bracketed_paste = frame.bracketed_paste
+        self.history_lines = frame.history
+        for row in frame.scrolled:
+            self.add_to_scrollback(row)
+
+        # Switching screens arrives as ordinary changed rows: the engine keeps
+        # the main screen aside and marks every row dirty, so no rebuild here
+        mode_changed = frame.alternate != self.in_alternate_screen
+        self.in_alternate_screen = frame.alternate
+
+        # New output brings a view scrolled into the scrollback back to the live screen
+        snapped = bool(self.scroll_position or self.scroll_target) and bool(frame.rows or frame.scrolled)
+        if snapped:
+            self._reset_view()
+        if frame.scrolled or snapped or mode_changed:
+            self._update_scrollbar()
+
+        if frame.full or snapped:
+            with tracing.span('redraw', 'grid'):
+                self.redraw()
+        elif self.render_suspended:
+            self._redraw_pending = True
+        else:
+            with tracing.span('grid', 'grid'):
+                colors = self._color_cache()
+                rows = frame.rows
+                shift = self._scroll_shift(previous, frame)
+                if shift:
+                    # The grid scrolls with the screen, which only rotates its
+                    # texture ring; then just the rows that differ from what
+                    # moved into their place are set
+                    lines = self.grid_widget.rows
+                    self.grid_widget.scroll_up(shift)
+                    current = self.frame_rows
+                    rows = {y: row for y, row in current.items()
+                            if y >= lines - shift or row != previous.get(y + shift)}
+                for y, row in rows.items():
+                    self._set_grid_row(y, row, colors)
         self.update_cursor()
 
-    def handle_escape_sequences(self, data_str):
-        """Handle escape sequences"""
+    def _scroll_shift(self, previous, frame):
+        """Lines the screen moved up since the previous frame, or 0 if it did not scroll"""
+        lines = self.grid_widget.rows
+        rows = frame.rows
+        if len(rows) < lines // 2 or frame.lines != lines or self.scroll_position:
+            return 0
+        if frame.scrolled:
+            shift = len(frame.scrolled)
+        else:
+            # Nothing went to history (alternate screen, scroll regions): see
+            # where the first changed row was before
+            first = min(rows)
+            row = rows[first]
+            shift = next((y - first for y in range(first + 1, lines) if previous.get(y) == row), 0)
+        if not 0 < shift < lines:
+            return 0
+        current = self.frame_rows
+        kept = sum(1 for y in range(lines - shift) if current.get(y) == previous.get(y + shift))
+        return shift if kept * 2 >= lines - shift else 0
+
+    def _reflow_scrollback(self, columns):
+        """Rewrap the scrollback to a new width: the lines in view now, the rest in slices"""
+        scrollback = self.scrollback_buffer
+        scrollback.reflow(columns)
+        if scrollback.reflow_view(self.scroll_offset + self.rows + 1):
+            self.reflow_timer.start()
+        if self.scroll_position:
+            self.render_viewport()
+        self._update_scrollbar()
+
+    def _reflow_slice(self):
         if self._is_closing:
+            self.reflow_timer.stop()
+            self.scrollback_buffer.stop_reflow()
             return
+        if not self.scrollback_buffer.reflow_step(REFLOW_SLICE_LINES):
+            self.reflow_timer.stop()
+        if self.scroll_position:
+            self.render_viewport()
+        self._update_scrollbar()
 
-        if "\x1b[?1049h" in data_str:
-            self.in_alternate_screen = True
-            self.redraw()
-        elif "\x1b[?1049l" in data_str:
-            self.in_alternate_screen = False
-            self.redraw()
+    def row_text(self, y):
+        """Text of one screen row as of the last applied frame"""
+        return "".join(char.data for char in self.frame_rows.get(y, ()))
 
     def add_to_scrollback(self, line):
         """Add to scrollback buffer"""
         if self._is_closing:
             return
-
-        if len(self.scrollback_buffer) >= self.max_scrollback_size:
-            self.scrollback_buffer.pop(0)
         self.scrollback_buffer.append(line)
 
-    def redraw(self):
-        """Redraw terminal using your grid approach"""
-        if self._is_closing:
-            return
+    def set_scrollback_lines(self, lines):
+        """How many scrolled-off lines to keep; the newest are kept when shrinking"""
+        self.max_scrollback_size = max(1, lines)
+        self.scrollback_buffer.set_capacity(self.max_scrollback_size)
+        self.parser.scrollback_limit = self.max_scrollback_size
+        self.scroll_to(min(self.scroll_target, len(self.scrollback_buffer)), smooth=False)
 
-        try:
-            self.grid_widget.clear_screen()
+    # --- Scrollback view ----------------------------------------------------------
 
-            if self.in_alternate_screen:
-                # Alternate screen mode
-                for display_idx, line in enumerate(self.screen.display):
-                    if display_idx >= self.grid_widget.rows:
-                        break
-
-                    line_str = ""
-                    if isinstance(line, str):
-                        line_str = line
-                    else:
-                        for char in line:
-                            if hasattr(char, 'data'):
-                                line_str += char.data
-                            else:
-                                line_str += str(char)
-
-                    for col, char in enumerate(line_str):
-                        if col >= self.grid_widget.cols:
-                            break
-                        self.grid_widget.set_char(display_idx, col, char)
-
-                self._apply_colors_alternate_screen()
+    def scroll_view(self, lines, smooth=None):
+        """Move the view `lines` up into the scrollback (negative: back toward the live screen)"""
+        self.scroll_to(self.scroll_target + lines, smooth)
 
-            else:
-                # Normal mode with history
-                history_lines = []
-                try:
-                    if hasattr(self.screen, 'history') and hasattr(self.screen.history, 'top'):
-                        for line_dict in self.screen.history.top:
-                            processed_line = ""
-                            if isinstance(line_dict, dict):
-                                for index in sorted(line_dict.keys()):
-                                    char = line_dict[index]
-                                    if hasattr(char, 'data'):
-                                        processed_line += char.data
-                                    else:
-                                        processed_line += str(char)
-                            history_lines.append(processed_line)
-                except Exception as e:
-                    print(f"Error extracting history: {e}")
-                    history_lines = []
-
-                # Combine history with current screen
-                combined_lines = history_lines[:]
-
-                for line in self.screen.display:
-                    if isinstance(line, str):
-                        combined_lines.append(line)
-                    else:
-                        line_str = ""
-                        for char in line:
-                            if hasattr(char, 'data'):
-                                line_str += char.data
-                            else:
-                                line_str += str(char)
-                        combined_lines.append(line_str)
-
-                # Calculate display window
-                rows = self.grid_widget.rows
-                total_lines = len(combined_lines)
-
-                if total_lines > rows:
-                    start_line = total_lines - rows
-                    lines_to_display = combined_lines[start_line:]
-                    offset = total_lines - len(self.screen.display) - start_line
-                else:
-                    lines_to_display = combined_lines
-                    start_line = 0
-                    offset = len(history_lines)
-
-                # Render content to grid
-                for display_idx, line_text in enumerate(lines_to_display):
-                    if display_idx >= rows:
-                        break
-                    for col, char in enumerate(line_text):
-                        if col >= self.grid_widget.cols:
-                            break
-                        self.grid_widget.set_char(display_idx, col, char)
-
-                # Apply colors with correct offset
-                self._apply_colors_simple(max(0, offset))
+    def scroll_to(self, position, smooth=None):
+        """Show the view `position` lines above the live screen, animated if smooth scrolling is on"""
+        if self._is_closing or self.in_alternate_screen:
+            return
+        position = min(max(float(position), 0.0), float(len(self.scrollback_buffer)))
+        self.scroll_target = position
+        if smooth is None:
+            smooth = self.smooth_scrolling
+        if smooth and not self.render_suspended:
+            if not self.scroll_timer.isActive():
+                self.scroll_timer.start()
+        else:
+            self.scroll_timer.stop()
+            self._show_position(position)
+
+    def _animate_scroll(self):
+        distance = self.scroll_target - self.scroll_position
+        if abs(distance) < SCROLL_SETTLE_LINES:
+            self.scroll_timer.stop()
+            self._show_position(self.scroll_target)
+        else:
+            self._show_position(self.scroll_position + distance * SCROLL_EASING)
 
-        except Exception as e:
-            if not self._is_closing:
-                print(f"Error in redraw: {e}")
-                import traceback
-                traceback.print_exc()
+    def _show_position(self, position):
+        if position <= 0:
+            self._reset_view()
+            self.redraw()
+            self.update_cursor()
+        else:
+            self.scroll_position = position
+            self.scroll_offset = int(position)
+            self.render_viewport()
+        self._update_scrollbar()
+
+    def _reset_view(self):
+        """Back to the live screen, without redrawing it"""
+        self.scroll_timer.stop()
+        self.scroll_position = self.scroll_target = 0.0
+        self.scroll_offset = 0
+        grid = self.grid_widget
+        if grid is not None:
+            grid.cursor_shown = True
+            grid.set_view_offset(0.0)
 
-    def _apply_colors_simple(self, offset):
-        """Apply colors in normal mode"""
+    def render_viewport(self):
+        """Draw the view at scroll_position, reading only its own lines from scrollback and screen"""
         if self._is_closing:
             return
+        if self.render_suspended:
+            self._redraw_pending = True
+            return
 
-        try:
-            current_theme = self.theme_manager.get_current_theme()
-
-            for y, line in enumerate(self.screen.display):
-                for x, char in enumerate(line):
-                    if y < len(self.screen.buffer) and x < len(self.screen.buffer[y]):
-                        char_style = self.screen.buffer[y][x]
-
-                        # Map colors using theme manager
-                        fg_color = current_theme.foreground
-                        bg_color = current_theme.background
-
-                        if hasattr(char_style, 'fg') and char_style.fg:
-                            fg_color = self.theme_manager.map_pyte_color(char_style.fg, current_theme)
-
-                        if hasattr(char_style, 'bg') and char_style.bg and char_style.bg != "default":
-                            bg_color = self.theme_manager.map_pyte_color(char_style.bg, current_theme)
-
-                        char_data = char_style.data if hasattr(char_style, 'data') else ' '
-                        is_bold = getattr(char_style, 'bold', False)
-                        is_underline = getattr(char_style, 'underline', False)
+        grid = self.grid_widget
+        scrollback = self.scrollback_buffer
+        history = len(scrollback)
+        fraction = self.scroll_position - self.scroll_offset
+        # Lines are numbered through scrollback then screen; mid-line, the view
+        # starts in the line above and the texture is drawn moved up
+        first = history - self.scroll_offset - (1 if fraction else 0)
+        lines = []
+        for index in range(first, first + grid.rows + 1):
+            if index < history:
+                lines.append(line_cells(scrollback[index], grid.cols))
+            else:
+                lines.append(self.frame_rows.get(index - history, ()))
 
-                        adjusted_line_num = y + offset
+        colors = self._color_cache()
+        for y, row in enumerate(lines[:grid.rows]):
+            self._set_grid_row(y, row, colors)
+        if fraction:
+            grid.set_view_offset(1.0 - fraction, self._grid_cells(lines[-1], colors))
+        else:
+            grid.set_view_offset(0.0)
+
+        cursor_row = history + self.frame_cursor[0] - first
+        grid.cursor_shown = 0 <= cursor_row < grid.rows
+        if grid.cursor_shown:
+            grid.set_cursor_position(cursor_row, self.frame_cursor[1])
+
+    def _update_scrollbar(self):
+        bar = self.scrollbar
+        history = len(self.scrollback_buffer)
+        bar.blockSignals(True)
+        bar.setRange(0, history)
+        bar.setPageStep(max(1, self.rows))
+        bar.setValue(history - round(self.scroll_position))
+        bar.setEnabled(not self.in_alternate_screen)
+        bar.blockSignals(False)
+
+    def _on_scrollbar_moved(self, value):
+        self.scroll_to(len(self.scrollback_buffer) - value, smooth=False)
+
+    def _scroll_key(self, event):
+        """Shift+PageUp/PageDown page through the scrollback; True if the key was one of them"""
+        modifiers = event.modifiers()
+        if (self.in_alternate_screen or not modifiers & Qt.KeyboardModifier.ShiftModifier
+                or modifiers & (Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.AltModifier)):
+            return False
+        page = max(1, self.rows - 1)
+        if event.key() == Qt.Key.Key_PageUp:
+            self.scroll_view(page)
+        elif event.key() == Qt.Key.Key_PageDown:
+            self.scroll_view(-page)
+        else:
+            return False
+        return True
 
-                        if adjusted_line_num >= 0 and adjusted_line_num < self.grid_widget.rows:
-                            self.grid_widget.set_char(
-                                adjusted_line_num, x, char_data,
-                                fg_color=fg_color,
-                                bg_color=bg_color,
-                                bold=is_bold,
-                                underline=is_underline
-                            )
-        except Exception as e:
-            if not self._is_closing:
-                print(f"Error applying simple colors: {e}")
+    def wheelEvent(self, event):
+        """Scroll through the scrollback; on the alternate screen the wheel is left alone"""
+        if self._is_closing or self.in_alternate_screen or not len(self.scrollback_buffer):
+            event.ignore()
+            return
+        pixels = event.pixelDelta().y()
+        if pixels:
+            # Touchpads report pixels and already move smoothly
+            self.scroll_view(pixels / self.grid_widget.char_height, smooth=False)
+        else:
+            self.scroll_view(event.angleDelta().y() / 120 * self.wheel_lines)
+        event.accept()
 
-    def _apply_colors_alternate_screen(self):
-        """Apply colors in alternate screen mode"""
+    def redraw(self):
+        """Rebuild the whole grid from the last applied frame"""
         if self._is_closing:
             return
+        if self.render_suspended:
+            # Translated once, from the latest frame, when the tab comes back
+            self._redraw_pending = True
+            return
+        if self.scroll_position:
+            self.render_viewport()
+            return
 
         try:
-            current_theme = self.theme_manager.get_current_theme()
-
-            for y, line in enumerate(self.screen.display):
-                if y >= self.grid_widget.rows:
-                    break
-
-                for x, char in enumerate(line):
-                    if x >= self.grid_widget.cols:
-                        break
-
-                    if y < len(self.screen.buffer) and x < len(self.screen.buffer[y]):
-                        char_style = self.screen.buffer[y][x]
-
-                        fg_color = current_theme.foreground
-                        bg_color = current_theme.background
-
-                        if hasattr(char_style, 'fg') and char_style.fg:
-                            fg_color = self.theme_manager.map_pyte_color(char_style.fg, current_theme)
-
-                        if hasattr(char_style, 'bg') and char_style.bg and char_style.bg != "default":
-                            bg_color = self.theme_manager.map_pyte_color(char_style.bg, current_theme)
-
-                        char_data = char_style.data if hasattr(char_style, 'data') else ' '
-                        is_bold = getattr(char_style, 'bold', False)
-                        is_underline = getattr(char_style, 'underline', False)
-
-                        self.grid_widget.set_char(
-                            y, x, char_data,
-                            fg_color=fg_color,
-                            bg_color=bg_color,
-                            bold=is_bold,
-                            underline=is_underline
-                        )
+            self.grid_widget.clear_screen()
+            colors = self._color_cache()
+            for y, row in self.frame_rows.items():
+                self._set_grid_row(y, row, colors)
         except Exception as e:
             if not self._is_closing:
-                print(f"Error applying alternate screen colors: {e}")
+                term_log.exception("Error in redraw: %s", e)
+
+    def _color_cache(self):
+        """(fg, bg) pyte color names -> theme QColors, rebuilt when the theme changes"""
+        theme = self.theme_manager.get_current_theme()
+        if theme is not self._frame_colors_theme:
+            self._frame_colors = {}
+            self._frame_colors_theme = theme
+        return self._frame_colors
+
+    def _set_grid_row(self, y, row, colors):
+        """Copy one row of pyte Chars into the grid, mapping colors through the theme"""
+        grid = self.grid_widget
+        if y >= grid.rows:
+            return
+        grid.set_row(y, self._grid_cells(row, colors))
+
+    def _grid_cells(self, row, colors):
+        """A row of pyte Chars as the grid's (char, fg, bg, bold, underline) cells"""
+        theme = self._frame_colors_theme
+        cells = []
+        for char in row[:self.grid_widget.cols]:
+            pair = colors.get((char.fg, char.bg))
+            if pair is None:
+                fg_color = theme.foreground
+                bg_color = theme.background
+                if char.fg:
+                    fg_color = self.theme_manager.map_pyte_color(char.fg, theme)
+                if char.bg and char.bg != "default":
+                    bg_color = self.theme_manager.map_pyte_color(char.bg, theme)
+                pair = colors[(char.fg, char.bg)] = (fg_color, bg_color)
+            cells.append((char.data, pair[0], pair[1], char.bold, char.underscore))
+        return cells
 
     def update_cursor(self):
         """Update cursor position"""
-        if self._is_closing:
-            return
+        if self._is_closing or self.render_suspended or self.scroll_position:
+            return  # a scrolled-back view places the cursor in render_viewport
 
         try:
-            if self.in_alternate_screen:
-                cursor_row = self.screen.cursor.y
-                cursor_col = self.screen.cursor.x
-            else:
-                total_lines_in_widget = self.grid_widget.rows
-                lines_from_bottom = self.screen.lines - self.screen.cursor.y
-                cursor_row = total_lines_in_widget - lines_from_bottom
-                cursor_col = self.screen.cursor.x
+            cursor_row, cursor_col = self.frame_cursor
 
             # Bounds checking
             cursor_row = max(0, min(cursor_row, self.grid_widget.rows - 1))
@@ -540,30 +692,95 @@ class TerminalWithHardwareGrid(QWidget):
 
         except Exception as e:
             if not self._is_closing:
-                print(f"Error updating cursor: {e}")
+                term_log.error("Error updating cursor: %s", e)
 
     def keyPressEvent(self, event):
         """Handle key press events - ENHANCED DEBUG VERSION"""
         if self._is_closing:
             return
 
-        print(f"🔑 Key pressed: {event.key()}, text: '{event.text()}', modifiers: {event.modifiers()}")
-        print(f"🔑 Backend type: {type(self.ssh_backend)}")
-        print(
-            f"🔑 Backend has send_command: {hasattr(self.ssh_backend, 'send_command') if self.ssh_backend else 'No backend'}")
-        print(
-            f"🔑 Backend has write_data: {hasattr(self.ssh_backend, 'write_data') if self.ssh_backend else 'No backend'}")
+        tracker = self.latency_tracker
+        if tracker is not None:
+            tracker.key_pressed()
+
+        if __debug__ and input_log.isEnabledFor(TRACE):
+            input_log.log(TRACE, "Key pressed: %s, text: %r, modifiers: %s, backend: %s",
+                          event.key(), event.text(), event.modifiers(), type(self.ssh_backend).__name__)
+
+        if self._scroll_key(event):
+            if tracker is not None:
+                tracker.key_ignored()
+            return
 
         if self.ssh_backend:
             handled = KeyHandler.handle_key_event(event, self.ssh_backend)
-            print(f"🔑 Key handled by KeyHandler: {handled}")
+            if __debug__ and input_log.isEnabledFor(TRACE):
+                input_log.log(TRACE, "Key handled by KeyHandler: %s", handled)
             if handled:
+                # Typing brings a scrolled-back view to the live screen
+                if self.scroll_position or self.scroll_target:
+                    self.scroll_to(0.0, smooth=False)
+                if tracker is not None:
+                    self._latency_key_handled(tracker)
                 return
         else:
-            print("🔑 No backend available for key handling")
+            input_log.debug("No backend available for key handling")
 
+        if tracker is not None:
+            tracker.key_ignored()
         super().keyPressEvent(event)
 
+    def _latency_key_handled(self, tracker):
+        """Stamp a handled key and make sure the current backend reports its sends"""
+        tracker.key_handled()
+        send_queue = getattr(self.ssh_backend, 'send_queue', None)
+        if send_queue is None:
+            # Backends without a send queue write synchronously
+            tracker.mark_sent()
+        elif send_queue.on_sent is None:
+            send_queue.on_sent = tracker.mark_sent
+
+    def set_latency_tracking(self, enabled):
+        """Start or stop keystroke-to-photon tracking and its overlay"""
+        if enabled and self.latency_tracker is None:
+            self.latency_tracker = LatencyTracker()
+            self.grid_widget.frameSwapped.connect(self.latency_tracker.mark_presented)
+            self.latency_overlay_timer = QTimer(self)
+            self.latency_overlay_timer.timeout.connect(self._refresh_latency_overlay)
+            self.latency_overlay_timer.start(500)
+            self._refresh_latency_overlay()
+        elif not enabled and self.latency_tracker is not None:
+            self.latency_overlay_timer.stop()
+            self.latency_overlay_timer = None
+            try:
+                self.grid_widget.frameSwapped.disconnect(self.latency_tracker.mark_presented)
+            except TypeError:
+                pass
+            send_queue = getattr(self.ssh_backend, 'send_queue', None)
+            if send_queue is not None and send_queue.on_sent == self.latency_tracker.mark_sent:
+                send_queue.on_sent = None
+            self.latency_tracker = None
+            self.grid_widget.set_overlay_section('latency', None)
+
+    def set_perf_hud(self, enabled):
+        """Show or hide the performance HUD"""
+        if not self.grid_widget:
+            return
+        self.perf_hud = self.grid_widget.set_perf_hud(enabled, self._perf_hud_stats)
+
+    def _perf_hud_stats(self):
+        """Terminal-side numbers for the HUD, sampled when its text refreshes"""
+        report = terminal_memory_report(self)
+        scrollback = report['history'] + report['scrollback']
+        return {
+            'scrollback': f"{scrollback / (1024 * 1024):7.2f} MiB ({self.history_lines + len(self.scrollback_buffer)} lines)",
+            'memory': f"{format_bytes(report['total']):>10} est.",
+        }
+
+    def _refresh_latency_overlay(self):
+        if self.latency_tracker is not None and self.grid_widget:
+            self.grid_widget.set_overlay_section('latency', self.latency_tracker.overlay_lines())
+
     def focusInEvent(self, event):
         """Handle focus in events"""
         if self._is_closing:
@@ -573,7 +790,7 @@ class TerminalWithHardwareGrid(QWidget):
         self.grid_widget.setFocus()
 
     def paste_from_clipboard(self):
-        """Paste from clipboard"""
+        """Paste from clipboard, streaming large pastes in chunks"""
         if self._is_closing:
             return
 
@@ -581,12 +798,54 @@ class TerminalWithHardwareGrid(QWidget):
             clipboard = QApplication.clipboard()
             text = clipboard.text()
             if text and self.ssh_backend:
-                if hasattr(KeyHandler, 'handle_paste'):
-                    KeyHandler.handle_paste(text, self.ssh_backend)
-                else:
-                    self.ssh_backend.write_data(text)
+                self.start_paste(text)
         except Exception as e:
-            print(f"Paste error: {e}")
+            term_log.error("Paste error: %s", e)
+
+    def is_bracketed_paste_enabled(self):
+        """True if the remote application turned on bracketed paste (?2004h)"""
+        # Published with each frame by the parser worker
+        return self.bracketed_paste
+
+    def start_paste(self, text):
+        """Stream text to the backend with progress and cancel for large pastes"""
+        if self.active_paste is not None and self.active_paste.active:
+            term_log.info("Paste already in progress - ignoring new paste")
+            return
+
+        streamer = PasteStreamer(
+            text,
+            self.ssh_backend,
+            bracketed=self.is_bracketed_paste_enabled(),
+            chunk_size=self.paste_chunk_size,
+            line_delay_ms=self.paste_line_delay_ms,
+            parent=self
+        )
+
+        if streamer.total >= self.paste_progress_threshold or self.paste_line_delay_ms:
+            from PyQt6.QtWidgets import QProgressDialog
+
+            progress_dialog = QProgressDialog("Pasting...", "Cancel", 0, 1000, self)
+            progress_dialog.setWindowTitle("Paste")
+            progress_dialog.setMinimumDuration(500)
+            progress_dialog.setAutoClose(True)
+            progress_dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+            streamer.progress.connect(
+                lambda sent, total: progress_dialog.setValue(int(sent * 1000 / max(1, total))))
+            streamer.cancelled.connect(progress_dialog.close)
+            streamer.finished.connect(progress_dialog.close)
+            progress_dialog.canceled.connect(streamer.cancel)
+
+        streamer.finished.connect(self._on_paste_done)
+        streamer.cancelled.connect(self._on_paste_done)
+        self.active_paste = streamer
+        streamer.start()
+
+    def _on_paste_done(self):
+        """Release the finished or cancelled paste"""
+        if self.active_paste is not None:
+            self.active_paste.deleteLater()
+            self.active_paste = None
 
     def send_command(self, command):
         """Send command to SSH"""
@@ -601,7 +860,7 @@ class TerminalWithHardwareGrid(QWidget):
         if self._is_closing:
             return
 
-        print(f"Terminal {self.widget_id} setting theme to: {theme_name}")
+        term_log.debug("Terminal %s setting theme to: %s", self.widget_id, theme_name)
 
         # Update theme manager
         self.theme_manager.set_current_theme(theme_name)
@@ -614,7 +873,7 @@ class TerminalWithHardwareGrid(QWidget):
         # Force redraw without recreating
         self.redraw()
 
-        print(f"Terminal {self.widget_id} theme applied: {theme_name}")
+        term_log.debug("Terminal %s theme applied: %s", self.widget_id, theme_name)
 
     def toggle_background_glow(self):
         """NEW: Toggle background glow (replaces toggle_flicker)"""
@@ -634,12 +893,94 @@ class TerminalWithHardwareGrid(QWidget):
             return
         self.grid_widget.toggle_scanlines()
 
+    def start_recording(self, path, title=None):
+        """Start recording the raw backend byte stream to path"""
+        self.stop_recording()
+        self.session_recorder = SessionRecorder(path, cols=self.cols, rows=self.rows, title=title)
+        return self.session_recorder
+
+    def stop_recording(self):
+        """Stop the active recording, if any"""
+        recorder, self.session_recorder = self.session_recorder, None
+        if recorder is not None:
+            recorder.close()
+        return recorder
+
+    def on_replay_resize(self, cols, rows):
+        """Apply a recorded size change to the screen during replay"""
+        if self._is_closing:
+            return
+        self.parser.resize(cols, rows)
+        self.applied_size = (cols, rows)
+
+    def suspend_rendering(self):
+        """Background tab: keep parsing output but skip grid translation, textures and paint"""
+        if self.render_suspended or self._is_closing:
+            return
+        self.render_suspended = True
+        self.grid_widget.suspend_rendering()
+        if self.gl_release_idle_ms > 0:
+            self.gl_release_timer.start(self.gl_release_idle_ms)
+
+    def resume_rendering(self):
+        """Foreground tab: bring the grid up to date so the next frame shows the current screen"""
+        if not self.render_suspended or self._is_closing:
+            return
+        self.render_suspended = False
+        self.gl_release_timer.stop()
+        if self._redraw_pending:
+            self._redraw_pending = False
+            with tracing.span('redraw', 'grid'):
+                self.redraw()
+        self.update_cursor()
+        self.grid_widget.resume_rendering()
+
+    def _release_gl_resources(self):
+        if self.render_suspended and self.grid_widget:
+            self.grid_widget.release_gl_resources()
+
+    def on_raw_received(self, data, text):
+        """
+        Reader thread: a chunk of backend output, raw and decoded, about to be emitted
+
+        Every backend reader calls this once per chunk, so the probes that
+        watch output (latency, recording, HUD, tracing) are fed in one place.
+        """
+        tracker = self.latency_tracker
+        if tracker is not None:
+            tracker.mark_received(len(data))
+
+        # Raw bytes, so a recording replays exactly what the backend sent
+        recorder = self.session_recorder
+        if recorder is not None:
+            recorder.record_output(data)
+
+        hud = self.perf_hud
+        if hud is not None:
+            hud.chars_received(len(text))
+
+        tracer = tracing.tracer
+        if tracer is not None and text:
+            tracer.signal_sent(id(self))
+
+    def get_session_logger(self):
+        """Return the shared session logger for this terminal, starting it if needed"""
+        if self.log_filename is None or self._is_closing:
+            return None
+        if self.session_logger is None:
+            self.session_logger = SessionLogger(self.log_filename, **self.session_log_options)
+            self.session_logger.start()
+        return self.session_logger
+
     def close(self):
         """Clean up resources"""
-        print(f"Terminal {self.widget_id} starting cleanup...")
+        term_log.debug("Terminal %s starting cleanup...", self.widget_id)
         self._is_closing = True
 
         try:
+            if self.active_paste is not None:
+                self.active_paste.cancel()
+
             # Disconnect SSH backend signals first
             if self.ssh_backend:
                 try:
@@ -650,7 +991,24 @@ class TerminalWithHardwareGrid(QWidget):
                 # Close SSH connection
                 self.ssh_backend.close()
                 self.ssh_backend = None
-                print(f"Terminal {self.widget_id} SSH backend closed")
+                term_log.debug("Terminal %s SSH backend closed", self.widget_id)
+
+            # Nothing feeds the parser any more
+            self.parser.stop()
+
+            self.gl_release_timer.stop()
+            self.scroll_timer.stop()
+            self.resize_timer.stop()
+            self.reflow_timer.stop()
+            self.scrollback_buffer.stop_reflow()
+            self.stop_recording()
+            self.set_latency_tracking(False)
+            self.set_perf_hud(False)
+
+            if self.session_logger is not None:
+                self.session_logger.close()
+                term_log.info("Terminal %s session log closed: %s", self.widget_id, self.session_logger.stats())
+                self.session_logger = None
 
             # Clean up grid widget
             if self.grid_widget:
@@ -658,18 +1016,18 @@ class TerminalWithHardwareGrid(QWidget):
                     self.grid_widget.setParent(None)
                     self.grid_widget.deleteLater()
                     self.grid_widget = None
-                    print(f"Terminal {self.widget_id} grid widget cleaned up")
+                    term_log.debug("Terminal %s grid widget cleaned up", self.widget_id)
                 except:
                     pass
 
         except Exception as e:
-            print(f"Error during terminal cleanup: {e}")
+            term_log.error("Error during terminal cleanup: %s", e)
 
-        print(f"Terminal {self.widget_id} cleanup completed")
+        term_log.debug("Terminal %s cleanup completed", self.widget_id)
 
     def __del__(self):
         """Track widget destruction"""
-        print(f"Terminal widget {self.widget_id} destroyed")
+        term_log.debug("Terminal widget %s destroyed", self.widget_id)
 
 
 class HardwareTerminalWindow(QMainWindow):
@@ -680,7 +1038,8 @@ class HardwareTerminalWindow(QMainWindow):
 
     def __init__(self):
         super().__init__()
-        self.setWindowTitle("Hardware-Accelerated SSH Terminal with Retro Effects")
+        self.default_title = "Hardware-Accelerated SSH Terminal with Retro Effects"
+        self.setWindowTitle(self.default_title)
         self.setGeometry(100, 100, 1200, 800)
 
         # Full screen state tracking
@@ -688,9 +1047,19 @@ class HardwareTerminalWindow(QMainWindow):
         self.window_id = None
         self.windowed_geometry = None
         self.windowed_state = None
-        self.terminal = None
+        self.tabs = None
+        self._tabs_created = 0
+        # Set while the connection dialog is open for a new split pane
+        self._pending_split = None
         self._is_closing = False
 
+        self.profiling_session = None
+        self.profile_timer = QTimer(self)
+        self.profile_timer.setSingleShot(True)
+        self.profile_timer.timeout.connect(self.finish_profiling)
+        # tracemalloc runs from the first memory report on, so later reports can diff
+        self.memory_tracker = MemoryTracker()
+
         # Create theme manager
         self.theme_manager = RetroThemeManager()
         self.theme_manager.set_current_theme("green")
@@ -699,14 +1068,23 @@ class HardwareTerminalWindow(QMainWindow):
         self.settings_manager = SettingsManager()
         self.connection_manager = ConnectionManager(self.settings_manager)
 
+        # Decrypted SSH keys are cached for the session (0 = no expiry)
+        key_cache_lifetime = self.settings_manager.get_int('ssh/key_cache_lifetime')
+        set_key_cache_lifetime(key_cache_lifetime or None)
+
+        # One tab per session; the bar only shows once there are two
+        self.tabs = QTabWidget(self)
+        self.tabs.setDocumentMode(True)
+        self.tabs.setTabsClosable(True)
+        self.tabs.setMovable(True)
+        self.tabs.setTabBarAutoHide(True)
+        self.tabs.tabBar().setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.tabs.tabCloseRequested.connect(self.close_tab)
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+        self.setCentralWidget(self.tabs)
+
         # Create placeholder terminal (no SSH connection yet)
-        self.terminal = TerminalWithHardwareGrid(
-            ssh_config=None,  # No SSH config yet
-            log_file="logs/hardware_terminal.log",
-            font_size=12,
-            theme_manager=self.theme_manager
-        )
-        self.setCentralWidget(self.terminal)
+        self.new_tab()
 
         # Create menu system
         self.create_menu_system()
@@ -720,10 +1098,207 @@ class HardwareTerminalWindow(QMainWindow):
         # Show connection dialog immediately
         self.show_connection_dialog()
 
+    @property
+    def terminal(self):
+        """Terminal of the current tab (its active pane when the tab is split)"""
+        widget = self.tabs.currentWidget() if self.tabs is not None else None
+        if isinstance(widget, SplitTerminalView):
+            return widget.active
+        return widget
+
+    @property
+    def session_id(self):
+        return self.terminal.session_id if self.terminal else None
+
+    @property
+    def connection_type(self):
+        return self.terminal.connection_type if self.terminal else None
+
+    def terminals(self):
+        """Terminals of all tabs and panes, in tab order"""
+        if self.tabs is None:
+            return []
+        terminals = []
+        for i in range(self.tabs.count()):
+            widget = self.tabs.widget(i)
+            if isinstance(widget, SplitTerminalView):
+                terminals.extend(widget.panes())
+            else:
+                terminals.append(widget)
+        return terminals
+
+    def _tab_index_of(self, terminal):
+        """Index of the tab showing terminal, directly or as a pane; -1 if none"""
+        for i in range(self.tabs.count()):
+            widget = self.tabs.widget(i)
+            if widget is terminal or (isinstance(widget, SplitTerminalView) and terminal in widget.panes()):
+                return i
+        return -1
+
+    def new_tab(self):
+        """Add an unconnected terminal in a new tab and switch to it"""
+        terminal = self._create_terminal()
+        self.tabs.addTab(terminal, terminal.session_title)
+        self.tabs.setCurrentWidget(terminal)
+        return terminal
+
+    def new_pane(self, orientation):
+        """Add an unconnected terminal next to the current one, in the same GL surface"""
+        current = self.tabs.currentWidget()
+        if current is None:
+            return self.new_tab()
+        terminal = self._create_terminal()
+
+        if not isinstance(current, SplitTerminalView):
+            # The tab's own terminal becomes the first pane of a split view
+            index = self.tabs.currentIndex()
+            text, tooltip = self.tabs.tabText(index), self.tabs.tabToolTip(index)
+            view = SplitTerminalView(current)
+            view.pane_activated.connect(self.on_pane_activated)
+            self.tabs.insertTab(index, view, text)
+            self.tabs.setTabToolTip(index, tooltip)
+            self.tabs.setCurrentIndex(index)
+            current = view
+
+        current.split(terminal, orientation)
+        current.setFocus()
+        return terminal
+
+    def _create_terminal(self):
+        current = self.terminal
+        theme_name = self.theme_manager.current_theme
+
+        # The first tab keeps the original log name
+        self._tabs_created += 1
+        suffix = "" if self._tabs_created == 1 else f"-{self._tabs_created}"
+        terminal = TerminalWithHardwareGrid(
+            ssh_config=None,  # No SSH config yet
+            log_file=f"logs/hardware_terminal{suffix}.log",
+            font_size=12,
+            theme_manager=self.theme_manager,
+            parse_mode=self.settings_manager.get('parsing/mode'),
+            parser_processes=self.settings_manager.get_int('parsing/processes'),
+            engine=self.settings_manager.get('parsing/engine'),
+            scrollback_lines=self.settings_manager.get_int('terminal/scrollback_lines'),
+        )
+        terminal.paste_chunk_size = self.settings_manager.get_int('paste/chunk_size')
+        terminal.paste_line_delay_ms = self.settings_manager.get_int('paste/line_delay_ms')
+        terminal.session_log_options = {
+            'max_bytes': self.settings_manager.get_int('logging/max_bytes'),
+            'max_age': self.settings_manager.get_int('logging/max_age'),
+            'backup_count': self.settings_manager.get_int('logging/backup_count'),
+            'compress': self.settings_manager.get_bool('logging/compress'),
+        }
+        terminal.gl_release_idle_ms = self.settings_manager.get_int('tabs/gl_release_seconds') * 1000
+        terminal.smooth_scrolling = self.settings_manager.get_bool('terminal/smooth_scrolling')
+        terminal.wheel_lines = self.settings_manager.get_int('terminal/wheel_lines')
+        terminal.scrollbar.setVisible(self.settings_manager.get_bool('terminal/scrollbar'))
+
+        # A new terminal resets the shared theme manager; keep the window's look
+        terminal.set_theme(theme_name)
+        if current is not None:
+            self._copy_effects(current.grid_widget, terminal.grid_widget)
+        return terminal
+
+    @staticmethod
+    def _copy_effects(source, target):
+        for name in ('glow_enabled', 'glow_intensity', 'scanlines_enabled', 'scanline_intensity',
+                     'ambient_glow', 'curvature', 'brightness', 'contrast'):
+            setattr(target, name, getattr(source, name))
+        target.set_cursor_blink_rate(source.cursor_timer.interval())
+        target.enable_cursor_blink(source.cursor_blink_enabled)
+
+    def close_tab(self, index=None):
+        """Close a tab's session (or its active pane when split); closing the last tab quits"""
+        if self._is_closing:
+            return
+        if index is None or index is False:
+            index = self.tabs.currentIndex()
+        widget = self.tabs.widget(index)
+        if widget is None:
+            return
+
+        if isinstance(widget, SplitTerminalView):
+            self.close_pane(widget, widget.active)
+            return
+
+        if self.tabs.count() == 1:
+            self.close_application()
+            return
+
+        log.info("Closing tab %s (%s)", widget.session_id, widget.session_title)
+        widget.close()
+        self.tabs.removeTab(index)
+        widget.deleteLater()
+
+    def close_pane(self, view, terminal):
+        """Close one pane; a view left with a single pane turns back into a plain tab"""
+        log.info("Closing pane %s (%s)", terminal.session_id, terminal.session_title)
+        remaining = view.remove(terminal)
+        terminal.close()
+        terminal.deleteLater()
+        if len(remaining) > 1:
+            self.on_pane_activated(view.active)
+            return
+
+        index = self.tabs.indexOf(view)
+        last = remaining[0]
+        view.remove(last)
+        view.release_gl_resources()
+        self.tabs.insertTab(index, last, self.tabs.tabText(index))
+        self.tabs.setTabToolTip(index, last.session_title)
+        self.tabs.removeTab(index + 1)
+        self.tabs.setCurrentIndex(index)
+        view.deleteLater()
+        last.setFocus()
+
+    def next_tab(self, step=1):
+        if self.tabs.count() > 1:
+            self.tabs.setCurrentIndex((self.tabs.currentIndex() + step) % self.tabs.count())
+
+    def on_tab_changed(self, index):
+        """Suspend every background tab and bring the new current one up to date"""
+        if self._is_closing:
+            return
+        current = self.tabs.widget(index)
+        for i in range(self.tabs.count()):
+            widget = self.tabs.widget(i)
+            if widget is not current:
+                widget.suspend_rendering()
+        if current is None:
+            return
+
+        with tracing.span('tab_switch', 'gui'):
+            current.resume_rendering()
+        current.setFocus()
+        self.on_pane_activated(self.terminal)
+
+    def on_pane_activated(self, current):
+        """Window title and per-session toggles follow the current tab's active terminal"""
+        if current is None or current is not self.terminal:
+            return
+        self.setWindowTitle(current.session_title if current.connection_type else self.default_title)
+
+        # Per-session toggles follow the tab
+        if hasattr(self, 'latency_action'):
+            self.latency_action.setChecked(current.latency_tracker is not None)
+            self.perf_hud_action.setChecked(current.perf_hud is not None)
+            self.record_action.setChecked(current.session_recorder is not None)
+
+    def set_session_title(self, terminal, title, tab_text=None):
+        """Title for one session: its tab label, and the window title while it is current"""
+        terminal.session_title = title
+        index = self._tab_index_of(terminal)
+        if index >= 0:
+            self.tabs.setTabText(index, tab_text or title)
+            self.tabs.setTabToolTip(index, title)
+        if terminal is self.terminal:
+            self.setWindowTitle(title)
+
     def setup_signal_handlers(self):
         """Setup signal handlers for clean shutdown"""
         def signal_handler(signum, frame):
-            print(f"Received signal {signum}, shutting down cleanly...")
+            log.info("Received signal %s, shutting down cleanly...", signum)
             self.close_application()
 
         # Handle common termination signals
@@ -735,9 +1310,9 @@ class HardwareTerminalWindow(QMainWindow):
 
     def cleanup_on_exit(self):
         """Cleanup function called on exit"""
-        print("Application cleanup on exit...")
-        if hasattr(self, 'terminal') and self.terminal:
-            self.terminal.close()
+        log.debug("Application cleanup on exit...")
+        for terminal in self.terminals():
+            terminal.close()
 
     # Add this method to your HardwareTerminalWindow class in cpt.py
     # or replace the existing auto_adjust_scanlines method
@@ -745,16 +1320,16 @@ class HardwareTerminalWindow(QMainWindow):
     def auto_adjust_scanlines(self):
         """Auto-adjust scanlines for current display with error handling"""
         if not hasattr(self, 'terminal') or not self.terminal or self._is_closing:
-            print("No terminal available for scanline adjustment")
+            log.warning("No terminal available for scanline adjustment")
             return
 
         try:
             # Check if the method exists
             if hasattr(self.terminal.grid_widget, 'adjust_scanlines_for_dpi'):
                 intensity = self.terminal.grid_widget.adjust_scanlines_for_dpi()
-                print(f"Scanlines auto-adjusted to intensity: {intensity:.3f}")
+                log.info("Scanlines auto-adjusted to intensity: %.3f", intensity)
             else:
-                print("adjust_scanlines_for_dpi method not found - using fallback")
+                log.warning("adjust_scanlines_for_dpi method not found - using fallback")
                 # Fallback: manually set a reasonable intensity
                 if hasattr(self.terminal.grid_widget, 'set_scanline_intensity'):
                     self.terminal.grid_widget.set_scanline_intensity(0.25)
@@ -763,12 +1338,10 @@ class HardwareTerminalWindow(QMainWindow):
                     self.terminal.grid_widget.scanlines_enabled = True
                     self.terminal.grid_widget.update()
                 else:
-                    print("Could not adjust scanlines - widget doesn't support this feature")
+                    log.info("Could not adjust scanlines - widget doesn't support this feature")
 
         except Exception as e:
-            print(f"Error adjusting scanlines: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("Error adjusting scanlines: %s", e)
 
             # Show user-friendly error message
             from PyQt6.QtWidgets import QMessageBox
@@ -787,7 +1360,7 @@ class HardwareTerminalWindow(QMainWindow):
                     level = self.terminal.grid_widget.get_ambient_glow_level()
 
             else:
-                print("Ambient glow control not available")
+                log.warning("Ambient glow control not available")
 
     def decrease_ambient_glow(self):
         """Decrease ambient glow intensity"""
@@ -797,7 +1370,7 @@ class HardwareTerminalWindow(QMainWindow):
                 if success:
                     level = self.terminal.grid_widget.get_ambient_glow_level()
             else:
-                print("Ambient glow control not available")
+                log.warning("Ambient glow control not available")
 
     def reset_ambient_glow(self):
         """Reset ambient glow to theme default"""
@@ -834,30 +1407,42 @@ class HardwareTerminalWindow(QMainWindow):
         if self._is_closing:
             return
 
-        print(f"Connecting to: {connection_config}")
+        log.info("Connecting to: %s", connection_config)
+
+        # A session already running in this tab keeps it; connect in a new one
+        terminal = self.terminal
+        if self._pending_split is not None and terminal is not None and terminal.ssh_backend is not None:
+            terminal = self.new_pane(self._pending_split)
+        elif terminal is None or terminal.ssh_backend is not None:
+            terminal = self.new_tab()
 
         connection_type = connection_config.get('connection_type', 'ssh')
+        terminal.session_id = uuid.uuid4().hex[:8]
+        terminal.connection_type = connection_type
 
         if connection_type == 'ssh':
             # SSH connection
-            self.setWindowTitle(f"Connecting to {connection_config['username']}@{connection_config['hostname']}...")
+            user_host = f"{connection_config['username']}@{connection_config['hostname']}"
+            self.set_session_title(terminal, f"Connecting to {user_host}...", user_host)
 
             # Connect terminal to SSH
             success = self.connect_to_ssh(connection_config)
 
             if success:
                 # Update window title with SSH connection info
-                self.setWindowTitle(
-                    f"SSH Terminal - {connection_config['username']}@{connection_config['hostname']}:{connection_config['port']}")
-                print("SSH connection established successfully!")
+                self.set_session_title(
+                    terminal, f"SSH Terminal - {user_host}:{connection_config['port']}", user_host)
+                log.info("SSH connection established successfully!")
             else:
                 # SSH connection failed - show dialog again
                 QMessageBox.critical(self, "Connection Failed", "Failed to establish SSH connection.")
 
         else:
-            # Local terminal connection
-            shell_name = connection_config.get('shell_path', 'Terminal')
-            self.setWindowTitle(f"Connecting to {shell_name}...")
+            # Local terminal connection (or a recording replay)
+            shell_name = connection_config.get('shell_path') or \
+                os.path.basename(connection_config.get('recording_path') or 'Terminal')
+            tab_text = os.path.basename(shell_name)
+            self.set_session_title(terminal, f"Connecting to {shell_name}...", tab_text)
 
             # Connect terminal to local shell
             success = self.connect_to_local_terminal(connection_config)
@@ -866,10 +1451,10 @@ class HardwareTerminalWindow(QMainWindow):
                 # Update window title with local terminal info
                 working_dir = connection_config.get('working_dir', '')
                 if working_dir:
-                    self.setWindowTitle(f"{shell_name} - {working_dir}")
+                    self.set_session_title(terminal, f"{shell_name} - {working_dir}", tab_text)
                 else:
-                    self.setWindowTitle(f"Local Terminal - {shell_name}")
-                print("Local terminal connection established successfully!")
+                    self.set_session_title(terminal, f"Local Terminal - {shell_name}", tab_text)
+                log.info("Local terminal connection established successfully!")
             else:
                 # Local connection failed - show dialog again
                 QMessageBox.critical(self, "Connection Failed", "Failed to establish local terminal connection.")
@@ -880,52 +1465,63 @@ class HardwareTerminalWindow(QMainWindow):
             return False
 
         try:
-            print(f"Connecting to local terminal: {connection_config}")
+            log.info("Connecting to local terminal: %s", connection_config)
 
             # Import and use the backend factory
             from coolpyterm.backend_factory import create_backend
 
             # Create appropriate backend (Windows terminal)
-            backend = create_backend(connection_config, self.terminal)  # Pass terminal widget, not main window
+            terminal = self.terminal
+            backend = create_backend(connection_config, terminal)  # Pass terminal widget, not main window
 
-            # Store backend in BOTH places for now
-            self.ssh_backend = backend  # Main window (for cleanup)
-            self.terminal.ssh_backend = backend  # Terminal widget (for keyboard handling)
+            # The tab's terminal owns the backend (keyboard handling and cleanup)
+            terminal.ssh_backend = backend
 
             # Connect signals (same as SSH)
-            backend.send_output.connect(self.terminal.update_ui)
+            terminal.attach_output(backend)
             backend.connection_established.connect(self.on_local_terminal_connected)
             backend.connection_failed.connect(self.on_local_terminal_failed)
-
-            print("Local terminal backend established successfully")
-            print(f"Backend stored in main window: {type(self.ssh_backend)}")
-            print(f"Backend stored in terminal widget: {type(self.terminal.ssh_backend)}")
+            if hasattr(backend, 'process_exited'):
+                backend.process_exited.connect(
+                    lambda exit_code, t=terminal: self.on_local_terminal_exited(exit_code, t))
+            if hasattr(backend, 'resize_requested'):
+                backend.resize_requested.connect(terminal.on_replay_resize)
+
+            log.info("Local terminal backend established successfully")
+            log.debug("Backend stored in terminal widget: %s", type(terminal.ssh_backend))
             return True
 
         except Exception as e:
-            print(f"Failed to establish local terminal backend: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("Failed to establish local terminal backend: %s", e)
             QMessageBox.critical(None, "Connection Failed", f"Failed to connect to local terminal:\n{str(e)}")
-            self.ssh_backend = None
             self.terminal.ssh_backend = None
             return False
     def on_local_terminal_connected(self):
         """Handle successful local terminal connection"""
-        print("Local terminal connected successfully!")
+        log.info("Local terminal connected successfully!")
 
     def on_local_terminal_failed(self, error_msg):
         """Handle failed local terminal connection"""
-        print(f"Local terminal connection failed: {error_msg}")
+        log.error("Local terminal connection failed: %s", error_msg)
         QMessageBox.critical(None, "Terminal Connection Failed", f"Failed to connect to terminal:\n{error_msg}")
 
+    def on_local_terminal_exited(self, exit_code, terminal=None):
+        """Handle the local shell exiting (e.g. the user typed exit)"""
+        log.info("Local shell exited with code %s", exit_code)
+        terminal = terminal or self.terminal
+        if terminal is None or self._is_closing or self._tab_index_of(terminal) < 0:
+            return
+        index = self._tab_index_of(terminal)
+        self.set_session_title(terminal, f"{terminal.session_title} [exited {exit_code}]",
+                               f"{self.tabs.tabText(index)} [exited]")
+
     def on_ssh_connected(self):
         """Handle successful SSH connection"""
-        print("SSH connected successfully!")
+        log.info("SSH connected successfully!")
 
     def on_ssh_failed(self, error_msg):
         """Handle failed SSH connection"""
-        print(f"SSH connection failed: {error_msg}")
+        log.error("SSH connection failed: %s", error_msg)
         QMessageBox.critical(None, "SSH Connection Failed", f"Failed to connect to SSH server:\n{error_msg}")
 
     def connect_to_ssh(self, ssh_config):
@@ -934,31 +1530,28 @@ class HardwareTerminalWindow(QMainWindow):
             return False
 
         try:
-            print(f"Connecting to SSH: {ssh_config['username']}@{ssh_config['hostname']}:{ssh_config['port']}")
+            log.info("Connecting to SSH: %s@%s:%s", ssh_config['username'], ssh_config['hostname'], ssh_config['port'])
 
             # Use the backend factory for consistency
             from coolpyterm.backend_factory import create_backend
 
-            backend = create_backend(ssh_config, self.terminal)  # Pass terminal widget
+            terminal = self.terminal
+            backend = create_backend(ssh_config, terminal)  # Pass terminal widget
 
-            # Store backend in BOTH places
-            self.ssh_backend = backend  # Main window
-            self.terminal.ssh_backend = backend  # Terminal widget
+            # The tab's terminal owns the backend
+            terminal.ssh_backend = backend
 
             # Connect signals
-            backend.send_output.connect(self.terminal.update_ui)
+            terminal.attach_output(backend)
             backend.connection_established.connect(self.on_ssh_connected)
             backend.connection_failed.connect(self.on_ssh_failed)
 
-            print("SSH backend established successfully")
+            log.info("SSH backend established successfully")
             return True
 
         except Exception as e:
-            print(f"Failed to establish SSH backend: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("Failed to establish SSH backend: %s", e)
             QMessageBox.critical(None, "Connection Failed", f"Failed to connect to SSH server:\n{str(e)}")
-            self.ssh_backend = None
             self.terminal.ssh_backend = None
             return False
 
@@ -984,6 +1577,54 @@ class HardwareTerminalWindow(QMainWindow):
         new_connection_action.triggered.connect(self.show_new_connection_dialog)
         file_menu.addAction(new_connection_action)
 
+        # Tabs - New Connection opens in a new tab once the current one is in use
+        close_tab_action = QAction('Close Tab', self)  # No '&'
+        close_tab_action.setShortcut(QKeySequence('Ctrl+Shift+W'))
+        close_tab_action.triggered.connect(lambda: self.close_tab())
+        file_menu.addAction(close_tab_action)
+
+        next_tab_action = QAction('Next Tab', self)  # No '&'
+        next_tab_action.setShortcut(QKeySequence('Ctrl+PgDown'))
+        next_tab_action.triggered.connect(lambda: self.next_tab(1))
+        file_menu.addAction(next_tab_action)
+
+        previous_tab_action = QAction('Previous Tab', self)  # No '&'
+        previous_tab_action.setShortcut(QKeySequence('Ctrl+PgUp'))
+        previous_tab_action.triggered.connect(lambda: self.next_tab(-1))
+        file_menu.addAction(previous_tab_action)
+
+        # Split panes share the tab's GL surface
+        split_side_action = QAction('Split Side by Side...', self)  # No '&'
+        split_side_action.setShortcut(QKeySequence('Ctrl+Shift+E'))
+        split_side_action.triggered.connect(lambda: self.split_pane(Qt.Orientation.Horizontal))
+        file_menu.addAction(split_side_action)
+
+        split_stacked_action = QAction('Split Stacked...', self)  # No '&'
+        split_stacked_action.setShortcut(QKeySequence('Ctrl+Shift+O'))
+        split_stacked_action.triggered.connect(lambda: self.split_pane(Qt.Orientation.Vertical))
+        file_menu.addAction(split_stacked_action)
+
+        next_pane_action = QAction('Next Pane', self)  # No '&'
+        next_pane_action.setShortcut(QKeySequence('Ctrl+Shift+Right'))
+        next_pane_action.triggered.connect(self.next_pane)
+        file_menu.addAction(next_pane_action)
+
+        file_menu.addSeparator()
+
+        # Session recording / replay
+        self.record_action = QAction('Record Session...', self)  # No '&'
+        self.record_action.setCheckable(True)
+        self.record_action.triggered.connect(self.toggle_recording)
+        file_menu.addAction(self.record_action)
+
+        replay_action = QAction('Replay Recording...', self)  # No '&'
+        replay_action.triggered.connect(self.replay_recording)
+        file_menu.addAction(replay_action)
+
+        export_cast_action = QAction('Export Recording to asciicast...', self)  # No '&'
+        export_cast_action.triggered.connect(self.export_recording)
+        file_menu.addAction(export_cast_action)
+
         file_menu.addSeparator()
 
         exit_action = QAction('Exit', self)  # No '&'
@@ -995,7 +1636,7 @@ class HardwareTerminalWindow(QMainWindow):
         edit_menu = menubar.addMenu('Edit')  # No '&'
         paste_action = QAction('Paste', self)  # No '&'
         paste_action.setShortcut('Ctrl+V')
-        paste_action.triggered.connect(self.terminal.paste_from_clipboard)
+        paste_action.triggered.connect(lambda: self.terminal.paste_from_clipboard())
         edit_menu.addAction(paste_action)
 
         # View Menu
@@ -1006,6 +1647,47 @@ class HardwareTerminalWindow(QMainWindow):
         self.fullscreen_action.triggered.connect(self.toggle_fullscreen)
         view_menu.addAction(self.fullscreen_action)
 
+        view_menu.addSeparator()
+
+        self.latency_action = QAction('Latency Overlay', self)  # No '&'
+        self.latency_action.setShortcut(QKeySequence('Ctrl+Shift+L'))
+        self.latency_action.setCheckable(True)
+        self.latency_action.triggered.connect(self.toggle_latency_overlay)
+        view_menu.addAction(self.latency_action)
+
+        export_latency_action = QAction('Export Latency Report...', self)  # No '&'
+        export_latency_action.triggered.connect(self.export_latency_report)
+        view_menu.addAction(export_latency_action)
+
+        self.perf_hud_action = QAction('Performance HUD', self)  # No '&'
+        self.perf_hud_action.setShortcut(QKeySequence('Ctrl+Shift+H'))
+        self.perf_hud_action.setCheckable(True)
+        self.perf_hud_action.triggered.connect(self.toggle_perf_hud)
+        view_menu.addAction(self.perf_hud_action)
+
+        self.trace_action = QAction('Pipeline Tracing', self)  # No '&'
+        self.trace_action.setShortcut(QKeySequence('Ctrl+Shift+T'))
+        self.trace_action.setCheckable(True)
+        self.trace_action.setChecked(tracing.tracer is not None)
+        self.trace_action.triggered.connect(self.toggle_tracing)
+        view_menu.addAction(self.trace_action)
+
+        dump_trace_action = QAction('Dump Trace', self)  # No '&'
+        dump_trace_action.setShortcut(QKeySequence('Ctrl+Shift+D'))
+        dump_trace_action.triggered.connect(self.dump_trace)
+        view_menu.addAction(dump_trace_action)
+
+        self.profile_action = QAction('Profile Session', self)  # No '&'
+        self.profile_action.setShortcut(QKeySequence('Ctrl+Shift+P'))
+        self.profile_action.setCheckable(True)
+        self.profile_action.triggered.connect(self.toggle_profiling)
+        view_menu.addAction(self.profile_action)
+
+        memory_action = QAction('Memory Report', self)  # No '&'
+        memory_action.setShortcut(QKeySequence('Ctrl+Shift+M'))
+        memory_action.triggered.connect(self.show_memory_report)
+        view_menu.addAction(memory_action)
+
         # Theme Menu
         theme_menu = menubar.addMenu('Theme')  # No '&'
         self.theme_group = QActionGroup(self)
@@ -1138,6 +1820,173 @@ class HardwareTerminalWindow(QMainWindow):
             self.blink_rate_group.addAction(action)
             blink_rate_menu.addAction(action)
 
+    def toggle_latency_overlay(self):
+        """Switch keystroke-to-photon tracking and its overlay on or off"""
+        enabled = self.terminal.latency_tracker is None
+        self.terminal.set_latency_tracking(enabled)
+        self.latency_action.setChecked(enabled)
+
+    def toggle_perf_hud(self):
+        """Switch the on-screen performance HUD on or off"""
+        enabled = self.terminal.perf_hud is None
+        self.terminal.set_perf_hud(enabled)
+        self.perf_hud_action.setChecked(enabled)
+
+    def toggle_tracing(self):
+        """Start pipeline tracing, or stop it and dump what was recorded"""
+        if tracing.tracer is None:
+            tracing.start()
+            log.info("Pipeline tracing started")
+        else:
+            self._write_trace(tracing.stop())
+        self.trace_action.setChecked(tracing.tracer is not None)
+
+    def dump_trace(self):
+        """Dump the trace ring buffer without stopping the tracer"""
+        if tracing.tracer is None:
+            QMessageBox.information(self, "Pipeline Trace", "Enable View → Pipeline Tracing first.")
+            return
+        self._write_trace(tracing.tracer)
+
+    def _write_trace(self, tracer):
+        path = os.path.join("traces", datetime.now().strftime("trace-%Y%m%d-%H%M%S.json"))
+        try:
+            events = tracer.dump(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Pipeline Trace", f"Could not write trace:\n{e}")
+            return
+        log.info("Wrote %d trace events to %s", events, path)
+        QMessageBox.information(self, "Pipeline Trace",
+                                f"Wrote {events} events to\n{os.path.abspath(path)}\n\nOpen it in ui.perfetto.dev or chrome://tracing.")
+
+    def toggle_profiling(self):
+        """Start a time-boxed profiling session, or end the running one early"""
+        if self.profiling_session is not None:
+            self.finish_profiling()
+            return
+
+        seconds = self.settings_manager.get_int('diagnostics/profile_seconds') or 10
+        self.profiling_session = ProfilingSession(session_id=self.session_id,
+                                                  connection_type=self.connection_type)
+        self.profiling_session.start()
+        self.profile_action.setChecked(True)
+        self.profile_timer.start(seconds * 1000)
+
+    def finish_profiling(self):
+        """Stop profiling and report where the results were written"""
+        self.profile_timer.stop()
+        session, self.profiling_session = self.profiling_session, None
+        self.profile_action.setChecked(False)
+        if session is None or not session.running:
+            return
+
+        try:
+            pstats_path, collapsed_path = session.stop()
+        except OSError as e:
+            QMessageBox.critical(self, "Profile", f"Could not write profile:\n{e}")
+            return
+        QMessageBox.information(self, "Profile",
+                                f"Profiled {session.duration:.1f}s ({session.samples} stack samples):\n"
+                                f"{os.path.abspath(pstats_path)}\n{os.path.abspath(collapsed_path)}")
+
+    def show_memory_report(self):
+        """Per-component memory of the terminal, plus a tracemalloc diff since the last report"""
+        if self.terminal is None:
+            return
+        lines = format_report(terminal_memory_report(self.terminal),
+                              f"Session {self.session_id} ({self.connection_type or 'none'})")
+        lines.append("")
+        if self.memory_tracker.baseline is None:
+            self.memory_tracker.start()
+            lines.append("Allocation tracing started; the next report shows what grew since now.")
+        else:
+            lines.extend(self.memory_tracker.diff_lines(limit=10))
+
+        for line in lines:
+            log.info("%s", line)
+        box = QMessageBox(QMessageBox.Icon.Information, "Memory Report", "\n".join(lines), parent=self)
+        box.setStyleSheet("QLabel { font-family: monospace; }")
+        box.exec()
+
+    def export_latency_report(self):
+        """Save the latency percentiles and raw samples as JSON"""
+        tracker = self.terminal.latency_tracker
+        if tracker is None:
+            QMessageBox.information(self, "Latency Report", "Enable View → Latency Overlay and type for a while first.")
+            return
+
+        default_path = datetime.now().strftime("latency-%Y%m%d-%H%M%S.json")
+        path, _ = QFileDialog.getSaveFileName(self, "Export Latency Report", default_path, "JSON (*.json)")
+        if not path:
+            return
+
+        try:
+            report = tracker.export_json(path)
+            QMessageBox.information(self, "Latency Report",
+                                    f"Saved {report['summary']['total']['count']} samples to {path}")
+        except OSError as e:
+            QMessageBox.critical(self, "Export Failed", f"Could not write latency report:\n{e}")
+
+    def toggle_recording(self):
+        """Start or stop recording the current session"""
+        if self.terminal.session_recorder is not None:
+            self.terminal.stop_recording()
+            self.record_action.setChecked(False)
+            return
+
+        default_path = os.path.join("recordings", datetime.now().strftime("session-%Y%m%d-%H%M%S.cptrec"))
+        path, _ = QFileDialog.getSaveFileName(self, "Record Session", default_path,
+                                              "CoolPyTerm Recordings (*.cptrec)")
+        if not path:
+            self.record_action.setChecked(False)
+            return
+
+        try:
+            self.terminal.start_recording(path, title=self.windowTitle())
+            self.record_action.setChecked(True)
+        except OSError as e:
+            self.record_action.setChecked(False)
+            QMessageBox.critical(self, "Recording Failed", f"Could not start recording:\n{e}")
+
+    def replay_recording(self):
+        """Play a recording back into the terminal"""
+        path, _ = QFileDialog.getOpenFileName(self, "Replay Recording", "recordings",
+                                              "CoolPyTerm Recordings (*.cptrec)")
+        if not path:
+            return
+
+        speed, ok = QInputDialog.getDouble(self, "Replay Speed",
+                                           "Playback speed (0 = as fast as possible):",
+                                           1.0, 0.0, 100.0, 1)
+        if not ok:
+            return
+
+        # Opens in a new tab unless the current one is unconnected
+        self.handle_connection_request({
+            'connection_type': 'replay',
+            'recording_path': path,
+            'speed': speed,
+            'max_idle': 2.0
+        })
+
+    def export_recording(self):
+        """Convert a recording to asciicast v2"""
+        path, _ = QFileDialog.getOpenFileName(self, "Export Recording", "recordings",
+                                              "CoolPyTerm Recordings (*.cptrec)")
+        if not path:
+            return
+
+        cast_path, _ = QFileDialog.getSaveFileName(self, "Save asciicast", os.path.splitext(path)[0] + ".cast",
+                                                   "asciicast (*.cast)")
+        if not cast_path:
+            return
+
+        try:
+            events = export_asciicast(path, cast_path)
+            QMessageBox.information(self, "Export Complete", f"Wrote {events} events to {cast_path}")
+        except Exception as e:
+            QMessageBox.critical(self, "Export Failed", f"Could not export recording:\n{e}")
+
     def show_theme_info(self):
         """Show information about current theme and available themes"""
         if self._is_closing:
@@ -1177,27 +2026,46 @@ class HardwareTerminalWindow(QMainWindow):
         """Show dialog for new connection"""
         self.show_connection_manager()
 
+    def split_pane(self, orientation):
+        """Connect a new session in a pane next to the current one"""
+        if self._is_closing:
+            return
+        self._pending_split = orientation
+        try:
+            self.show_connection_manager()
+        finally:
+            self._pending_split = None
+
+    def next_pane(self):
+        widget = self.tabs.currentWidget()
+        if isinstance(widget, SplitTerminalView):
+            widget.focus_next_pane()
+
     def toggle_cursor_blinking(self):
         """Toggle cursor blinking on/off"""
-        if hasattr(self, 'terminal') and not self._is_closing:
+        if not self._is_closing:
             enabled = self.cursor_blink_action.isChecked()
-            self.terminal.grid_widget.enable_cursor_blink(enabled)
+            for terminal in self.terminals():
+                terminal.grid_widget.enable_cursor_blink(enabled)
 
     def set_cursor_blink_rate(self, milliseconds):
         """Set cursor blink rate"""
-        if hasattr(self, 'terminal') and not self._is_closing:
-            self.terminal.grid_widget.set_cursor_blink_rate(milliseconds)
-            print(f"Cursor blink rate changed to {milliseconds}ms")
+        if not self._is_closing:
+            for terminal in self.terminals():
+                terminal.grid_widget.set_cursor_blink_rate(milliseconds)
+            log.info("Cursor blink rate changed to %sms", milliseconds)
 
     def toggle_background_glow(self):
         """NEW: Toggle background glow (replaces toggle_flicker)"""
         if not self._is_closing:
-            self.terminal.grid_widget.toggle_background_glow()
+            for terminal in self.terminals():
+                terminal.grid_widget.toggle_background_glow()
 
     def toggle_ambient_glow(self):
         """NEW: Toggle ambient background glow"""
         if not self._is_closing:
-            self.terminal.grid_widget.toggle_ambient_glow()
+            for terminal in self.terminals():
+                terminal.grid_widget.toggle_ambient_glow()
 
     def adjust_brightness(self, delta):
         """NEW: Adjust CRT brightness"""
@@ -1252,12 +2120,12 @@ class HardwareTerminalWindow(QMainWindow):
             if screen:
                 screen_rect = screen.geometry()
                 self.setGeometry(screen_rect)
-                print(f"Setting fullscreen geometry to: {screen_rect}")
+                log.debug("Setting fullscreen geometry to: %s", screen_rect)
 
             self.is_fullscreen = True
             self.fullscreen_action.setChecked(True)
 
-            print("Entered fullscreen mode (Ctrl Alt F11 to exit)")
+            log.info("Entered fullscreen mode (Ctrl Alt F11 to exit)")
 
     def exit_fullscreen(self):
         """Exit fullscreen mode"""
@@ -1285,7 +2153,7 @@ class HardwareTerminalWindow(QMainWindow):
             self.is_fullscreen = False
             self.fullscreen_action.setChecked(False)
 
-            print("Exited fullscreen mode")
+            log.info("Exited fullscreen mode")
 
     def create_fullscreen_layout(self):
         """Create layout for fullscreen mode without menu bar"""
@@ -1296,16 +2164,16 @@ class HardwareTerminalWindow(QMainWindow):
         self.menuBar().hide()
 
         # Remove any margins from the central widget
-        if self.terminal:
+        if self.tabs:
             # Create a new widget that will fill the entire window
             fullscreen_container = QWidget()
             fullscreen_layout = QVBoxLayout(fullscreen_container)
             fullscreen_layout.setContentsMargins(0, 0, 0, 0)
             fullscreen_layout.setSpacing(0)
 
-            # Move terminal to fullscreen container
-            self.terminal.setParent(fullscreen_container)
-            fullscreen_layout.addWidget(self.terminal)
+            # Move the tabs to fullscreen container
+            self.tabs.setParent(fullscreen_container)
+            fullscreen_layout.addWidget(self.tabs)
 
             # Set as central widget
             self.setCentralWidget(fullscreen_container)
@@ -1318,10 +2186,10 @@ class HardwareTerminalWindow(QMainWindow):
         # Show the menu bar
         self.menuBar().show()
 
-        # Restore terminal as direct central widget
-        if self.terminal:
-            self.terminal.setParent(self)
-            self.setCentralWidget(self.terminal)
+        # Restore the tabs as direct central widget
+        if self.tabs:
+            self.tabs.setParent(self)
+            self.setCentralWidget(self.tabs)
 
     def keyPressEvent(self, event):
         """Handle global key events for fullscreen"""
@@ -1388,39 +2256,51 @@ class HardwareTerminalWindow(QMainWindow):
         if self._is_closing:
             return
 
-        print(f"Window {self.window_id} changing theme to: {theme_name}")
+        log.info("Window %s changing theme to: %s", self.window_id, theme_name)
 
         # Update theme manager
         self.theme_manager.set_current_theme(theme_name)
 
-        # CRITICAL: Just update existing terminal, don't recreate!
-        if hasattr(self, 'terminal') and self.terminal:
-            self.terminal.set_theme(theme_name)
-        else:
-            print(f"ERROR: Window {self.window_id} has no terminal!")
+        # CRITICAL: Just update existing terminals, don't recreate!
+        terminals = self.terminals()
+        if not terminals:
+            log.error("Window %s has no terminal!", self.window_id)
+        for terminal in terminals:
+            terminal.set_theme(theme_name)
 
     def toggle_glow(self):
         """Toggle glow effect"""
-        if hasattr(self, 'terminal') and not self._is_closing:
-            self.terminal.toggle_glow()
+        if not self._is_closing:
+            for terminal in self.terminals():
+                terminal.toggle_glow()
 
     def toggle_scanlines(self):
         """Toggle scanlines effect"""
-        if hasattr(self, 'terminal') and not self._is_closing:
-            self.terminal.toggle_scanlines()
+        if not self._is_closing:
+            for terminal in self.terminals():
+                terminal.toggle_scanlines()
 
     def close_application(self):
         """Clean application shutdown"""
         if self._is_closing:
             return
 
-        print("Starting clean application shutdown...")
+        log.info("Starting clean application shutdown...")
         self._is_closing = True
 
         try:
-            # Close terminal first
-            if hasattr(self, 'terminal') and self.terminal:
-                self.terminal.close()
+            # Keep whatever a running profile captured
+            if self.profiling_session is not None:
+                self.profile_timer.stop()
+                self.profiling_session.stop()
+                self.profiling_session = None
+
+            self.memory_tracker.stop()
+
+            # Close terminals first
+            for terminal in self.terminals():
+                terminal.close()
+            shutdown_parser_pool()
 
             # Give time for cleanup
             QApplication.processEvents()
@@ -1429,13 +2309,13 @@ class HardwareTerminalWindow(QMainWindow):
             QApplication.quit()
 
         except Exception as e:
-            print(f"Error during application shutdown: {e}")
+            log.error("Error during application shutdown: %s", e)
             # Force exit if normal shutdown fails
             sys.exit(0)
 
     def closeEvent(self, event):
         """Handle window close event"""
-        print("Close event received")
+        log.info("Close event received")
 
         # Start clean shutdown
         self.close_application()
@@ -1458,19 +2338,19 @@ class HardwareTerminalWindow(QMainWindow):
         if self._is_closing:
             return
 
-        print(f"Window {self.window_id} resize event: {event.size()}")
+        log.debug("Window %s resize event: %s", self.window_id, event.size())
 
         # Call parent resize first
         super().resizeEvent(event)
 
         # Only do fullscreen-specific positioning
-        if self.is_fullscreen and hasattr(self, 'terminal'):
+        if self.is_fullscreen and self.tabs:
             # Just ensure positioning, don't force resize
-            self.terminal.move(0, 0)
+            self.tabs.move(0, 0)
 
     def __del__(self):
         """Track window destruction"""
-        print(f"Terminal window {self.window_id} destroyed")
+        log.debug("Terminal window %s destroyed", self.window_id)
 
 
 def cleanup_threads():
@@ -1481,50 +2361,59 @@ def cleanup_threads():
         thread_objects = [obj for obj in gc.get_objects() if isinstance(obj, QThread)]
 
         if thread_objects:
-            print(f"Found {len(thread_objects)} thread objects to cleanup...")
+            log.debug("Found %s thread objects to cleanup...", len(thread_objects))
 
             for thread in thread_objects:
                 try:
                     if thread.isRunning():
-                        print(f"Waiting for thread {thread} to finish...")
+                        log.debug("Waiting for thread %s to finish...", thread)
                         thread.quit()
                         if not thread.wait(2000):  # Wait up to 2 seconds
-                            print(f"Force terminating thread {thread}")
+                            log.warning("Force terminating thread %s", thread)
                             thread.terminate()
                             thread.wait(1000)  # Wait for termination
                 except Exception as e:
-                    print(f"Error cleaning up individual thread: {e}")
+                    log.error("Error cleaning up individual thread: %s", e)
         else:
-            print("No active threads found to cleanup")
+            log.debug("No active threads found to cleanup")
 
     except Exception as e:
-        print(f"Error cleaning up threads: {e}")
+        log.error("Error cleaning up threads: %s", e)
 
 
 def debug_widget_count():
-    """Debug function to check for widget leaks"""
-    import gc
-    terminals = [obj for obj in gc.get_objects() if isinstance(obj, TerminalWithHardwareGrid)]
-    opengl_widgets = [obj for obj in gc.get_objects() if isinstance(obj, OpenGLRetroGridWidget)]
-
-    print(f"Active terminals: {len(terminals)}")
-    print(f"Active OpenGL widgets: {len(opengl_widgets)}")
+    """Debug function to check for widget leaks (see memory_stats.leak_check for the full test)"""
+    counts = live_instances(TerminalWithHardwareGrid, OpenGLRetroGridWidget)
+    terminals, opengl_widgets = counts[TerminalWithHardwareGrid], counts[OpenGLRetroGridWidget]
 
-    for i, terminal in enumerate(terminals):
-        print(f"  Terminal {i}: {id(terminal)}")
+    log.debug("Active terminals: %s", terminals)
+    log.debug("Active OpenGL widgets: %s", opengl_widgets)
 
-    for i, widget in enumerate(opengl_widgets):
-        print(f"  OpenGL widget {i}: {id(widget)}")
-
-    return len(terminals), len(opengl_widgets)
+    return terminals, opengl_widgets
 
 
 def main():
     """STEP 3: Connection Manager starts first with clean shutdown"""
+    # Parser processes (process parsing mode) are spawned from this executable
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="CoolPyTerm")
+    parser.add_argument('--log', metavar='SPEC',
+                        help="diagnostic log levels, e.g. 'info', 'warning,ssh=debug' or 'off' "
+                             "(default: $COOLPYTERM_LOG or info)")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="record pipeline trace events from startup and write them to FILE "
+                             "(Chrome Trace JSON) on exit")
+    parser.add_argument('--trace-buffer', type=int, default=tracing.DEFAULT_CAPACITY, metavar='EVENTS',
+                        help="trace ring buffer size (default: %(default)s events)")
+    args, qt_args = parser.parse_known_args()
+    configure_logging(args.log)
+    if args.trace:
+        tracing.start(args.trace_buffer)
+
     # Enable clean shutdown on Ctrl+C
     signal.signal(signal.SIGINT, signal.SIG_DFL)
 
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setApplicationName("Hardware-Accelerated Terminal")
     app.setApplicationVersion("1.0")
 
@@ -1564,7 +2453,11 @@ def main():
         # Run the application
         exit_code = app.exec()
 
-        print("Application finished, cleaning up...")
+        if args.trace and tracing.tracer is not None:
+            events = tracing.stop().dump(args.trace)
+            log.info("Wrote %d trace events to %s", events, args.trace)
+
+        log.debug("Application finished, cleaning up...")
 
         # Force cleanup of any remaining threads
         cleanup_threads()
@@ -1573,18 +2466,16 @@ def main():
         import gc
         gc.collect()
 
-        print("Clean shutdown completed!")
+        log.debug("Clean shutdown completed!")
         return exit_code
 
     except KeyboardInterrupt:
-        print("\nReceived keyboard interrupt, shutting down...")
+        log.info("Received keyboard interrupt, shutting down...")
         if 'window' in locals():
             window.close_application()
         return 0
     except Exception as e:
-        print(f"Unhandled exception: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Unhandled exception: %s", e)
         return 1
 
 
@@ -0,0 +1,848 @@
+"""
+Fast pure-Python terminal engine
+
+FastSession implements the engine interface (see vt_session.py) without
+pyte's per-character state machine. Output is cut into tokens with a few
+compiled regexes: runs of printable text, CSI / OSC / string sequences,
+short escapes and single controls. A text run is written into the row with
+slice assignments, so a line of output costs a handful of list operations
+rather than one draw() call and one Char per character.
+
+Rows are kept as two parallel arrays: a list of one-character strings and
+an array('I') of style ids into an interned table of (fg, bg, bold,
+italics, underscore, strikethrough, reverse, blink) tuples. Char tuples
+are only built for the rows changes() reports, from a per-style cache.
+A third list, wraps, flags the rows that autowrapped into the next one.
+
+Semantics follow pyte's Screen (cursor movement, margins, erase with the
+current attributes, autowrap) so both engines render the same output,
+with a few additions pyte lacks: DEC line drawing (ESC ( 0, via
+str.translate), SU/SD, REP, CSI s/u and a real alternate screen (?47,
+?1047, ?1049) that keeps the main screen aside until the switch back. Where pyte is off this engine
+follows xterm instead: ED erases whole rows, not only the cells written
+so far; ESC E returns the carriage; ICH drops what it pushes past the edge;
+DL clears rows that pyte leaves in place when nothing below them was
+written. tests/test_engine_parity.py holds the two engines to each other.
+"""
+import re
+import unicodedata
+from array import array
+
+from pyte import charsets, graphics, modes as mo
+from pyte.screens import Char
+from wcwidth import wcwidth
+
+from coolpyterm.app_logging import get_logger
+from coolpyterm.vt_session import WrappedRow, reflow_screen
+
+log = get_logger('terminal')
+
+_TEXT = re.compile(r'[^\x00-\x1f\x7f-\x9f]+')
+_CSI = re.compile(r'(?:\x1b\[|\x9b)([<=>?]?)([0-9;:]*)([ -/]*)([@-~])')
+_OSC = re.compile(r'(?:\x1b\]|\x9d)[^\x07\x1b\x9c]*(?:\x07|\x1b\\|\x9c)')
+_STRING = re.compile(r'\x1b[P^_X][^\x1b\x9c]*(?:\x1b\\|\x9c)')
+_ESCAPE = re.compile(r'\x1b([ -/]*)([0-~])')
+# An escape sequence cut off by the end of a chunk; kept for the next feed
+_PARTIAL = re.compile(r'(?:(?:\x1b\[|\x9b)[<=>?]?[0-9;:]*[ -/]*|(?:\x1b\]|\x9d)[^\x07\x1b\x9c]*\x1b?'
+                      r'|\x1b[P^_X][^\x1b\x9c]*\x1b?|\x1b[ -/]*)\Z')
+_MAX_PARTIAL = 4096
+
+# Style ids are compacted when the table grows past this (24-bit color floods)
+_MAX_STYLES = 1 << 16
+
+_DEFAULT_STYLE = ('default', 'default', False, False, False, False, False, False)
+_FLAGS = {'bold': 2, 'italics': 3, 'underscore': 4, 'strikethrough': 5, 'reverse': 6, 'blink': 7}
+_SGR_FLAGS = {code: (_FLAGS[name[1:]], name[0] == '+') for code, name in graphics.TEXT.items()}
+
+_DEFAULT_MODE = frozenset((mo.DECAWM, mo.DECTCEM))
+_ALTERNATE_MODES = (1049, 1047, 47)
+_BRACKETED_PASTE = 2004 << 5
+
+_narrow = None
+
+
+class _StyleChars(dict):
+    """data -> Char for one style, built on first use"""
+
+    __slots__ = ('style',)
+
+    def __init__(self, style):
+        super().__init__()
+        self.style = style
+
+    def __missing__(self, data):
+        char = self[data] = Char(data, *self.style)
+        return char
+
+
+class _CharTables(dict):
+    """style id -> _StyleChars"""
+
+    __slots__ = ('styles',)
+
+    def __init__(self, styles):
+        super().__init__()
+        self.styles = styles
+
+    def __missing__(self, sid):
+        table = self[sid] = _StyleChars(self.styles[sid])
+        return table
+
+
+def _is_narrow(text):
+    """True when every character of text is one cell wide (str.translate deletes them all)"""
+    global _narrow
+    if _narrow is None:
+        _narrow = {cp: None for cp in range(0x20, 0x3000) if wcwidth(chr(cp)) == 1}
+    return not text.translate(_narrow)
+
+
+class FastSession:
+    """Engine with regex tokenizing, bulk text writes and compact row arrays"""
+
+    def __init__(self, columns=80, lines=24):
+        self.columns = columns
+        self.lines = lines
+        self.closing = False
+        self.alternate = False
+        self.screen = None
+        self.scrollback_limit = 1000
+
+        self.styles = [_DEFAULT_STYLE]
+        self._style_ids = {_DEFAULT_STYLE: 0}
+        self._chars = _CharTables(self.styles)
+        self._rows = {}    # last reported row tuples
+        self._pending = ""
+        self._full = False
+
+        self._csi_handlers = {
+            '@': self._insert_characters, 'A': self._cursor_up, 'B': self._cursor_down,
+            'C': self._cursor_forward, 'D': self._cursor_back, 'E': self._cursor_down1,
+            'F': self._cursor_up1, 'G': self._cursor_to_column, 'H': self._cursor_position,
+            'J': self._erase_in_display, 'K': self._erase_in_line, 'L': self._insert_lines,
+            'M': self._delete_lines, 'P': self._delete_characters, 'S': self._scroll_up,
+            'T': self._scroll_down, 'X': self._erase_characters, '`': self._cursor_to_column,
+            'a': self._cursor_forward, 'b': self._repeat, 'd': self._cursor_to_line,
+            'e': self._cursor_down, 'f': self._cursor_position, 'g': self._clear_tab_stop,
+            'r': self._set_margins, 's': self._save_cursor, 'u': self._restore_cursor,
+        }
+        self._controls = {
+            '\x08': self._backspace, '\x09': self._tab, '\x0a': self._linefeed,
+            '\x0b': self._linefeed, '\x0c': self._linefeed, '\x0d': self._carriage_return,
+            '\x0e': self._shift_out, '\x0f': self._shift_in,
+        }
+        self._escapes = {
+            'c': self._reset, 'D': self._index, 'E': self._next_line, 'M': self._reverse_index,
+            'H': self._set_tab_stop, '7': self._save_cursor, '8': self._restore_cursor,
+        }
+        self._reset()
+
+    # --- Engine interface ---------------------------------------------------------
+
+    def apply(self, item):
+        if isinstance(item, str):
+            self.feed(item)
+        elif item[0] == 'resize':
+            self._resize(item[1], item[2])
+        elif item[0] == 'reset':
+            self._reset()
+            self._pending = ""
+            self.scrolled_off = []
+        full, self._full = self._full, False
+        return full
+
+    def feed(self, data):
+        if self.closing:
+            return
+        if self._pending:
+            data = self._pending + data
+            self._pending = ""
+        try:
+            self._parse(data)
+        except Exception as e:
+            log.warning("Fast engine feed error (continuing): %s", e)
+
+    def changes(self, full):
+        if full:
+            changed_rows = range(self.lines)
+            self._rows.clear()
+        else:
+            changed_rows = self.dirty
+        previous = self._rows
+        rows = {}
+        for y in changed_rows:
+            if y >= self.lines:
+                continue
+            row = self._row_chars(self.text[y], self.style[y])
+            if self.wraps[y]:
+                row = WrappedRow(row)
+            if full or previous.get(y) != row:
+                rows[y] = previous[y] = row
+        self.dirty = set()
+
+        scrolled = []
+        if self.scrolled_off:
+            row_chars = self._row_chars
+            scrolled = [WrappedRow(row_chars(text, style)) if wrapped else row_chars(text, style)
+                        for text, style, wrapped in self.scrolled_off[-self.scrollback_limit:]]
+            self.scrolled_off = []
+
+        if len(self.styles) > _MAX_STYLES:
+            self._compact_styles()
+        return rows, scrolled
+
+    def state(self):
+        return ((self.y, self.x), mo.DECTCEM not in self.mode, self.alternate,
+                _BRACKETED_PASTE in self.mode, 0)
+
+    # --- Rows and styles ----------------------------------------------------------
+
+    def _blank_row(self, style=0):
+        return [" "] * self.columns, array('I', (style,)) * self.columns
+
+    def _row_chars(self, text, style):
+        """One row as a tuple of Chars from the per-style caches; no Python loop on a hit"""
+        return tuple(map(_StyleChars.__getitem__, map(self._chars.__getitem__, style), text))
+
+    def _intern(self, style):
+        sid = self._style_ids.get(style)
+        if sid is None:
+            sid = self._style_ids[style] = len(self.styles)
+            self.styles.append(style)
+        return sid
+
+    def _compact_styles(self):
+        """Renumber the styles still in use and drop the rest"""
+        used = {0, self.cursor_style}
+        main_style = self._main[1] if self._main is not None else ()
+        for style in (*self.style, *main_style):
+            used.update(style)
+        for saved in (*self.savepoints, *filter(None, [self._main_cursor])):
+            used.add(saved[2])
+        remap = {}
+        styles = []
+        for sid in sorted(used):
+            remap[sid] = len(styles)
+            styles.append(self.styles[sid])
+        self.style = [array('I', [remap[sid] for sid in row]) for row in self.style]
+        if self._main is not None:
+            self._main = (self._main[0], [array('I', [remap[sid] for sid in row])
+                                          for row in self._main[1]], self._main[2])
+        self.cursor_style = remap[self.cursor_style]
+        self.savepoints = [saved[:2] + (remap[saved[2]],) + saved[3:] for saved in self.savepoints]
+        if self._main_cursor is not None:
+            saved = self._main_cursor
+            self._main_cursor = saved[:2] + (remap[saved[2]],) + saved[3:]
+        self.styles = styles
+        self._style_ids = {style: sid for sid, style in enumerate(styles)}
+        self._chars = _CharTables(styles)
+
+    # --- Tokenizer ----------------------------------------------------------------
+
+    def _parse(self, data):
+        text_match = _TEXT.match
+        controls = self._controls
+        pos = 0
+        end = len(data)
+        while pos < end:
+            match = text_match(data, pos)
+            if match is not None:
+                self._draw(match.group())
+                pos = match.end()
+                continue
+
+            char = data[pos]
+            if char == '\x1b' or char == '\x9b' or char == '\x9d':
+                follower = data[pos + 1:pos + 2] if char == '\x1b' else char
+                if follower == '[' or follower == '\x9b':
+                    match = _CSI.match(data, pos)
+                    if match is not None:
+                        self._csi(*match.groups())
+                elif follower == ']' or follower == '\x9d':
+                    match = _OSC.match(data, pos)
+                elif follower and follower in 'P^_X':
+                    match = _STRING.match(data, pos)
+                else:
+                    match = _ESCAPE.match(data, pos)
+                    if match is not None:
+                        self._escape(*match.groups())
+                if match is None:
+                    if end - pos < _MAX_PARTIAL and _PARTIAL.match(data, pos):
+                        self._pending = data[pos:]
+                        return
+                    pos += 1  # Not a sequence we can parse; drop the ESC
+                else:
+                    pos = match.end()
+                continue
+
+            handler = controls.get(char)
+            if handler is not None:
+                handler()
+            pos += 1
+
+    def _escape(self, intermediate, final):
+        if not intermediate:
+            handler = self._escapes.get(final)
+            if handler is not None:
+                handler()
+        elif intermediate == '#' and final == '8':
+            self._alignment_display()
+        elif intermediate in '()' and final in charsets.MAPS:
+            if intermediate == '(':
+                self.g0 = charsets.MAPS[final]
+            else:
+                self.g1 = charsets.MAPS[final]
+
+    def _csi(self, private, params, intermediate, final):
+        if intermediate:
+            return  # DECSCUSR, DECSTR and friends are not supported
+        if final == 'm':
+            if not private:
+                self._select_graphic_rendition(params)
+            return
+        args = [min(int(p), 9999) if p else 0 for p in params.replace(':', ';').split(';')] if params else []
+        if final == 'h' or final == 'l':
+            if private in ('', '?'):
+                self._set_modes(args, private == '?', final == 'h')
+            return
+        if private and not (private == '?' and final in 'JK'):
+            return  # DA2, XTMODKEYS etc.; DECSED/DECSEL erase like ED/EL
+        handler = self._csi_handlers.get(final)
+        if handler is not None:
+            handler(*args)
+
+    # --- Text ---------------------------------------------------------------------
+
+    def _draw(self, data):
+        charset = self.g1 if self.shifted else self.g0
+        if charset is not charsets.LAT1_MAP:
+            data = data.translate(charset)
+        self.last_char = data[-1]
+        if mo.IRM in self.mode or not (data.isascii() or _is_narrow(data)):
+            self._draw_slow(data)
+            return
+
+        columns = self.columns
+        style = self.cursor_style
+        dirty = self.dirty
+        x = self.x
+        start = 0
+        end = len(data)
+        while start < end:
+            if x >= columns:
+                if mo.DECAWM in self.mode:
+                    dirty.add(self.y)
+                    self.wraps[self.y] = True
+                    self.x = 0
+                    self._linefeed()
+                    x = self.x
+                else:
+                    # Without autowrap each character overwrites the last column
+                    self.text[self.y][columns - 1] = data[-1]
+                    self.style[self.y][columns - 1] = style
+                    break
+            count = min(columns - x, end - start)
+            y = self.y
+            self.text[y][x:x + count] = data[start:start + count]
+            self.style[y][x:x + count] = array('I', (style,)) * count
+            x += count
+            start += count
+        self.x = x
+        dirty.add(self.y)
+
+    def _draw_slow(self, data):
+        """Character at a time, for wide and combining characters and insert mode"""
+        columns = self.columns
+        style = self.cursor_style
+        for char in data:
+            width = wcwidth(char)
+            if self.x >= columns:
+                if mo.DECAWM in self.mode:
+                    self.dirty.add(self.y)
+                    self.wraps[self.y] = True
+                    self.x = 0
+                    self._linefeed()
+                elif width > 0:
+                    self.x = columns - width
+            if mo.IRM in self.mode and width > 0:
+                self._insert_characters(width)
+            text = self.text[self.y]
+            if width == 1 or width == 2:
+                text[self.x] = char
+                self.style[self.y][self.x] = style
+                if width == 2 and self.x + 1 < columns:
+                    text[self.x + 1] = ""
+                    self.style[self.y][self.x + 1] = style
+            elif width == 0 and unicodedata.combining(char):
+                if self.x:
+                    text[self.x - 1] = unicodedata.normalize("NFC", text[self.x - 1] + char)
+                elif self.y:
+                    above = self.text[self.y - 1]
+                    above[columns - 1] = unicodedata.normalize("NFC", above[columns - 1] + char)
+                    self.dirty.add(self.y - 1)
+            else:
+                break
+            if width > 0:
+                self.x = min(self.x + width, columns)
+        self.dirty.add(self.y)
+
+    def _repeat(self, count=1, *_):
+        if self.last_char:
+            self._draw(self.last_char * (count or 1))
+
+    def _alignment_display(self):
+        for y in range(self.lines):
+            self.text[y] = ["E"] * self.columns
+        self.dirty.update(range(self.lines))
+
+    # --- Controls -----------------------------------------------------------------
+
+    def _carriage_return(self):
+        self.x = 0
+
+    def _linefeed(self):
+        self._index()
+        if mo.LNM in self.mode:
+            self.x = 0
+
+    def _next_line(self):
+        self._index()
+        self.x = 0
+
+    def _backspace(self):
+        self._cursor_back()
+
+    def _tab(self):
+        for stop in sorted(self.tabstops):
+            if self.x < stop:
+                self.x = stop
+                return
+        self.x = self.columns - 1
+
+    def _shift_out(self):
+        self.shifted = True
+
+    def _shift_in(self):
+        self.shifted = False
+
+    def _set_tab_stop(self):
+        self.tabstops.add(self.x)
+
+    def _clear_tab_stop(self, how=0, *_):
+        if how == 0:
+            self.tabstops.discard(self.x)
+        elif how == 3:
+            self.tabstops = set()
+
+    # --- Scrolling ----------------------------------------------------------------
+
+    def _region(self):
+        return self.margins or (0, self.lines - 1)
+
+    def _index(self):
+        top, bottom = self._region()
+        if self.y == bottom:
+            self._scroll_up(1)
+        else:
+            self.y = min(self.y + 1, bottom)
+
+    def _reverse_index(self):
+        top, bottom = self._region()
+        if self.y == top:
+            self._scroll_down(1)
+        else:
+            self.y = max(self.y - 1, top)
+
+    def _scroll_up(self, count=1, *_):
+        top, bottom = self._region()
+        count = min(count or 1, bottom - top + 1)
+        for _ in range(count):
+            line = (self.text.pop(top), self.style.pop(top), self.wraps.pop(top))
+            if not self.alternate:
+                # What scrolls away on the alternate screen is not scrollback
+                self.scrolled_off.append(line)
+            text, style = self._blank_row()
+            self.text.insert(bottom, text)
+            self.style.insert(bottom, style)
+            self.wraps.insert(bottom, False)
+        self.dirty.update(range(self.lines))
+
+    def _scroll_down(self, count=1, *_):
+        top, bottom = self._region()
+        count = min(count or 1, bottom - top + 1)
+        for _ in range(count):
+            del self.text[bottom], self.style[bottom], self.wraps[bottom]
+            text, style = self._blank_row()
+            self.text.insert(top, text)
+            self.style.insert(top, style)
+            self.wraps.insert(top, False)
+        self.dirty.update(range(self.lines))
+
+    def _set_margins(self, top=0, bottom=None, *_):
+        if not top and bottom is None:
+            self.margins = None
+            return
+        current_top, current_bottom = self._region()
+        top = current_top if not top else max(0, min(top - 1, self.lines - 1))
+        bottom = current_bottom if bottom is None else max(0, min(bottom - 1, self.lines - 1))
+        if bottom - top >= 1:
+            self.margins = (top, bottom)
+            self._cursor_position()
+
+    def _insert_lines(self, count=1, *_):
+        top, bottom = self._region()
+        if top <= self.y <= bottom:
+            count = min(count or 1, bottom - self.y + 1)
+            for _ in range(count):
+                del self.text[bottom], self.style[bottom], self.wraps[bottom]
+                text, style = self._blank_row()
+                self.text.insert(self.y, text)
+                self.style.insert(self.y, style)
+                self.wraps.insert(self.y, False)
+            self.dirty.update(range(self.y, self.lines))
+            self.x = 0
+
+    def _delete_lines(self, count=1, *_):
+        top, bottom = self._region()
+        if top <= self.y <= bottom:
+            count = min(count or 1, bottom - self.y + 1)
+            for _ in range(count):
+                del self.text[self.y], self.style[self.y], self.wraps[self.y]
+                text, style = self._blank_row()
+                self.text.insert(bottom, text)
+                self.style.insert(bottom, style)
+                self.wraps.insert(bottom, False)
+            self.dirty.update(range(self.y, self.lines))
+            self.x = 0
+
+    # --- Cursor -------------------------------------------------------------------
+
+    def _clamp_x(self):
+        self.x = min(max(0, self.x), self.columns - 1)
+
+    def _clamp_y(self, use_margins=False):
+        if (use_margins or mo.DECOM in self.mode) and self.margins is not None:
+            top, bottom = self.margins
+        else:
+            top, bottom = 0, self.lines - 1
+        self.y = min(max(top, self.y), bottom)
+
+    def _cursor_up(self, count=1, *_):
+        self.y = max(self.y - (count or 1), self._region()[0])
+
+    def _cursor_down(self, count=1, *_):
+        self.y = min(self.y + (count or 1), self._region()[1])
+
+    def _cursor_up1(self, count=1, *_):
+        self._cursor_up(count)
+        self.x = 0
+
+    def _cursor_down1(self, count=1, *_):
+        self._cursor_down(count)
+        self.x = 0
+
+    def _cursor_back(self, count=1, *_):
+        if self.x == self.columns:
+            self.x -= 1
+        self.x -= count or 1
+        self._clamp_x()
+
+    def _cursor_forward(self, count=1, *_):
+        self.x += count or 1
+        self._clamp_x()
+
+    def _cursor_position(self, line=0, column=0, *_):
+        column = (column or 1) - 1
+        line = (line or 1) - 1
+        if self.margins is not None and mo.DECOM in self.mode:
+            line += self.margins[0]
+            if not self.margins[0] <= line <= self.margins[1]:
+                return
+        self.x = column
+        self.y = line
+        self._clamp_x()
+        self._clamp_y()
+
+    def _cursor_to_column(self, column=0, *_):
+        self.x = (column or 1) - 1
+        self._clamp_x()
+
+    def _cursor_to_line(self, line=0, *_):
+        self.y = (line or 1) - 1
+        if mo.DECOM in self.mode and self.margins is not None:
+            self.y += self.margins[0]
+        self._clamp_y()
+
+    def _cursor_state(self):
+        return (self.y, self.x, self.cursor_style, self.g0, self.g1, self.shifted,
+                mo.DECOM in self.mode, mo.DECAWM in self.mode)
+
+    def _save_cursor(self, *_):
+        self.savepoints.append(self._cursor_state())
+
+    def _restore_cursor(self, *_):
+        if not self.savepoints:
+            self.mode.discard(mo.DECOM)
+            self._cursor_position()
+            return
+        self._set_cursor_state(self.savepoints.pop())
+
+    def _set_cursor_state(self, saved):
+        self.y, self.x, self.cursor_style, self.g0, self.g1, self.shifted, origin, wrap = saved
+        if origin:
+            self.mode.add(mo.DECOM)
+        if wrap:
+            self.mode.add(mo.DECAWM)
+        self._clamp_x()
+        self._clamp_y(use_margins=True)
+
+    # --- Erasing and editing ------------------------------------------------------
+
+    def _erase_span(self, y, start, stop):
+        count = stop - start
+        if count > 0:
+            self.text[y][start:stop] = [" "] * count
+            self.style[y][start:stop] = array('I', (self.cursor_style,)) * count
+            if stop == self.columns:
+                self.wraps[y] = False
+            self.dirty.add(y)
+
+    def _erase_in_line(self, how=0, *_):
+        columns = self.columns
+        if how == 0:
+            self._erase_span(self.y, min(self.x, columns), columns)
+        elif how == 1:
+            self._erase_span(self.y, 0, min(self.x + 1, columns))
+        elif how == 2:
+            self._erase_span(self.y, 0, columns)
+
+    def _erase_in_display(self, how=0, *_):
+        if how == 0:
+            rows = range(self.y + 1, self.lines)
+        elif how == 1:
+            rows = range(self.y)
+        elif how in (2, 3):
+            rows = range(self.lines)
+        else:
+            return
+        for y in rows:
+            self._erase_span(y, 0, self.columns)
+        if how in (0, 1):
+            self._erase_in_line(how)
+
+    def _erase_characters(self, count=1, *_):
+        self._erase_span(self.y, self.x, min(self.x + (count or 1), self.columns))
+
+    def _insert_characters(self, count=1, *_):
+        count = count or 1
+        x = self.x
+        columns = self.columns
+        if x >= columns:
+            return
+        text = self.text[self.y]
+        style = self.style[self.y]
+        count = min(count, columns - x)
+        text[x:x] = [" "] * count
+        style[x:x] = array('I', (0,)) * count
+        del text[columns:], style[columns:]
+        self.dirty.add(self.y)
+
+    def _delete_characters(self, count=1, *_):
+        count = count or 1
+        x = self.x
+        columns = self.columns
+        if x >= columns:
+            return
+        text = self.text[self.y]
+        style = self.style[self.y]
+        count = min(count, columns - x)
+        del text[x:x + count], style[x:x + count]
+        text.extend([" "] * count)
+        style.extend(array('I', (0,)) * count)
+        self.dirty.add(self.y)
+
+    # --- Modes and attributes -----------------------------------------------------
+
+    def _set_modes(self, args, private, enable):
+        modes = [mode << 5 for mode in args] if private else args
+        if enable:
+            self.mode.update(modes)
+        else:
+            self.mode.difference_update(modes)
+        if mo.DECOM in modes:
+            self._cursor_position()
+        if private:
+            for mode in args:
+                if mode in _ALTERNATE_MODES:
+                    self._switch_screen(enable, mode)
+
+    def _switch_screen(self, alternate, mode):
+        """Enter or leave the alternate screen; the main one is kept as it was, not rebuilt
+
+        ?1049 also saves the cursor on the way in and restores it on the way out.
+        """
+        if alternate == self.alternate:
+            return
+        if alternate:
+            if mode == 1049:
+                self._main_cursor = self._cursor_state()
+            self._main = (self.text, self.style, self.wraps)
+            self.text = []
+            self.style = []
+            for _ in range(self.lines):
+                text, style = self._blank_row()
+                self.text.append(text)
+                self.style.append(style)
+            self.wraps = [False] * self.lines
+        else:
+            self.text, self.style, self.wraps = self._main
+            self._main = None
+            if mode == 1049 and self._main_cursor is not None:
+                self._set_cursor_state(self._main_cursor)
+            self._main_cursor = None
+        self.alternate = alternate
+        self.dirty.update(range(self.lines))
+
+    def _select_graphic_rendition(self, params):
+        if not params or params == '0':
+            self.cursor_style = 0
+            return
+        style = list(self.styles[self.cursor_style])
+        args = []
+        for param in params.split(';'):
+            if ':' in param:
+                # ITU form, 38:2:<colorspace>:r:g:b or 38:5:n
+                sub = [int(p) if p else 0 for p in param.split(':')]
+                if len(sub) == 6 and sub[1] == 2:
+                    del sub[2]
+                args.extend(sub)
+            else:
+                args.append(int(param) if param else 0)
+
+        args.reverse()
+        while args:
+            code = args.pop()
+            if code == 0:
+                style = list(_DEFAULT_STYLE)
+            elif code in _SGR_FLAGS:
+                index, value = _SGR_FLAGS[code]
+                style[index] = value
+            elif code in graphics.FG_ANSI:
+                style[0] = graphics.FG_ANSI[code]
+            elif code in graphics.BG_ANSI:
+                style[1] = graphics.BG_ANSI[code]
+            elif code in graphics.FG_AIXTERM:
+                style[0] = graphics.FG_AIXTERM[code]
+            elif code in graphics.BG_AIXTERM:
+                style[1] = graphics.BG_AIXTERM[code]
+            elif code in (graphics.FG_256, graphics.BG_256, 58):
+                try:
+                    kind = args.pop()
+                    if kind == 5:
+                        color = graphics.FG_BG_256[args.pop()]
+                    elif kind == 2:
+                        color = "{0:02x}{1:02x}{2:02x}".format(args.pop(), args.pop(), args.pop())
+                    else:
+                        continue
+                except IndexError:
+                    break
+                if code == graphics.FG_256:
+                    style[0] = color
+                elif code == graphics.BG_256:
+                    style[1] = color
+        self.cursor_style = self._intern(tuple(style))
+
+    # --- Whole screen -------------------------------------------------------------
+
+    def _reset(self):
+        self.text = []
+        self.style = []
+        for _ in range(self.lines):
+            text, style = self._blank_row()
+            self.text.append(text)
+            self.style.append(style)
+        self.wraps = [False] * self.lines
+        self.y = self.x = 0
+        self.cursor_style = 0
+        self.margins = None
+        self.mode = set(_DEFAULT_MODE)
+        self.tabstops = set(range(8, self.columns, 8))
+        self.savepoints = []
+        self.g0 = charsets.LAT1_MAP
+        self.g1 = charsets.VT100_MAP
+        self.shifted = False
+        self.last_char = ""
+        self.alternate = False
+        self._main = None         # (text, style, wraps) of the main screen while on the alternate one
+        self._main_cursor = None  # cursor saved by ?1049
+        self.scrolled_off = getattr(self, 'scrolled_off', [])
+        self.dirty = set(range(self.lines))
+        self._full = True
+
+    def _resize(self, columns, lines):
+        if (columns, lines) == (self.columns, self.lines):
+            return
+        if columns != self.columns:
+            # A column change rewraps the main screen instead of clipping it;
+            # the alternate one is left clipped, its program redraws anyway
+            if self.alternate:
+                self._resize_rows(self.text, self.style, self.wraps, columns, lines)
+                saved = self._main_cursor
+                cursor = saved[:2] if saved is not None else (0, 0)
+                self._main, (y, x) = self._reflow_rows(self._main, cursor, columns, lines)
+                if saved is not None:
+                    self._main_cursor = (y, x) + saved[2:]
+            else:
+                (self.text, self.style, self.wraps), (self.y, self.x) = self._reflow_rows(
+                    (self.text, self.style, self.wraps), (self.y, self.x), columns, lines)
+        else:
+            self._resize_rows(self.text, self.style, self.wraps, columns, lines)
+            if self._main is not None:
+                self._resize_rows(*self._main, columns, lines)
+        if columns != self.columns:
+            self.tabstops = {stop for stop in self.tabstops if stop < columns}
+            self.tabstops.update(range((self.columns + 7) // 8 * 8, columns, 8))
+        self.columns = columns
+        self.lines = lines
+        self.margins = None
+        self.x = min(self.x, columns - 1)
+        self.y = min(self.y, lines - 1)
+        self.dirty = set(range(lines))
+        self._full = True
+
+    def _resize_rows(self, text_rows, style_rows, wraps, columns, lines):
+        """Fit one screen's rows to the new size in place"""
+        if lines < self.lines:
+            # Like pyte: lines are dropped from the top, not scrolled into history
+            del text_rows[:self.lines - lines], style_rows[:self.lines - lines], wraps[:self.lines - lines]
+        if columns != self.columns:
+            for text, style in zip(text_rows, style_rows):
+                if columns < self.columns:
+                    del text[columns:], style[columns:]
+                else:
+                    text.extend([" "] * (columns - self.columns))
+                    style.extend(array('I', (0,)) * (columns - self.columns))
+        for _ in range(lines - self.lines):
+            text_rows.append([" "] * columns)
+            style_rows.append(array('I', (0,)) * columns)
+            wraps.append(False)
+
+    def _reflow_rows(self, screen, cursor, columns, lines):
+        """One screen's (text, style, wraps) rewrapped to columns x lines, and where the cursor went
+
+        Rows pushed off the top go to scrolled_off like any others.
+        """
+        text_rows, style_rows, wraps = screen
+        rows = [WrappedRow(self._row_chars(text, style)) if wrapped else self._row_chars(text, style)
+                for text, style, wrapped in zip(text_rows, style_rows, wraps)]
+        rows, cursor, overflow = reflow_screen(rows, columns, lines, cursor)
+
+        intern = self._intern
+        reflowed = ([], [], [])
+        for row in (*overflow, *rows):
+            reflowed[0].append([char.data for char in row])
+            reflowed[1].append(array('I', [intern(tuple(char[1:])) for char in row]))
+            reflowed[2].append(type(row) is WrappedRow)
+        for line in zip(*(part[:len(overflow)] for part in reflowed)):
+            self.scrolled_off.append(line)
+        return tuple(part[len(overflow):] for part in reflowed), cursor
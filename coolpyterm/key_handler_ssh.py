@@ -2,18 +2,17 @@
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QKeyEvent
 
+from coolpyterm.app_logging import get_logger, TRACE
+from coolpyterm.paste_engine import prepare_paste_text
+
+log = get_logger('input')
+
 
 class KeyHandler:
     @staticmethod
     def send(string, backend_connection):
-        """Send a string to backend connection, handling newlines and backend types properly."""
-        if "\n" in string:
-            lines = string.splitlines()
-            for line in lines:
-                KeyHandler._send_to_backend(line, backend_connection)
-                KeyHandler._send_to_backend("\n", backend_connection)
-        else:
-            KeyHandler._send_to_backend(string, backend_connection)
+        """Send a string to backend connection in a single write, newlines included."""
+        KeyHandler._send_to_backend(string, backend_connection)
 
     @staticmethod
     def _send_to_backend(data, backend_connection):
@@ -105,7 +104,8 @@ class KeyHandler:
         """
         # First check if this should be handled locally
         if KeyHandler.should_handle_locally(event):
-            print(f"🔑 KeyHandler: Passing key {event.key()} to application (local handling)")
+            if __debug__ and log.isEnabledFor(TRACE):
+                log.log(TRACE, "KeyHandler: passing key %s to application (local handling)", event.key())
             return False  # Let the application handle it
 
         key = event.key()
@@ -116,11 +116,10 @@ class KeyHandler:
 
         # SPECIAL HANDLING FOR BACKSPACE - LEFT ARROW + DELETE METHOD
         if key == Qt.Key.Key_Backspace:
-            print("🔙 Backspace pressed - using left arrow + delete method")
-
             if hasattr(backend_connection, 'pty_process'):
                 # Windows backend - simulate left arrow + delete
-                print("🔙 Windows backend - sending: left arrow (\\x1b[D) + delete (\\x1b[3~)")
+                if __debug__ and log.isEnabledFor(TRACE):
+                    log.log(TRACE, "Backspace on Windows backend - sending left arrow + delete")
 
                 # Method 1: Two separate sends
                 KeyHandler._send_to_backend("\x1b[D", backend_connection)  # Left arrow
@@ -131,10 +130,12 @@ class KeyHandler:
 
             else:
                 # SSH backend - use standard backspace
-                print("🔙 SSH backend - using standard backspace")
+                if __debug__ and log.isEnabledFor(TRACE):
+                    log.log(TRACE, "Backspace - sending standard backspace")
                 KeyHandler._send_to_backend("\x08", backend_connection)
             return True
-        print(f"🔑 KeyHandler: Sending key {event.key()} to backend")
+        if __debug__ and log.isEnabledFor(TRACE):
+            log.log(TRACE, "KeyHandler: sending key %s to backend", event.key())
 
         # Mapping of Qt keys to escape sequences (as strings for compatibility)
         special_keys = {
@@ -231,9 +232,8 @@ class KeyHandler:
         return False
 
     @staticmethod
-    def handle_paste(text, backend_connection):
-        """Handle pasted text, converting to appropriate format."""
+    def handle_paste(text, backend_connection, bracketed=False):
+        """Handle pasted text in one write; large pastes go through PasteStreamer instead."""
         if text:
-            # Convert line endings and send
-            text = text.replace('\r\n', '\n').replace('\r', '\n')
-            KeyHandler.send(text, backend_connection)
\ No newline at end of file
+            # Convert line endings, wrap for bracketed paste mode and send
+            KeyHandler.send(prepare_paste_text(text, bracketed), backend_connection)
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""
+Keystroke-to-photon latency tracking
+
+Every key event opens a probe that is stamped as it moves through the
+pipeline; the first echo bytes after a send close the network leg and the
+next presented frame after parsing closes the probe:
+
+    input    keyPressEvent -> handed to the backend
+    send     handed to the backend -> written to the transport by the send queue
+    network  written -> first echo bytes read by the backend reader thread
+    parse    echo read -> its frame applied to the grid (parser worker, frame hand-off)
+    render   frame applied -> frame swapped to the screen
+    total    keyPressEvent -> frame swapped
+
+Stamps arrive from the GUI, send queue and reader threads, so the tracker is
+lock protected. It is only created while latency tracking is switched on;
+hot paths check for None before calling into it.
+"""
+import json
+import math
+import threading
+import time
+from collections import deque
+
+
+STAGES = ('input', 'send', 'network', 'parse', 'render', 'total')
+
+# Stamp order within a probe; stage i spans _MARKS[i] .. _MARKS[i + 1]
+_MARKS = ('key', 'handled', 'sent', 'received', 'parsed', 'presented')
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def summarize(samples):
+    """p50/p95/p99/max summary (seconds in, milliseconds out)"""
+    return {
+        'count': len(samples),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3) if samples else 0.0,
+    }
+
+
+class LatencyTracker:
+    """Correlates key events with their echo and the frame that shows it"""
+
+    def __init__(self, max_samples=2000, probe_timeout=2.0):
+        self.probe_timeout = probe_timeout
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self._samples = deque(maxlen=max_samples)
+        self.unmatched = 0  # probes that never saw an echo (no-echo input, local keys)
+
+    def _expire(self, now):
+        """Drop probes whose echo never came (passwords, stty -echo, keys with no output); lock held"""
+        pending = self._pending
+        while pending and 'parsed' not in pending[0] and now - pending[0]['key'] > self.probe_timeout:
+            pending.popleft()
+            self.unmatched += 1
+
+    # Each mark_* stamps the oldest probes still waiting for that stage
+
+    def _stamp(self, mark, previous):
+        now = time.perf_counter()
+        with self._lock:
+            # A stale probe would otherwise take the stamps of a later key's echo
+            self._expire(now)
+            for probe in self._pending:
+                if previous in probe and mark not in probe:
+                    probe[mark] = now
+
+    def key_pressed(self):
+        """GUI thread: a key event arrived"""
+        now = time.perf_counter()
+        with self._lock:
+            self._expire(now)
+            self._pending.append({'key': now})
+
+    def key_handled(self):
+        """GUI thread: the key was handed to the backend"""
+        self._stamp('handled', 'key')
+
+    def key_ignored(self):
+        """GUI thread: the key was consumed locally and nothing was sent"""
+        with self._lock:
+            if self._pending and 'handled' not in self._pending[-1]:
+                self._pending.pop()
+
+    def mark_sent(self, nbytes=0):
+        """Send queue thread (or GUI thread for unqueued backends): data reached the transport"""
+        self._stamp('sent', 'handled')
+
+    def mark_received(self, nbytes=0):
+        """Reader thread: bytes arrived from the backend"""
+        self._stamp('received', 'sent')
+
+    def mark_parsed(self):
+        """GUI thread: the frame holding the received data was applied to the grid"""
+        self._stamp('parsed', 'received')
+
+    def mark_presented(self):
+        """GUI thread: a frame was swapped to the screen"""
+        now = time.perf_counter()
+        with self._lock:
+            # Expired on every frame too, so an unechoed key cannot hold up the
+            # ones behind it until the next key press
+            self._expire(now)
+            while self._pending and 'parsed' in self._pending[0]:
+                probe = self._pending.popleft()
+                probe['presented'] = now
+                self._samples.append(probe)
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def stage_samples(self):
+        """Per-stage durations in seconds for every completed probe"""
+        with self._lock:
+            samples = list(self._samples)
+        stages = {stage: [] for stage in STAGES}
+        for probe in samples:
+            for stage, start, end in zip(STAGES, _MARKS, _MARKS[1:]):
+                stages[stage].append(probe[end] - probe[start])
+            stages['total'].append(probe['presented'] - probe['key'])
+        return stages
+
+    def summary(self):
+        """p50/p95/p99 per stage"""
+        return {stage: summarize(values) for stage, values in self.stage_samples().items()}
+
+    def overlay_lines(self):
+        """Compact text for the on-screen overlay"""
+        summary = self.summary()
+        lines = [f"key->photon  n={summary['total']['count']}  unmatched={self.unmatched}",
+                 f"{'stage':<8}{'p50':>8}{'p95':>8}{'p99':>8}"]
+        for stage in STAGES:
+            s = summary[stage]
+            lines.append(f"{stage:<8}{s['p50_ms']:>8.1f}{s['p95_ms']:>8.1f}{s['p99_ms']:>8.1f}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self._samples.clear()
+            self.unmatched = 0
+
+    def export_json(self, path):
+        """Write the summary and raw per-probe stage timings (ms) to a JSON file"""
+        stages = self.stage_samples()
+        report = {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'unmatched': self.unmatched,
+            'summary': {stage: summarize(values) for stage, values in stages.items()},
+            'samples_ms': {stage: [round(v * 1000, 3) for v in values] for stage, values in stages.items()},
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return report
@@ -1,21 +1,254 @@
-import threading
+"""
+Asynchronous session logging
+
+Reader threads hand received text to SessionLogger.log(), which only appends
+to a bounded queue. A writer thread owns the open log file, batches writes,
+flushes on size/time thresholds and rotates the file by size or age, gzip
+compressing rotated files in the background. When the queue is full records
+are dropped and counted instead of stalling the terminal.
+"""
+import glob
+import gzip
+import os
 import queue
-import logging
+import shutil
+import threading
+import time
+from datetime import datetime
+
+from coolpyterm.app_logging import get_logger
+
+log = get_logger('session')
+
+
+_STOP = object()
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
 
-class LogThread(threading.Thread):
-    def __init__(self, log_queue, log_file):
-        super().__init__(daemon=True)
-        self.log_queue = log_queue
+
+class SessionLogger(threading.Thread):
+    """
+    Writer thread for one session log file
+
+    max_bytes / max_age (seconds) of 0 disable size / age based rotation.
+    backup_count limits how many rotated files are kept (0 keeps all).
+    """
+
+    def __init__(self, log_file, max_queue=10000, flush_bytes=64 * 1024, flush_interval=1.0,
+                 max_bytes=10 * 1024 * 1024, max_age=0, backup_count=5, compress=True):
+        super().__init__(daemon=True, name=f"session-log-{os.path.basename(log_file)}")
         self.log_file = log_file
-        logging.basicConfig(filename=log_file, level=logging.INFO, format='%(asctime)s - %(message)s')
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+        self.compress = compress
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._file = None
+        self._file_size = 0
+        self._opened_at = 0.0
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+        self._pending_cr = False
+        self._compress_threads = []
+
+        # Counters for observability
+        self.dropped = 0
+        self.records = 0
+        self.bytes_written = 0
+        self.flushes = 0
+        self.rotations = 0
+
+        log_dir = os.path.dirname(log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+
+    @property
+    def queue_depth(self):
+        """Records waiting for the writer thread"""
+        return self._queue.qsize()
+
+    def stats(self):
+        """Snapshot of logger counters"""
+        return {
+            'queue_depth': self.queue_depth,
+            'dropped': self.dropped,
+            'records': self.records,
+            'bytes_written': self.bytes_written,
+            'flushes': self.flushes,
+            'rotations': self.rotations,
+        }
+
+    def log(self, data):
+        """Queue data for the log file; never blocks the caller"""
+        if self._closed or not data:
+            return
+        try:
+            self._queue.put_nowait(data)
+        except queue.Full:
+            self.dropped += 1
 
     def run(self):
-        while True:
-            log_data = self.log_queue.get()
-            if log_data is None:
-                # None is a signal to stop the thread
-                break
-            # Ensure log data is decoded if it's in bytes
-            if isinstance(log_data, bytes):
-                log_data = log_data.decode(errors='replace')
-            logging.info(log_data)
\ No newline at end of file
+        self._open()
+        try:
+            while True:
+                timeout = max(0.0, self._last_flush + self.flush_interval - time.monotonic())
+                try:
+                    record = self._queue.get(timeout=timeout if self._unflushed else None)
+                except queue.Empty:
+                    self._flush()
+                    continue
+
+                if record is _STOP:
+                    break
+                self._write(record)
+
+                # Drain whatever else is already queued before deciding to flush
+                stop = False
+                while True:
+                    try:
+                        record = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if record is _STOP:
+                        stop = True
+                        break
+                    self._write(record)
+
+                if self._unflushed >= self.flush_bytes or \
+                        time.monotonic() - self._last_flush >= self.flush_interval:
+                    self._flush()
+                if stop:
+                    break
+        except Exception as e:
+            log.error("Session logger error (%s): %s", self.log_file, e)
+        finally:
+            if self._pending_cr:
+                self._write_text('\n')
+            self._close_file()
+
+    def _normalize(self, data):
+        """Decode and convert CRLF/CR line endings, holding a trailing CR for the next record"""
+        if isinstance(data, bytes):
+            data = data.decode('utf-8', errors='replace')
+        if self._pending_cr:
+            data = '\r' + data
+        self._pending_cr = data.endswith('\r')
+        if self._pending_cr:
+            data = data[:-1]
+        return data.replace('\r\n', '\n').replace('\r', '\n')
+
+    def _write(self, record):
+        self.records += 1
+        text = self._normalize(record)
+        if text:
+            self._write_text(text)
+
+    def _write_text(self, text):
+        if self._needs_rotation():
+            self._rotate()
+        encoded_size = len(text.encode('utf-8'))
+        self._file.write(text)
+        self._file_size += encoded_size
+        self._unflushed += encoded_size
+        self.bytes_written += encoded_size
+
+    def _needs_rotation(self):
+        if self.max_bytes and self._file_size >= self.max_bytes:
+            return True
+        return bool(self.max_age and self._file_size and time.time() - self._opened_at >= self.max_age)
+
+    def _open(self):
+        self._file = open(self.log_file, 'a', encoding='utf-8', newline='')
+        self._file_size = self._file.tell()
+        try:
+            # Age counts from when the current file was started, not from this session
+            self._opened_at = os.path.getctime(self.log_file) if self._file_size else time.time()
+        except OSError:
+            self._opened_at = time.time()
+
+    def _flush(self):
+        if self._file and self._unflushed:
+            self._file.flush()
+            self.flushes += 1
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def _close_file(self):
+        if self._file:
+            self._flush()
+            self._file.close()
+            self._file = None
+
+    def _rotate(self):
+        """Move the current file aside under a timestamped name and start a new one"""
+        self._close_file()
+
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        rotated = f"{self.log_file}.{stamp}"
+        suffix = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + '.gz'):
+            rotated = f"{self.log_file}.{stamp}-{suffix}"
+            suffix += 1
+
+        try:
+            os.replace(self.log_file, rotated)
+            self.rotations += 1
+        except OSError as e:
+            log.error("Error rotating session log %s: %s", self.log_file, e)
+            rotated = None
+
+        self._open()
+
+        if rotated and self.compress:
+            thread = threading.Thread(target=self._compress_file, args=(rotated,), daemon=True)
+            self._compress_threads = [t for t in self._compress_threads if t.is_alive()]
+            self._compress_threads.append(thread)
+            thread.start()
+        else:
+            self._prune_backups()
+
+    def _compress_file(self, path):
+        """Gzip a rotated log off the writer thread"""
+        try:
+            with open(path, 'rb') as src, gzip.open(path + '.gz', 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(path)
+        except OSError as e:
+            log.error("Error compressing session log %s: %s", path, e)
+        self._prune_backups()
+
+    def _prune_backups(self):
+        """Delete the oldest rotated files beyond backup_count"""
+        if not self.backup_count:
+            return
+        backups = [path for path in glob.glob(glob.escape(self.log_file) + '.*')
+                   if not (path.endswith('.gz') and os.path.exists(path[:-3]))]
+        backups.sort(key=_mtime)
+        for path in backups[:-self.backup_count]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self, timeout=2.0):
+        """Flush everything queued, close the file and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        if self.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            self.join(timeout)
+        for thread in self._compress_threads:
+            thread.join(timeout)
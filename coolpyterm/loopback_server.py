@@ -0,0 +1,522 @@
+"""
+In-process loopback SSH server
+
+A paramiko ServerInterface that serves a scriptable PTY shell on 127.0.0.1,
+so the full SSHBackend path (connect, auth, send queue, reader thread) can be
+exercised and measured on an offline machine without real devices.
+
+Shell commands understood by the loopback shell:
+
+    echo TEXT               print TEXT
+    flood SIZE              send SIZE bytes (K/M suffixes) as fast as possible
+    trickle SIZE [MS]       send SIZE bytes one line every MS milliseconds
+    size                    print the PTY size the client requested
+    sleep SECONDS           pause before the next prompt
+    disconnect              drop the connection without a clean close
+    exit                    log out
+
+Run a server for manual testing, or measure the SSH path against it:
+
+    python -m coolpyterm.loopback_server --port 2222
+    python -m coolpyterm.loopback_server --measure --flood-size 8M --samples 200
+"""
+import argparse
+import random
+import socket
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import paramiko
+
+from coolpyterm.app_logging import configure as configure_logging, get_logger
+from coolpyterm.latency import summarize
+
+log = get_logger('ssh')
+
+
+FLOOD_END_MARKER = "--FLOOD-END--"
+
+_host_key = None
+_host_key_lock = threading.Lock()
+
+
+def get_host_key():
+    """Host key shared by every loopback server in the process (generated once)"""
+    global _host_key
+    with _host_key_lock:
+        if _host_key is None:
+            _host_key = paramiko.RSAKey.generate(2048)
+        return _host_key
+
+
+def parse_size(text):
+    """Parse 512, 64K or 8M into a byte count"""
+    text = text.strip().upper()
+    multiplier = 1
+    if text.endswith('K'):
+        multiplier, text = 1024, text[:-1]
+    elif text.endswith('M'):
+        multiplier, text = 1024 * 1024, text[:-1]
+    return int(float(text) * multiplier)
+
+
+@dataclass
+class LoopbackBehavior:
+    """Scriptable server behavior shared by all sessions of one server"""
+    username: str = "test"
+    password: str = "test"
+    accept_any_key: bool = True
+    auth_delay: float = 0.0  # seconds before answering an auth attempt
+    banner: str = "CoolPyTerm loopback server\r\n"
+    prompt: str = "loopback# "
+    echo: bool = True
+    echo_delay: float = 0.0  # simulated slow-console echo, seconds
+    flood_line: str = "The quick brown fox jumps over the lazy dog 0123456789 " * 2
+    trickle_delay: float = 0.05
+    disconnect_probability: float = 0.0  # chance of dropping the link after each command
+    disconnect_after: float = 0.0  # drop every session after this many seconds, 0 = never
+    seed: Optional[int] = None
+
+
+class LoopbackServerInterface(paramiko.ServerInterface):
+    """Authentication and channel policy for one loopback connection"""
+
+    def __init__(self, behavior):
+        self.behavior = behavior
+        self.shell_requested = threading.Event()
+        self.pty_size = (80, 24)
+        self.term = None
+
+    def get_allowed_auths(self, username):
+        return "password,publickey" if self.behavior.accept_any_key else "password"
+
+    def check_auth_password(self, username, password):
+        if self.behavior.auth_delay:
+            time.sleep(self.behavior.auth_delay)
+        if username == self.behavior.username and password == self.behavior.password:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def check_auth_publickey(self, username, key):
+        if self.behavior.auth_delay:
+            time.sleep(self.behavior.auth_delay)
+        if self.behavior.accept_any_key and username == self.behavior.username:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        self.term = term
+        self.pty_size = (width, height)
+        return True
+
+    def check_channel_window_change_request(self, channel, width, height, pixelwidth, pixelheight):
+        self.pty_size = (width, height)
+        return True
+
+    def check_channel_shell_request(self, channel):
+        self.shell_requested.set()
+        return True
+
+
+class LoopbackShell:
+    """Line-editing shell session running on one channel"""
+
+    def __init__(self, channel, interface, behavior, rng):
+        self.channel = channel
+        self.interface = interface
+        self.behavior = behavior
+        self.rng = rng
+        self.line = []
+        self.running = True
+
+    def send(self, text):
+        self.channel.sendall(text.encode('utf-8'))
+
+    def run(self):
+        self.send(self.behavior.banner + self.behavior.prompt)
+        while self.running and not self.channel.closed:
+            data = self.channel.recv(4096)
+            if not data:
+                break
+            for char in data.decode('utf-8', errors='replace'):
+                self._handle_char(char)
+                if not self.running:
+                    break
+
+    def _echo(self, text):
+        if not self.behavior.echo:
+            return
+        if self.behavior.echo_delay:
+            time.sleep(self.behavior.echo_delay)
+        self.send(text)
+
+    def _handle_char(self, char):
+        if char in '\r\n':
+            self._echo("\r\n")
+            command = "".join(self.line).strip()
+            self.line = []
+            self._run_command(command)
+            if self.running:
+                self.send(self.behavior.prompt)
+        elif char in '\x7f\b':
+            if self.line:
+                self.line.pop()
+                self._echo("\b \b")
+        elif char == '\x03':
+            self.line = []
+            self.send("^C\r\n" + self.behavior.prompt)
+        elif char >= ' ':
+            self.line.append(char)
+            self._echo(char)
+
+    def _run_command(self, command):
+        if not command:
+            return
+
+        name, _, args = command.partition(" ")
+        handler = getattr(self, f"cmd_{name}", None)
+        try:
+            if handler is None:
+                self.send(f"% Invalid input detected: {name}\r\n")
+            else:
+                handler(args.strip())
+        except (ValueError, IndexError) as e:
+            self.send(f"% {name}: {e}\r\n")
+
+        if self.running and self.rng.random() < self.behavior.disconnect_probability:
+            self.cmd_disconnect("")
+
+    def cmd_echo(self, args):
+        self.send(args + "\r\n")
+
+    def cmd_flood(self, args):
+        remaining = parse_size(args or "1M")
+        line = self.behavior.flood_line + "\r\n"
+        block = (line * max(1, 32768 // len(line))).encode('ascii')
+        while remaining > 0:
+            piece = block[:remaining]
+            self.channel.sendall(piece)
+            remaining -= len(piece)
+        self.send(f"\r\n{FLOOD_END_MARKER}\r\n")
+
+    def cmd_trickle(self, args):
+        parts = args.split()
+        remaining = parse_size(parts[0]) if parts else 1024
+        delay = float(parts[1]) / 1000 if len(parts) > 1 else self.behavior.trickle_delay
+        line = self.behavior.flood_line + "\r\n"
+        while remaining > 0 and not self.channel.closed:
+            piece = line[:remaining]
+            self.send(piece)
+            remaining -= len(piece)
+            time.sleep(delay)
+
+    def cmd_size(self, args):
+        cols, rows = self.interface.pty_size
+        self.send(f"{cols}x{rows}\r\n")
+
+    def cmd_sleep(self, args):
+        time.sleep(float(args or 1))
+
+    def cmd_disconnect(self, args):
+        # Abrupt: close the transport without an exit status or EOF
+        self.running = False
+        self.channel.get_transport().close()
+
+    def cmd_exit(self, args):
+        self.send("logout\r\n")
+        self.running = False
+        self.channel.send_exit_status(0)
+        self.channel.close()
+
+    cmd_quit = cmd_exit
+
+    def cmd_help(self, args):
+        commands = sorted(name[4:] for name in dir(self) if name.startswith("cmd_"))
+        self.send("Commands: " + " ".join(commands) + "\r\n")
+
+
+class LoopbackSSHServer:
+    """
+    Threaded SSH server bound to localhost
+
+    Usable as a context manager; port 0 picks a free port.
+    """
+
+    def __init__(self, behavior=None, host="127.0.0.1", port=0):
+        self.behavior = behavior or LoopbackBehavior()
+        self.host = host
+        self.requested_port = port
+        self.port = None
+        self._socket = None
+        self._thread = None
+        self._running = False
+        self._transports = []
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.behavior.seed)
+        self.connections = 0
+
+    def start(self):
+        """Bind, listen and start accepting connections"""
+        get_host_key()
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, self.requested_port))
+        self._socket.listen(16)
+        self._socket.settimeout(0.2)
+        self.port = self._socket.getsockname()[1]
+
+        self._running = True
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True, name="loopback-ssh")
+        self._thread.start()
+        log.info("Loopback SSH server listening on %s:%s", self.host, self.port)
+        return self
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                client, _ = self._socket.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.connections += 1
+            threading.Thread(target=self._serve_connection, args=(client,), daemon=True,
+                             name=f"loopback-session-{self.connections}").start()
+
+    def _serve_connection(self, client):
+        client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        transport = paramiko.Transport(client)
+        transport.add_server_key(get_host_key())
+        with self._lock:
+            self._transports.append(transport)
+
+        interface = LoopbackServerInterface(self.behavior)
+        try:
+            transport.start_server(server=interface)
+            channel = transport.accept(20)
+            if channel is None or not interface.shell_requested.wait(10):
+                return
+
+            if self.behavior.disconnect_after:
+                timer = threading.Timer(self.behavior.disconnect_after, transport.close)
+                timer.daemon = True
+                timer.start()
+
+            with self._lock:
+                rng = random.Random(self._rng.random())
+            LoopbackShell(channel, interface, self.behavior, rng).run()
+        except (paramiko.SSHException, EOFError, OSError) as e:
+            if self._running:
+                log.info("Loopback session ended: %s", e)
+        finally:
+            transport.close()
+            with self._lock:
+                if transport in self._transports:
+                    self._transports.remove(transport)
+
+    def stop(self):
+        """Stop accepting and drop every open session"""
+        self._running = False
+        if self._socket:
+            self._socket.close()
+        with self._lock:
+            transports = list(self._transports)
+        for transport in transports:
+            transport.close()
+        if self._thread:
+            self._thread.join(2)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+# --- SSH path measurements ---------------------------------------------------
+
+class _SessionStub:
+    """Minimal stand-in for the terminal widget the reader thread reports to"""
+
+    def __init__(self, log_file):
+        self.log_filename = log_file
+        self.initial_buffer = ""
+        self.session_recorder = None
+        self._is_closing = False
+
+
+class _OutputCollector:
+    """Accumulates backend output and lets the caller wait for a substring"""
+
+    def __init__(self, backend):
+        self.text = ""
+        self.received = 0
+        backend.send_output.connect(self._on_output)
+
+    def _on_output(self, data):
+        self.text = (self.text + data)[-8192:]
+        self.received += len(data)
+
+    def wait_for(self, needle, timeout=10.0):
+        from PyQt6.QtCore import QCoreApplication, QEventLoop
+
+        deadline = time.monotonic() + timeout
+        while needle not in self.text:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Timed out waiting for {needle!r}")
+            QCoreApplication.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents,
+                                           int(min(remaining, 0.05) * 1000))
+        return True
+
+    def clear(self):
+        self.text = ""
+
+
+def _open_backend(server, log_file):
+    from coolpyterm.ssh_backend import SSHBackend
+
+    return SSHBackend(
+        host=server.host,
+        port=server.port,
+        username=server.behavior.username,
+        password=server.behavior.password,
+        parent_widget=_SessionStub(log_file),
+    )
+
+
+def measure_ssh_path(server, connects=5, samples=100, flood_size="4M"):
+    """Measure connect latency, keystroke echo latency and bulk throughput through SSHBackend"""
+    import os
+    import tempfile
+    from PyQt6.QtCore import QCoreApplication
+    from coolpyterm.benchmark import quiet_output
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    log_file = os.path.join(tempfile.mkdtemp(prefix="coolpyterm-loopback-"), "session.log")
+    prompt = server.behavior.prompt
+    results = {}
+
+    with quiet_output():
+        # Connect: SSHBackend construction (TCP, KEX, auth, shell) and first prompt
+        connect_times, prompt_times = [], []
+        for _ in range(connects):
+            start = time.perf_counter()
+            backend = _open_backend(server, log_file)
+            connect_times.append(time.perf_counter() - start)
+            output = _OutputCollector(backend)
+            output.wait_for(prompt)
+            prompt_times.append(time.perf_counter() - start)
+            backend.close()
+        results['connect'] = summarize(connect_times)
+        results['first_prompt'] = summarize(prompt_times)
+
+        backend = _open_backend(server, log_file)
+        output = _OutputCollector(backend)
+        output.wait_for(prompt)
+        # The backend sends a newline shortly after connecting; let its prompt arrive first
+        output.clear()
+        output.wait_for(prompt)
+
+        # Keystroke echo: one character out, wait for it to come back
+        echo_times = []
+        for i in range(samples):
+            char = chr(ord('a') + i % 26)
+            output.clear()
+            start = time.perf_counter()
+            backend.write_data(char)
+            output.wait_for(char)
+            echo_times.append(time.perf_counter() - start)
+            backend.write_data("\x7f")
+            output.wait_for("\b \b")
+        results['echo'] = summarize(echo_times)
+
+        # Bulk: time a flood from command to end marker
+        size = parse_size(flood_size)
+        output.clear()
+        received_before = output.received
+        start = time.perf_counter()
+        backend.write_data(f"flood {flood_size}\r")
+        output.wait_for(FLOOD_END_MARKER, timeout=max(30.0, size / (64 * 1024)))
+        elapsed = time.perf_counter() - start
+        received = output.received - received_before
+        results['bulk'] = {
+            'bytes': received,
+            'seconds': round(elapsed, 4),
+            'bytes_per_s': round(received / elapsed, 1),
+        }
+
+        backend.close()
+
+    return results
+
+
+def print_measurements(results):
+    for name in ('connect', 'first_prompt', 'echo'):
+        s = results[name]
+        print(f"{name:<13} n={s['count']:<5} p50 {s['p50_ms']:8.2f} ms  p95 {s['p95_ms']:8.2f} ms  "
+              f"p99 {s['p99_ms']:8.2f} ms  max {s['max_ms']:8.2f} ms")
+    bulk = results['bulk']
+    print(f"{'bulk':<13} {bulk['bytes'] / (1024 * 1024):.1f} MiB in {bulk['seconds']:.2f}s = "
+          f"{bulk['bytes_per_s'] / (1024 * 1024):.2f} MiB/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CoolPyTerm loopback SSH server")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=2222)
+    parser.add_argument('--username', default="test")
+    parser.add_argument('--password', default="test")
+    parser.add_argument('--auth-delay', type=float, default=0.0, help="Seconds to delay each auth reply")
+    parser.add_argument('--echo-delay', type=float, default=0.0, help="Seconds to delay each echoed key")
+    parser.add_argument('--disconnect-probability', type=float, default=0.0,
+                        help="Chance of dropping the link after each command")
+    parser.add_argument('--disconnect-after', type=float, default=0.0,
+                        help="Drop every session after this many seconds")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--measure', action='store_true',
+                        help="Measure connect, echo and bulk throughput through SSHBackend, then exit")
+    parser.add_argument('--connects', type=int, default=5)
+    parser.add_argument('--samples', type=int, default=100)
+    parser.add_argument('--flood-size', default="4M")
+    parser.add_argument('--log', metavar='SPEC', help="Diagnostic log levels, e.g. 'info' or 'warning,ssh=debug'")
+    args = parser.parse_args(argv)
+    configure_logging(args.log)
+
+    behavior = LoopbackBehavior(
+        username=args.username,
+        password=args.password,
+        auth_delay=args.auth_delay,
+        echo_delay=args.echo_delay,
+        disconnect_probability=args.disconnect_probability,
+        disconnect_after=args.disconnect_after,
+        seed=args.seed,
+    )
+
+    if args.measure:
+        with LoopbackSSHServer(behavior, args.host, 0) as server:
+            print_measurements(measure_ssh_path(server, args.connects, args.samples, args.flood_size))
+        return 0
+
+    server = LoopbackSSHServer(behavior, args.host, args.port).start()
+    print(f"Connect with user '{args.username}' password '{args.password}'; Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+"""
+Per-session memory accounting and leak detection
+
+terminal_memory_report() breaks down what one terminal holds:
+
+    grid         OpenGL widget cell grid (a dict per cell)
+    screen       the screen as of the last applied frame (the GUI's copy)
+    history      the parser's own history, estimated from its line count
+    shared       shared-memory screen segment, reserved size (process parsing mode)
+    scrollback   the terminal's own scrollback_buffer
+    text_image   CPU-side QImage the grid is rasterized into
+    texture      VRAM estimate for the uploaded text texture (RGB8)
+    pending_io   bytes queued to the backend plus session log records waiting
+
+Sizes are estimates: a few lines or cells are deep-sized and the result is
+scaled up, so a report stays cheap on a full scrollback.
+
+MemoryTracker wraps tracemalloc snapshots so two points in time can be
+diffed by allocation site, and leak_check() opens and closes sessions against
+the loopback SSH server and fails if terminals, widgets, backends, threads or
+traced memory are left behind:
+
+    python -m coolpyterm.memory_stats --leak-check --sessions 20
+"""
+import argparse
+import gc
+import sys
+import threading
+import time
+import tracemalloc
+
+from coolpyterm.app_logging import configure as configure_logging, get_logger
+from coolpyterm.perf_hud import estimate_lines_size
+
+log = get_logger('perf')
+
+# Allocation sites that are tracemalloc's own bookkeeping, not the app's
+_IGNORED_FILES = (tracemalloc.__file__, '<frozen importlib._bootstrap>',
+                  '<frozen importlib._bootstrap_external>', '<unknown>')
+
+
+def format_bytes(size):
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def estimate_grid_size(grid, samples=8):
+    """Approximate memory of the widget's row lists of cell dicts"""
+    rows = len(grid)
+    if not rows:
+        return 0
+    step = max(1, rows // samples)
+    sampled = 0
+    total = 0
+    for index in range(0, rows, step):
+        row = grid[index]
+        size = sys.getsizeof(row)
+        for cell in row:
+            size += sys.getsizeof(cell)
+        total += size
+        sampled += 1
+    # Cell values (chars, color tuples, bools) are mostly shared and not counted
+    return total * rows // sampled
+
+
+def terminal_memory_report(terminal):
+    """Estimated bytes per component for one TerminalWithHardwareGrid"""
+    report = {}
+
+    widget = terminal.grid_widget
+    report['grid'] = estimate_grid_size(widget.grid) if widget is not None else 0
+
+    # The parser's screen belongs to its thread or process: measure the
+    # frame copy instead, and size its history at the same bytes per line
+    rows = list(terminal.frame_rows.values())
+    report['screen'] = estimate_lines_size(rows)
+    report['history'] = report['screen'] * terminal.history_lines // len(rows) if rows else 0
+    report['shared'] = getattr(terminal.parser, 'shared_bytes', 0)
+    report['scrollback'] = estimate_lines_size(terminal.scrollback_buffer)
+
+    image = widget.text_image if widget is not None else None
+    if image is not None and not image.isNull():
+        report['text_image'] = image.sizeInBytes()
+        # Uploaded as RGB8; a driver may pad rows, so this is a floor
+        report['texture'] = image.width() * image.height() * 3 if widget.text_texture is not None else 0
+    else:
+        report['text_image'] = report['texture'] = 0
+
+    pending = 0
+    backend = terminal.ssh_backend
+    if backend is not None and getattr(backend, 'send_queue', None) is not None:
+        pending += backend.send_queue.bytes_pending
+    logger = terminal.session_logger
+    if logger is not None:
+        # Queued records are reader-sized chunks; count them at a typical 4 KiB
+        pending += logger.queue_depth * 4096
+    report['pending_io'] = pending
+
+    report['total'] = sum(report.values())
+    return report
+
+
+def format_report(report, title=None):
+    lines = [title] if title else []
+    for name, size in report.items():
+        lines.append(f"{name:<11} {format_bytes(size):>10}")
+    return lines
+
+
+def python_threads():
+    """Running Python threads, not counting the placeholders made for QThreads"""
+    return sum(1 for thread in threading.enumerate() if not isinstance(thread, threading._DummyThread))
+
+
+def live_instances(*classes):
+    """Count live objects of each class in a single pass over the GC heap"""
+    counts = dict.fromkeys(classes, 0)
+    for obj in gc.get_objects():
+        for cls in classes:
+            if isinstance(obj, cls):
+                counts[cls] += 1
+    return counts
+
+
+class MemoryTracker:
+    """tracemalloc snapshots diffed by allocation site"""
+
+    def __init__(self, frames=1):
+        self.frames = frames
+        self.baseline = None
+        self._started_tracing = False
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self.baseline = self.snapshot()
+        return self.baseline
+
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self.baseline = None
+
+    def snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, name) for name in _IGNORED_FILES])
+
+    def diff(self, before=None, after=None, limit=15):
+        """Top allocation-site changes between two snapshots (default: baseline to now)"""
+        before = before or self.baseline
+        after = after or self.snapshot()
+        stats = after.compare_to(before, 'lineno')
+        growth = sum(stat.size_diff for stat in stats)
+        return growth, stats[:limit]
+
+    def diff_lines(self, limit=15):
+        """Diff against the baseline as text, then move the baseline to now"""
+        after = self.snapshot()
+        growth, stats = self.diff(after=after, limit=limit)
+        self.baseline = after
+        lines = [f"Traced memory change: {format_bytes(growth)}"]
+        for stat in stats:
+            frame = stat.traceback[0]
+            lines.append(f"{format_bytes(stat.size_diff):>10} {stat.count_diff:+6d}  "
+                         f"{frame.filename}:{frame.lineno}")
+        return lines
+
+
+# --- Leak check ---------------------------------------------------------------
+
+def _drain_events(app, seconds=0.0):
+    from PyQt6.QtCore import QCoreApplication, QEvent
+
+    deadline = time.monotonic() + seconds
+    while True:
+        app.processEvents()
+        QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+        if time.monotonic() >= deadline:
+            break
+        time.sleep(0.01)
+
+
+def _open_close_session(app, server, theme_manager, log_file):
+    from coolpyterm.cpt import TerminalWithHardwareGrid
+
+    terminal = TerminalWithHardwareGrid(log_file=log_file, theme_manager=theme_manager)
+    connected = terminal.connect_to_ssh({
+        'hostname': server.host,
+        'port': server.port,
+        'username': server.behavior.username,
+        'password': server.behavior.password,
+    })
+    if not connected:
+        raise RuntimeError("Could not connect to the loopback server")
+
+    # Wait for the prompt, then run one command so the parser and grid have content
+    prompt = server.behavior.prompt
+    deadline = time.monotonic() + 10.0
+    while prompt not in terminal.row_text(terminal.frame_cursor[0]):
+        if time.monotonic() > deadline:
+            raise TimeoutError("Timed out waiting for the loopback prompt")
+        _drain_events(app, 0.01)
+    terminal.ssh_backend.write_data("flood 16K\r")
+    _drain_events(app, 0.2)
+
+    terminal.close()
+    terminal.deleteLater()
+    del terminal
+    _drain_events(app)
+
+
+def leak_check(sessions=20, warmup=2, tolerance=32 * 1024):
+    """
+    Open and close `sessions` terminals against a loopback SSH server
+
+    Returns (passed, lines). Fails when any tracked object or thread count
+    ends above its baseline, or traced memory grows by more than `tolerance`
+    bytes per session.
+    """
+    import os
+    import tempfile
+    from PyQt6.QtCore import QThread
+    from PyQt6.QtWidgets import QApplication
+    from coolpyterm.benchmark import quiet_output
+    from coolpyterm.cpt import TerminalWithHardwareGrid
+    from coolpyterm.loopback_server import LoopbackSSHServer
+    from coolpyterm.opengl_grid_widget import OpenGLRetroGridWidget
+    from coolpyterm.retro_theme_manager import RetroThemeManager
+    from coolpyterm.ssh_backend import SSHBackend
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    tracked = (TerminalWithHardwareGrid, OpenGLRetroGridWidget, SSHBackend, QThread)
+    tracker = MemoryTracker()
+    log_file = os.path.join(tempfile.mkdtemp(prefix="coolpyterm-leak-check-"), "session.log")
+    lines = []
+
+    with quiet_output(), LoopbackSSHServer() as server:
+        theme_manager = RetroThemeManager()
+        # Warm-up sessions fill one-off caches (imports, host keys, glyphs)
+        for _ in range(warmup):
+            _open_close_session(app, server, theme_manager, log_file)
+
+        # Server-side handler threads wind down asynchronously after each close
+        _drain_events(app, 0.3)
+        gc.collect()
+        before_counts = live_instances(*tracked)
+        before_threads = python_threads()
+        tracker.start()
+
+        for _ in range(sessions):
+            _open_close_session(app, server, theme_manager, log_file)
+
+        _drain_events(app, 0.3)
+        gc.collect()
+        after_counts = live_instances(*tracked)
+        after_threads = python_threads()
+        growth, stats = tracker.diff(limit=10)
+        tracker.stop()
+
+    passed = True
+    for cls in tracked:
+        leaked = after_counts[cls] - before_counts[cls]
+        status = "ok" if leaked <= 0 else "LEAK"
+        passed &= leaked <= 0
+        lines.append(f"{cls.__name__:<26} {before_counts[cls]:4d} -> {after_counts[cls]:4d}  {status}")
+
+    leaked_threads = after_threads - before_threads
+    passed &= leaked_threads <= 0
+    lines.append(f"{'Python threads':<26} {before_threads:4d} -> {after_threads:4d}  "
+                 f"{'ok' if leaked_threads <= 0 else 'LEAK'}")
+
+    per_session = growth / sessions if sessions else 0
+    memory_ok = per_session <= tolerance
+    passed &= memory_ok
+    lines.append(f"Traced memory {format_bytes(growth)} over {sessions} sessions "
+                 f"({format_bytes(per_session)}/session, limit {format_bytes(tolerance)})  "
+                 f"{'ok' if memory_ok else 'LEAK'}")
+    if not memory_ok:
+        for stat in stats:
+            frame = stat.traceback[0]
+            lines.append(f"  {format_bytes(stat.size_diff):>10} {stat.count_diff:+6d}  {frame.filename}:{frame.lineno}")
+
+    return passed, lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CoolPyTerm memory diagnostics")
+    parser.add_argument('--leak-check', action='store_true',
+                        help="open and close sessions against a loopback SSH server and check for growth")
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--tolerance', type=int, default=32 * 1024,
+                        help="allowed traced memory growth per session in bytes (default: %(default)s)")
+    parser.add_argument('--log', metavar='SPEC', default='warning',
+                        help="Diagnostic log levels (default: %(default)s)")
+    args = parser.parse_args(argv)
+    configure_logging(args.log)
+
+    if not args.leak_check:
+        parser.print_help()
+        return 0
+
+    start = time.perf_counter()
+    passed, lines = leak_check(args.sessions, args.warmup, args.tolerance)
+    for line in lines:
+        print(line)
+    print(f"{'PASS' if passed else 'FAIL'} in {time.perf_counter() - start:.1f}s")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
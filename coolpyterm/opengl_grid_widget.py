@@ -14,13 +14,270 @@ from PyQt6.QtOpenGLWidgets import QOpenGLWidget
 from PyQt6.QtOpenGL import (QOpenGLShader, QOpenGLShaderProgram, QOpenGLTexture,
                            QOpenGLVertexArrayObject, QOpenGLBuffer)
 
+from coolpyterm import tracing
+from coolpyterm.app_logging import get_logger
+
+log = get_logger('render')
+
 try:
     from OpenGL.GL import *
     OPENGL_AVAILABLE = True
 except ImportError:
-    print("PyOpenGL not available. Install with: pip install PyOpenGL PyOpenGL_accelerate")
+    log.warning("PyOpenGL not available. Install with: pip install PyOpenGL PyOpenGL_accelerate")
     OPENGL_AVAILABLE = False
 
+# Text textures are allocated in whole chunks of cells and reused while the
+# grid still fits, so dragging a window edge does not reallocate per pixel
+TEXTURE_CHUNK_COLUMNS = 32
+TEXTURE_CHUNK_ROWS = 16
+
+
+# CRT shader shared by the single-terminal widget and the split-pane surface.
+# Everything is computed in quad-relative coordinates, so it works unchanged
+# when a pane is drawn into a viewport of a larger surface.
+VERTEX_SHADER_SOURCE = """
+        #version 330 core
+        layout (location = 0) in vec3 aPos;
+        layout (location = 1) in vec2 aTexCoord;
+        
+        out vec2 TexCoord;
+        out vec2 screenPos;
+        
+        void main()
+        {
+            gl_Position = vec4(aPos, 1.0);
+            TexCoord = aTexCoord;
+            screenPos = aPos.xy;
+        }
+"""
+
+# Fragment shader with ambient glow
+FRAGMENT_SHADER_SOURCE = """
+        #version 330 core
+        out vec4 FragColor;
+        
+        in vec2 TexCoord;
+        in vec2 screenPos;
+        
+        uniform sampler2D textTexture;
+        uniform float time;
+        uniform float glowIntensity;
+        uniform float scanlineIntensity;
+        uniform float flickerIntensity;
+        uniform float ambientGlow;
+        uniform float curvature;
+        uniform float brightness;
+        uniform float contrast;
+        uniform vec3 bgColor;
+        uniform vec3 fgColor;
+        uniform vec3 glowColor;
+        uniform vec2 screenSize;
+        uniform float textRows;      // grid rows; the ring has at least one more (the overscan row)
+        uniform float scrollOffset;  // rows the text is moved up, for sub-line scrolling
+        uniform float baseRow;       // texture row holding grid row 0; rows wrap around
+        uniform float ringRows;      // texture rows in the ring, spare capacity included
+        uniform float textWidth;     // fraction of the texture width the grid's columns use
+        
+        void main()
+        {
+            // Apply barrel distortion for CRT curvature
+            vec2 cc = TexCoord - 0.5;
+            float dist = dot(cc, cc);
+            vec2 distortedCoord = TexCoord + cc * (dist * curvature);
+            
+            // Check if we're outside the curved screen area
+            if (distortedCoord.x < 0.0 || distortedCoord.x > 1.0 || 
+                distortedCoord.y < 0.0 || distortedCoord.y > 1.0) {
+                FragColor = vec4(bgColor, 1.0);
+                return;
+            }
+            
+            // Sample the text texture: a ring of rows starting at baseRow, shifted
+            // into the overscan row while scrolling
+            float textRow = distortedCoord.y * textRows + scrollOffset + baseRow;
+            vec2 textCoord = vec2(distortedCoord.x * textWidth, fract(textRow / ringRows));
+            vec4 textColor = texture(textTexture, textCoord);
+            
+            // Convert to grayscale intensity
+            float intensity = dot(textColor.rgb, vec3(0.299, 0.587, 0.114));
+            
+            // Apply theme colors with AMBIENT GLOW added to background
+            vec3 ambientColor = bgColor + (fgColor * ambientGlow);
+            vec3 color = mix(ambientColor, fgColor, intensity);
+            
+            // Apply phosphor glow - inline calculation
+            if (intensity > 0.1 && glowIntensity > 0.0) {
+                float glowAmount = glowIntensity * 0.3;
+                vec3 glow = color * glowAmount;
+                float bloom = smoothstep(0.0, 1.0, intensity) * 0.2;
+                glow += vec3(bloom) * color;
+                color = color + glow;
+            }
+            
+            // Apply scanlines - inline calculation, guaranteed to work
+            if (scanlineIntensity > 0.0) {
+                float pixelY = distortedCoord.y * screenSize.y;
+                float scanlinePattern = mod(pixelY, 2.0);
+                if (scanlinePattern >= 1.0) {
+                    color *= (1.0 - scanlineIntensity);
+                }
+            }
+            
+            // Apply screen flicker - inline calculation
+            if (flickerIntensity > 0.0) {
+                float slowFlicker = sin(time * 1.5) * 0.4;
+                float mediumFlicker = sin(time * 3.7) * 0.3;
+                float fastFlicker = sin(time * 12.1) * 0.3;
+                float combined = (slowFlicker + mediumFlicker + fastFlicker) / 3.0;
+                float flickerAmount = flickerIntensity * combined * 0.1;
+                float flickerFactor = 1.0 + flickerAmount;
+                color *= flickerFactor;
+            }
+            
+            // Apply brightness and contrast
+            color = ((color - 0.5) * contrast + 0.5) * brightness;
+            
+            // Vignette effect
+            vec2 vignetteCoord = screenPos;
+            float vignette = 1.0 - dot(vignetteCoord, vignetteCoord) * 0.2;
+            color *= vignette;
+            
+            FragColor = vec4(color, 1.0);
+        }
+"""
+
+
+def build_crt_program():
+    """Compile and link the CRT shader in the current context; None on failure"""
+    program = QOpenGLShaderProgram()
+
+    if not program.addShaderFromSourceCode(QOpenGLShader.ShaderTypeBit.Vertex, VERTEX_SHADER_SOURCE):
+        log.error("Vertex shader compilation failed: %s", program.log())
+        return None
+
+    if not program.addShaderFromSourceCode(QOpenGLShader.ShaderTypeBit.Fragment, FRAGMENT_SHADER_SOURCE):
+        log.error("Fragment shader compilation failed: %s", program.log())
+        return None
+
+    if not program.link():
+        log.error("Shader program linking failed: %s", program.log())
+        return None
+
+    log.debug("Shaders compiled successfully")
+    return program
+
+
+def create_quad_geometry():
+    """Fullscreen quad VAO with its vertex and index buffers, in the current context"""
+    vertices = np.array([
+        # positions     # texture coords
+        -1.0, -1.0, 0.0,  0.0, 1.0,  # Bottom-left
+         1.0, -1.0, 0.0,  1.0, 1.0,  # Bottom-right
+         1.0,  1.0, 0.0,  1.0, 0.0,  # Top-right
+        -1.0,  1.0, 0.0,  0.0, 0.0   # Top-left
+    ], dtype=np.float32)
+
+    indices = np.array([
+        0, 1, 2,
+        2, 3, 0
+    ], dtype=np.uint32)
+
+    # Create VAO
+    vao = QOpenGLVertexArrayObject()
+    if not vao.create():
+        log.error("Failed to create VAO")
+        return None, None, None
+    vao.bind()
+
+    # Create vertex buffer
+    vertex_buffer = QOpenGLBuffer(QOpenGLBuffer.Type.VertexBuffer)
+    if not vertex_buffer.create():
+        log.error("Failed to create vertex buffer")
+        return None, None, None
+    vertex_buffer.bind()
+    vertex_buffer.allocate(vertices.tobytes(), vertices.nbytes)
+
+    # Create index buffer
+    index_buffer = QOpenGLBuffer(QOpenGLBuffer.Type.IndexBuffer)
+    if not index_buffer.create():
+        log.error("Failed to create index buffer")
+        return None, None, None
+    index_buffer.bind()
+    index_buffer.allocate(indices.tobytes(), indices.nbytes)
+
+    # Set vertex attributes
+    glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 5 * 4, None)
+    glEnableVertexAttribArray(0)
+
+    glVertexAttribPointer(1, 2, GL_FLOAT, GL_FALSE, 5 * 4, ctypes.c_void_p(3 * 4))
+    glEnableVertexAttribArray(1)
+
+    vao.release()
+    return vao, vertex_buffer, index_buffer
+
+
+def upload_texture_rows(texture, image, row_height, slots):
+    """Upload the given row slots of image into texture, one glTexSubImage2D per contiguous run
+
+    Returns the bytes uploaded.
+    """
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    data = memoryview(bits)
+    stride = image.bytesPerLine()
+    width = image.width()
+    uploaded = 0
+    texture.bind()
+    for start, count in _runs(slots):
+        top = start * row_height
+        height = count * row_height
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, top, width, height, GL_RGB, GL_UNSIGNED_BYTE,
+                        data[top * stride:(top + height) * stride].tobytes())
+        uploaded += height * stride
+    return uploaded
+
+
+def _runs(slots):
+    """Sorted slot numbers as (start, count) runs of consecutive slots"""
+    runs = []
+    for slot in slots:
+        if runs and runs[-1][0] + runs[-1][1] == slot:
+            runs[-1][1] += 1
+        else:
+            runs.append([slot, 1])
+    return runs
+
+
+def texture_capacity(needed, allocated, chunk):
+    """Cells to allocate for `needed`: `allocated` while it fits without a spare
+    chunk too many, else `needed` rounded up to whole chunks"""
+    rounded = -(-needed // chunk) * chunk
+    if needed <= allocated <= rounded + chunk:
+        return allocated
+    return rounded
+
+
+def create_grid_texture(width, height):
+    """RGB8 texture the rasterized grid is uploaded into, in the current context"""
+    texture = QOpenGLTexture(QOpenGLTexture.Target.Target2D)
+    if not texture.create():
+        log.error("Failed to create texture")
+        return None
+
+    texture.setSize(width, height)
+    texture.setFormat(QOpenGLTexture.TextureFormat.RGB8_UNorm)
+    texture.allocateStorage()
+
+    # Set texture parameters
+    texture.setWrapMode(QOpenGLTexture.CoordinateDirection.DirectionS,
+                        QOpenGLTexture.WrapMode.ClampToEdge)
+    # Rows are a ring (see baseRow): filtering across the seam has to wrap too
+    texture.setWrapMode(QOpenGLTexture.CoordinateDirection.DirectionT,
+                        QOpenGLTexture.WrapMode.Repeat)
+    texture.setMinMagFilters(QOpenGLTexture.Filter.Linear,
+                             QOpenGLTexture.Filter.Linear)
+    return texture
+
 
 class OpenGLRetroGridWidget(QOpenGLWidget):
     """
@@ -58,6 +315,15 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
         self.cols = 80
         self.rows = 24
 
+        # The text texture is a ring of ring_rows row slots (at least rows + 1;
+        # see texture_capacity): grid row y lives in slot (ring_base + y) %
+        # ring_rows, the overscan row in the slot after the last row.
+        # Scrolling moves ring_base; only dirty_rows (grid row numbers, rows =
+        # the overscan row) are rasterized and uploaded.
+        self.ring_base = 0
+        self.ring_rows = self.rows + 1
+        self.dirty_rows = set()
+
         # Character grid - EXACTLY like your original
         self.grid = []
         self.init_grid()
@@ -66,6 +332,14 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
         self.cursor_row = 0
         self.cursor_col = 0
         self.cursor_visible = True
+        # False while the terminal shows scrollback the cursor is not in
+        self.cursor_shown = True
+
+        # Sub-line scrolling: the texture holds one row more than the grid
+        # (the overscan row, blank unless scrolling) and is drawn moved up
+        # by scroll_fraction rows
+        self.overscan_row = None
+        self.scroll_fraction = 0.0
 
         # Effect settings - make scanlines and flicker more visible
         self.glow_enabled = True
@@ -93,6 +367,22 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
         self.index_buffer = None
         self.text_image = None
 
+        # Background tabs: no timers, texture work or paint while suspended;
+        # GL objects may be released and are rebuilt on the next paintGL
+        self.render_suspended = False
+        self.gl_released = False
+        self.texture_size_stale = False
+        # Set while a SplitTerminalView draws this grid as one of its panes;
+        # the widget itself is then hidden and only holds the grid
+        self.surface = None
+
+        # Diagnostic overlay sections drawn over the CRT output, name -> list of lines
+        self.overlay_sections = {}
+        self.overlay_font = QFont("Consolas", 9)
+        self.overlay_font.setStyleHint(QFont.StyleHint.Monospace)
+        # Performance HUD counters, only while the HUD is shown
+        self.perf_hud = None
+
         # Enable focus and key events - EXACTLY like your original
         self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
         self.setMinimumSize(self.char_width * 80, self.char_height * 24)
@@ -109,8 +399,18 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
         """Toggle cursor visibility for blinking effect"""
         if self.cursor_blink_enabled:
             self.cursor_visible = not self.cursor_visible
+            self.dirty_rows.add(self.cursor_row)
             self.update()
 
+    def set_cursor_visible(self, visible):
+        if visible != self.cursor_visible:
+            self.cursor_visible = visible
+            self.dirty_rows.add(self.cursor_row)
+
+    def mark_all_dirty(self):
+        """Rasterize every row, the overscan row included, on the next texture update"""
+        self.dirty_rows = set(range(self.rows + 1))
+
     def init_grid(self):
         """Initialize the character grid - EXACTLY like your original"""
         self.grid = []
@@ -126,6 +426,7 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
                 }
                 grid_row.append(cell)
             self.grid.append(grid_row)
+        self.mark_all_dirty()
 
     def set_theme(self, theme_name):
         """Change the current theme - EXACTLY like your original"""
@@ -136,29 +437,24 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
             self.update()
 
     def resize_grid(self, new_cols, new_rows):
-        """Resize the grid - EXACTLY like your original"""
+        """Resize the grid, keeping the top-left of its content"""
         old_grid = self.grid
-        old_rows = len(old_grid)
-        old_cols = len(old_grid[0]) if old_rows > 0 else 0
-
-        # Create new grid
         self.cols = new_cols
         self.rows = new_rows
-        self.init_grid()
-
-        # Copy old content to new grid
-        copy_rows = min(old_rows, new_rows)
-        copy_cols = min(old_cols, new_cols)
+        self.ring_base = 0
 
-        for row in range(copy_rows):
-            for col in range(copy_cols):
-                self.grid[row][col] = old_grid[row][col]
+        # Cells are never modified in place, so kept rows share them
+        blank = self._make_row(())
+        self.grid = [row[:new_cols] + blank[len(row):] for row in old_grid[:new_rows]]
+        self.grid.extend(blank[:] for _ in range(len(self.grid), new_rows))
+        self.mark_all_dirty()
 
-        # Recreate OpenGL texture with new size
-        if self.text_texture:
-            self.create_text_texture()
+        # Keep the texture while the grid fits its capacity; otherwise it is
+        # reallocated on the next update_text_texture, with the context current
+        if self.text_texture and not self._text_image_fits():
+            self.texture_size_stale = True
 
-        print(f"Grid resized to: {self.cols}x{self.rows}")
+        log.debug("Grid resized to: %sx%s", self.cols, self.rows)
 
     def set_char(self, row, col, char, fg_color=None, bg_color=None, bold=False, underline=False):
         """Set a character - EXACTLY like your original"""
@@ -170,8 +466,35 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
                 'bold': bold,
                 'underline': underline
             }
+            self.dirty_rows.add(row)
             self.update()
 
+    def set_row(self, row, cells):
+        """Replace a whole row from (char, fg_color, bg_color, bold, underline) tuples, blanking the rest"""
+        if not 0 <= row < self.rows:
+            return
+        self.grid[row] = self._make_row(cells)
+        self.dirty_rows.add(row)
+        self.update()
+
+    def set_view_offset(self, fraction, overscan_cells=None):
+        """Draw the text moved up by fraction of a row, with overscan_cells showing below the grid"""
+        self.scroll_fraction = fraction
+        if overscan_cells or self.overscan_row is not None:
+            self.overscan_row = self._make_row(overscan_cells) if overscan_cells else None
+            self.dirty_rows.add(self.rows)
+        self.update()
+
+    def _make_row(self, cells):
+        fg = self.current_theme.foreground
+        bg = self.current_theme.background
+        new_row = [{'char': char, 'fg_color': fg_color or fg, 'bg_color': bg_color or bg,
+                    'bold': bold, 'underline': underline}
+                   for char, fg_color, bg_color, bold, underline in cells[:self.cols]]
+        for _ in range(len(new_row), self.cols):
+            new_row.append({'char': ' ', 'fg_color': fg, 'bg_color': bg, 'bold': False, 'underline': False})
+        return new_row
+
     def get_char(self, row, col):
         """Get the character data - EXACTLY like your original"""
         if 0 <= row < self.rows and 0 <= col < self.cols:
@@ -180,13 +503,20 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
 
     def set_cursor_position(self, row, col):
         """Set the cursor position - EXACTLY like your original"""
-        self.cursor_row = max(0, min(row, self.rows - 1))
-        self.cursor_col = max(0, min(col, self.cols - 1))
+        row = max(0, min(row, self.rows - 1))
+        col = max(0, min(col, self.cols - 1))
+        if (row, col) == (self.cursor_row, self.cursor_col):
+            return
+        self.dirty_rows.add(self.cursor_row)
+        self.dirty_rows.add(row)
+        self.cursor_row = row
+        self.cursor_col = col
         self.update()
 
     def toggle_cursor(self):
         """Toggle cursor visibility - EXACTLY like your original"""
         self.cursor_visible = not self.cursor_visible
+        self.dirty_rows.add(self.cursor_row)
         cursor_rect = QRect(
             self.cursor_col * self.char_width,
             self.cursor_row * self.char_height,
@@ -203,20 +533,24 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
         self.update()
 
     def scroll_up(self, lines=1):
-        """Scroll the content up - EXACTLY like your original"""
+        """Scroll the content up by rotating the texture ring; only the rows brought in get redrawn"""
+        lines = min(lines, self.rows)
+        if lines <= 0:
+            return
         for _ in range(lines):
             self.grid.pop(0)
-            new_row = []
-            for col in range(self.cols):
-                cell = {
-                    'char': ' ',
-                    'fg_color': self.current_theme.foreground,
-                    'bg_color': self.current_theme.background,
-                    'bold': False,
-                    'underline': False
-                }
-                new_row.append(cell)
-            self.grid.append(new_row)
+            self.grid.append(self._make_row(()))
+        self.ring_base = (self.ring_base + lines) % self.ring_rows
+
+        # Pending rows move up with their content; the new bottom rows, the
+        # overscan row (now in a stale slot) and both cursor rows are redrawn
+        rows = self.rows
+        dirty = {y - lines for y in self.dirty_rows if lines <= y < rows}
+        dirty.update(range(rows - lines, rows + 1))
+        dirty.add(self.cursor_row)
+        if self.cursor_row >= lines:
+            dirty.add(self.cursor_row - lines)
+        self.dirty_rows = dirty
         self.update()
 
     def resizeEvent(self, event):
@@ -235,7 +569,7 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
     def initializeGL(self):
         """Initialize OpenGL"""
         if not OPENGL_AVAILABLE:
-            print("OpenGL not available!")
+            log.error("OpenGL not available!")
             return
 
         # Enable blending for glow effects
@@ -251,292 +585,235 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
         # Create texture for character rendering
         self.create_text_texture()
 
-        print("OpenGL retro grid initialized")
+        log.info("OpenGL retro grid initialized")
 
     def create_shaders(self):
         """Create OpenGL shaders - WITH AMBIENT BACKGROUND GLOW"""
-        vertex_shader_source = """
-        #version 330 core
-        layout (location = 0) in vec3 aPos;
-        layout (location = 1) in vec2 aTexCoord;
-        
-        out vec2 TexCoord;
-        out vec2 screenPos;
-        
-        void main()
-        {
-            gl_Position = vec4(aPos, 1.0);
-            TexCoord = aTexCoord;
-            screenPos = aPos.xy;
-        }
-        """
-
-        # UPDATED fragment shader with ambient glow
-        fragment_shader_source = """
-        #version 330 core
-        out vec4 FragColor;
-        
-        in vec2 TexCoord;
-        in vec2 screenPos;
-        
-        uniform sampler2D textTexture;
-        uniform float time;
-        uniform float glowIntensity;
-        uniform float scanlineIntensity;
-        uniform float flickerIntensity;
-        uniform float ambientGlow;
-        uniform float curvature;
-        uniform float brightness;
-        uniform float contrast;
-        uniform vec3 bgColor;
-        uniform vec3 fgColor;
-        uniform vec3 glowColor;
-        uniform vec2 screenSize;
-        
-        void main()
-        {
-            // Apply barrel distortion for CRT curvature
-            vec2 cc = TexCoord - 0.5;
-            float dist = dot(cc, cc);
-            vec2 distortedCoord = TexCoord + cc * (dist * curvature);
-            
-            // Check if we're outside the curved screen area
-            if (distortedCoord.x < 0.0 || distortedCoord.x > 1.0 || 
-                distortedCoord.y < 0.0 || distortedCoord.y > 1.0) {
-                FragColor = vec4(bgColor, 1.0);
-                return;
-            }
-            
-            // Sample the text texture
-            vec4 textColor = texture(textTexture, distortedCoord);
-            
-            // Convert to grayscale intensity
-            float intensity = dot(textColor.rgb, vec3(0.299, 0.587, 0.114));
-            
-            // Apply theme colors with AMBIENT GLOW added to background
-            vec3 ambientColor = bgColor + (fgColor * ambientGlow);
-            vec3 color = mix(ambientColor, fgColor, intensity);
-            
-            // Apply phosphor glow - inline calculation
-            if (intensity > 0.1 && glowIntensity > 0.0) {
-                float glowAmount = glowIntensity * 0.3;
-                vec3 glow = color * glowAmount;
-                float bloom = smoothstep(0.0, 1.0, intensity) * 0.2;
-                glow += vec3(bloom) * color;
-                color = color + glow;
-            }
-            
-            // Apply scanlines - inline calculation, guaranteed to work
-            if (scanlineIntensity > 0.0) {
-                float pixelY = distortedCoord.y * screenSize.y;
-                float scanlinePattern = mod(pixelY, 2.0);
-                if (scanlinePattern >= 1.0) {
-                    color *= (1.0 - scanlineIntensity);
-                }
-            }
-            
-            // Apply screen flicker - inline calculation
-            if (flickerIntensity > 0.0) {
-                float slowFlicker = sin(time * 1.5) * 0.4;
-                float mediumFlicker = sin(time * 3.7) * 0.3;
-                float fastFlicker = sin(time * 12.1) * 0.3;
-                float combined = (slowFlicker + mediumFlicker + fastFlicker) / 3.0;
-                float flickerAmount = flickerIntensity * combined * 0.1;
-                float flickerFactor = 1.0 + flickerAmount;
-                color *= flickerFactor;
-            }
-            
-            // Apply brightness and contrast
-            color = ((color - 0.5) * contrast + 0.5) * brightness;
-            
-            // Vignette effect
-            vec2 vignetteCoord = screenPos;
-            float vignette = 1.0 - dot(vignetteCoord, vignetteCoord) * 0.2;
-            color *= vignette;
-            
-            FragColor = vec4(color, 1.0);
-        }
-        """
-
-        # Create shader program
-        self.shader_program = QOpenGLShaderProgram()
-
-        if not self.shader_program.addShaderFromSourceCode(QOpenGLShader.ShaderTypeBit.Vertex, vertex_shader_source):
-            print("Vertex shader compilation failed:", self.shader_program.log())
-            return
-
-        if not self.shader_program.addShaderFromSourceCode(QOpenGLShader.ShaderTypeBit.Fragment, fragment_shader_source):
-            print("Fragment shader compilation failed:", self.shader_program.log())
-            return
-
-        if not self.shader_program.link():
-            print("Shader program linking failed:", self.shader_program.log())
-            return
-
-        print("Shaders compiled successfully")
+        self.shader_program = build_crt_program()
 
     def create_geometry(self):
         """Create fullscreen quad geometry"""
-        vertices = np.array([
-            # positions     # texture coords
-            -1.0, -1.0, 0.0,  0.0, 1.0,  # Bottom-left
-             1.0, -1.0, 0.0,  1.0, 1.0,  # Bottom-right
-             1.0,  1.0, 0.0,  1.0, 0.0,  # Top-right
-            -1.0,  1.0, 0.0,  0.0, 0.0   # Top-left
-        ], dtype=np.float32)
-
-        indices = np.array([
-            0, 1, 2,
-            2, 3, 0
-        ], dtype=np.uint32)
-
-        # Create VAO
-        self.vao = QOpenGLVertexArrayObject()
-        if not self.vao.create():
-            print("Failed to create VAO")
-            return
-        self.vao.bind()
-
-        # Create vertex buffer
-        self.vertex_buffer = QOpenGLBuffer(QOpenGLBuffer.Type.VertexBuffer)
-        if not self.vertex_buffer.create():
-            print("Failed to create vertex buffer")
-            return
-        self.vertex_buffer.bind()
-        self.vertex_buffer.allocate(vertices.tobytes(), vertices.nbytes)
-
-        # Create index buffer
-        self.index_buffer = QOpenGLBuffer(QOpenGLBuffer.Type.IndexBuffer)
-        if not self.index_buffer.create():
-            print("Failed to create index buffer")
-            return
-        self.index_buffer.bind()
-        self.index_buffer.allocate(indices.tobytes(), indices.nbytes)
-
-        # Set vertex attributes
-        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 5 * 4, None)
-        glEnableVertexAttribArray(0)
-
-        glVertexAttribPointer(1, 2, GL_FLOAT, GL_FALSE, 5 * 4, ctypes.c_void_p(3 * 4))
-        glEnableVertexAttribArray(1)
-
-        self.vao.release()
+        self.vao, self.vertex_buffer, self.index_buffer = create_quad_geometry()
 
     def create_text_texture(self):
-        """Create texture for text rendering"""
-        # Calculate texture size based on grid
-        texture_width = self.cols * self.char_width
-        texture_height = self.rows * self.char_height
-
-        # Create QImage for text rendering
-        self.text_image = QImage(texture_width, texture_height, QImage.Format.Format_RGB888)
-        self.text_image.fill(QColor(0, 0, 0))
+        """(Re)allocate the text image and texture at the grid's capacity, freeing the old texture"""
+        self.texture_size_stale = False
+        image = self.ensure_text_image()
+        self.mark_all_dirty()
+        if self.text_texture:
+            self.text_texture.destroy()
 
         # Create OpenGL texture
-        self.text_texture = QOpenGLTexture(QOpenGLTexture.Target.Target2D)
-        if not self.text_texture.create():
-            print("Failed to create texture")
+        self.text_texture = create_grid_texture(image.width(), image.height())
+        if self.text_texture is None:
             return
 
-        self.text_texture.setSize(texture_width, texture_height)
-        self.text_texture.setFormat(QOpenGLTexture.TextureFormat.RGB8_UNorm)
-        self.text_texture.allocateStorage()
-
-        # Set texture parameters
-        self.text_texture.setWrapMode(QOpenGLTexture.CoordinateDirection.DirectionS,
-                                     QOpenGLTexture.WrapMode.ClampToEdge)
-        self.text_texture.setWrapMode(QOpenGLTexture.CoordinateDirection.DirectionT,
-                                     QOpenGLTexture.WrapMode.ClampToEdge)
-        self.text_texture.setMinMagFilters(QOpenGLTexture.Filter.Linear,
-                                          QOpenGLTexture.Filter.Linear)
-
         # Upload initial data
         self.update_text_texture()
 
     def render_grid_to_texture(self):
-        """Render character grid to texture with enhanced quality"""
-        if not self.text_image:
-            return
-
-        # Clear the image
-        self.text_image.fill(QColor(0, 0, 0))
+        """Rasterize the dirty rows into their ring slots of text_image; returns the slots drawn"""
+        if not self.text_image or not self.dirty_rows:
+            return []
+
+        rows = sorted(self.dirty_rows)
+        self.dirty_rows = set()
+        capacity = self.ring_rows
+        char_width = self.char_width
+        char_height = self.char_height
+        baseline = char_height - self.font_metrics.descent()
+        width = self.text_image.width()
+        black = QColor(0, 0, 0)
+        white = QColor(255, 255, 255)
+        bold_font = QFont(self.font)
+        bold_font.setBold(True)
 
         # Create painter for text rendering
         painter = QPainter(self.text_image)
         painter.setFont(self.font)
+        bold = False
 
         # Enable high-quality text rendering
         painter.setRenderHint(QPainter.RenderHint.TextAntialiasing, True)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
-
-        # Render each character from the grid
-        for row in range(self.rows):
-            for col in range(self.cols):
-                cell = self.grid[row][col]
+        # Text is white; the theme is applied in the shader
+        painter.setPen(white)
+
+        slots = []
+        for row in rows:
+            if row < self.rows:
+                cells = self.grid[row]
+            elif row == self.rows:
+                cells = self.overscan_row
+            else:
+                continue
+            slot = (self.ring_base + row) % capacity
+            slots.append(slot)
+            top = slot * char_height
+            painter.fillRect(0, top, width, char_height, black)
+            if cells is None:
+                continue
+
+            for col, cell in enumerate(cells[:self.cols]):
                 char = cell['char']
-
                 if char != ' ':
-                    # Set text color (white for texture, theme applied in shader)
-                    painter.setPen(QColor(255, 255, 255))
-
-                    # Apply bold if needed
-                    font = QFont(self.font)
-                    if cell['bold']:
-                        font.setBold(True)
-                    painter.setFont(font)
-
-                    # Calculate position
-                    x = col * self.char_width
-                    y = (row + 1) * self.char_height - self.font_metrics.descent()
-
-                    # Draw character
-                    painter.drawText(x, y, char)
-
-                    # Draw underline if needed
+                    if cell['bold'] != bold:
+                        bold = cell['bold']
+                        painter.setFont(bold_font if bold else self.font)
+                    x = col * char_width
+                    painter.drawText(x, top + baseline, char)
                     if cell['underline']:
-                        underline_y = (row + 1) * self.char_height - 2
-                        painter.drawLine(x, underline_y, x + self.char_width, underline_y)
+                        underline_y = top + char_height - 2
+                        painter.drawLine(x, underline_y, x + char_width, underline_y)
 
-                # Render cursor
-                if (row == self.cursor_row and col == self.cursor_col and self.cursor_visible):
-                    cursor_rect = QRect(col * self.char_width, row * self.char_height,
-                                      self.char_width, self.char_height)
-                    painter.fillRect(cursor_rect, QColor(128, 128, 128))
+            # Render cursor
+            if row == self.cursor_row and self.cursor_visible and self.cursor_shown:
+                painter.fillRect(QRect(self.cursor_col * char_width, top, char_width, char_height),
+                                 QColor(128, 128, 128))
 
         painter.end()
+        slots.sort()
+        return slots
 
     def update_text_texture(self):
-        """Update OpenGL texture with current grid"""
+        """Rasterize and upload the rows that changed since the last update"""
         if not self.text_texture:
             return
+        if self.texture_size_stale:
+            # Outgrew its capacity in resize_grid; uploads itself once rebuilt
+            self.create_text_texture()
+            return
+
+        with tracing.span('rasterize', 'render'):
+            slots = self.render_grid_to_texture()
+        if not slots:
+            return
+
+        with tracing.span('upload', 'render', rows=len(slots)):
+            uploaded = upload_texture_rows(self.text_texture, self.text_image, self.char_height, slots)
+
+        if self.perf_hud is not None:
+            self.perf_hud.texture_uploaded(uploaded)
+
+    def suspend_rendering(self):
+        """Stop animating and painting (background tab); the grid keeps its contents"""
+        if self.render_suspended:
+            return
+        self.render_suspended = True
+        self.animation_timer.stop()
+        self.cursor_timer.stop()
+
+    def resume_rendering(self):
+        """Restart timers and schedule a frame; released GL objects come back in paintGL"""
+        if not self.render_suspended or self.surface is not None:
+            return
+        self.render_suspended = False
+        self.animation_timer.start()
+        if self.cursor_blink_enabled:
+            # Keeps whatever rate set_cursor_blink_rate chose
+            self.cursor_timer.start()
+        self.update()
 
-        # Render grid to image
-        self.render_grid_to_texture()
+    def release_gl_resources(self):
+        """Free the texture, shader and buffers of an idle background tab"""
+        if self.gl_released or not self.render_suspended or not self.isValid():
+            return
+        self.makeCurrent()
+        if self.perf_hud is not None:
+            self.perf_hud.release()
+        if self.text_texture:
+            self.text_texture.destroy()
+        for buffer in (self.vertex_buffer, self.index_buffer):
+            if buffer:
+                buffer.destroy()
+        if self.vao:
+            self.vao.destroy()
+        if self.shader_program:
+            self.shader_program.removeAllShaders()
+        self.doneCurrent()
 
-        # Convert to OpenGL format
-        gl_image = self.text_image.convertToFormat(QImage.Format.Format_RGB888)
+        self.text_texture = self.vertex_buffer = self.index_buffer = self.vao = self.shader_program = None
+        self.text_image = None
+        self.gl_released = True
+        log.debug("Released GL resources of background grid %sx%s", self.cols, self.rows)
+
+    def _restore_gl_resources(self):
+        """Rebuild what release_gl_resources freed (context is current in paintGL)"""
+        self.gl_released = False
+        self.texture_size_stale = False
+        with tracing.span('gl_restore', 'render'):
+            self.create_shaders()
+            self.create_geometry()
+            self.create_text_texture()
+        log.debug("Restored GL resources for grid %sx%s", self.cols, self.rows)
 
-        # Upload to texture
-        self.text_texture.bind()
-        self.text_texture.setData(QOpenGLTexture.PixelFormat.RGB,
-                                 QOpenGLTexture.PixelType.UInt8,
-                                 gl_image.constBits())
+    def update(self, *args):
+        """Schedule a repaint - of the hosting surface while this grid is a split pane"""
+        if self.surface is not None:
+            self.surface.pane_changed(self)
+        else:
+            super().update(*args)
+
+    def attach_to_surface(self, surface):
+        """Let a split view draw this grid; the widget's own timers and GL objects go away"""
+        self.suspend_rendering()
+        self.release_gl_resources()
+        self.surface = surface
+        self.set_cursor_visible(True)
+
+    def detach_from_surface(self):
+        """Draw this grid in its own widget again"""
+        self.surface = None
+        self.resume_rendering()
+
+    def ensure_text_image(self):
+        """CPU image the grid is rasterized into, reallocated when the grid outgrows its capacity"""
+        if not self._text_image_fits():
+            columns, ring_rows = self._texture_capacity()
+            self.text_image = QImage(columns * self.char_width, ring_rows * self.char_height,
+                                     QImage.Format.Format_RGB888)
+            self.text_image.fill(QColor(0, 0, 0))
+            self.ring_rows = ring_rows
+            self.ring_base = 0
+            self.mark_all_dirty()
+        return self.text_image
+
+    def _texture_capacity(self):
+        """(columns, ring rows) the text image should have for the current grid"""
+        image = self.text_image
+        columns = ring_rows = 0
+        if image is not None:
+            columns = image.width() // self.char_width
+            ring_rows = image.height() // self.char_height
+        return (texture_capacity(self.cols, columns, TEXTURE_CHUNK_COLUMNS),
+                texture_capacity(self.rows + 1, ring_rows, TEXTURE_CHUNK_ROWS))
+
+    def _text_image_fits(self):
+        image = self.text_image
+        if image is None or image.isNull():
+            return False
+        columns, ring_rows = self._texture_capacity()
+        return image.width() == columns * self.char_width and image.height() == ring_rows * self.char_height
 
     def paintGL(self):
         """Render with OpenGL"""
-        if not OPENGL_AVAILABLE or not self.shader_program:
+        if not OPENGL_AVAILABLE or self.render_suspended:
+            return
+        if self.gl_released:
+            self._restore_gl_resources()
+        if not self.shader_program:
             return
 
-        # Get theme colors
-        bg_rgb = [0, 0, 0]
-        fg_rgb = [0, 1, 0]  # Default green
-        if self.current_theme:
-            bg = self.current_theme.background
-            fg = self.current_theme.foreground
-            bg_rgb = [bg.redF(), bg.greenF(), bg.blueF()]
-            fg_rgb = [fg.redF(), fg.greenF(), fg.blueF()]
+        tracer = tracing.tracer
+        if tracer is not None:
+            trace_start = tracer.now()
+
+        hud = self.perf_hud
+        if hud is not None:
+            hud.frame_begin()
 
         # Clear screen
+        bg_rgb, _ = self.theme_rgb()
         glClearColor(bg_rgb[0], bg_rgb[1], bg_rgb[2], 1.0)
         glClear(GL_COLOR_BUFFER_BIT)
 
@@ -545,31 +822,11 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
 
         # Use shader program
         if not self.shader_program.bind():
+            if hud is not None:
+                hud.frame_end()
             return
 
-        # Set uniforms with debugging
-        current_time = time.time() - self.start_time
-
-        # Calculate actual values to send to shader
-        actual_glow = self.glow_intensity if self.glow_enabled else 0.0
-        actual_scanlines = self.scanline_intensity if self.scanlines_enabled else 0.0
-        # actual_flicker = self.flicker_intensity if self.flicker_enabled else 0.0
-
-        # Debug print occasionally
-        # if int(current_time) % 5 == 0 and int(current_time * 10) % 10 == 0:  # Every 5 seconds
-        #     print(f"Shader uniforms - Glow: {actual_glow}, Scanlines: {actual_scanlines}, Flicker: {actual_flicker}, Ambient: {self.ambient_glow}")
-
-        self.shader_program.setUniformValue("time", current_time)
-        self.shader_program.setUniformValue("glowIntensity", actual_glow)
-        self.shader_program.setUniformValue("scanlineIntensity", actual_scanlines)
-        self.shader_program.setUniformValue("ambientGlow", self.ambient_glow)  # NEW: Ambient glow uniform
-        self.shader_program.setUniformValue("curvature", self.curvature)
-        self.shader_program.setUniformValue("brightness", self.brightness)
-        self.shader_program.setUniformValue("contrast", self.contrast)
-        self.shader_program.setUniformValue("bgColor", bg_rgb[0], bg_rgb[1], bg_rgb[2])
-        self.shader_program.setUniformValue("fgColor", fg_rgb[0], fg_rgb[1], fg_rgb[2])
-        self.shader_program.setUniformValue("glowColor", fg_rgb[0], fg_rgb[1], fg_rgb[2])
-        self.shader_program.setUniformValue("screenSize", float(self.width()), float(self.height()))
+        self.set_crt_uniforms(self.shader_program, self.width(), self.height())
 
         # Bind texture
         if self.text_texture:
@@ -587,6 +844,103 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
             self.text_texture.release()
         self.shader_program.release()
 
+        if hud is not None:
+            hud.frame_end()
+
+        if self.overlay_sections:
+            self.draw_overlay()
+
+        if tracer is not None:
+            tracer.complete('paintGL', 'render', trace_start)
+
+    def theme_rgb(self):
+        """Background and foreground of the current theme as float RGB lists"""
+        bg_rgb = [0, 0, 0]
+        fg_rgb = [0, 1, 0]  # Default green
+        if self.current_theme:
+            bg = self.current_theme.background
+            fg = self.current_theme.foreground
+            bg_rgb = [bg.redF(), bg.greenF(), bg.blueF()]
+            fg_rgb = [fg.redF(), fg.greenF(), fg.blueF()]
+        return bg_rgb, fg_rgb
+
+    def set_crt_uniforms(self, program, width, height):
+        """Load this grid's effect settings into a bound CRT program drawing a width x height quad"""
+        bg_rgb, fg_rgb = self.theme_rgb()
+        current_time = time.time() - self.start_time
+
+        # Calculate actual values to send to shader
+        actual_glow = self.glow_intensity if self.glow_enabled else 0.0
+        actual_scanlines = self.scanline_intensity if self.scanlines_enabled else 0.0
+
+        program.setUniformValue("time", current_time)
+        program.setUniformValue("glowIntensity", actual_glow)
+        program.setUniformValue("scanlineIntensity", actual_scanlines)
+        program.setUniformValue("ambientGlow", self.ambient_glow)  # NEW: Ambient glow uniform
+        program.setUniformValue("curvature", self.curvature)
+        program.setUniformValue("brightness", self.brightness)
+        program.setUniformValue("contrast", self.contrast)
+        program.setUniformValue("bgColor", bg_rgb[0], bg_rgb[1], bg_rgb[2])
+        program.setUniformValue("fgColor", fg_rgb[0], fg_rgb[1], fg_rgb[2])
+        program.setUniformValue("glowColor", fg_rgb[0], fg_rgb[1], fg_rgb[2])
+        program.setUniformValue("screenSize", float(width), float(height))
+        program.setUniformValue("textRows", float(self.rows))
+        program.setUniformValue("scrollOffset", float(self.scroll_fraction))
+        program.setUniformValue("baseRow", float(self.ring_base))
+        program.setUniformValue("ringRows", float(self.ring_rows))
+        image = self.text_image
+        used = self.cols * self.char_width / image.width() if image is not None and image.width() else 1.0
+        program.setUniformValue("textWidth", float(used))
+
+    def set_overlay_section(self, name, lines):
+        """Show (or with lines=None remove) a block of text in the diagnostic overlay"""
+        if lines:
+            self.overlay_sections[name] = list(lines)
+        else:
+            self.overlay_sections.pop(name, None)
+        self.update()
+
+    def set_perf_hud(self, enabled, stats_provider=None):
+        """Show or hide the performance HUD; returns the PerfHud while shown"""
+        if enabled and self.perf_hud is None:
+            from coolpyterm.perf_hud import PerfHud
+            self.perf_hud = PerfHud(self, stats_provider)
+            self.overlay_sections['perf'] = ["performance HUD: measuring..."]
+        elif not enabled and self.perf_hud is not None:
+            # Timer queries belong to this widget's context
+            self.makeCurrent()
+            self.perf_hud.release()
+            self.doneCurrent()
+            self.perf_hud = None
+        self.update()
+        return self.perf_hud
+
+    def draw_overlay(self):
+        """Draw overlay sections in the top-right corner, outside the CRT shader"""
+        painter = QPainter(self)
+        self.paint_overlay(painter, self.width(), 0)
+        painter.end()
+
+    def paint_overlay(self, painter, right, top):
+        """Paint the overlay sections with their top-right corner at (right, top)"""
+        lines = []
+        for section in self.overlay_sections.values():
+            if lines:
+                lines.append("")
+            lines.extend(section)
+
+        painter.setFont(self.overlay_font)
+        metrics = QFontMetrics(self.overlay_font)
+        line_height = metrics.height()
+        width = max(metrics.horizontalAdvance(line) for line in lines) + 16
+        height = line_height * len(lines) + 12
+        x = right - width - 8
+
+        painter.fillRect(QRect(x, top + 8, width, height), QColor(0, 0, 0, 190))
+        painter.setPen(self.current_theme.foreground)
+        for i, line in enumerate(lines):
+            painter.drawText(x + 8, top + 14 + metrics.ascent() + i * line_height, line)
+
     def resizeGL(self, width, height):
         """Handle OpenGL resize"""
         glViewport(0, 0, width, height)
@@ -595,39 +949,39 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
     def toggle_glow(self):
         """Toggle glow effect"""
         self.glow_enabled = not self.glow_enabled
-        print(f"Glow: {'ON' if self.glow_enabled else 'OFF'} (intensity: {self.glow_intensity})")
+        log.info("Glow: %s (intensity: %s)", 'ON' if self.glow_enabled else 'OFF', self.glow_intensity)
         self.update()
 
     def toggle_scanlines(self):
         """Toggle scanlines effect"""
         self.scanlines_enabled = not self.scanlines_enabled
-        print(f"Scanlines: {'ON' if self.scanlines_enabled else 'OFF'} (intensity: {self.scanline_intensity})")
+        log.info("Scanlines: %s (intensity: %s)", 'ON' if self.scanlines_enabled else 'OFF', self.scanline_intensity)
         self.update()
 
     def toggle_flicker(self):
         """Toggle flicker effect"""
         self.flicker_enabled = not self.flicker_enabled
-        print(f"Flicker: {'ON' if self.flicker_enabled else 'OFF'} (intensity: {self.flicker_intensity})")
+        log.info("Flicker: %s (intensity: %s)", 'ON' if self.flicker_enabled else 'OFF', self.flicker_intensity)
         self.update()
 
     # NEW: Ambient glow controls
     def toggle_ambient_glow(self):
         """Toggle ambient background glow"""
         self.ambient_glow = 0.0 if self.ambient_glow > 0.0 else 0.15
-        print(f"Ambient glow: {'ON' if self.ambient_glow > 0.0 else 'OFF'} (intensity: {self.ambient_glow})")
+        log.info("Ambient glow: %s (intensity: %s)", 'ON' if self.ambient_glow > 0.0 else 'OFF', self.ambient_glow)
         self.update()
 
     def set_ambient_glow(self, intensity):
         """Set ambient glow intensity (0.0 to 1.0)"""
         self.ambient_glow = max(0.0, min(1.0, intensity))
-        print(f"Ambient glow intensity: {self.ambient_glow}")
+        log.info("Ambient glow intensity: %s", self.ambient_glow)
         self.update()
 
     def test_ambient_glow(self):
         """Test ambient glow at high intensity"""
         self.ambient_glow = 0.3
-        print(f"Testing ambient glow at high intensity: {self.ambient_glow}")
-        print("The entire background should now have a subtle color tint!")
+        log.info("Testing ambient glow at high intensity: %s", self.ambient_glow)
+        log.info("The entire background should now have a subtle color tint!")
         self.update()
 
     # MISSING CURSOR CONTROL METHODS
@@ -636,16 +990,16 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
         self.cursor_blink_enabled = enabled
 
         if enabled:
-            # Enable blinking
-            if not self.cursor_timer.isActive():
-                self.cursor_timer.start(500)
-            print("Cursor blinking enabled")
+            # Enable blinking (a suspended tab starts its timer on resume)
+            if not self.cursor_timer.isActive() and not self.render_suspended:
+                self.cursor_timer.start()
+            log.info("Cursor blinking enabled")
         else:
             # Disable blinking - cursor always visible
-            self.cursor_visible = True
+            self.set_cursor_visible(True)
             if self.cursor_timer.isActive():
                 self.cursor_timer.stop()
-            print("Cursor blinking disabled - cursor always visible")
+            log.info("Cursor blinking disabled - cursor always visible")
 
         self.update()
 
@@ -653,8 +1007,10 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
         """Set cursor blink rate in milliseconds"""
         if self.cursor_timer:
             self.cursor_timer.stop()
-            self.cursor_timer.start(milliseconds)
-            print(f"Cursor blink rate set to {milliseconds}ms")
+            self.cursor_timer.setInterval(milliseconds)
+            if not self.render_suspended:
+                self.cursor_timer.start()
+            log.info("Cursor blink rate set to %sms", milliseconds)
 
     def toggle_cursor_blinking(self):
         """Toggle cursor blinking on/off"""
@@ -668,13 +1024,13 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
     def increase_scanlines(self):
         """Increase scanline intensity for testing"""
         self.scanline_intensity = min(1.0, self.scanline_intensity + 0.1)
-        print(f"Scanlines intensity: {self.scanline_intensity}")
+        log.info("Scanlines intensity: %s", self.scanline_intensity)
         self.update()
 
     def increase_flicker(self):
         """Increase flicker intensity for testing"""
         self.flicker_intensity = min(1.0, self.flicker_intensity + 0.05)
-        print(f"Flicker intensity: {self.flicker_intensity}")
+        log.info("Flicker intensity: %s", self.flicker_intensity)
         self.update()
 
     # Add these methods to your OpenGLRetroGridWidget class in opengl_grid_widget.py
@@ -688,7 +1044,7 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
             screen = QGuiApplication.primaryScreen()
 
             if not screen:
-                print("Could not get screen information for DPI adjustment")
+                log.warning("Could not get screen information for DPI adjustment")
                 return 0.25
 
             # Get DPI values
@@ -696,8 +1052,7 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
             physical_dpi = screen.physicalDotsPerInch()
             device_pixel_ratio = screen.devicePixelRatio()
 
-            print(
-                f"Screen info - Logical DPI: {logical_dpi}, Physical DPI: {physical_dpi}, Pixel Ratio: {device_pixel_ratio}")
+            log.debug("Screen info - Logical DPI: %s, Physical DPI: %s, Pixel Ratio: %s", logical_dpi, physical_dpi, device_pixel_ratio)
 
             # Calculate optimal scanline intensity based on DPI and widget size
             widget_height = self.height()
@@ -737,11 +1092,11 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
             self.scanline_intensity = adjusted_intensity
             self.scanlines_enabled = True  # Enable scanlines when auto-adjusting
 
-            print(f"Auto-adjusted scanlines:")
-            print(f"  - Widget size: {self.width()}x{widget_height}")
-            print(f"  - Character height: {char_height_pixels}px")
-            print(f"  - DPI: {logical_dpi}")
-            print(f"  - New scanline intensity: {adjusted_intensity:.3f}")
+            log.debug("Auto-adjusted scanlines:")
+            log.debug("- Widget size: %sx%s", self.width(), widget_height)
+            log.debug("- Character height: %spx", char_height_pixels)
+            log.debug("- DPI: %s", logical_dpi)
+            log.debug("- New scanline intensity: %.3f", adjusted_intensity)
 
             # Force an update to show the changes
             self.update()
@@ -749,7 +1104,7 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
             return adjusted_intensity
 
         except Exception as e:
-            print(f"Error in adjust_scanlines_for_dpi: {e}")
+            log.error("Error in adjust_scanlines_for_dpi: %s", e)
             # Fallback to a safe default
             self.scanline_intensity = 0.25
             self.scanlines_enabled = True
@@ -806,7 +1161,7 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
             self.scanline_intensity = 0.25
 
         self.scanlines_enabled = True
-        print(f"Reset scanlines to default intensity: {self.scanline_intensity}")
+        log.info("Reset scanlines to default intensity: %s", self.scanline_intensity)
         self.update()
 
     def set_scanline_intensity(self, intensity):
@@ -815,7 +1170,7 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
         self.scanline_intensity = max(0.0, min(1.0, intensity))
 
         if abs(self.scanline_intensity - old_intensity) > 0.001:  # Only update if changed
-            print(f"Scanline intensity changed: {old_intensity:.3f} -> {self.scanline_intensity:.3f}")
+            log.info("Scanline intensity changed: %.3f -> %.3f", old_intensity, self.scanline_intensity)
             self.update()
 
         return self.scanline_intensity
@@ -824,15 +1179,15 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
         """Set CRT control values"""
         if brightness is not None:
             self.brightness = max(0.5, min(2.0, brightness))
-            print(f"Brightness set to: {self.brightness}")
+            log.info("Brightness set to: %s", self.brightness)
 
         if contrast is not None:
             self.contrast = max(0.5, min(2.0, contrast))
-            print(f"Contrast set to: {self.contrast}")
+            log.info("Contrast set to: %s", self.contrast)
 
         if curvature is not None:
             self.curvature = max(0.0, min(0.2, curvature))
-            print(f"Curvature set to: {self.curvature}")
+            log.info("Curvature set to: %s", self.curvature)
 
         self.update()
 
@@ -844,11 +1199,11 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
         self.ambient_glow = min(1.0, self.ambient_glow + step)
 
         if abs(self.ambient_glow - old_value) > 0.001:
-            print(f"Ambient glow increased: {old_value:.3f} -> {self.ambient_glow:.3f}")
+            log.info("Ambient glow increased: %.3f -> %.3f", old_value, self.ambient_glow)
             self.update()
             return True
         else:
-            print(f"Ambient glow already at maximum: {self.ambient_glow:.3f}")
+            log.info("Ambient glow already at maximum: %.3f", self.ambient_glow)
             return False
 
     def decrease_ambient_glow(self, step=0.05):
@@ -857,11 +1212,11 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
         self.ambient_glow = max(0.0, self.ambient_glow - step)
 
         if abs(self.ambient_glow - old_value) > 0.001:
-            print(f"Ambient glow decreased: {old_value:.3f} -> {self.ambient_glow:.3f}")
+            log.info("Ambient glow decreased: %.3f -> %.3f", old_value, self.ambient_glow)
             self.update()
             return True
         else:
-            print(f"Ambient glow already at minimum: {self.ambient_glow:.3f}")
+            log.info("Ambient glow already at minimum: %.3f", self.ambient_glow)
             return False
 
     def get_ambient_glow_level(self):
@@ -874,7 +1229,7 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
         self.ambient_glow = max(0.0, min(1.0, percentage / 100.0))
 
         if abs(self.ambient_glow - old_value) > 0.001:
-            print(f"Ambient glow set to {percentage}%: {old_value:.3f} -> {self.ambient_glow:.3f}")
+            log.info("Ambient glow set to %s%%: %.3f -> %.3f", percentage, old_value, self.ambient_glow)
             self.update()
             return True
         return False
@@ -904,75 +1259,74 @@ class OpenGLRetroGridWidget(QOpenGLWidget):
         old_value = self.ambient_glow
         self.ambient_glow = default_glow
 
-        print(f"Reset ambient glow to theme default: {old_value:.3f} -> {self.ambient_glow:.3f}")
+        log.info("Reset ambient glow to theme default: %.3f -> %.3f", old_value, self.ambient_glow)
         self.update()
 
     def print_ambient_glow_status(self):
         """Print current ambient glow status"""
         percentage = int(self.ambient_glow * 100)
-        print(f"Ambient Glow: {self.ambient_glow:.3f} ({percentage}%)")
+        log.info("Ambient Glow: %.3f (%s%%)", self.ambient_glow, percentage)
 
         if self.ambient_glow == 0.0:
-            print("  Status: OFF")
+            log.info("Ambient glow status: OFF")
         elif self.ambient_glow < 0.1:
-            print("  Status: Very Subtle")
+            log.info("Ambient glow status: Very Subtle")
         elif self.ambient_glow < 0.2:
-            print("  Status: Moderate")
+            log.info("Ambient glow status: Moderate")
         elif self.ambient_glow < 0.3:
-            print("  Status: Strong")
+            log.info("Ambient glow status: Strong")
         else:
-            print("  Status: Very Strong")
+            log.info("Ambient glow status: Very Strong")
 
     # Add these preset methods for quick adjustment
     def set_ambient_glow_subtle(self):
         """Set ambient glow to subtle level"""
         self.ambient_glow = 0.08
-        print("Ambient glow set to SUBTLE (8%)")
+        log.info("Ambient glow set to SUBTLE (8%)")
         self.update()
 
     def set_ambient_glow_moderate(self):
         """Set ambient glow to moderate level"""
         self.ambient_glow = 0.15
-        print("Ambient glow set to MODERATE (15%)")
+        log.info("Ambient glow set to MODERATE (15%)")
         self.update()
 
     def set_ambient_glow_strong(self):
         """Set ambient glow to strong level"""
         self.ambient_glow = 0.25
-        print("Ambient glow set to STRONG (25%)")
+        log.info("Ambient glow set to STRONG (25%)")
         self.update()
 
     def set_ambient_glow_maximum(self):
         """Set ambient glow to maximum level"""
         self.ambient_glow = 0.40
-        print("Ambient glow set to MAXIMUM (40%)")
+        log.info("Ambient glow set to MAXIMUM (40%)")
         self.update()
 
     def force_scanlines_visible(self):
         """Force scanlines to be highly visible for testing"""
-        print("Forcing scanlines to maximum visibility...")
+        log.info("Forcing scanlines to maximum visibility...")
         self.scanlines_enabled = True
         self.scanline_intensity = 0.8  # Very high
-        print(f"Scanlines enabled: {self.scanlines_enabled}, intensity: {self.scanline_intensity}")
+        log.info("Scanlines enabled: %s, intensity: %s", self.scanlines_enabled, self.scanline_intensity)
         self.update()
 
     def force_flicker_visible(self):
         """Force flicker to be highly visible for testing"""
-        print("Forcing flicker to maximum visibility...")
+        log.info("Forcing flicker to maximum visibility...")
         self.flicker_enabled = True
         self.flicker_intensity = 0.3  # Very high
-        print(f"Flicker enabled: {self.flicker_enabled}, intensity: {self.flicker_intensity}")
+        log.info("Flicker enabled: %s, intensity: %s", self.flicker_enabled, self.flicker_intensity)
         self.update()
 
     def print_current_effects(self):
         """Print current effect status"""
-        print("=== Current Effect Status ===")
-        print(f"Glow: {'ON' if self.glow_enabled else 'OFF'} (intensity: {self.glow_intensity})")
-        print(f"Scanlines: {'ON' if self.scanlines_enabled else 'OFF'} (intensity: {self.scanline_intensity})")
-        print(f"Flicker: {'ON' if self.flicker_enabled else 'OFF'} (intensity: {self.flicker_intensity})")
-        print(f"Ambient Glow: {self.ambient_glow}")  # NEW: Show ambient glow status
-        print(f"Curvature: {self.curvature}")
-        print("==============================")
+        log.info("Current Effect Status")
+        log.info("Glow: %s (intensity: %s)", 'ON' if self.glow_enabled else 'OFF', self.glow_intensity)
+        log.info("Scanlines: %s (intensity: %s)", 'ON' if self.scanlines_enabled else 'OFF', self.scanline_intensity)
+        log.info("Flicker: %s (intensity: %s)", 'ON' if self.flicker_enabled else 'OFF', self.flicker_intensity)
+        log.info("Ambient Glow: %s", self.ambient_glow)  # NEW: Show ambient glow status
+        log.info("Curvature: %s", self.curvature)
 
     def keyPressEvent(self, event):
         """Forward keyboard events to parent terminal"""
@@ -0,0 +1,238 @@
+"""
+Process parsing mode: sessions parsed in a pool of worker processes
+
+With 'parsing/mode' set to 'process', terminals get a ProcessParser instead
+of a ParserWorker thread. All of them share one ParserPool: a process per
+core by default ('parsing/processes'), started on first use, each serving
+many sessions. A session stays on the process it was assigned to, since its
+pyte screen lives there.
+
+    reader thread   recv -> feed()                (multiprocessing queue put)
+    parser process  engine -> SharedScreen        (shared_screen.serve)
+    GUI thread      poll seq -> take_frame -> grid rows -> texture -> paint
+
+The pool polls every attached segment's sequence counter on a GUI timer and
+emits frame_ready once per change, so a ProcessParser drops into the
+terminal exactly where a ParserWorker would. Frames carry decoded Char
+tuples, like the thread mode ones; the engine itself is not reachable from
+the GUI.
+"""
+import multiprocessing
+import os
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from coolpyterm import tracing
+from coolpyterm.app_logging import get_logger
+from coolpyterm.parser_worker import FrameSnapshot
+from coolpyterm.shared_screen import ALTERNATE, BRACKETED_PASTE, CURSOR_HIDDEN, SharedScreen, serve
+
+log = get_logger('terminal')
+
+# How often the GUI checks the segments for new frames
+POLL_INTERVAL_MS = 8
+
+_pool = None
+
+
+def parser_pool(processes=0):
+    """The shared pool, started on first use with `processes` workers (0 = one per core)"""
+    global _pool
+    if _pool is None:
+        _pool = ParserPool(processes)
+    return _pool
+
+
+def shutdown_parser_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+class ParserPool(QObject):
+    """Parser processes and the timer that polls their segments"""
+
+    def __init__(self, processes=0, parent=None):
+        super().__init__(parent)
+        count = processes if processes > 0 else (os.cpu_count() or 1)
+        # spawn, not fork: forking a process that has Qt and GL threads running is not safe
+        context = multiprocessing.get_context('spawn')
+        self.inboxes = []
+        self.processes = []
+        for index in range(count):
+            inbox = context.Queue()
+            process = context.Process(target=serve, args=(inbox,), daemon=True,
+                                      name=f"coolpyterm-parser-{index}")
+            process.start()
+            self.inboxes.append(inbox)
+            self.processes.append(process)
+        self.load = [0] * count
+        self.parsers = set()
+
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(POLL_INTERVAL_MS)
+        self.poll_timer.timeout.connect(self.poll)
+        log.info("Started %d parser processes", count)
+
+    def attach(self, parser):
+        """Assign parser to the least loaded process; returns that process's index"""
+        index = self.load.index(min(self.load))
+        self.load[index] += 1
+        self.parsers.add(parser)
+        if not self.poll_timer.isActive():
+            self.poll_timer.start()
+        return index
+
+    def detach(self, parser, index):
+        if parser in self.parsers:
+            self.parsers.discard(parser)
+            self.load[index] -= 1
+        if not self.parsers:
+            self.poll_timer.stop()
+
+    def poll(self):
+        for parser in tuple(self.parsers):
+            parser.poll()
+
+    def shutdown(self, timeout=2.0):
+        self.poll_timer.stop()
+        for inbox in self.inboxes:
+            inbox.put(None)
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                log.warning("Parser process %s did not stop, terminating it", process.name)
+                process.terminate()
+        for inbox in self.inboxes:
+            inbox.close()
+        self.processes = []
+        self.inboxes = []
+
+
+class ProcessParser(QObject):
+    """ParserWorker's interface for a session parsed in the process pool"""
+
+    frame_ready = pyqtSignal()
+
+    def __init__(self, columns=80, lines=24, engine='pyte', processes=0, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.columns = columns
+        self.lines = lines
+        self.processes = processes
+        self.closing = False
+        # Set by the owner, as for ParserWorker
+        self.trace_key = None
+        self._scrollback_limit = 1000
+
+        self.shared = None
+        self._pool = None
+        self._index = None
+        self._inbox = None
+        self._seen = 0           # seq of the last frame taken
+        self._scrolled_seen = 0  # ring lines taken so far
+        self._chars_seen = 0
+        self._notified = False
+
+    @property
+    def scrollback_limit(self):
+        return self._scrollback_limit
+
+    @scrollback_limit.setter
+    def scrollback_limit(self, limit):
+        """Most scrolled lines the process holds back while the GUI has not read the ring"""
+        self._scrollback_limit = limit
+        if self._inbox is not None and not self.closing:
+            self._inbox.put(('scrollback', id(self), limit))
+
+    @property
+    def shared_bytes(self):
+        return self.shared.size if self.shared is not None else 0
+
+    def start(self):
+        """Create the segment and hand the session to a parser process"""
+        if self.shared is not None:
+            return
+        self.shared = SharedScreen(max_columns=self.columns, max_lines=self.lines)
+        self._pool = parser_pool(self.processes)
+        self._index = self._pool.attach(self)
+        self._inbox = self._pool.inboxes[self._index]
+        self._inbox.put(('open', id(self), self.shared.name, self.engine, self.columns, self.lines,
+                         self._scrollback_limit))
+
+    def isRunning(self):
+        return self.shared is not None and not self.closing
+
+    # --- Any thread ---------------------------------------------------------------
+
+    def feed(self, text):
+        if self.closing or self._inbox is None:
+            return
+        tracer = tracing.tracer
+        if tracer is not None and self.trace_key is not None:
+            tracer.signal_delivered(self.trace_key)
+        self._inbox.put(('feed', id(self), text))
+
+    def resize(self, columns, lines):
+        self.columns, self.lines = columns, lines
+        if self._inbox is not None and not self.closing:
+            shared = self.shared
+            if columns > shared.max_columns or lines > shared.max_lines:
+                self._replace_segment(columns, lines)
+            self._inbox.put(('resize', id(self), columns, lines))
+
+    def _replace_segment(self, columns, lines):
+        """GUI thread: move the session to a segment made for a bigger screen
+
+        The old segment is unlinked right away; the process still has it
+        mapped and moves the ring lines not taken yet into the new one.
+        """
+        old = self.shared
+        self.shared = SharedScreen(max_columns=columns, max_lines=lines, ring_rows=old.ring_rows)
+        old.close(unlink=True)
+        # The new segment counts from zero; it is not read until the process has written it
+        self._seen = self._scrolled_seen = 0
+        self._inbox.put(('segment', id(self), self.shared.name, columns, lines))
+
+    def reset(self):
+        if self._inbox is not None and not self.closing:
+            self._inbox.put(('reset', id(self)))
+
+    def stop(self, timeout=2000):
+        """Release the session in its process and free the segment"""
+        if self.closing:
+            return
+        self.closing = True
+        if self._pool is not None:
+            self._pool.detach(self, self._index)
+            self._inbox.put(('close', id(self)))
+        if self.shared is not None:
+            self.shared.close(unlink=True)
+            self.shared = None
+
+    # --- GUI thread ---------------------------------------------------------------
+
+    def poll(self):
+        """Emit frame_ready if the segment changed since the last frame was taken"""
+        if self._notified or self.shared is None or not self.shared.changed(self._seen):
+            return
+        self._notified = True
+        self.frame_ready.emit()
+
+    def take_frame(self):
+        self._notified = False
+        if self.shared is None or not self.shared.changed(self._seen):
+            return None
+        state = self.shared.read(self._seen, self._scrolled_seen)
+        if state is None:
+            return None  # mid-write; the next poll tries again
+        self._seen = state['seq']
+        self._scrolled_seen = state['scrolled_total']
+        chars = state['chars'] - self._chars_seen
+        self._chars_seen = state['chars']
+        flags = state['flags']
+        return FrameSnapshot(state['columns'], state['lines'], state['rows'], state['full'],
+                             state['scrolled'], state['cursor'], bool(flags & CURSOR_HIDDEN),
+                             bool(flags & ALTERNATE), bool(flags & BRACKETED_PASTE),
+                             state['history'], chars)
@@ -0,0 +1,237 @@
+"""
+VT parsing off the GUI thread
+
+Each terminal owns one ParserWorker. The worker owns the session's engine
+(pyte or the fast engine, see vt_session.py); backend reader threads hand it decoded output with
+feed(), which only queues the text. The worker thread drains whatever has
+queued up, parses it in one go and publishes the result:
+
+    reader thread   recv -> feed()            (queue put)
+    parser thread   engine.feed -> snapshot   (rows that changed, cursor, modes)
+    GUI thread      take_frame -> grid rows -> texture -> paint
+
+Publishing is coalesced. frame_ready is emitted only when the GUI has taken
+the previous frame; until then new results are merged into the pending one.
+A GUI thread that falls behind during a flood therefore applies one merged
+frame, not a backlog of them, and parsing never waits for the GUI.
+
+Frames hold pyte Char namedtuples in plain tuples, so the GUI can keep them
+as long as it likes while the worker moves on.
+
+A worker that was never start()ed parses inline in feed(), on the caller's
+thread. The headless benchmark uses that mode. parser_pool.py runs the
+same engines in processes.
+"""
+import queue
+import threading
+import time
+from types import MappingProxyType
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from coolpyterm import tracing
+from coolpyterm.app_logging import get_logger
+from coolpyterm.vt_session import create_session
+
+log = get_logger('terminal')
+
+# Longest the worker parses queued output before publishing, so floods still show progress
+PUBLISH_INTERVAL = 1 / 30
+
+_STOP = object()
+
+
+class FrameSnapshot:
+    """One published parse result; treat every field as read-only"""
+
+    __slots__ = ('columns', 'lines', 'rows', 'full', 'scrolled', 'cursor', 'cursor_hidden',
+                 'alternate', 'bracketed_paste', 'history', 'chars')
+
+    def __init__(self, columns, lines, rows, full, scrolled, cursor, cursor_hidden,
+                 alternate, bracketed_paste, history, chars):
+        self.columns = columns
+        self.lines = lines
+        self.rows = MappingProxyType(rows)  # screen row -> tuple of pyte Chars (WrappedRow if it runs on), changed rows only
+        self.full = full                    # rows covers the whole screen
+        self.scrolled = tuple(scrolled)     # pyte lines that left the top of the screen, oldest first
+        self.cursor = cursor                # (row, col) on the screen
+        self.cursor_hidden = cursor_hidden
+        self.alternate = alternate
+        self.bracketed_paste = bracketed_paste
+        self.history = history              # lines in pyte's own history
+        self.chars = chars                  # characters parsed into this frame
+
+
+class ParserWorker(QThread):
+    """Owns a session's pyte screen; parses queued output and publishes frames"""
+
+    frame_ready = pyqtSignal()
+
+    def __init__(self, columns=80, lines=24, engine='pyte', parent=None):
+        super().__init__(parent)
+        self.session = create_session(engine, columns, lines)
+        # Set by the owner: the key reader threads use for their trace flows
+        self.trace_key = None
+
+        self._input = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._pending = None
+
+    @property
+    def closing(self):
+        return self.session.closing
+
+    @property
+    def scrollback_limit(self):
+        return self.session.scrollback_limit
+
+    @scrollback_limit.setter
+    def scrollback_limit(self, limit):
+        self.session.scrollback_limit = limit
+
+    # --- Any thread ---------------------------------------------------------------
+
+    def feed(self, text):
+        """Queue decoded output for parsing (parses right away if the thread is not running)"""
+        if self.isRunning():
+            self._input.put(text)
+        elif not self.closing:
+            self.process([text])
+
+    def resize(self, columns, lines):
+        """Resize the screen, in order with the output queued before it"""
+        self._submit(('resize', columns, lines))
+
+    def reset(self):
+        self._submit(('reset',))
+
+    def _submit(self, command):
+        if self.isRunning():
+            self._input.put(command)
+        else:
+            self.process([command])
+
+    def stop(self, timeout=2000):
+        """Finish the thread; output still queued is dropped"""
+        self.session.closing = True
+        if self.isRunning():
+            self._input.put(_STOP)
+            if not self.wait(timeout):
+                log.warning("Parser worker did not stop within %s ms", timeout)
+
+    # --- Parser thread ------------------------------------------------------------
+
+    def run(self):
+        self._stopped = False
+        while not self._stopped:
+            first = self._input.get()
+            if first is _STOP:
+                return
+            try:
+                self.process(self._drain(first))
+            except Exception:
+                log.exception("Parser worker failed on a batch")
+
+    def _drain(self, first):
+        """The first item plus whatever queues up behind it, for at most PUBLISH_INTERVAL"""
+        deadline = time.perf_counter() + PUBLISH_INTERVAL
+        item = first
+        while item is not _STOP:
+            yield item
+            if time.perf_counter() >= deadline:
+                return
+            try:
+                item = self._input.get_nowait()
+            except queue.Empty:
+                return
+        self._stopped = True
+
+    def process(self, items):
+        """Parse a batch of output and commands, then publish one frame"""
+        tracer = tracing.tracer
+        if tracer is not None:
+            start = tracer.now()
+
+        session = self.session
+        chars = 0
+        count = 0
+        full = False
+        for item in items:
+            count += 1
+            if isinstance(item, str):
+                if tracer is not None and self.trace_key is not None:
+                    tracer.signal_delivered(self.trace_key)
+                chars += len(item)
+                with tracing.span('feed', 'parse', chars=len(item)):
+                    full |= session.apply(item)
+            else:
+                full |= session.apply(item)
+
+        with tracing.span('snapshot', 'parse'):
+            self._publish(full, chars)
+
+        if tracer is not None:
+            tracer.complete('parse', 'parse', start, chars=chars, items=count)
+
+    def _publish(self, full, chars):
+        session = self.session
+        rows, scrolled = session.changes(full)
+        state = session.state()
+
+        with self._lock:
+            pending = self._pending
+            notify = pending is None
+            if notify:
+                pending = self._pending = _PendingFrame()
+            pending.merge(session.columns, session.lines, rows, full, scrolled, state, chars,
+                          session.scrollback_limit)
+
+        if notify:
+            tracer = tracing.tracer
+            if tracer is not None:
+                tracer.signal_sent(id(self))
+            self.frame_ready.emit()
+
+    # --- GUI thread ---------------------------------------------------------------
+
+    def take_frame(self):
+        """Everything published since the last call as one FrameSnapshot, or None"""
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return None
+        tracer = tracing.tracer
+        if tracer is not None:
+            tracer.signal_delivered(id(self))
+        return pending.freeze()
+
+
+class _PendingFrame:
+    """Published results the GUI has not taken yet, merged"""
+
+    __slots__ = ('columns', 'lines', 'rows', 'full', 'scrolled', 'state', 'chars')
+
+    def __init__(self):
+        self.rows = {}
+        self.full = False
+        self.scrolled = []
+        self.chars = 0
+
+    def merge(self, columns, lines, rows, full, scrolled, state, chars, limit):
+        self.columns = columns
+        self.lines = lines
+        if full:
+            self.rows = rows
+            self.full = True
+        else:
+            self.rows.update(rows)
+        self.scrolled.extend(scrolled)
+        if len(self.scrolled) > limit:
+            del self.scrolled[:-limit]
+        self.state = state
+        self.chars += chars
+
+    def freeze(self):
+        cursor, cursor_hidden, alternate, bracketed_paste, history = self.state
+        return FrameSnapshot(self.columns, self.lines, self.rows, self.full, self.scrolled,
+                             cursor, cursor_hidden, alternate, bracketed_paste, history, self.chars)
@@ -0,0 +1,113 @@
+"""
+Streaming paste engine
+
+Large clipboard pastes are fed to the backend in sized chunks from a timer
+instead of one write per line, honouring bracketed paste mode (?2004) and
+the backend send queue's backpressure. Optional per-line pacing is available
+for network-device CLIs that drop input arriving faster than they parse it.
+"""
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+BRACKETED_PASTE_START = "\x1b[200~"
+BRACKETED_PASTE_END = "\x1b[201~"
+
+
+def prepare_paste_text(text, bracketed=False):
+    """Normalize line endings and wrap in bracketed paste markers if requested"""
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    if bracketed:
+        # Never let pasted content terminate the bracket early
+        text = text.replace(BRACKETED_PASTE_END, "")
+        return BRACKETED_PASTE_START + text + BRACKETED_PASTE_END
+    return text
+
+
+class PasteStreamer(QObject):
+    """
+    Feed a paste to a backend in chunks from the GUI event loop
+
+    Each timer tick writes at most one chunk (or one line when pacing), so
+    the window stays responsive and the paste can be cancelled part way.
+    """
+    progress = pyqtSignal(int, int)  # characters sent, total characters
+    finished = pyqtSignal()
+    cancelled = pyqtSignal()
+
+    def __init__(self, text, backend, bracketed=False, chunk_size=4096, line_delay_ms=0,
+                 backlog_retry_ms=10, parent=None):
+        super().__init__(parent)
+        self.backend = backend
+        self.bracketed = bracketed
+        self.chunk_size = max(1, chunk_size)
+        self.line_delay_ms = max(0, line_delay_ms)
+        self.backlog_retry_ms = backlog_retry_ms
+
+        self.payload = prepare_paste_text(text, bracketed)
+        self.total = len(self.payload)
+        self.position = 0
+        self.active = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._pump)
+
+    def start(self):
+        """Begin streaming the paste"""
+        if self.active or not self.payload:
+            return
+        self.active = True
+        self._timer.start(0)
+
+    def cancel(self):
+        """Stop sending; closes an open bracket so the remote leaves paste mode"""
+        if not self.active:
+            return
+        self._timer.stop()
+        self.active = False
+
+        if self.bracketed and 0 < self.position < self.total:
+            self.backend.write_data(BRACKETED_PASTE_END)
+
+        self.cancelled.emit()
+
+    def _backend_backlogged(self):
+        """Check the backend send queue's high-water mark when it has one"""
+        send_queue = getattr(self.backend, 'send_queue', None)
+        return bool(send_queue is not None and send_queue.is_backlogged)
+
+    def _next_chunk(self):
+        """Slice the next piece of the payload"""
+        end = min(self.position + self.chunk_size, self.total)
+        if self.line_delay_ms:
+            # Pacing sends one line per tick, newline included
+            newline = self.payload.find('\n', self.position, end)
+            if newline != -1:
+                end = newline + 1
+        return self.payload[self.position:end]
+
+    def _pump(self):
+        """Send the next chunk and schedule the following one"""
+        if not self.active:
+            return
+
+        if self.backend is None or not getattr(self.backend, 'is_connected', True):
+            self.cancel()
+            return
+
+        if self._backend_backlogged():
+            # Let the writer thread catch up before queueing more
+            self._timer.start(self.backlog_retry_ms)
+            return
+
+        chunk = self._next_chunk()
+        self.backend.write_data(chunk)
+        self.position += len(chunk)
+        self.progress.emit(self.position, self.total)
+
+        if self.position >= self.total:
+            self.active = False
+            self.finished.emit()
+            return
+
+        delay = self.line_delay_ms if self.line_delay_ms and chunk.endswith('\n') else 0
+        self._timer.start(delay)
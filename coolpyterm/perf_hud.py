@@ -0,0 +1,205 @@
+"""
+On-screen performance HUD
+
+PerfHud collects per-frame and per-second counters for the grid widget and
+publishes a few lines of text into the widget's overlay. It exists only while
+the HUD is shown; every hook in the hot paths is guarded by a None check, so
+a hidden HUD costs one attribute lookup per chunk and per frame.
+
+The HUD never schedules repaints of its own. Its text is refreshed from
+inside frames the widget was already drawing.
+"""
+import sys
+import threading
+import time
+
+import numpy as np
+
+from coolpyterm.app_logging import get_logger
+
+try:
+    from OpenGL.GL import (glGenQueries, glDeleteQueries, glBeginQuery, glEndQuery,
+                           glGetQueryObjectiv, glGetQueryObjectui64v,
+                           GL_TIME_ELAPSED, GL_QUERY_RESULT, GL_QUERY_RESULT_AVAILABLE)
+    GPU_TIMERS_AVAILABLE = True
+except ImportError:
+    GPU_TIMERS_AVAILABLE = False
+
+log = get_logger('perf')
+
+
+class GpuFrameTimer:
+    """
+    GL_TIME_ELAPSED queries in a small ring
+
+    Results are read a few frames late so the CPU never waits on the GPU.
+    All methods must run with the widget's GL context current.
+    """
+
+    def __init__(self, depth=4):
+        self.depth = depth
+        self.queries = []
+        self.active = [False] * depth
+        self.index = 0
+        self.last_ns = None
+        self.failed = not GPU_TIMERS_AVAILABLE
+        self._result = np.zeros(1, dtype=np.uint64)
+        self._available = np.zeros(1, dtype=np.int32)
+
+    def begin(self):
+        if self.failed:
+            return
+        try:
+            if not self.queries:
+                self.queries = list(np.atleast_1d(glGenQueries(self.depth)))
+            query = self.queries[self.index]
+            if self.active[self.index]:
+                glGetQueryObjectiv(query, GL_QUERY_RESULT_AVAILABLE, self._available)
+                if self._available[0]:
+                    glGetQueryObjectui64v(query, GL_QUERY_RESULT, self._result)
+                    self.last_ns = int(self._result[0])
+            glBeginQuery(GL_TIME_ELAPSED, query)
+        except Exception as e:
+            # Timer queries need GL 3.3 / ARB_timer_query; fall back to CPU-only numbers
+            log.warning("GPU frame timing unavailable: %s", e)
+            self.failed = True
+
+    def end(self):
+        if self.failed or not self.queries:
+            return
+        try:
+            glEndQuery(GL_TIME_ELAPSED)
+            self.active[self.index] = True
+            self.index = (self.index + 1) % self.depth
+        except Exception as e:
+            log.warning("GPU frame timing unavailable: %s", e)
+            self.failed = True
+
+    def release(self):
+        if self.queries and not self.failed:
+            try:
+                glDeleteQueries(len(self.queries), self.queries)
+            except Exception:
+                pass
+        self.queries = []
+        self.active = [False] * self.depth
+
+
+class PerfHud:
+    """Counters behind the HUD; published as overlay text about twice a second"""
+
+    def __init__(self, widget, stats_provider=None, refresh_interval=0.5):
+        self.widget = widget
+        # Optional callable returning extra {label: value} from the terminal
+        self.stats_provider = stats_provider
+        self.refresh_interval = refresh_interval
+        self.gpu_timer = GpuFrameTimer()
+
+        self._lock = threading.Lock()
+        # Both sides count decoded characters, so the backlog is their difference
+        self._chars_received = 0  # reader threads
+        self._chars_ingested = 0  # GUI thread, after parsing
+        self._frame_dirty = set()
+
+        self._window_start = time.perf_counter()
+        self._frames = 0
+        self._cpu_frame_ns = 0
+        self._upload_bytes = 0
+        self._dirty_rows = 0
+        self._frame_start = 0
+
+        self.lines = []
+        self.received_total = 0
+        self.ingested_total = 0
+
+    # --- hooks ------------------------------------------------------------
+
+    def chars_received(self, count):
+        """Reader thread: characters decoded from the backend's output"""
+        with self._lock:
+            self._chars_received += count
+
+    def chars_ingested(self, count, dirty_rows=()):
+        """GUI thread: characters fed to the parser and the rows they touched"""
+        self._chars_ingested += count
+        self._frame_dirty.update(dirty_rows)
+
+    def texture_uploaded(self, nbytes):
+        """GUI thread: bytes handed to glTexImage/glTexSubImage this frame"""
+        self._upload_bytes += nbytes
+
+    def frame_begin(self):
+        self._frame_start = time.perf_counter_ns()
+        self.gpu_timer.begin()
+
+    def frame_end(self):
+        """End of paintGL: account the frame and refresh the text when due"""
+        self.gpu_timer.end()
+        self._cpu_frame_ns += time.perf_counter_ns() - self._frame_start
+        self._frames += 1
+        self._dirty_rows += len(self._frame_dirty)
+        self._frame_dirty.clear()
+
+        now = time.perf_counter()
+        if now - self._window_start >= self.refresh_interval:
+            self._publish(now)
+
+    # --- reporting ----------------------------------------------------------
+
+    def _publish(self, now):
+        elapsed = now - self._window_start
+        frames = max(self._frames, 1)
+
+        with self._lock:
+            received = self._chars_received
+            self._chars_received = 0
+        ingested = self._chars_ingested
+        self.received_total += received
+        self.ingested_total += ingested
+
+        gpu_ms = self.gpu_timer.last_ns / 1e6 if self.gpu_timer.last_ns is not None else None
+        lines = [
+            f"FPS        {self._frames / elapsed:7.1f}",
+            f"CPU frame  {self._cpu_frame_ns / frames / 1e6:7.2f} ms",
+            f"GPU frame  {gpu_ms:7.2f} ms" if gpu_ms is not None else "GPU frame      n/a",
+            f"ingest     {ingested / elapsed / 1000:7.1f} kchar/s",
+            f"backlog    {max(0, self.received_total - self.ingested_total) / 1000:7.1f} kchar",
+            f"upload     {self._upload_bytes / frames / 1024:7.1f} KiB/frame",
+            f"dirty rows {self._dirty_rows / frames:7.1f} /frame",
+        ]
+        if self.stats_provider is not None:
+            for label, value in self.stats_provider().items():
+                lines.append(f"{label:<10} {value}")
+
+        self.lines = lines
+        # Written directly: the frame being drawn shows it, no extra update() needed
+        self.widget.overlay_sections['perf'] = lines
+
+        self._window_start = now
+        self._frames = 0
+        self._cpu_frame_ns = 0
+        self._upload_bytes = 0
+        self._dirty_rows = 0
+        self._chars_ingested = 0
+
+    def release(self):
+        self.gpu_timer.release()
+        self.widget.overlay_sections.pop('perf', None)
+
+
+def estimate_lines_size(lines, samples=8):
+    """Approximate memory of a sequence of pyte lines by deep-sizing a few of them"""
+    count = len(lines)
+    if not count:
+        return 0
+    step = max(1, count // samples)
+    sampled = 0
+    total = 0
+    for index in range(0, count, step):
+        line = lines[index]
+        size = sys.getsizeof(line)
+        if isinstance(line, dict):
+            size += sum(sys.getsizeof(char) for char in line.values())
+        total += size
+        sampled += 1
+    return total * count // sampled
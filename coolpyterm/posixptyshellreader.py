@@ -0,0 +1,365 @@
+"""
+POSIX Terminal Backend Implementation for CoolPyTerm
+Runs a local shell on Linux/macOS through a native pseudo-terminal,
+matching the SSHBackend / WindowsTerminalBackend contract
+"""
+
+import codecs
+import errno
+import fcntl
+import os
+import pty
+import select
+import shlex
+import signal
+import struct
+import termios
+import threading
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot, QTimer
+
+from coolpyterm import tracing
+from coolpyterm.app_logging import get_logger
+from coolpyterm.send_queue import SendQueueThread
+
+log = get_logger('pty')
+
+# Child pid -> backend, for SIGCHLD based exit detection. Reentrant: the
+# handler runs on the main thread, possibly in the middle of a registration.
+_children = {}
+_children_lock = threading.RLock()
+_previous_sigchld_handler = None
+
+
+def _reap(pid):
+    """If child pid has exited, forget it and notify its backend on the GUI thread"""
+    with _children_lock:
+        if pid not in _children:
+            return False
+        try:
+            reaped_pid, status = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            reaped_pid, status = pid, 0
+        if reaped_pid != pid:
+            return False
+        backend = _children.pop(pid, None)
+    if backend is None:
+        return False  # reaped by a handler that interrupted us
+    exit_code = os.waitstatus_to_exitcode(status)
+    QTimer.singleShot(0, lambda: backend._on_child_exited(exit_code))
+    return True
+
+
+def _register_child(pid, backend):
+    """Watch pid for exit, including an exit that happened before this call"""
+    with _children_lock:
+        _children[pid] = backend
+    # A SIGCHLD delivered between fork and registration found nothing to reap
+    _reap(pid)
+
+
+def _sigchld_handler(signum, frame):
+    """Reap exited shells and notify their backends on the GUI thread"""
+    for pid in list(_children):
+        _reap(pid)
+
+    if callable(_previous_sigchld_handler):
+        _previous_sigchld_handler(signum, frame)
+
+
+def _install_sigchld_handler():
+    """Install the SIGCHLD handler once; must run on the main thread"""
+    global _previous_sigchld_handler
+    current = signal.getsignal(signal.SIGCHLD)
+    if current is _sigchld_handler:
+        return
+    _previous_sigchld_handler = current
+    signal.signal(signal.SIGCHLD, _sigchld_handler)
+
+
+class PosixPtyReaderThread(QThread):
+    """
+    POSIX PTY Reader Thread - mirrors ShellReaderThread / WinPtyReaderThread
+    Reads the non-blocking PTY master fd and emits decoded text
+    """
+    data_ready = pyqtSignal(str)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, master_fd, parent_widget=None):
+        super().__init__()
+        self.master_fd = master_fd
+        self.parent_widget = parent_widget
+        self.running = True
+        self.buffer_size = 65536
+        # Incremental decoder so multi-byte characters split across reads survive
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    def run(self):
+        """Main thread loop - waits on the master fd and reads what is available"""
+        while self.running:
+            try:
+                readable, _, _ = select.select([self.master_fd], [], [], 0.1)
+                if not readable:
+                    continue
+
+                data = os.read(self.master_fd, self.buffer_size)
+                if not data:
+                    break
+
+                with tracing.span('recv', 'reader', bytes=len(data)):
+                    text_data = self.decoder.decode(data)
+                    received = getattr(self.parent_widget, 'on_raw_received', None)
+                    if received is not None:
+                        received(data, text_data)
+                    if text_data:
+                        self.data_ready.emit(text_data)
+
+            except BlockingIOError:
+                continue
+            except OSError as e:
+                # EIO on the master means the child side of the PTY closed
+                if e.errno not in (errno.EIO, errno.EBADF):
+                    self.error_occurred.emit(str(e))
+                break
+
+        log.debug("PosixPtyReaderThread stopped")
+
+    def stop(self):
+        """Stop the reader thread"""
+        self.running = False
+        self.wait(2000)
+
+
+class PosixTerminalBackend(QObject):
+    """
+    POSIX Terminal Backend - mirrors SSHBackend exactly
+    Uses pty.fork instead of an SSH channel
+    """
+    send_output = pyqtSignal(str)
+    connection_failed = pyqtSignal(str)
+    connection_established = pyqtSignal()
+    process_exited = pyqtSignal(int)
+
+    def __init__(self, shell_path=None, working_dir=None, env_vars=None,
+                 startup_command=None, parent_widget=None, parent=None):
+        super().__init__(parent)
+        self.parent_widget = parent_widget
+        self.shell_path = shell_path or os.environ.get('SHELL') or '/bin/sh'
+        self.working_dir = working_dir or os.path.expanduser('~')
+        self.env_vars = env_vars or {}
+        self.startup_command = startup_command
+
+        # PTY components
+        self.pid = None
+        self.master_fd = None
+        self.reader_thread = None
+        self.send_queue = None
+        self.exit_code = None
+        self.is_connected = False
+
+        log.info("Initializing POSIX Terminal Backend: %s", self.shell_path)
+
+        # Connect immediately like the SSH backend
+        try:
+            self._attempt_connection()
+        except Exception as e:
+            error_msg = f"Local Terminal Connection Error: {str(e)}"
+            log.error("%s", error_msg)
+            QTimer.singleShot(10, lambda: self.connection_failed.emit(error_msg))
+
+    def _attempt_connection(self):
+        """Fork the shell on a new pseudo-terminal"""
+        argv = shlex.split(self.shell_path)
+        env = self._prepare_environment()
+
+        _install_sigchld_handler()
+
+        pid, master_fd = pty.fork()
+        if pid == 0:
+            # Child: never return into the Qt application
+            try:
+                os.chdir(self.working_dir)
+            except OSError:
+                pass
+            try:
+                os.execvpe(argv[0], argv, env)
+            finally:
+                os._exit(127)
+
+        self.pid = pid
+        self.master_fd = master_fd
+        os.set_blocking(self.master_fd, False)
+        _register_child(pid, self)
+
+        self._set_winsize(24, 80)
+        self.is_connected = True
+        log.info("Started %s (pid %s) in %s", argv[0], pid, self.working_dir)
+
+        self.send_queue = SendQueueThread(self._write_fd, name=f"pty-send-{pid}")
+        self.send_queue.send_failed.connect(self._on_error)
+        self.send_queue.start()
+
+        # Signal connection ready - same pattern as SSH backend
+        QTimer.singleShot(50, self._signal_connection_ready)
+
+    def _prepare_environment(self):
+        """Prepare environment variables"""
+        env = os.environ.copy()
+        env.update(self.env_vars)
+        env['TERM'] = 'xterm'
+        env['COLUMNS'] = '80'
+        env['LINES'] = '24'
+        return env
+
+    def _signal_connection_ready(self):
+        """Signal connection ready - exactly like SSH backend"""
+        self.connection_established.emit()
+
+        # Start reader thread after signals are connected
+        QTimer.singleShot(100, self._start_reader_thread)
+
+    def _start_reader_thread(self):
+        """Start the reader thread - mirrors SSH backend pattern"""
+        if self.master_fd is None:
+            log.error("No PTY available for reader thread")
+            return
+
+        self.reader_thread = PosixPtyReaderThread(self.master_fd, self.parent_widget)
+        self.reader_thread.data_ready.connect(self._on_data_received)
+        self.reader_thread.error_occurred.connect(self._on_error)
+        self.reader_thread.start()
+
+        if self.startup_command:
+            QTimer.singleShot(500, lambda: self.write_data(self.startup_command + "\n"))
+
+    def _on_data_received(self, data):
+        """Forward PTY output to the UI"""
+        self.send_output.emit(data)
+
+    def _on_error(self, error_msg):
+        """Handle errors from the reader or writer thread"""
+        if not self.is_connected:
+            # Expected while closing or after the shell exited
+            return
+        log.error("POSIX terminal error: %s", error_msg)
+        self.connection_failed.emit(error_msg)
+
+    def _on_child_exited(self, exit_code):
+        """Called on the GUI thread once SIGCHLD reaped the shell"""
+        self.exit_code = exit_code
+        self.is_connected = False
+        log.info("Local shell (pid %s) exited with code %s", self.pid, exit_code)
+        self.process_exited.emit(exit_code)
+
+    def _write_fd(self, data):
+        """Write all bytes to the non-blocking master fd (runs on the send queue thread)"""
+        view = memoryview(data)
+        while view:
+            try:
+                written = os.write(self.master_fd, view)
+                view = view[written:]
+            except BlockingIOError:
+                # PTY input buffer full - wait until the shell drains it
+                select.select([], [self.master_fd], [], 1.0)
+
+    def _set_winsize(self, rows, cols):
+        """Apply the window size to the PTY; the kernel delivers SIGWINCH"""
+        fcntl.ioctl(self.master_fd, termios.TIOCSWINSZ, struct.pack('HHHH', rows, cols, 0, 0))
+
+    @pyqtSlot(str)
+    def write_data(self, data):
+        """Queue data for the shell - matches SSH backend API exactly"""
+        if not self.is_connected:
+            log.error("Error: Not connected to terminal")
+            return
+        self.send_queue.enqueue(data)
+
+    def send_command(self, data):
+        """Compatibility method for KeyHandler"""
+        self.write_data(data)
+
+    @property
+    def bytes_pending(self):
+        """Bytes written by the UI but not yet accepted by the PTY"""
+        return self.send_queue.bytes_pending if self.send_queue else 0
+
+    @pyqtSlot(str)
+    def set_pty_size(self, data):
+        """Set PTY size - matches SSH backend API exactly"""
+        if not self.is_connected:
+            return
+
+        try:
+            # Parse format: "cols:80::rows:24"
+            cols = int(data.split("::")[0].split(":")[1])
+            rows = int(data.split("::")[1].split(":")[1])
+            self._set_winsize(rows, cols)
+            log.debug("POSIX pty resize -> cols:%s rows:%s", cols, rows)
+        except Exception as e:
+            log.error("Error setting terminal pty size: %s", e)
+
+    def close(self):
+        """Clean up resources - matches SSH backend pattern"""
+        self.is_connected = False
+        log.info("Closing POSIX terminal backend...")
+
+        if self.send_queue:
+            self.send_queue.request_stop()
+
+        try:
+            if self.reader_thread and self.reader_thread.isRunning():
+                self.reader_thread.stop()
+        except Exception as e:
+            log.error("Error stopping reader thread: %s", e)
+
+        try:
+            if self.pid and self.pid in _children:
+                # Hang up the shell the way closing a terminal window does
+                os.kill(self.pid, signal.SIGHUP)
+        except ProcessLookupError:
+            pass
+        except Exception as e:
+            log.error("Error signalling shell: %s", e)
+
+        try:
+            if self.master_fd is not None:
+                os.close(self.master_fd)
+                self.master_fd = None
+        except OSError as e:
+            log.error("Error closing PTY: %s", e)
+
+        if self.send_queue:
+            self.send_queue.stop()
+
+
+def get_available_posix_shells():
+    """
+    Detect login shells listed in /etc/shells for the connection dialog
+    """
+    shells = []
+    seen = set()
+
+    try:
+        with open('/etc/shells', encoding='utf-8') as f:
+            candidates = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    except OSError:
+        candidates = ['/bin/bash', '/bin/zsh', '/bin/sh']
+
+    default_shell = os.environ.get('SHELL')
+    if default_shell:
+        candidates.insert(0, default_shell)
+
+    for path in candidates:
+        real_path = os.path.realpath(path)
+        if real_path in seen or not os.access(path, os.X_OK):
+            continue
+        seen.add(real_path)
+        name = os.path.basename(path)
+        shells.append({
+            "name": f"{name} (default)" if path == default_shell else name,
+            "description": f"Local shell {path}",
+            "shell_path": path,
+            "type": "posix"
+        })
+
+    return shells
@@ -0,0 +1,133 @@
+"""
+Time-boxed profiling sessions
+
+ProfilingSession runs cProfile on the thread that starts it (the GUI thread)
+and, in parallel, a sampler thread that snapshots every other thread's stack
+with sys._current_frames() at a fixed interval. cProfile only sees the
+thread it was enabled on, so the sampler is what covers the backend reader
+and send queue threads.
+
+stop() writes two files next to each other:
+
+    <name>.pstats          cProfile stats (python -m pstats, snakeviz, ...)
+    <name>.collapsed.txt   "thread;frame;frame... count" lines for
+                           flamegraph.pl, speedscope or inferno
+
+The session does not schedule its own end; the caller stops it (the window
+uses a single-shot QTimer).
+"""
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from coolpyterm.app_logging import get_logger
+
+log = get_logger('perf')
+
+
+class ProfilingSession:
+    """cProfile on the calling thread plus stack sampling of all other threads"""
+
+    def __init__(self, output_dir="profiles", session_id=None, connection_type=None,
+                 sample_interval=0.005):
+        self.output_dir = output_dir
+        self.session_id = session_id or "session"
+        self.connection_type = connection_type or "none"
+        self.sample_interval = sample_interval
+
+        self.profile = cProfile.Profile()
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.duration = 0.0
+
+        self._stop_event = threading.Event()
+        self._sampler = None
+        self._profiled_thread = None
+
+    @property
+    def running(self):
+        return self.started_at is not None and not self._stop_event.is_set()
+
+    def start(self):
+        """Begin profiling; must be called on the thread cProfile should cover"""
+        self._profiled_thread = threading.get_ident()
+        self.started_at = time.perf_counter()
+        self._sampler = threading.Thread(target=self._sample_loop, name="ProfilerSampler", daemon=True)
+        self._sampler.start()
+        self.profile.enable()
+        log.info("Profiling session %s (%s) started", self.session_id, self.connection_type)
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop_event.wait(self.sample_interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or ident == self._profiled_thread:
+                    continue
+                if ident not in names:
+                    names[ident] = _thread_name(ident, frame)
+                self.stacks[_collapse(names[ident], frame)] += 1
+            self.samples += 1
+
+    def stop(self):
+        """End profiling and write the result files; returns (pstats path, collapsed path)"""
+        if not self.running:
+            return None
+        self.profile.disable()
+        self._stop_event.set()
+        self._sampler.join(timeout=1.0)
+        self.duration = time.perf_counter() - self.started_at
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, self.file_stem())
+        pstats_path = base + ".pstats"
+        collapsed_path = base + ".collapsed.txt"
+
+        self.profile.dump_stats(pstats_path)
+        with open(collapsed_path, 'w', encoding='utf-8') as f:
+            for stack, samples in self.stacks.most_common():
+                f.write(f"{stack} {samples}\n")
+
+        log.info("Profiling session %s finished after %.1fs (%d stack samples): %s, %s",
+                 self.session_id, self.duration, self.samples, pstats_path, collapsed_path)
+        return pstats_path, collapsed_path
+
+    def file_stem(self):
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        return f"profile-{_safe(self.session_id)}-{_safe(self.connection_type)}-{stamp}"
+
+
+def _safe(text):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', str(text))
+
+
+def _thread_name(ident, frame):
+    """Python thread name when known, else named after the outermost frame (QThread.run)"""
+    thread = threading._active.get(ident)
+    if thread is not None and not isinstance(thread, threading._DummyThread):
+        return thread.name
+    while frame.f_back is not None:
+        frame = frame.f_back
+    code = frame.f_code
+    owner = getattr(code, 'co_qualname', code.co_name).split('.')[0]
+    return f"{owner}-{ident}"
+
+
+def _collapse(thread_name, frame):
+    """Root-first 'thread;frame;frame' string for one stack"""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        name = getattr(code, 'co_qualname', code.co_name)
+        parts.append(f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    parts.append(thread_name)
+    parts.reverse()
+    # ';' separates frames in the collapsed format
+    return ';'.join(part.replace(';', ':') for part in parts)
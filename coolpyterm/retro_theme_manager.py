@@ -2,6 +2,10 @@ from PyQt6.QtGui import QColor
 from dataclasses import dataclass, field
 from typing import Dict, Any
 
+from coolpyterm.app_logging import get_logger
+
+log = get_logger('config')
+
 
 @dataclass
 class TerminalTheme:
@@ -235,9 +239,9 @@ class RetroThemeManager:
         """Set the current active theme"""
         if theme_name in self.themes:
             self.current_theme = theme_name
-            print(f"Theme changed to: {self.themes[theme_name].name}")
+            log.info("Theme changed to: %s", self.themes[theme_name].name)
         else:
-            print(f"Theme '{theme_name}' not found")
+            log.warning("Theme '%s' not found", theme_name)
 
     def get_current_theme(self) -> TerminalTheme:
         """Get the currently active theme"""
@@ -305,7 +309,7 @@ class RetroThemeManager:
     def create_custom_theme(self, name: str, base_theme: str = "green", **overrides) -> bool:
         """Create custom theme with CRT properties"""
         if base_theme not in self.themes:
-            print(f"Base theme '{base_theme}' not found")
+            log.warning("Base theme '%s' not found", base_theme)
             return False
 
         base = self.themes[base_theme]
@@ -346,7 +350,7 @@ class RetroThemeManager:
         )
 
         self.themes[name] = new_theme
-        print(f"Created custom theme: {name}")
+        log.info("Created custom theme: %s", name)
         return True
 
 
@@ -0,0 +1,218 @@
+"""
+Scrollback store: a fixed-capacity ring of the lines scrolled off the screen
+
+Lines are whatever the parser hands over (pyte lines or Char tuples; see
+vt_session.line_cells). Appending and reading line i are O(1) at any fill
+level, so drawing a viewport costs its height in lines no matter how deep in
+a million-line history it sits.
+
+After a column change reflow() rewraps the lines to the new width, newest
+first and a slice at a time (reflow_step), so the owner can do the lines in
+view at once and the rest of a long history in the background. Meanwhile
+the buffer reads as the lines still waiting, oldest first, followed by the
+rewrapped ones and whatever was appended since.
+"""
+import gc
+from contextlib import contextmanager
+
+from coolpyterm.vt_session import is_wrapped, rewrap
+
+# Rewrapping a long history allocates a new row per line within seconds, and
+# each such burst sets off full collections that walk every cell of every row
+# (Chars are tuples, so rows are never untracked): pauses of a second or more
+# at a million lines. Rewrapped rows hold no cycles, so automatic collection
+# is held off while a slice rewraps, and the new rows are then moved straight
+# to the oldest generation (freeze/unfreeze) instead of being scanned once
+# more as young objects. The hold never outlasts the slice: collection is
+# process-wide, and the rest of the app allocates between slices.
+
+
+@contextmanager
+def _gc_held():
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.freeze()
+            gc.unfreeze()
+            gc.enable()
+
+
+class ScrollbackBuffer:
+    """Ring of scrolled-off lines, oldest first; full rings overwrite the oldest"""
+
+    def __init__(self, capacity=1000):
+        self.capacity = max(1, capacity)
+        self._lines = []
+        self._start = 0  # index of the oldest line once the ring has wrapped
+        self._reflow = None
+
+    def __len__(self):
+        if self._reflow is not None:
+            return min(self._reflow.count(), self.capacity)
+        return len(self._lines)
+
+    def __getitem__(self, index):
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("scrollback index out of range")
+        if self._reflow is not None:
+            return self._reflow.line(index + self._reflow.count() - count)
+        return self._lines[(self._start + index) % count]
+
+    def __iter__(self):
+        if self._reflow is not None:
+            lines = self._reflow.lines()
+            return iter(lines[len(lines) - len(self):])
+        lines = self._lines
+        return iter(lines[self._start:] + lines[:self._start])
+
+    def append(self, line):
+        if self._reflow is not None:
+            self._reflow.appended.append(line)
+            return
+        lines = self._lines
+        if len(lines) < self.capacity:
+            lines.append(line)
+        else:
+            lines[self._start] = line
+            self._start = (self._start + 1) % self.capacity
+
+    def extend(self, lines):
+        for line in lines[-self.capacity:]:
+            self.append(line)
+
+    def window(self, start, count):
+        """Lines start .. start + count - 1 (clipped to what is stored), oldest first"""
+        stop = min(start + count, len(self))
+        return [self[index] for index in range(max(0, start), stop)]
+
+    def set_capacity(self, capacity):
+        """Change the capacity, keeping the newest lines"""
+        capacity = max(1, capacity)
+        if capacity == self.capacity:
+            return
+        kept = list(self)[-capacity:]
+        self.capacity = capacity
+        self._reflow = None
+        self._lines = kept
+        self._start = 0
+
+    def clear(self):
+        self._lines = []
+        self._start = 0
+        self._reflow = None
+
+    # --- Reflow -------------------------------------------------------------------
+
+    @property
+    def reflowing(self):
+        return self._reflow is not None
+
+    def reflow(self, columns):
+        """Start rewrapping every line to `columns`; nothing is rewrapped until reflow_step()"""
+        # The reflow takes over the stored list rather than copying it: a
+        # copy touches every line, which is most of the cost at a million
+        if self._reflow is not None:
+            lines = self._reflow.take(self.capacity)
+        elif self._start:
+            lines = self._lines[self._start:] + self._lines[:self._start]
+        else:
+            lines = self._lines
+        if not lines:
+            self._reflow = None
+            return
+        self._reflow = _Reflow(lines, columns)
+        self._lines = []
+        self._start = 0
+
+    def reflow_step(self, lines):
+        """Rewrap at least `lines` more of the waiting lines, newest first; False once all are done"""
+        reflow = self._reflow
+        if reflow is None:
+            return False
+        with _gc_held():
+            reflow.step(lines)
+        # Lines past the capacity would be dropped once rewrapped; stop there
+        if reflow.waiting and len(reflow.done) + len(reflow.appended) < self.capacity:
+            return True
+        self._lines = reflow.take(self.capacity)
+        self._start = 0
+        self._reflow = None
+        return False
+
+    def reflow_view(self, count):
+        """Rewrap until the newest `count` lines are all rewrapped ones; False once all are done"""
+        while self._reflow is not None and len(self._reflow.done) + len(self._reflow.appended) < count:
+            self.reflow_step(count)
+        return self._reflow is not None
+
+    def stop_reflow(self):
+        """Give up on a reflow, keeping the lines as they stand (partly rewrapped)"""
+        if self._reflow is not None:
+            self._lines = self._reflow.take(self.capacity)
+            self._start = 0
+            self._reflow = None
+
+
+class _Reflow:
+    """A reflow in progress: waiting[:] then done (stored newest first) then appended"""
+
+    # Longest run of soft-wrapped lines rewrapped as one; a longer one is cut
+    # into several, each of which ends in a short row
+    MAX_RUN = 4096
+
+    def __init__(self, lines, columns):
+        self.waiting = lines
+        self.columns = columns
+        self.done = []
+        self.appended = []
+
+    def count(self):
+        return len(self.waiting) + len(self.done) + len(self.appended)
+
+    def line(self, index):
+        waiting = len(self.waiting)
+        if index < waiting:
+            return self.waiting[index]
+        index -= waiting
+        done = len(self.done)
+        if index < done:
+            return self.done[done - 1 - index]
+        return self.appended[index - done]
+
+    def lines(self):
+        return self.waiting + self.done[::-1] + self.appended
+
+    def take(self, capacity):
+        """The newest `capacity` lines, oldest first, built from the lists in place; spends the reflow"""
+        lines = self.done
+        lines.reverse()
+        lines.extend(self.appended)
+        if len(lines) < capacity and self.waiting:
+            del self.waiting[:max(0, len(self.waiting) + len(lines) - capacity)]
+            self.waiting.extend(lines)
+            lines = self.waiting
+        del lines[:max(0, len(lines) - capacity)]
+        self.waiting, self.done, self.appended = [], [], []
+        return lines
+
+    def step(self, budget):
+        waiting = self.waiting
+        done = self.done
+        end = len(waiting)
+        stop = max(0, end - budget)
+        while end > stop:
+            # The logical line ending at end - 1 starts after the last unwrapped line before it
+            start = end - 1
+            limit = max(0, end - self.MAX_RUN)
+            while start > limit and is_wrapped(waiting[start - 1]):
+                start -= 1
+            rows, _ = rewrap(waiting[start:end], self.columns)
+            done.extend(reversed(rows))
+            end = start
+        del waiting[end:]
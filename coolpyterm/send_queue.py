@@ -0,0 +1,136 @@
+"""
+Outbound send queue for terminal backends
+
+Writes from the GUI thread are appended to a queue and return immediately.
+A writer thread drains the queue as fast as the transport accepts data,
+coalescing small writes (keystrokes, paste chunks) into larger sends.
+"""
+import threading
+from collections import deque
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+class SendQueueThread(QThread):
+    """
+    Writer thread owning the outbound side of a backend connection
+
+    send_func is called from this thread with coalesced bytes and may block
+    (e.g. paramiko Channel.sendall waiting for the remote window to open).
+    """
+    send_failed = pyqtSignal(str)
+
+    def __init__(self, send_func, max_chunk=32768, high_water=256 * 1024, name="send-queue"):
+        super().__init__()
+        self.send_func = send_func
+        self.max_chunk = max_chunk
+        self.high_water = high_water
+        self.setObjectName(name)
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._bytes_pending = 0
+        self._running = True
+
+        # Counters for observability
+        self.bytes_sent = 0
+        self.sends = 0
+        # Optional callable(nbytes) run on this thread after each send (latency probes)
+        self.on_sent = None
+
+    @property
+    def queue_length(self):
+        """Number of queued writes not yet handed to the transport"""
+        return len(self._queue)
+
+    @property
+    def bytes_pending(self):
+        """Bytes enqueued but not yet sent"""
+        return self._bytes_pending
+
+    @property
+    def is_backlogged(self):
+        """True while pending bytes exceed the high-water mark"""
+        return self._bytes_pending >= self.high_water
+
+    def stats(self):
+        """Snapshot of queue counters"""
+        return {
+            'queue_length': self.queue_length,
+            'bytes_pending': self._bytes_pending,
+            'bytes_sent': self.bytes_sent,
+            'sends': self.sends,
+        }
+
+    def enqueue(self, data):
+        """Queue data for sending without blocking the caller"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if not data or not self._running:
+            return
+
+        with self._cond:
+            self._queue.append(data)
+            self._bytes_pending += len(data)
+            self._cond.notify()
+
+    def _take_batch(self):
+        """Pop queued writes and join them into a single send of up to max_chunk bytes"""
+        parts = []
+        size = 0
+        while self._queue and size < self.max_chunk:
+            item = self._queue[0]
+            room = self.max_chunk - size
+            if len(item) > room:
+                # Split oversized writes so one paste can't monopolise a send
+                parts.append(item[:room])
+                self._queue[0] = item[room:]
+                size += room
+                break
+            parts.append(self._queue.popleft())
+            size += len(item)
+        return b"".join(parts)
+
+    def run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._running:
+                    break
+                batch = self._take_batch()
+
+            try:
+                self.send_func(batch)
+            except Exception as e:
+                self._running = False
+                self.send_failed.emit(str(e))
+                break
+
+            with self._cond:
+                self._bytes_pending -= len(batch)
+            self.bytes_sent += len(batch)
+            self.sends += 1
+
+            on_sent = self.on_sent
+            if on_sent is not None:
+                on_sent(len(batch))
+
+    def clear(self):
+        """Drop everything not yet sent"""
+        with self._cond:
+            # A batch already handed to send_func stays counted until it completes
+            self._bytes_pending -= sum(len(item) for item in self._queue)
+            self._queue.clear()
+
+    def request_stop(self):
+        """Ask the writer thread to exit after its current send"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def stop(self, timeout_ms=2000):
+        """Stop the writer thread; unsent data is discarded"""
+        self.request_stop()
+        if self.isRunning():
+            self.wait(timeout_ms)
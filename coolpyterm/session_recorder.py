@@ -0,0 +1,303 @@
+"""
+Raw session recording and replay
+
+SessionRecorder captures the exact bytes a backend receives, with monotonic
+timestamps and terminal resize events, in a compact binary file:
+
+    MAGIC, uint32 header length, JSON header,
+    then records of  kind (1 byte) | offset ns (uint64) | length (uint32) | payload
+
+Recordings export to asciicast v2 for sharing, and ReplayBackend plays them
+back into a terminal at real-time, accelerated or as-fast-as-possible speed,
+which doubles as a reproducible workload for parser and render measurements.
+"""
+import codecs
+import json
+import os
+import struct
+import threading
+import time
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+
+from coolpyterm.app_logging import get_logger
+
+log = get_logger('session')
+
+
+MAGIC = b"CPTREC\x01\n"
+RECORD_HEADER = struct.Struct('<cQI')
+
+OUTPUT = b'o'
+RESIZE = b'r'
+
+
+class RecordingFormatError(Exception):
+    """Raised when a file is not a CoolPyTerm session recording"""
+
+
+class SessionRecorder:
+    """
+    Append-only writer for one recording
+
+    record_output() is called from backend reader threads, so writes are
+    serialized with a lock; the file is buffered and flushed on close.
+    """
+
+    def __init__(self, path, cols=80, rows=24, title=None, term='xterm'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._start_ns = time.monotonic_ns()
+        self.events = 0
+        self.bytes_recorded = 0
+
+        record_dir = os.path.dirname(path)
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+
+        header = json.dumps({
+            'version': 1,
+            'width': cols,
+            'height': rows,
+            'timestamp': int(time.time()),
+            'title': title,
+            'term': term,
+        }).encode('utf-8')
+
+        self._file = open(path, 'wb', buffering=256 * 1024)
+        self._file.write(MAGIC)
+        self._file.write(struct.pack('<I', len(header)))
+        self._file.write(header)
+        log.info("Recording session to %s", path)
+
+    @property
+    def is_open(self):
+        return self._file is not None
+
+    def _write(self, kind, payload):
+        offset = time.monotonic_ns() - self._start_ns
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(RECORD_HEADER.pack(kind, offset, len(payload)))
+            self._file.write(payload)
+            self.events += 1
+            self.bytes_recorded += len(payload)
+
+    def record_output(self, data):
+        """Record bytes received from the backend (str is encoded as UTF-8)"""
+        if not data:
+            return
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self._write(OUTPUT, data)
+
+    def record_resize(self, cols, rows):
+        """Record a terminal size change"""
+        self._write(RESIZE, f"{cols}x{rows}".encode('ascii'))
+
+    def close(self):
+        """Flush and close the recording"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._file = None
+        log.info("Recording saved: %s (%s events, %s bytes)", self.path, self.events, self.bytes_recorded)
+
+
+def read_recording(path):
+    """
+    Load a recording
+
+    Returns (header dict, list of (seconds, kind, payload bytes)).
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise RecordingFormatError(f"{path} is not a CoolPyTerm recording")
+        (header_len,) = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(header_len).decode('utf-8'))
+
+        events = []
+        while True:
+            raw = f.read(RECORD_HEADER.size)
+            if len(raw) < RECORD_HEADER.size:
+                # A truncated trailing record (e.g. crash mid-write) is ignored
+                break
+            kind, offset_ns, length = RECORD_HEADER.unpack(raw)
+            payload = f.read(length)
+            if len(payload) < length:
+                break
+            events.append((offset_ns / 1e9, kind, payload))
+
+    return header, events
+
+
+def parse_resize(payload):
+    """Decode a resize payload into (cols, rows)"""
+    cols, rows = payload.decode('ascii').split('x')
+    return int(cols), int(rows)
+
+
+def export_asciicast(recording_path, cast_path):
+    """Convert a recording to an asciicast v2 file; returns the number of events written"""
+    header, events = read_recording(recording_path)
+
+    cast_header = {
+        'version': 2,
+        'width': header.get('width', 80),
+        'height': header.get('height', 24),
+        'timestamp': header.get('timestamp'),
+        'env': {'TERM': header.get('term', 'xterm')},
+    }
+    if header.get('title'):
+        cast_header['title'] = header['title']
+
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    written = 0
+    with open(cast_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(cast_header) + '\n')
+        for seconds, kind, payload in events:
+            if kind == OUTPUT:
+                text = decoder.decode(payload)
+                if not text:
+                    continue
+                event = [round(seconds, 6), 'o', text]
+            elif kind == RESIZE:
+                event = [round(seconds, 6), 'r', payload.decode('ascii')]
+            else:
+                continue
+            f.write(json.dumps(event, ensure_ascii=False) + '\n')
+            written += 1
+
+    log.info("Exported %s events to %s", written, cast_path)
+    return written
+
+
+class ReplayBackend(QObject):
+    """
+    Replay a recording as if it were a live backend
+
+    speed is a playback multiplier; 0 plays as fast as possible while still
+    yielding to the event loop between batches. max_idle caps long pauses
+    (seconds, None keeps the recorded timing).
+    """
+    send_output = pyqtSignal(str)
+    connection_failed = pyqtSignal(str)
+    connection_established = pyqtSignal()
+    resize_requested = pyqtSignal(int, int)  # cols, rows
+    replay_finished = pyqtSignal()
+
+    def __init__(self, recording_path, speed=1.0, max_idle=None, batch_events=64,
+                 parent_widget=None, parent=None):
+        super().__init__(parent)
+        self.recording_path = recording_path
+        self.parent_widget = parent_widget
+        self.speed = max(0.0, float(speed or 0))
+        self.max_idle = max_idle
+        self.batch_events = batch_events
+        self.is_connected = False
+
+        self.header = {}
+        self.events = []
+        self.position = 0
+        self._schedule = []
+        self._started_at = 0.0
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._pump)
+
+        try:
+            self.header, self.events = read_recording(recording_path)
+            self._schedule = self._build_schedule()
+            self.is_connected = True
+            log.info("Loaded recording %s: %s events", recording_path, len(self.events))
+            QTimer.singleShot(50, self._signal_connection_ready)
+        except (OSError, ValueError, RecordingFormatError) as e:
+            error_msg = f"Replay Error: {str(e)}"
+            log.error("%s", error_msg)
+            QTimer.singleShot(10, lambda: self.connection_failed.emit(error_msg))
+
+    def _build_schedule(self):
+        """Playback time of each event after idle capping"""
+        schedule = []
+        previous = 0.0
+        elapsed = 0.0
+        for seconds, _, _ in self.events:
+            gap = seconds - previous
+            if self.max_idle is not None:
+                gap = min(gap, self.max_idle)
+            elapsed += gap
+            previous = seconds
+            schedule.append(elapsed)
+        return schedule
+
+    def _signal_connection_ready(self):
+        self.connection_established.emit()
+        # Give the terminal a moment to hook up signals, like the live backends
+        QTimer.singleShot(100, self.start)
+
+    def start(self):
+        """Begin (or restart) playback from the current position"""
+        if not self.is_connected:
+            return
+        offset = self._schedule[self.position] if self.position < len(self._schedule) else 0.0
+        self._started_at = time.monotonic() - (offset / self.speed if self.speed else 0.0)
+        self._timer.start(0)
+
+    def _emit_event(self, kind, payload):
+        if kind == OUTPUT:
+            text = self._decoder.decode(payload)
+            if text:
+                self.send_output.emit(text)
+        elif kind == RESIZE:
+            self.resize_requested.emit(*parse_resize(payload))
+
+    def _pump(self):
+        """Emit every event that is due, then sleep until the next one"""
+        if not self.is_connected:
+            return
+
+        if self.speed:
+            now = (time.monotonic() - self._started_at) * self.speed
+            while self.position < len(self.events) and self._schedule[self.position] <= now:
+                _, kind, payload = self.events[self.position]
+                self._emit_event(kind, payload)
+                self.position += 1
+        else:
+            end = min(self.position + self.batch_events, len(self.events))
+            while self.position < end:
+                _, kind, payload = self.events[self.position]
+                self._emit_event(kind, payload)
+                self.position += 1
+
+        if self.position >= len(self.events):
+            self.is_connected = False
+            log.info("Replay of %s finished", self.recording_path)
+            self.replay_finished.emit()
+            return
+
+        if self.speed:
+            due = self._schedule[self.position] / self.speed
+            delay_ms = max(0, int((due - (time.monotonic() - self._started_at)) * 1000))
+            self._timer.start(delay_ms)
+        else:
+            self._timer.start(0)
+
+    @pyqtSlot(str)
+    def write_data(self, data):
+        """Replays are read-only; keystrokes are ignored"""
+
+    def send_command(self, data):
+        """Compatibility method for KeyHandler"""
+
+    @pyqtSlot(str)
+    def set_pty_size(self, data):
+        """Replays keep the recorded size changes"""
+
+    def close(self):
+        """Stop playback"""
+        self.is_connected = False
+        self._timer.stop()
@@ -13,6 +13,10 @@ from PyQt6.QtWidgets import (QWidget, QApplication, QMainWindow, QVBoxLayout,
 from PyQt6.QtCore import QTimer, Qt, pyqtSlot, QRect, QSettings, pyqtSignal
 from PyQt6.QtGui import QAction, QActionGroup, QFont, QFontMetrics, QColor, QPainter, QPen, QBrush, QImage, QKeySequence
 
+from coolpyterm.app_logging import get_logger
+
+log = get_logger('config')
+
 
 # Your existing imports would go here
 # from coolpyterm.opengl_grid_widget import OpenGLRetroGridWidget
@@ -57,6 +61,13 @@ class SettingsManager:
             'terminal/rows': 24,
             'terminal/theme': 'green',
             'terminal/scrollback_lines': 1000,
+            'terminal/scrollbar': True,
+            'terminal/smooth_scrolling': True,  # animate wheel and page scrolling through scrollback
+            'terminal/wheel_lines': 3,  # scrollback lines per wheel notch
+
+            # Paste
+            'paste/chunk_size': 4096,
+            'paste/line_delay_ms': 0,  # per-line pacing for slow device CLIs
 
             # Window
             'window/width': 1200,
@@ -71,6 +82,24 @@ class SettingsManager:
             'ssh/last_username': '',
             'ssh/last_port': 22,
             'ssh/save_credentials': False,
+            'ssh/key_cache_lifetime': 0,  # seconds, 0 = keep for the session
+
+            # Session logging
+            'logging/max_bytes': 10 * 1024 * 1024,  # rotate at this size, 0 = never
+            'logging/max_age': 0,  # rotate after this many seconds, 0 = never
+            'logging/backup_count': 5,
+            'logging/compress': True,  # gzip rotated logs
+
+            # Diagnostics
+            'diagnostics/profile_seconds': 10,  # length of a View > Profile session
+
+            # Tabs
+            'tabs/gl_release_seconds': 300,  # free a background tab's GL objects after this long, 0 = never
+
+            # Parsing
+            'parsing/mode': 'thread',  # 'thread', or 'process' to parse sessions in a process pool
+            'parsing/processes': 0,  # parser processes in 'process' mode, 0 = one per core
+            'parsing/engine': 'pyte',  # terminal emulation engine: 'pyte' or 'fast'
         }
 
     def get(self, key, default=None):
@@ -92,12 +121,12 @@ class SettingsManager:
         return bool(value)
 
     def get_int(self, key):
-        """Get integer setting"""
-        return int(self.get(key, 0))
+        """Get integer setting with fallback to defaults"""
+        return int(self.get(key) or 0)
 
     def get_float(self, key):
-        """Get float setting"""
-        return float(self.get(key, 0.0))
+        """Get float setting with fallback to defaults"""
+        return float(self.get(key) or 0.0)
 
     def restore_defaults(self):
         """Restore all settings to defaults"""
@@ -113,7 +142,7 @@ class SettingsManager:
             export_settings.sync()
             return True
         except Exception as e:
-            print(f"Failed to export settings: {e}")
+            log.error("Failed to export settings: %s", e)
             return False
 
     def import_settings(self, filename):
@@ -125,7 +154,7 @@ class SettingsManager:
             self.settings.sync()
             return True
         except Exception as e:
-            print(f"Failed to import settings: {e}")
+            log.error("Failed to import settings: %s", e)
             return False
 
 
@@ -665,7 +694,7 @@ class AdvancedSettingsDialog(QDialog):
             self.brightness_slider.setValue(int(preset['brightness'] * 100))
             self.contrast_slider.setValue(int(preset['contrast'] * 100))
 
-            print(f"Applied {preset_name} preset")
+            log.info("Applied %s preset", preset_name)
 
     def save_custom_preset(self):
         """Save current settings as a custom preset"""
@@ -680,13 +709,13 @@ class AdvancedSettingsDialog(QDialog):
         }
 
         self.settings_manager.set('presets/custom', custom_preset)
-        print("Custom preset saved")
+        log.info("Custom preset saved")
 
     def restore_defaults(self):
         """Restore all settings to defaults"""
         self.settings_manager.restore_defaults()
         self.load_current_settings()
-        print("Settings restored to defaults")
+        log.info("Settings restored to defaults")
 
 
 # Integration methods for your existing terminal class
@@ -876,7 +905,7 @@ def add_settings_helper_methods(window):
             if hasattr(self.terminal, 'settings_manager'):
                 self.terminal.settings_manager.set('effects/ambient_glow', new_value)
 
-            print(f"Ambient glow adjusted to: {new_value:.3f}")
+            log.info("Ambient glow adjusted to: %.3f", new_value)
 
     def export_settings(self):
         """Export settings to file"""
@@ -888,7 +917,7 @@ def add_settings_helper_methods(window):
 
         if filename and hasattr(self.terminal, 'settings_manager'):
             if self.terminal.settings_manager.export_settings(filename):
-                print(f"Settings exported to: {filename}")
+                log.info("Settings exported to: %s", filename)
 
     def import_settings(self):
         """Import settings from file"""
@@ -901,14 +930,14 @@ def add_settings_helper_methods(window):
         if filename and hasattr(self.terminal, 'settings_manager'):
             if self.terminal.settings_manager.import_settings(filename):
                 self.terminal.load_settings()
-                print(f"Settings imported from: {filename}")
+                log.info("Settings imported from: %s", filename)
 
     def restore_default_settings(self):
         """Restore default settings"""
         if hasattr(self.terminal, 'settings_manager'):
             self.terminal.settings_manager.restore_defaults()
             self.terminal.load_settings()
-            print("Settings restored to defaults")
+            log.info("Settings restored to defaults")
 
     # Add these methods to your window class
     window.adjust_ambient_glow = adjust_ambient_glow.__get__(window, window.__class__)
@@ -917,12 +946,12 @@ def add_settings_helper_methods(window):
     window.restore_default_settings = restore_default_settings.__get__(window, window.__class__)
 
 
-print("Enhanced settings system created!")
-print("Features:")
-print("- Cross-platform settings persistence using QSettings")
-print("- Real-time ambient glow adjustment with fine controls")
-print("- Monitor compensation for different display brightness")
-print("- Preset system for quick configuration")
-print("- Import/export settings")
-print("- Tabbed settings dialog")
-print("- All settings auto-save when changed")
\ No newline at end of file
+log.debug("Enhanced settings system created!")
+log.debug("Features:")
+log.debug("- Cross-platform settings persistence using QSettings")
+log.debug("- Real-time ambient glow adjustment with fine controls")
+log.debug("- Monitor compensation for different display brightness")
+log.debug("- Preset system for quick configuration")
+log.debug("- Import/export settings")
+log.debug("- Tabbed settings dialog")
+log.debug("- All settings auto-save when changed")
\ No newline at end of file
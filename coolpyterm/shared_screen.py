@@ -0,0 +1,405 @@
+"""
+Session screens in shared memory, for parsing in worker processes
+
+In process parsing mode a session's engine lives in one of the parser
+processes (serve() below) and the GUI never sees its pyte screen. The
+process writes the screen into a multiprocessing.shared_memory segment the
+GUI created and maps with numpy, so reading a row is a slice, not a pipe:
+
+    header    int64[HEADER_FIELDS]         seq, size, cursor, flags, counters
+    row_seq   int64[max_lines]             seq at which each row last changed
+    row_wrap  int64[max_lines]             1 where the row soft-wraps into the next
+    cells     CELL[max_lines, max_columns] the screen
+    ring_len  int64[ring_rows]             columns used by each ring row
+    ring_wrap int64[ring_rows]             1 where the ring row soft-wraps into the next
+    ring      CELL[ring_rows, max_columns] lines scrolled off the top, a ring
+
+A cell is four uint32s: code point, fg, bg and attribute bits. Colors are
+0 for 'default', 1.. for pyte's color names and COLOR_RGB | rrggbb for the
+rest, so they decode back to the strings pyte uses.
+
+header[SEQ] is a sequence lock. The writer makes it odd before touching the
+segment and even again when done; readers copy what they need and retry if
+the counter moved meanwhile. It is also the change notification: the GUI
+polls it and only reads a segment whose seq differs from the last one it took.
+
+The ring only carries scrolled lines over to the GUI, whose scrollback_buffer
+keeps them, so it is a fixed RING_ROWS whatever the scrollback size. Lines
+it has no room for wait in the process (up to the scrollback limit) until
+the GUI has taken the ones before them.
+
+A segment is sized for the screen it was made for. When the window grows
+past it the GUI makes a bigger one and sends its name ahead of the resize;
+the process moves over the ring lines the GUI had not taken yet
+(header[TAKEN], written by the GUI) and carries on in the new segment.
+
+Only the first code point of a cell is kept; combining marks are dropped.
+"""
+import queue
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+from pyte.screens import Char
+
+from coolpyterm.app_logging import get_logger
+from coolpyterm.vt_session import WrappedRow, create_session, is_wrapped, line_cells
+
+log = get_logger('terminal')
+
+CELL = np.dtype([('char', '<u4'), ('fg', '<u4'), ('bg', '<u4'), ('attrs', '<u4')])
+
+HEADER_FIELDS = 16
+SEQ, COLUMNS, LINES, CURSOR_Y, CURSOR_X, FLAGS, HISTORY, CHARS, SCROLLED, FULL_SEQ, TAKEN = range(11)
+
+CURSOR_HIDDEN = 1
+ALTERNATE = 2
+BRACKETED_PASTE = 4
+
+_ATTRS = ('bold', 'italics', 'underscore', 'strikethrough', 'reverse', 'blink')
+
+COLOR_RGB = 1 << 24
+_COLOR_NAMES = ('black', 'blue', 'brightblack', 'brightblue', 'brightbrown', 'brightcyan',
+                'brightgreen', 'brightmagenta', 'brightred', 'brightwhite', 'brown', 'cyan',
+                'green', 'magenta', 'red', 'white', 'bfightmagenta')  # sic, pyte's own typo
+_COLOR_CODES = {name: code for code, name in enumerate(_COLOR_NAMES, 1)}
+_COLOR_CODES['default'] = 0
+
+# Scrolled lines in flight to the GUI, a few frames' worth of a flood
+RING_ROWS = 1024
+
+# Longest a parser process parses queued output before writing its screens
+PUBLISH_INTERVAL = 1 / 30
+
+# How often a reader retries a segment the writer is in the middle of
+_READ_ATTEMPTS = 3
+
+
+def color_code(color):
+    code = _COLOR_CODES.get(color)
+    if code is not None:
+        return code
+    try:
+        return COLOR_RGB | int(color, 16)
+    except (TypeError, ValueError):
+        return 0
+
+
+def color_name(code):
+    if code >= COLOR_RGB:
+        return f"{code & 0xFFFFFF:06x}"
+    if 0 < code <= len(_COLOR_NAMES):
+        return _COLOR_NAMES[code - 1]
+    return 'default'
+
+
+def segment_size(max_columns, max_lines, ring_rows):
+    return (8 * (HEADER_FIELDS + 2 * (max_lines + ring_rows))
+            + CELL.itemsize * max_columns * (max_lines + ring_rows))
+
+
+class SharedScreen:
+    """One session's segment; the GUI creates it (name=None), the parser process attaches"""
+
+    def __init__(self, name=None, max_columns=80, max_lines=24, ring_rows=RING_ROWS):
+        self.max_columns = max_columns
+        self.max_lines = max_lines
+        self.ring_rows = max(1, ring_rows)
+        size = segment_size(max_columns, max_lines, self.ring_rows)
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        buf = self.shm.buf
+        offset = 0
+
+        def view(shape, dtype):
+            nonlocal offset
+            array = np.ndarray(shape, dtype, buf, offset)
+            offset += array.nbytes
+            return array
+
+        self.header = view((HEADER_FIELDS,), np.int64)
+        self.row_seq = view((max_lines,), np.int64)
+        self.row_wrap = view((max_lines,), np.int64)
+        self.cells = view((max_lines, max_columns), CELL)
+        self.ring_len = view((self.ring_rows,), np.int64)
+        self.ring_wrap = view((self.ring_rows,), np.int64)
+        self.ring = view((self.ring_rows, max_columns), CELL)
+
+        self.backlog = deque(maxlen=1000)  # scrolled lines waiting for room in the ring, writer side
+        self._encoded = {}  # Char -> cell tuple, writer side
+        self._decoded = {}  # cell tuple -> Char, reader side
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def size(self):
+        return self.shm.size
+
+    def close(self, unlink=False):
+        # The numpy views export the buffer; they have to go before the mapping can
+        self.header = self.row_seq = self.row_wrap = self.cells = None
+        self.ring_len = self.ring_wrap = self.ring = None
+        self.shm.close()
+        if unlink:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    # --- Parser process -----------------------------------------------------------
+
+    def carry_over(self, old):
+        """Take over the lines a replaced segment had not handed to the GUI yet"""
+        header = old.header
+        total, taken = int(header[SCROLLED]), int(header[TAKEN])
+        unread = deque()
+        for index in range(max(taken, total - old.ring_rows), total):
+            slot = index % old.ring_rows
+            unread.append(old._decode(old.ring[slot, :old.ring_len[slot]].tolist(), old.ring_wrap[slot]))
+        self._write_ring(unread)
+        self.backlog = old.backlog
+        self.header[CHARS] = header[CHARS]
+
+    def ring_free(self):
+        """Ring rows the writer can fill without overwriting lines the GUI has not taken"""
+        header = self.header
+        return self.ring_rows - (int(header[SCROLLED]) - int(header[TAKEN]))
+
+    def _write_ring(self, lines, columns=None):
+        """Append lines to the ring, `columns` wide or, if None, as wide as each already is"""
+        header = self.header
+        total = int(header[SCROLLED])
+        for line in lines:
+            slot = total % self.ring_rows
+            width = min(len(line), self.max_columns) if columns is None else columns
+            self.ring[slot, :width] = self._encode(line_cells(line, width))
+            self.ring_len[slot] = width
+            self.ring_wrap[slot] = is_wrapped(line)
+            total += 1
+        header[SCROLLED] = total
+
+    def _encode(self, row):
+        cache = self._encoded
+        if len(cache) > 4096:
+            cache.clear()
+        cells = []
+        for char in row:
+            cell = cache.get(char)
+            if cell is None:
+                data = char.data
+                attrs = 0
+                for bit, name in enumerate(_ATTRS):
+                    if getattr(char, name):
+                        attrs |= 1 << bit
+                cell = cache[char] = (ord(data[0]) if data else 0,
+                                      color_code(char.fg), color_code(char.bg), attrs)
+            cells.append(cell)
+        return cells
+
+    def publish(self, session, full, chars):
+        """Write what changed in session since the last publish
+
+        Returns True if scrolled lines are left waiting for the GUI to make room.
+        """
+        rows, scrolled = session.changes(full)
+        columns = session.columns
+        header = self.header
+
+        seq = int(header[SEQ]) + 1
+        header[SEQ] = seq  # odd: readers back off
+        done = seq + 1
+
+        for y, row in rows.items():
+            self.cells[y, :columns] = self._encode(row[:columns])
+            self.row_wrap[y] = is_wrapped(row)
+            self.row_seq[y] = done
+
+        backlog = self.backlog
+        backlog.extend(scrolled)
+        if backlog:
+            count = min(len(backlog), self.ring_free())
+            self._write_ring([backlog.popleft() for _ in range(count)], columns)
+
+        cursor, cursor_hidden, alternate, bracketed_paste, history = session.state()
+        header[COLUMNS] = columns
+        header[LINES] = session.lines
+        header[CURSOR_Y], header[CURSOR_X] = cursor
+        header[FLAGS] = ((CURSOR_HIDDEN if cursor_hidden else 0) | (ALTERNATE if alternate else 0)
+                         | (BRACKETED_PASTE if bracketed_paste else 0))
+        header[HISTORY] = history
+        header[CHARS] += chars
+        if full:
+            header[FULL_SEQ] = done
+        header[SEQ] = done
+        return bool(backlog)
+
+    # --- GUI process --------------------------------------------------------------
+
+    def changed(self, seen):
+        return int(self.header[SEQ]) != seen
+
+    def read(self, seen, scrolled_seen):
+        """Rows changed after seq `seen` and ring lines after `scrolled_seen`, decoded
+
+        Returns a dict with the copied state, or None while the writer holds the lock.
+        """
+        header = self.header
+        for _ in range(_READ_ATTEMPTS):
+            seq = int(header[SEQ])
+            if seq & 1:
+                time.sleep(0)
+                continue
+            state = header.copy()
+            columns, lines = int(state[COLUMNS]), int(state[LINES])
+            full = int(state[FULL_SEQ]) > seen
+            if full:
+                changed = np.arange(lines)
+            else:
+                changed = np.flatnonzero(self.row_seq[:lines] > seen)
+            cells = self.cells[changed, :columns].copy()
+            wraps = self.row_wrap[changed].copy()
+
+            total = int(state[SCROLLED])
+            count = min(total - scrolled_seen, self.ring_rows)
+            slots = [(total - count + i) % self.ring_rows for i in range(count)]
+            ring = self.ring[slots].copy() if slots else None
+            ring_len = self.ring_len[slots].copy() if slots else None
+            ring_wrap = self.ring_wrap[slots].copy() if slots else None
+
+            if int(header[SEQ]) == seq:
+                break
+        else:
+            return None
+
+        # Ring lines up to here may be overwritten; and on a segment change
+        # the process moves over only the ones after them
+        header[TAKEN] = total
+        decode = self._decode
+        scrolled = [decode(ring[i, :ring_len[i]].tolist(), ring_wrap[i]) for i in range(count)] if count else []
+        return {
+            'seq': seq,
+            'columns': columns,
+            'lines': lines,
+            'rows': {int(y): decode(cells[i].tolist(), wraps[i]) for i, y in enumerate(changed)},
+            'full': full,
+            'scrolled': scrolled,
+            'scrolled_total': total,
+            'cursor': (int(state[CURSOR_Y]), int(state[CURSOR_X])),
+            'flags': int(state[FLAGS]),
+            'history': int(state[HISTORY]),
+            'chars': int(state[CHARS]),
+        }
+
+    def _decode(self, cells, wrapped=False):
+        cache = self._decoded
+        if len(cache) > 4096:
+            cache.clear()
+        row = []
+        for cell in cells:
+            char = cache.get(cell)
+            if char is None:
+                code, fg, bg, attrs = cell
+                char = cache[cell] = Char(chr(code) if code else '', color_name(fg), color_name(bg),
+                                          *(bool(attrs & (1 << bit)) for bit in range(len(_ATTRS))))
+            row.append(char)
+        return WrappedRow(row) if wrapped else tuple(row)
+
+
+def serve(inbox):
+    """Parser process main loop: parse the sessions assigned here into their segments
+
+    Messages are tuples starting with an op and the session key:
+        ('open', key, name, engine, columns, lines, scrollback)
+        ('feed', key, text)   ('resize', key, columns, lines)   ('reset', key)
+        ('segment', key, name, max_columns, max_lines)          ('scrollback', key, lines)
+        ('close', key)
+    None stops the process.
+    """
+    sessions = {}  # key -> (engine session, SharedScreen)
+    waiting = set()  # keys with scrolled lines the ring had no room for
+    while True:
+        # With lines waiting, wake up to write them once the GUI has read the ring
+        try:
+            batch = [inbox.get(timeout=PUBLISH_INTERVAL if waiting else None)]
+        except queue.Empty:
+            batch = []
+        deadline = time.perf_counter() + PUBLISH_INTERVAL
+        while (not batch or batch[-1] is not None) and time.perf_counter() < deadline:
+            try:
+                batch.append(inbox.get_nowait())
+            except queue.Empty:
+                break
+
+        touched = {}  # key -> [full, chars]
+        for message in batch:
+            if message is None:
+                for _, shared in sessions.values():
+                    shared.close()
+                return
+            op, key = message[0], message[1]
+            try:
+                if op == 'open':
+                    _, _, name, engine, columns, lines, scrollback = message
+                    shared = SharedScreen(name, columns, lines)
+                    shared.backlog = deque(maxlen=scrollback)
+                    session = create_session(engine, columns, lines)
+                    session.scrollback_limit = scrollback
+                    sessions[key] = (session, shared)
+                    touched[key] = [True, 0]
+                    continue
+                if op == 'close':
+                    entry = sessions.pop(key, None)
+                    touched.pop(key, None)
+                    waiting.discard(key)
+                    if entry is not None:
+                        entry[1].close()
+                    continue
+
+                entry = sessions.get(key)
+                if entry is None:
+                    continue
+                session, shared = entry
+                change = touched.setdefault(key, [False, 0])
+                if op == 'feed':
+                    change[0] |= session.apply(message[2])
+                    change[1] += len(message[2])
+                elif op == 'resize':
+                    change[0] |= session.apply(('resize', message[2], message[3]))
+                elif op == 'segment':
+                    # Sent ahead of a resize the old segment is too small for
+                    _, _, name, max_columns, max_lines = message
+                    replacement = SharedScreen(name, max_columns, max_lines, shared.ring_rows)
+                    replacement.carry_over(shared)
+                    shared.close()
+                    sessions[key] = (session, replacement)
+                    change[0] = True
+                elif op == 'scrollback':
+                    # More waiting than the GUI would keep is dropped, oldest first
+                    session.scrollback_limit = message[2]
+                    shared.backlog = deque(shared.backlog, maxlen=message[2])
+                elif op == 'reset':
+                    change[0] |= session.apply(('reset',))
+            except Exception:
+                log.exception("Parser process failed on %r for session %s", op, key)
+
+        for key in waiting:
+            if key not in touched and sessions[key][1].ring_free():
+                touched[key] = [False, 0]
+        for key, (full, chars) in touched.items():
+            entry = sessions.get(key)
+            if entry is None:
+                continue
+            session, shared = entry
+            try:
+                if shared.publish(session, full, chars):
+                    waiting.add(key)
+                else:
+                    waiting.discard(key)
+            except Exception:
+                log.exception("Parser process failed to publish session %s", key)
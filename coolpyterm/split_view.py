@@ -0,0 +1,403 @@
+"""
+Split panes drawn by one GL surface
+
+SplitTerminalView lays several terminals out side by side and/or stacked
+and draws all of them from a single QOpenGLWidget: one context, one CRT
+shader program, one quad, one animation timer and one cursor blink timer,
+however many panes are visible. Each frame binds the program once and then
+draws every pane through a glViewport set to the pane's rectangle, with
+that pane's own theme and effect uniforms. Only the rows of a pane's grid that
+changed since the last frame are rasterized and uploaded; glyphs come from
+QPainter, so all panes share Qt's glyph cache.
+
+The terminals still own their grids. A hosted OpenGLRetroGridWidget stays
+hidden, keeps no timers or GL objects of its own and forwards its update()
+calls here (see attach_to_surface).
+"""
+from PyQt6.QtCore import QRect, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter, QPen
+from PyQt6.QtOpenGLWidgets import QOpenGLWidget
+
+from coolpyterm import tracing
+from coolpyterm.app_logging import get_logger
+from coolpyterm.opengl_grid_widget import (OPENGL_AVAILABLE, build_crt_program, create_grid_texture,
+                                           create_quad_geometry, upload_texture_rows)
+
+if OPENGL_AVAILABLE:
+    from OpenGL.GL import (glBlendFunc, glClear, glClearColor, glDrawElements, glEnable, glViewport,
+                           GL_BLEND, GL_COLOR_BUFFER_BIT, GL_ONE_MINUS_SRC_ALPHA, GL_SRC_ALPHA,
+                           GL_TRIANGLES, GL_UNSIGNED_INT)
+
+log = get_logger('render')
+
+GUTTER = 2
+GUTTER_COLOR = QColor(40, 40, 40)
+
+
+class PaneSplit:
+    """Layout node: children (terminals or PaneSplits) sharing its rectangle equally"""
+
+    def __init__(self, orientation, children):
+        # Qt.Orientation.Horizontal puts children side by side, Vertical stacks them
+        self.orientation = orientation
+        self.children = children
+
+
+class SplitTerminalView(QOpenGLWidget):
+    """Several terminals composited as viewports of one GL surface"""
+
+    pane_activated = pyqtSignal(object)
+
+    def __init__(self, terminal, parent=None):
+        super().__init__(parent)
+        self.layout_root = None
+        self.active = None
+        self.rects = {}      # terminal -> QRect in widget coordinates
+        self.textures = {}   # terminal -> QOpenGLTexture in this context
+        self.dirty = set()   # terminals whose grid changed since their last upload
+        self.presented = []  # grids uploaded in the frame being swapped
+
+        self.shader_program = None
+        self.vao = None
+        self.vertex_buffer = None
+        self.index_buffer = None
+        self.render_suspended = False
+
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+
+        # Shared by all panes; the cursor only blinks in the active one
+        self.animation_timer = QTimer(self)
+        self.animation_timer.timeout.connect(self.update)
+        self.animation_timer.start(16)
+        self.cursor_timer = QTimer(self)
+        self.cursor_timer.timeout.connect(self._blink_cursor)
+        self.cursor_timer.start(terminal.grid_widget.cursor_timer.interval() or 500)
+
+        # Latency probes listen on each grid's frameSwapped
+        self.frameSwapped.connect(self._on_frame_swapped)
+
+        self._adopt(terminal)
+        self.layout_root = terminal
+        self.set_active(terminal)
+
+    # --- Layout -----------------------------------------------------------------
+
+    def panes(self):
+        """Terminals in layout order"""
+        found = []
+
+        def walk(node):
+            if isinstance(node, PaneSplit):
+                for child in node.children:
+                    walk(child)
+            elif node is not None:
+                found.append(node)
+
+        walk(self.layout_root)
+        return found
+
+    def split(self, terminal, orientation):
+        """Put terminal next to the active pane and make it active"""
+        self._adopt(terminal)
+        parent, index = self._find_parent(self.active)
+        if parent is not None and parent.orientation == orientation:
+            parent.children.insert(index + 1, terminal)
+        else:
+            node = PaneSplit(orientation, [self.active, terminal])
+            self._replace(self.active, node)
+        self.set_active(terminal)
+        self._relayout()
+
+    def remove(self, terminal):
+        """Take a pane out of the layout; the caller closes or re-homes the terminal"""
+        parent, index = self._find_parent(terminal)
+        if parent is None:
+            self.layout_root = None
+        else:
+            del parent.children[index]
+            if len(parent.children) == 1:
+                self._replace(parent, parent.children[0])
+
+        self._drop_texture(terminal)
+        self.dirty.discard(terminal)
+        self.rects.pop(terminal, None)
+        if terminal.grid_widget is not None:
+            terminal.grid_widget.detach_from_surface()
+        terminal.setParent(None)
+
+        remaining = self.panes()
+        if terminal is self.active and remaining:
+            self.set_active(remaining[0])
+        self._relayout()
+        return remaining
+
+    def pane_at(self, pos):
+        for terminal, rect in self.rects.items():
+            if rect.contains(pos):
+                return terminal
+        return None
+
+    def set_active(self, terminal):
+        """Route keys to terminal and blink its cursor; other panes show a steady cursor"""
+        previous = self.active
+        self.active = terminal
+        if previous is not None and previous is not terminal and previous.grid_widget is not None:
+            previous.grid_widget.set_cursor_visible(True)
+            self.dirty.add(previous)
+        self.dirty.add(terminal)
+        self.update()
+        if previous is not terminal:
+            self.pane_activated.emit(terminal)
+
+    def _adopt(self, terminal):
+        terminal.setParent(self)
+        terminal.hide()
+        terminal.grid_widget.attach_to_surface(self)
+        self.dirty.add(terminal)
+
+    def _find_parent(self, target, node=None):
+        node = node or self.layout_root
+        if not isinstance(node, PaneSplit):
+            return None, None
+        for index, child in enumerate(node.children):
+            if child is target:
+                return node, index
+            found = self._find_parent(target, child)
+            if found[0] is not None:
+                return found
+        return None, None
+
+    def _replace(self, old, new):
+        parent, index = self._find_parent(old)
+        if parent is None:
+            self.layout_root = new
+        else:
+            parent.children[index] = new
+
+    def _layout(self, node, rect):
+        if not isinstance(node, PaneSplit):
+            self.rects[node] = rect
+            return
+        count = len(node.children)
+        side_by_side = node.orientation == Qt.Orientation.Horizontal
+        total = (rect.width() if side_by_side else rect.height()) - GUTTER * (count - 1)
+        pos = rect.x() if side_by_side else rect.y()
+        for index, child in enumerate(node.children):
+            size = total // count + (1 if index < total % count else 0)
+            if side_by_side:
+                child_rect = QRect(pos, rect.y(), size, rect.height())
+            else:
+                child_rect = QRect(rect.x(), pos, rect.width(), size)
+            self._layout(child, child_rect)
+            pos += size + GUTTER
+
+    def _relayout(self):
+        """Recompute pane rectangles and resize each grid (and its PTY) to fit"""
+        self.rects = {}
+        if self.layout_root is not None:
+            self._layout(self.layout_root, self.rect())
+        for terminal, rect in self.rects.items():
+            grid = terminal.grid_widget
+            if grid is None:
+                continue
+            cols = max(1, rect.width() // grid.char_width)
+            rows = max(1, rect.height() // grid.char_height)
+            if cols != grid.cols or rows != grid.rows:
+                grid.resize_grid(cols, rows)
+                terminal.on_grid_resize(None)
+            self.dirty.add(terminal)
+        self.update()
+
+    # --- Hosted grids -----------------------------------------------------------
+
+    def pane_changed(self, grid):
+        """A hosted grid's update(): re-rasterize that pane in the next frame"""
+        for terminal in self.rects:
+            if terminal.grid_widget is grid:
+                self.dirty.add(terminal)
+                break
+        if not self.render_suspended:
+            self.update()
+
+    def _blink_cursor(self):
+        grid = self.active.grid_widget if self.active is not None else None
+        if grid is not None:
+            grid.toggle_cursor_visibility()
+
+    def suspend_rendering(self):
+        """Background tab: stop the shared timers and suspend every pane's terminal"""
+        for terminal in self.panes():
+            terminal.suspend_rendering()
+        if self.render_suspended:
+            return
+        self.render_suspended = True
+        self.animation_timer.stop()
+        self.cursor_timer.stop()
+
+    def resume_rendering(self):
+        for terminal in self.panes():
+            terminal.resume_rendering()
+        if not self.render_suspended:
+            return
+        self.render_suspended = False
+        self.animation_timer.start()
+        self.cursor_timer.start()
+        self.dirty.update(self.rects)
+        self.update()
+
+    # --- GL ---------------------------------------------------------------------
+
+    def initializeGL(self):
+        if not OPENGL_AVAILABLE:
+            log.error("OpenGL not available!")
+            return
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        self.shader_program = build_crt_program()
+        self.vao, self.vertex_buffer, self.index_buffer = create_quad_geometry()
+        log.info("Split view initialized with %d panes", len(self.rects))
+
+    def resizeGL(self, width, height):
+        self._relayout()
+
+    def _pane_texture(self, terminal, grid):
+        """The pane's texture, with only the grid rows that changed re-rasterized and uploaded"""
+        image = grid.ensure_text_image()
+        texture = self.textures.get(terminal)
+        if texture is None or texture.width() != image.width() or texture.height() != image.height():
+            if texture is not None:
+                texture.destroy()
+            texture = create_grid_texture(image.width(), image.height())
+            if texture is None:
+                return None
+            self.textures[terminal] = texture
+            grid.mark_all_dirty()
+            self.dirty.add(terminal)
+
+        if terminal in self.dirty:
+            self.dirty.discard(terminal)
+            with tracing.span('rasterize', 'render'):
+                slots = grid.render_grid_to_texture()
+            if slots:
+                with tracing.span('upload', 'render', rows=len(slots)):
+                    upload_texture_rows(texture, image, grid.char_height, slots)
+            self.presented.append(grid)
+        return texture
+
+    def _drop_texture(self, terminal):
+        texture = self.textures.pop(terminal, None)
+        if texture is not None and self.isValid():
+            self.makeCurrent()
+            texture.destroy()
+            self.doneCurrent()
+
+    def paintGL(self):
+        if not OPENGL_AVAILABLE or self.render_suspended or self.shader_program is None:
+            return
+
+        tracer = tracing.tracer
+        if tracer is not None:
+            trace_start = tracer.now()
+
+        ratio = self.devicePixelRatioF()
+        glClearColor(GUTTER_COLOR.redF(), GUTTER_COLOR.greenF(), GUTTER_COLOR.blueF(), 1.0)
+        glClear(GL_COLOR_BUFFER_BIT)
+
+        program = self.shader_program
+        if not program.bind():
+            return
+        self.vao.bind()
+        for terminal, rect in self.rects.items():
+            grid = terminal.grid_widget
+            if grid is None:
+                continue
+            texture = self._pane_texture(terminal, grid)
+            if texture is None:
+                continue
+            # GL's origin is the bottom-left corner
+            glViewport(round(rect.x() * ratio), round((self.height() - rect.y() - rect.height()) * ratio),
+                       round(rect.width() * ratio), round(rect.height() * ratio))
+            grid.set_crt_uniforms(program, rect.width(), rect.height())
+            texture.bind(0)
+            program.setUniformValue("textTexture", 0)
+            glDrawElements(GL_TRIANGLES, 6, GL_UNSIGNED_INT, None)
+            texture.release()
+        self.vao.release()
+        program.release()
+        glViewport(0, 0, round(self.width() * ratio), round(self.height() * ratio))
+
+        self.draw_decorations()
+
+        if tracer is not None:
+            tracer.complete('paintGL', 'render', trace_start, panes=len(self.rects))
+
+    def draw_decorations(self):
+        """Active-pane frame and each pane's diagnostic overlay"""
+        overlays = [(terminal, rect) for terminal, rect in self.rects.items()
+                    if terminal.grid_widget is not None and terminal.grid_widget.overlay_sections]
+        framed = len(self.rects) > 1 and self.active in self.rects
+        if not overlays and not framed:
+            return
+
+        painter = QPainter(self)
+        if framed:
+            painter.setPen(QPen(self.active.grid_widget.current_theme.foreground, 1))
+            painter.drawRect(self.rects[self.active].adjusted(0, 0, -1, -1))
+        for terminal, rect in overlays:
+            painter.save()
+            painter.setClipRect(rect)
+            terminal.grid_widget.paint_overlay(painter, rect.right() + 1, rect.top())
+            painter.restore()
+        painter.end()
+
+    def _on_frame_swapped(self):
+        presented, self.presented = self.presented, []
+        for grid in presented:
+            grid.frameSwapped.emit()
+
+    def release_gl_resources(self):
+        """Free the shared program, quad and every pane texture (closing the view)"""
+        if not self.isValid():
+            return
+        self.makeCurrent()
+        for texture in self.textures.values():
+            texture.destroy()
+        for buffer in (self.vertex_buffer, self.index_buffer):
+            if buffer:
+                buffer.destroy()
+        if self.vao:
+            self.vao.destroy()
+        if self.shader_program:
+            self.shader_program.removeAllShaders()
+        self.doneCurrent()
+        self.textures = {}
+        self.shader_program = self.vao = self.vertex_buffer = self.index_buffer = None
+
+    # --- Input ------------------------------------------------------------------
+
+    def mousePressEvent(self, event):
+        terminal = self.pane_at(event.position().toPoint())
+        if terminal is not None and terminal is not self.active:
+            self.set_active(terminal)
+        self.setFocus()
+        super().mousePressEvent(event)
+
+    def wheelEvent(self, event):
+        """Scroll the scrollback of the pane under the pointer"""
+        terminal = self.pane_at(event.position().toPoint())
+        if terminal is not None:
+            terminal.wheelEvent(event)
+        else:
+            event.ignore()
+
+    def keyPressEvent(self, event):
+        """Forward keyboard events to the active pane's terminal"""
+        if self.active is not None:
+            self.active.keyPressEvent(event)
+        else:
+            super().keyPressEvent(event)
+
+    def focus_next_pane(self, step=1):
+        panes = self.panes()
+        if len(panes) > 1 and self.active in panes:
+            self.set_active(panes[(panes.index(self.active) + step) % len(panes)])
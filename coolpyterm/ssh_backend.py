@@ -1,5 +1,16 @@
+import os
+
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot, QTimer
+from coolpyterm.app_logging import get_logger, TRACE
 from coolpyterm.sshshellreader import ShellReaderThread
+from coolpyterm.send_queue import SendQueueThread
+from coolpyterm.ssh_keys import get_key_cache, KeyLoadError
+from coolpyterm.ssh_transport import get_transport_profile, is_algorithm_mismatch
+
+# Default key files probed when look_for_keys is enabled, in OpenSSH order
+DEFAULT_KEY_FILES = ("id_ed25519", "id_ecdsa", "id_rsa")
+
+log = get_logger('ssh')
 
 
 class SSHBackend(QObject):
@@ -10,12 +21,15 @@ class SSHBackend(QObject):
     connection_failed = pyqtSignal(str)
     connection_established = pyqtSignal()
 
-    def __init__(self, host, username, password=None, port=22, key_path=None, parent_widget=None, parent=None):
+    def __init__(self, host, username, password=None, port=22, key_path=None, parent_widget=None, parent=None,
+                 key_passphrase=None, allow_agent=False, look_for_keys=False, transport_profile=None,
+                 window_size=None, max_packet_size=None, compress=None):
         super().__init__(parent)
         self.parent_widget = parent_widget
         self.client = None
         self.channel = None
         self.reader_thread = None
+        self.send_queue = None
         self.auth_method_used = None
         self.is_connected = False
 
@@ -25,9 +39,12 @@ class SSHBackend(QObject):
         self.password = password
         self.port = port
         self.key_path = key_path
+        self.key_passphrase = key_passphrase
+        self.allow_agent = allow_agent
+        self.look_for_keys = look_for_keys
 
-        # Apply transport settings
-        self._apply_transport_settings()
+        # Per-connection transport tuning, applied as each transport is created
+        self.transport_profile = get_transport_profile(transport_profile, window_size, max_packet_size, compress)
 
         # CRITICAL FIX: Connect immediately like your working version
         # Don't use QTimer - connect synchronously so signals can be connected before data flows
@@ -35,58 +52,87 @@ class SSHBackend(QObject):
             self._attempt_connection()
         except Exception as e:
             error_msg = f"SSH Connection Error: {str(e)}"
-            print(error_msg)
+            log.error("%s", error_msg)
             # Emit error signal after a short delay to ensure UI is ready
             QTimer.singleShot(10, lambda: self.connection_failed.emit(error_msg))
 
     def _attempt_connection(self):
         """Attempt SSH connection immediately"""
-        print("Starting immediate SSH connection...")
-
-        import paramiko
-
-        self.client = paramiko.SSHClient()
-        self.client.load_system_host_keys()
-        self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        log.debug("Starting immediate SSH connection...")
 
         host = str(self.host).strip()
         username = str(self.username).strip()
         port = int(self.port)
 
-        print(f"Attempting SSH connection to {username}@{host}:{port}")
+        log.info("Attempting SSH connection to %s@%s:%s (transport profile: %s)", username, host, port, self.transport_profile.name)
 
-        # Authentication
-        if self.key_path:
-            self._try_key_auth(host, port, username, self.key_path)
-        else:
-            password = str(self.password).strip() if self.password else ""
-            print(f"Using password auth, password length: {len(password)}")
-            self._try_password_auth(host, port, username, password)
+        try:
+            self._authenticate(host, port, username)
+        except Exception as e:
+            if not (self.transport_profile.legacy_fallback and is_algorithm_mismatch(e)):
+                raise
+            log.warning("No common algorithms with %s (%s), retrying with legacy profile", host, e)
+            self.transport_profile = get_transport_profile(
+                'legacy',
+                self.transport_profile.window_size,
+                self.transport_profile.max_packet_size,
+                self.transport_profile.compress
+            )
+            self._authenticate(host, port, username)
 
         # Get transport and set keepalive
         transport = self.client.get_transport()
         if transport:
             transport.set_keepalive(60)
-            print("Transport keepalive set")
+            log.debug("Transport keepalive set")
 
         # Setup shell but DON'T start reader thread yet
         self._setup_shell_without_reader()
 
         self.is_connected = True
-        print("SSH connection established, shell ready")
+        log.info("SSH connection established, shell ready")
 
         # Emit connection established signal to allow UI to connect
         # Use a small delay to ensure the signal is processed
         QTimer.singleShot(50, self._signal_connection_ready)
 
+    def _create_client(self):
+        """Create a fresh SSHClient"""
+        import paramiko
+
+        if self.client:
+            self.client.close()
+        self.client = paramiko.SSHClient()
+        self.client.load_system_host_keys()
+        self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+
+    def _authenticate(self, host, port, username):
+        """Open the transport and authenticate with key or password"""
+        self._create_client()
+
+        key_path = self.key_path or (self._find_default_key() if self.look_for_keys else None)
+        if key_path:
+            self._try_key_auth(host, port, username, key_path)
+        else:
+            password = str(self.password).strip() if self.password else ""
+            log.debug("Using password auth")
+            self._try_password_auth(host, port, username, password)
+
+    def _transport_kwargs(self):
+        """Connect arguments that apply the transport profile to the new transport"""
+        return {
+            'transport_factory': self.transport_profile.transport_factory(),
+            'compress': self.transport_profile.compress,
+        }
+
     def _setup_shell_without_reader(self):
         """Setup shell but don't start reader thread yet"""
         try:
             self.channel = self.client.invoke_shell("xterm")
             self.channel.set_combine_stderr(True)
-            print("Invoked Shell!")
+            log.debug("Invoked Shell!")
         except Exception as e:
-            print(f"Shell not supported, falling back to pty...")
+            log.warning("Shell not supported, falling back to pty...")
             transport = self.client.get_transport()
             if transport:
                 self.channel = transport.open_session()
@@ -95,11 +141,17 @@ class SSHBackend(QObject):
             else:
                 raise Exception("No transport available for shell")
 
-        print("Shell setup complete, waiting for signal connection...")
+        # Outbound writes are drained by their own thread so a stalled TCP
+        # window blocks the writer instead of the GUI
+        self.send_queue = SendQueueThread(self.channel.sendall, name=f"ssh-send-{self.host}")
+        self.send_queue.send_failed.connect(self._on_send_failed)
+        self.send_queue.start()
+
+        log.debug("Shell setup complete, waiting for signal connection...")
 
     def _signal_connection_ready(self):
         """Called after UI has had time to connect signals"""
-        print("Emitting connection_established signal...")
+        log.debug("Emitting connection_established signal...")
         self.connection_established.emit()
 
         # Start reader thread after a small delay to ensure signals are connected
@@ -108,70 +160,64 @@ class SSHBackend(QObject):
     def _start_reader_thread(self):
         """Start the reader thread after signals are connected"""
         if self.channel is not None:
-            print("=== STARTING SHELL READER THREAD ===")
-            print("Signals should be connected by now...")
+            log.debug("Starting shell reader thread, signals should be connected by now")
 
             self.reader_thread = ShellReaderThread(self.channel, "", self.parent_widget)
 
-            print(f"Connecting ShellReaderThread.data_ready to SSHBackend.send_output...")
+            log.debug("Connecting ShellReaderThread.data_ready to SSHBackend.send_output...")
             self.reader_thread.data_ready.connect(self._on_data_received)
 
-            print("Starting ShellReaderThread...")
+            log.debug("Starting ShellReaderThread...")
             self.reader_thread.start()
-            print("✅ ShellReaderThread started successfully")
+            log.debug("ShellReaderThread started successfully")
 
             # Send initial newline to get prompt
             QTimer.singleShot(500, lambda: self.write_data("\n"))
         else:
-            print("❌ No channel available for ShellReaderThread")
+            log.error("No channel available for ShellReaderThread")
 
     def _on_data_received(self, data):
         """Handle data from ShellReaderThread and forward to UI"""
-        print(f"🔥 SSH Backend received data: {len(data)} chars")
-        print(f"First 50 chars: {repr(data[:50])}")
+        if __debug__ and log.isEnabledFor(TRACE):
+            log.log(TRACE, "SSH Backend received %d chars: %r", len(data), data[:50])
 
         # Forward to UI
         self.send_output.emit(data)
-        print(f"✅ Data forwarded to UI via send_output signal")
-
-    def _apply_transport_settings(self):
-        """Apply custom transport settings for better compatibility"""
-        import paramiko
 
-        cipher_settings = (
-            "aes128-cbc", "aes128-ctr", "aes192-ctr", "aes256-ctr",
-            "aes256-cbc", "3des-cbc", "aes192-cbc", "aes256-gcm@openssh.com",
-            "aes128-gcm@openssh.com", "chacha20-poly1305@openssh.com"
-        )
-
-        kex_settings = (
-            "diffie-hellman-group14-sha1", "diffie-hellman-group-exchange-sha1",
-            "diffie-hellman-group-exchange-sha256", "diffie-hellman-group1-sha1",
-            "ecdh-sha2-nistp256", "ecdh-sha2-nistp384", "ecdh-sha2-nistp521",
-            "curve25519-sha256", "curve25519-sha256@libssh.org",
-            "diffie-hellman-group16-sha512", "diffie-hellman-group18-sha512"
-        )
-
-        key_settings = (
-            "ssh-rsa", "ssh-dss", "ecdsa-sha2-nistp256", "ecdsa-sha2-nistp384",
-            "ecdsa-sha2-nistp521", "ssh-ed25519", "rsa-sha2-256", "rsa-sha2-512"
-        )
-
-        paramiko.Transport._preferred_ciphers = cipher_settings
-        paramiko.Transport._preferred_kex = kex_settings
-        paramiko.Transport._preferred_keys = key_settings
-        print("Applied custom transport settings for compatibility")
+    def _find_default_key(self):
+        """Return the first default key file that loads, for look_for_keys"""
+        ssh_dir = os.path.expanduser(os.path.join("~", ".ssh"))
+        for name in DEFAULT_KEY_FILES:
+            candidate = os.path.join(ssh_dir, name)
+            if not os.path.isfile(candidate):
+                continue
+            try:
+                # Loading through the cache means the probe is paid only once
+                get_key_cache().get(candidate, self.key_passphrase or self.password)
+                return candidate
+            except KeyLoadError as e:
+                log.debug("Skipping default key %s: %s", candidate, e)
+        return None
 
     def _try_key_auth(self, host, port, username, key_path):
-        """Try authentication with RSA key"""
-        import paramiko
-        print(f"Trying key authentication with {key_path}")
+        """Try authentication with a cached private key of any supported type"""
+        log.info("Trying key authentication with %s", key_path)
         try:
-            private_key = paramiko.RSAKey(filename=key_path.strip())
-            self.client.connect(hostname=host, port=port, username=username, pkey=private_key)
+            # Like paramiko, fall back to the password as the key passphrase
+            private_key = get_key_cache().get(key_path, self.key_passphrase or self.password)
+            self.client.connect(
+                hostname=host,
+                port=port,
+                username=username,
+                pkey=private_key,
+                password=self.password or None,
+                allow_agent=self.allow_agent,
+                look_for_keys=False,
+                **self._transport_kwargs()
+            )
             self.auth_method_used = "publickey"
         except Exception as e:
-            print(f"Key auth failed: {e}")
+            log.error("Key auth failed: %s", e)
             raise
 
     def _try_password_auth(self, host, port, username, password):
@@ -183,37 +229,50 @@ class SSHBackend(QObject):
                 username=username,
                 password=password,
                 look_for_keys=False,
-                allow_agent=False
+                allow_agent=self.allow_agent,
+                **self._transport_kwargs()
             )
             self.auth_method_used = "password"
-            print("Password authentication successful")
+            log.info("Password authentication successful")
         except Exception as e:
-            print(f"Password auth error: {e}")
+            log.error("Password auth error: %s", e)
             raise
 
     @pyqtSlot(str)
     def write_data(self, data):
-        """Write data to SSH channel"""
+        """Queue data for the SSH channel - never blocks and never drops input"""
         if not self.is_connected:
-            print("Error: Not connected to SSH server")
+            log.error("Error: Not connected to SSH server")
             return
 
-        if self.channel and self.channel.send_ready():
-            try:
-                self.channel.send(data)
-                print(f"✅ Sent data: {repr(data[:50])}")
-            except Exception as e:
-                print(f"Error while writing to channel: {e}")
-                self.is_connected = False
+        if self.send_queue:
+            self.send_queue.enqueue(data)
         else:
-            print("Error: Channel is not ready or doesn't exist")
+            log.error("Error: Channel is not ready or doesn't exist")
 
     def send_command(self, data):
         """Compatibility method for KeyHandler"""
-        if isinstance(data, bytes):
-            data = data.decode('utf-8')
         self.write_data(data)
 
+    def _on_send_failed(self, error_msg):
+        """Handle a failed send on the writer thread"""
+        log.error("Error while writing to channel: %s", error_msg)
+        self.is_connected = False
+
+    @property
+    def bytes_pending(self):
+        """Bytes written by the UI but not yet accepted by the channel"""
+        return self.send_queue.bytes_pending if self.send_queue else 0
+
+    @property
+    def queue_length(self):
+        """Number of queued writes waiting for the channel"""
+        return self.send_queue.queue_length if self.send_queue else 0
+
+    def send_queue_stats(self):
+        """Outbound queue counters for diagnostics"""
+        return self.send_queue.stats() if self.send_queue else {}
+
     @pyqtSlot(str)
     def set_pty_size(self, data):
         """Set PTY size following your pattern"""
@@ -227,37 +286,54 @@ class SSHBackend(QObject):
                 rows = data.split("::")[1]
                 rows = int(rows.split(":")[1])
                 self.channel.resize_pty(width=cols, height=rows)
-                print(f"backend pty resize -> cols:{cols} rows:{rows}")
+                log.debug("backend pty resize -> cols:%s rows:%s", cols, rows)
             except Exception as e:
-                print(f"Error setting backend pty term size: {e}")
+                log.error("Error setting backend pty term size: %s", e)
 
     def close(self):
         """Clean up resources"""
         self.is_connected = False
 
-        print("Closing SSH backend...")
+        log.info("Closing SSH backend...")
+
+        # Ask the writer to stop now; it is joined once the channel is closed,
+        # which also unblocks a send waiting on the remote window
+        if self.send_queue:
+            self.send_queue.request_stop()
+
+        # Closing the channel ends the reader's recv loop, so it returns from
+        # run() on its own. terminate() is only a fallback: a thread killed
+        # inside run() never unwinds that frame, which keeps the reader, its
+        # session logger and the whole terminal alive
+        try:
+            if self.channel:
+                log.debug("Closing channel...")
+                self.channel.close()
+                log.debug("Channel closed")
+        except Exception as e:
+            log.error("Error closing channel: %s", e)
 
         try:
             if self.reader_thread and self.reader_thread.isRunning():
-                print("Stopping reader thread...")
-                self.reader_thread.terminate()
-                self.reader_thread.wait(2000)
-                print("Reader thread stopped")
+                log.debug("Stopping reader thread...")
+                if not self.reader_thread.wait(2000):
+                    log.warning("Reader thread did not exit, terminating it")
+                    self.reader_thread.terminate()
+                    self.reader_thread.wait(1000)
+                log.debug("Reader thread stopped")
         except Exception as e:
-            print(f"Error stopping reader thread: {e}")
+            log.error("Error stopping reader thread: %s", e)
 
         try:
-            if self.channel:
-                print("Closing channel...")
-                self.channel.close()
-                print("Channel closed")
+            if self.send_queue:
+                self.send_queue.stop()
         except Exception as e:
-            print(f"Error closing channel: {e}")
+            log.error("Error stopping send queue: %s", e)
 
         try:
             if self.client:
-                print("Closing client...")
+                log.debug("Closing client...")
                 self.client.close()
-                print("Client closed")
+                log.debug("Client closed")
         except Exception as e:
-            print(f"Error closing client: {e}")
\ No newline at end of file
+            log.error("Error closing client: %s", e)
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""
+SSH private key loading with an in-memory decrypted key cache
+
+Parsing an OpenSSH-format key with a bcrypt KDF costs hundreds of milliseconds
+of CPU, so keys are decrypted once per application session and reused for
+every following connection that names the same key file.
+"""
+import os
+import threading
+import time
+
+from coolpyterm.app_logging import get_logger
+
+log = get_logger('ssh')
+
+
+class KeyLoadError(Exception):
+    """Raised when a private key file cannot be loaded or decrypted"""
+
+
+class PrivateKeyCache:
+    """
+    Thread-safe cache of decrypted paramiko keys
+
+    Entries are keyed by the resolved path and invalidated when the file's
+    mtime or size changes, or when the optional lifetime expires.
+    """
+
+    def __init__(self, lifetime=None):
+        # lifetime in seconds - None keeps keys for the whole session
+        self.lifetime = lifetime
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _file_signature(self, path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, key_path, passphrase=None):
+        """Return a decrypted key for key_path, loading it on first use"""
+        path = os.path.realpath(os.path.expanduser(str(key_path).strip()))
+
+        try:
+            signature = self._file_signature(path)
+        except OSError as e:
+            raise KeyLoadError(f"Cannot read key file {path}: {e}")
+
+        # Hold the lock while loading so concurrent connects to many devices
+        # wait for a single key derivation instead of each running their own
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                pkey, entry_signature, loaded_at = entry
+                expired = self.lifetime is not None and time.monotonic() - loaded_at > self.lifetime
+                if entry_signature == signature and not expired:
+                    self.hits += 1
+                    return pkey
+
+            self.misses += 1
+            pkey = load_private_key(path, passphrase)
+            self._entries[path] = (pkey, signature, time.monotonic())
+            return pkey
+
+    def evict(self, key_path):
+        """Drop a single key from the cache"""
+        path = os.path.realpath(os.path.expanduser(str(key_path).strip()))
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def clear(self):
+        """Forget all decrypted keys"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+def load_private_key(key_path, passphrase=None):
+    """
+    Load a private key of any supported type (Ed25519, ECDSA, RSA)
+
+    Both PEM and OpenSSH container formats are detected automatically.
+    """
+    import paramiko
+
+    if isinstance(passphrase, str):
+        passphrase = passphrase.encode('utf-8')
+
+    start = time.perf_counter()
+    try:
+        # Passed positionally: the argument was renamed between paramiko releases
+        pkey = paramiko.PKey.from_path(key_path, passphrase or None)
+    except (paramiko.PasswordRequiredException, TypeError):
+        # cryptography reports a missing passphrase as TypeError
+        raise KeyLoadError(f"Key {key_path} is encrypted and no passphrase was given")
+    except (paramiko.SSHException, paramiko.pkey.UnknownKeyType, ValueError) as e:
+        raise KeyLoadError(f"Unable to load key {key_path}: {e}")
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    log.debug("Loaded %s key from %s in %.1fms", pkey.get_name(), key_path, elapsed_ms)
+    return pkey
+
+
+# Shared cache for the whole application session
+_default_cache = PrivateKeyCache()
+
+
+def get_key_cache():
+    """Return the application-wide private key cache"""
+    return _default_cache
+
+
+def set_key_cache_lifetime(seconds):
+    """Set how long decrypted keys stay cached (None = whole session)"""
+    _default_cache.lifetime = seconds
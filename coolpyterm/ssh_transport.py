@@ -0,0 +1,143 @@
+"""
+Per-connection SSH transport tuning
+
+Algorithm preferences, window and packet sizes and compression are applied to
+each paramiko Transport as it is created, instead of patching the Transport
+class globally for every connection in the process.
+"""
+from dataclasses import dataclass, replace
+from typing import Optional, Tuple
+
+
+# Fast AEAD ciphers first: GCM needs no separate MAC pass and uses AES-NI
+THROUGHPUT_CIPHERS = (
+    "aes128-gcm@openssh.com", "aes256-gcm@openssh.com",
+    "chacha20-poly1305@openssh.com",
+    "aes128-ctr", "aes192-ctr", "aes256-ctr",
+)
+
+THROUGHPUT_KEX = (
+    "curve25519-sha256", "curve25519-sha256@libssh.org",
+    "ecdh-sha2-nistp256", "ecdh-sha2-nistp384", "ecdh-sha2-nistp521",
+    "diffie-hellman-group14-sha256", "diffie-hellman-group16-sha512",
+    "diffie-hellman-group-exchange-sha256",
+)
+
+THROUGHPUT_MACS = (
+    "hmac-sha2-256-etm@openssh.com", "hmac-sha2-512-etm@openssh.com",
+    "hmac-sha2-256", "hmac-sha2-512",
+)
+
+THROUGHPUT_KEYS = (
+    "ssh-ed25519", "ecdsa-sha2-nistp256", "ecdsa-sha2-nistp384",
+    "ecdsa-sha2-nistp521", "rsa-sha2-512", "rsa-sha2-256",
+)
+
+# Old network gear often only speaks CBC ciphers and SHA1 key exchange
+LEGACY_CIPHERS = THROUGHPUT_CIPHERS + (
+    "aes128-cbc", "aes192-cbc", "aes256-cbc", "3des-cbc",
+)
+
+LEGACY_KEX = THROUGHPUT_KEX + (
+    "diffie-hellman-group14-sha1", "diffie-hellman-group-exchange-sha1",
+    "diffie-hellman-group1-sha1",
+)
+
+LEGACY_MACS = THROUGHPUT_MACS + (
+    "hmac-sha1", "hmac-sha1-96", "hmac-md5", "hmac-md5-96",
+)
+
+LEGACY_KEYS = THROUGHPUT_KEYS + (
+    "ssh-rsa", "ssh-dss",
+)
+
+
+@dataclass(frozen=True)
+class TransportProfile:
+    """Algorithm order and flow-control settings for one SSH transport"""
+    name: str
+    ciphers: Tuple[str, ...]
+    kex: Tuple[str, ...]
+    macs: Tuple[str, ...]
+    keys: Tuple[str, ...]
+    window_size: int = 8 * 1024 * 1024
+    max_packet_size: int = 32768
+    compress: bool = False
+    legacy_fallback: bool = True  # Retry with the legacy profile on algorithm mismatch
+
+    def with_overrides(self, window_size=None, max_packet_size=None, compress=None):
+        """Return a copy with per-connection overrides applied (None/0 keeps the default)"""
+        changes = {}
+        if window_size:
+            changes['window_size'] = int(window_size)
+        if max_packet_size:
+            changes['max_packet_size'] = int(max_packet_size)
+        if compress is not None:
+            changes['compress'] = bool(compress)
+        return replace(self, **changes) if changes else self
+
+    def transport_factory(self):
+        """Build a factory suitable for SSHClient.connect(transport_factory=...)"""
+        import paramiko
+
+        def factory(sock, disabled_algorithms=None, **kwargs):
+            transport = paramiko.Transport(
+                sock,
+                default_window_size=self.window_size,
+                default_max_packet_size=self.max_packet_size,
+                disabled_algorithms=disabled_algorithms,
+                **kwargs
+            )
+            self.apply(transport)
+            return transport
+
+        return factory
+
+    def apply(self, transport):
+        """Set algorithm preferences on a transport before negotiation starts"""
+        options = transport.get_security_options()
+        options.ciphers = _supported(self.ciphers, transport._cipher_info)
+        options.kex = _supported(self.kex, transport._kex_info)
+        options.digests = _supported(self.macs, transport._mac_info)
+        options.key_types = _supported(self.keys, transport._key_info)
+
+
+def _supported(preferred, available):
+    """Keep the preferred order but drop names this paramiko build can't negotiate"""
+    return tuple(name for name in preferred if name in available)
+
+
+TRANSPORT_PROFILES = {
+    'throughput': TransportProfile(
+        name='throughput',
+        ciphers=THROUGHPUT_CIPHERS,
+        kex=THROUGHPUT_KEX,
+        macs=THROUGHPUT_MACS,
+        keys=THROUGHPUT_KEYS,
+    ),
+    'legacy': TransportProfile(
+        name='legacy',
+        ciphers=LEGACY_CIPHERS,
+        kex=LEGACY_KEX,
+        macs=LEGACY_MACS,
+        keys=LEGACY_KEYS,
+        legacy_fallback=False,
+    ),
+}
+
+
+def get_transport_profile(name: Optional[str] = None, window_size=None, max_packet_size=None,
+                          compress=None) -> TransportProfile:
+    """Look up a transport profile by name and apply connection overrides"""
+    profile = TRANSPORT_PROFILES.get((name or 'throughput').lower(), TRANSPORT_PROFILES['throughput'])
+    return profile.with_overrides(window_size, max_packet_size, compress)
+
+
+def is_algorithm_mismatch(error):
+    """True if a connect failure was caused by no common algorithms"""
+    import paramiko
+
+    incompatible = getattr(paramiko.ssh_exception, 'IncompatiblePeer', None)
+    if incompatible is not None and isinstance(error, incompatible):
+        return True
+    return isinstance(error, paramiko.SSHException) and 'Incompatible ssh' in str(error)
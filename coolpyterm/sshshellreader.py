@@ -1,5 +1,11 @@
 from PyQt6.QtCore import pyqtSignal, QThread
-import os
+
+from coolpyterm import tracing
+from coolpyterm.app_logging import get_logger
+from coolpyterm.log_handler import SessionLogger
+
+log = get_logger('ssh')
+
 
 class ShellReaderThread(QThread):
     data_ready = pyqtSignal(str)
@@ -9,27 +15,21 @@ class ShellReaderThread(QThread):
         self.channel = channel
         self.intial_buffer = buffer
         self.parent_widget = parent_widget
-        if parent_widget.log_filename is not None:
-            self.log_filename = parent_widget.log_filename
-        else:
-            self.log_filename = "../logs/session.log"
 
-        # Ensure log directory exists
-        os.makedirs(os.path.dirname(self.log_filename), exist_ok=True)
+        # Logging happens on the terminal's SessionLogger thread, never here
+        self.owns_logger = False
+        get_logger = getattr(parent_widget, 'get_session_logger', None)
+        self.session_logger = get_logger() if get_logger else None
+        if self.session_logger is None and not getattr(parent_widget, '_is_closing', False):
+            log_filename = getattr(parent_widget, 'log_filename', None) or "../logs/session.log"
+            self.session_logger = SessionLogger(log_filename)
+            self.session_logger.start()
+            self.owns_logger = True
 
     def log_data(self, data):
-        # Make sure that a log filename was provided
-        if self.log_filename is not None:
-            try:
-                # Attempt to encode and decode the data as UTF-8 to ensure it's valid
-                data = data.encode('utf-8', 'ignore').decode('utf-8', 'ignore')
-                data = data.replace('\r\n', '\n').replace('\r', '\n')
-                with open(self.log_filename, 'a', encoding='utf-8') as log_file: # 'a' option will append data to the end of the file
-                    # log_file.write(data + os.linesep)
-                    log_file.write(data)
-            except UnicodeError:
-                print("Failed to encode data as UTF-8.")
-
+        # Hand off to the writer thread - drops (and counts) rather than blocking
+        if self.session_logger is not None:
+            self.session_logger.log(data)
 
     def run(self):
         while True:
@@ -38,20 +38,27 @@ class ShellReaderThread(QThread):
                     data = self.channel.recv(1024)
 
                     if data:
-                        data_decoded = data.decode()
-                        # Log data that is being received
-                        self.log_data(data_decoded)
+                        with tracing.span('recv', 'reader', bytes=len(data)):
+                            data_decoded = data.decode()
+                            # Log data that is being received
+                            self.log_data(data_decoded)
 
-                        # for debugging
-                        if self.intial_buffer == "":
-                            self.intial_buffer = bytes(data).decode('utf-8')
-                            self.parent_widget.initial_buffer = bytes(data).decode('utf-8')
+                            # for debugging
+                            if self.intial_buffer == "":
+                                self.intial_buffer = bytes(data).decode('utf-8')
+                                self.parent_widget.initial_buffer = bytes(data).decode('utf-8')
 
-                        self.data_ready.emit(data_decoded)
+                            received = getattr(self.parent_widget, 'on_raw_received', None)
+                            if received is not None:
+                                received(data, data_decoded)
+                            self.data_ready.emit(data_decoded)
                 except Exception as e:
-                    print(f"Error while reading from channel: {e}")
+                    log.error("Error while reading from channel: %s", e)
                     self.log_data(f"Error while reading from channel: {e}")
             else:
-                print("Channel closed...")
+                log.info("Channel closed")
                 self.log_data("Channel closed...")
                 break
+
+        if self.owns_logger:
+            self.session_logger.close()
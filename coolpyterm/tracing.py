@@ -0,0 +1,210 @@
+"""
+Pipeline tracing
+
+An optional, always-compiled-in tracer that records what the reader threads
+and the GUI thread spend time on, in a fixed-size ring buffer, and dumps it
+as Chrome Trace Event JSON for chrome://tracing or https://ui.perfetto.dev.
+
+Spans recorded:
+
+    recv       reader thread: decode, log and emit one received chunk
+    signal     hand-off between threads (an async slice plus a flow arrow):
+               reader emit -> parser worker, and published frame -> GUI
+    parse      parser worker: one batch of queued output, containing:
+    feed       engine feed of one chunk
+    snapshot   collecting changed rows into the published frame
+    apply_frame  GUI thread: one taken frame, containing:
+    grid       changed rows copied into the grid, colors mapped
+    redraw     full grid rebuild (resize, theme, reset)
+    rasterize  grid -> QImage
+    upload     QImage -> GL texture
+    paintGL    the whole frame
+
+Tracing is off unless start() was called (View > Pipeline Tracing or
+--trace FILE). GUI-side code wraps work in span(), which hands back a shared
+no-op context manager while tracing is off:
+
+    with tracing.span('feed', 'parse'):
+        self.stream.feed(data)
+
+Reader loops read the module-level `tracer` directly, which is None while
+off, so a disabled tracer costs one global lookup per chunk:
+
+    tracer = tracing.tracer
+    if tracer is not None:
+        start = tracer.now()
+    ...
+    if tracer is not None:
+        tracer.complete('recv', 'reader', start, bytes=len(data))
+
+Appends to a deque are atomic, so reader threads record without a lock.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from itertools import count
+
+
+DEFAULT_CAPACITY = 200_000
+
+# The active Tracer, or None when tracing is off
+tracer = None
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+class Tracer:
+    """Ring buffer of trace events; the oldest are dropped once full"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.events = deque(maxlen=capacity)
+        self.thread_names = {}
+        self.started = time.perf_counter_ns()
+        self._flow_ids = count(1)
+        self._in_flight = {}  # channel key -> deque of (emit ns, flow id)
+
+    @staticmethod
+    def now():
+        return time.perf_counter_ns()
+
+    def _tid(self):
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = _thread_label()
+        return tid
+
+    def complete(self, name, cat, start_ns, end_ns=None, **args):
+        """Record a span that began at start_ns (from now()) and ends now"""
+        if end_ns is None:
+            end_ns = time.perf_counter_ns()
+        self.events.append(('X', name, cat, start_ns, end_ns - start_ns, self._tid(), args or None))
+
+    def instant(self, name, cat, **args):
+        self.events.append(('i', name, cat, time.perf_counter_ns(), 0, self._tid(), args or None))
+
+    def signal_sent(self, key):
+        """Reader thread: a chunk was emitted towards the GUI thread over channel `key`"""
+        flow_id = next(self._flow_ids)
+        now = time.perf_counter_ns()
+        queue = self._in_flight.get(key)
+        if queue is None:
+            queue = self._in_flight.setdefault(key, deque(maxlen=4096))
+        queue.append((now, flow_id))
+        self.events.append(('s', 'signal', 'signal', now, 0, self._tid(), flow_id))
+
+    def signal_delivered(self, key):
+        """GUI thread: the oldest chunk in flight on `key` reached its slot"""
+        queue = self._in_flight.get(key)
+        if not queue:
+            return
+        try:
+            sent_ns, flow_id = queue.popleft()
+        except IndexError:
+            return
+        now = time.perf_counter_ns()
+        tid = self._tid()
+        # The wait overlaps whatever the GUI thread was doing, so it goes on an async track
+        self.events.append(('b', 'signal', 'signal', sent_ns, 0, tid, flow_id))
+        self.events.append(('e', 'signal', 'signal', now, 0, tid, flow_id))
+        self.events.append(('f', 'signal', 'signal', now, 0, tid, flow_id))
+
+    def to_chrome_trace(self):
+        """Events as a Chrome Trace Event Format dict"""
+        pid = os.getpid()
+        origin = self.started
+        trace_events = [
+            {'ph': 'M', 'name': 'process_name', 'pid': pid, 'tid': 0, 'args': {'name': 'CoolPyTerm'}},
+        ]
+        for tid, label in list(self.thread_names.items()):
+            trace_events.append({'ph': 'M', 'name': 'thread_name', 'pid': pid, 'tid': tid, 'args': {'name': label}})
+
+        for ph, name, cat, ts, dur, tid, extra in list(self.events):
+            event = {'ph': ph, 'name': name, 'cat': cat, 'pid': pid, 'tid': tid, 'ts': (ts - origin) / 1000}
+            if ph == 'X':
+                event['dur'] = dur / 1000
+                if extra:
+                    event['args'] = extra
+            elif ph == 'i':
+                event['s'] = 't'
+                if extra:
+                    event['args'] = extra
+            else:
+                # Async begin/end and flow start/finish, paired by id; the flow
+                # finish binds to the next slice on the receiving thread
+                event['id'] = extra
+            trace_events.append(event)
+
+        return {
+            'traceEvents': trace_events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'capacity': self.capacity, 'events': len(self.events)},
+        }
+
+    def dump(self, path):
+        """Write the buffer to a Chrome trace JSON file; returns the number of events"""
+        trace_dir = os.path.dirname(path)
+        if trace_dir:
+            os.makedirs(trace_dir, exist_ok=True)
+        trace = self.to_chrome_trace()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+        return len(trace['traceEvents'])
+
+
+def _thread_label():
+    """Readable name for the current thread; QThreads show their class name"""
+    if threading.current_thread() is threading.main_thread():
+        return 'GUI'
+    try:
+        from PyQt6.QtCore import QThread
+        qthread = QThread.currentThread()
+        if qthread is not None and type(qthread) is not QThread:
+            return type(qthread).__name__
+    except ImportError:
+        pass
+    return threading.current_thread().name
+
+
+def start(capacity=DEFAULT_CAPACITY):
+    """Turn tracing on (keeping an already running tracer)"""
+    global tracer
+    if tracer is None:
+        tracer = Tracer(capacity)
+    return tracer
+
+
+def stop():
+    """Turn tracing off; returns the tracer so it can still be dumped"""
+    global tracer
+    stopped, tracer = tracer, None
+    return stopped
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start')
+
+    def __init__(self, active, name, cat, args):
+        self.tracer = active
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.complete(self.name, self.cat, self.start, **self.args)
+        return False
+
+
+def span(name, cat, **args):
+    """Context manager recording a complete event; a no-op while tracing is off"""
+    active = tracer
+    if active is None:
+        return _NO_SPAN
+    return _Span(active, name, cat, args)
@@ -0,0 +1,525 @@
+"""
+Terminal emulation engines: decoded output in, screen rows out
+
+An engine is the parsing core shared by the parser thread (parser_worker.py)
+and the parser processes (shared_screen.py). Engines have no Qt dependency,
+so a spawned worker process can import them without loading PyQt. Both
+parsing modes drive an engine through the same interface:
+
+    feed(text)          parse decoded output
+    apply(item)         feed() a string or run a ('resize', columns, lines) /
+                        ('reset',) command; True when the whole screen changed
+    changes(full)       (rows, scrolled): changed rows as tuples of pyte Chars
+                        and the lines scrolled off the top since the last call
+    state()             (cursor, cursor_hidden, alternate, bracketed_paste, history)
+    columns, lines, alternate, closing, scrollback_limit
+    screen              the pyte screen, or None for engines without one
+
+Scrolled lines are pyte lines or Char tuples; line_cells() reads either.
+A row or line whose text soft-wraps onto the next one is flagged: a
+WrappedRow tuple, or a pyte line with wrapped = True (is_wrapped()). On a
+column change the engines rewrap their screen with reflow_screen(), and
+the GUI rewraps its scrollback with rewrap().
+
+ENGINES names the implementations ('parsing/engine' picks one):
+
+    pyte   VTSession, pyte's HistoryScreen and Stream
+    fast   FastSession (fast_engine.py), bulk text runs and compact row arrays
+"""
+import importlib
+from bisect import bisect_right
+from collections import defaultdict
+
+import pyte
+from pyte.screens import Char, HistoryScreen, Margins, Screen
+
+from coolpyterm.app_logging import get_logger
+
+log = get_logger('terminal')
+
+ENGINES = {
+    'pyte': ('coolpyterm.vt_session', 'VTSession'),
+    'fast': ('coolpyterm.fast_engine', 'FastSession'),
+}
+
+BLANK = Char(" ", "default", "default")
+
+
+class WrappedRow(tuple):
+    """Char tuple of a row whose text continues on the next one (autowrap, not a newline)
+
+    Unequal to a plain tuple of the same Chars, so a row that only gained
+    or lost the flag still counts as changed.
+    """
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return type(other) is WrappedRow and tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = tuple.__hash__
+
+
+def is_wrapped(line):
+    """True for a row or scrolled line that soft-wraps onto the next one"""
+    return type(line) is WrappedRow or getattr(line, 'wrapped', False)
+
+
+def create_session(engine='pyte', columns=80, lines=24):
+    """A new session on the named engine; unknown names fall back to pyte"""
+    if engine not in ENGINES:
+        log.warning("Unknown terminal engine %r, using pyte", engine)
+        engine = 'pyte'
+    module, name = ENGINES[engine]
+    return getattr(importlib.import_module(module), name)(columns, lines)
+
+
+# Private modes that switch to the alternate screen; 1049 also saves the cursor
+ALTERNATE_MODES = (1049, 1047, 47)
+
+
+class SessionScreen(HistoryScreen):
+    """HistoryScreen with an alternate screen that also remembers the lines scrolled off
+
+    pyte has no alternate screen. Entering one sets the main buffer aside
+    untouched and leaving puts it back, so vim or htop exiting restores the
+    shell screen as it was; nothing they scroll goes into history.
+    """
+
+    def __init__(self, columns, lines, **kwargs):
+        self.alternate = False
+        self.main_buffer = None     # the main screen's buffer while on the alternate one
+        self.main_savepoint = None  # cursor saved by ?1049
+        self._drawing = False
+        super().__init__(columns, lines, **kwargs)
+        self.scrolled_off = []
+
+    def draw(self, data):
+        self._drawing = True
+        try:
+            super().draw(data)
+        finally:
+            self._drawing = False
+
+    def carriage_return(self):
+        # Within draw() a carriage return is autowrap: the line runs on into the next
+        if self._drawing:
+            self.buffer[self.cursor.y].wrapped = True
+        super().carriage_return()
+
+    # A row stops running on into the next once its last column is erased
+
+    def erase_in_line(self, how=0, *args, **kwargs):
+        if how != 1:
+            self.buffer[self.cursor.y].wrapped = False
+        super().erase_in_line(how, *args, **kwargs)
+
+    def erase_in_display(self, how=0, *args, **kwargs):
+        rows = {0: range(self.cursor.y + 1, self.lines), 1: range(self.cursor.y)}.get(how, range(self.lines))
+        for y in rows:
+            if y in self.buffer:
+                self.buffer[y].wrapped = False
+        super().erase_in_display(how, *args, **kwargs)
+
+    def erase_characters(self, count=None):
+        if self.cursor.x + (count or 1) >= self.columns:
+            self.buffer[self.cursor.y].wrapped = False
+        super().erase_characters(count)
+
+    def set_mode(self, *modes, **kwargs):
+        super().set_mode(*modes, **kwargs)
+        if kwargs.get('private'):
+            for mode in modes:
+                if mode in ALTERNATE_MODES:
+                    self.switch_screen(True, mode)
+
+    def reset_mode(self, *modes, **kwargs):
+        super().reset_mode(*modes, **kwargs)
+        if kwargs.get('private'):
+            for mode in modes:
+                if mode in ALTERNATE_MODES:
+                    self.switch_screen(False, mode)
+
+    def switch_screen(self, alternate, mode):
+        if alternate == self.alternate:
+            return
+        if alternate:
+            if mode == 1049:
+                self.save_cursor()
+                self.main_savepoint = self.savepoints.pop()
+            self.main_buffer = self.buffer
+            self.buffer = defaultdict(self.buffer.default_factory)
+        else:
+            self.buffer = self.main_buffer
+            self.main_buffer = None
+            if mode == 1049 and self.main_savepoint is not None:
+                self.savepoints.append(self.main_savepoint)
+                self.restore_cursor()
+            self.main_savepoint = None
+        self.alternate = alternate
+        self.dirty.update(range(self.lines))
+
+    def index(self):
+        if self.alternate:
+            Screen.index(self)
+            return
+        # Same condition HistoryScreen uses to push a line into history.top
+        top, bottom = self.margins or Margins(0, self.lines - 1)
+        if self.cursor.y == bottom:
+            self.scrolled_off.append(self.buffer[top])
+        super().index()
+
+    def reverse_index(self):
+        if self.alternate:
+            Screen.reverse_index(self)
+        else:
+            super().reverse_index()
+
+    def resize(self, lines=None, columns=None):
+        old_lines, old_columns = self.lines, self.columns
+        lines = lines or old_lines
+        columns = columns or old_columns
+        if columns != old_columns:
+            # A column change rewraps the main screen instead of clipping it;
+            # the alternate one is left to pyte, its program redraws anyway
+            if self.alternate:
+                savepoint = self.main_savepoint
+                cursor = (savepoint.cursor.y, savepoint.cursor.x) if savepoint is not None else (0, 0)
+                self.main_buffer, (y, x) = self._reflow_buffer(self.main_buffer, columns, lines, cursor)
+                if savepoint is not None:
+                    savepoint.cursor.y, savepoint.cursor.x = y, x
+            else:
+                self.buffer, (self.cursor.y, self.cursor.x) = self._reflow_buffer(
+                    self.buffer, columns, lines, (self.cursor.y, self.cursor.x))
+                self.lines, self.columns = lines, columns
+                self.set_margins()
+                self.dirty.update(range(lines))
+                return
+        super().resize(lines, columns)
+        main = self.main_buffer
+        if main is None or columns != old_columns:
+            return
+        # Fit the set-aside main screen the way pyte fits the visible one
+        drop = max(0, old_lines - self.lines)
+        self.main_buffer = defaultdict(main.default_factory)
+        for y, line in main.items():
+            if drop <= y < old_lines:
+                self.main_buffer[y - drop] = line
+
+    def _reflow_buffer(self, buffer, columns, lines, cursor):
+        """A main-screen buffer rewrapped to columns x lines, and where the cursor went"""
+        blank = self.default_char
+        rows = []
+        for y in range(self.lines):
+            line = buffer.get(y)
+            row = screen_row(line, self.columns, blank) if line else (blank,) * self.columns
+            rows.append(WrappedRow(row) if is_wrapped(line) else row)
+        rows, cursor, overflow = reflow_screen(rows, columns, lines, cursor)
+        self.scrolled_off.extend(overflow)
+
+        reflowed = defaultdict(buffer.default_factory)
+        for y, row in enumerate(rows):
+            line = reflowed[y]
+            for x, char in enumerate(row):
+                if char != blank:
+                    line[x] = char
+            if type(row) is WrappedRow:
+                line.wrapped = True
+        return reflowed, cursor
+
+    def reset(self):
+        if self.main_buffer is not None:
+            self.buffer = self.main_buffer
+        self.alternate = False
+        self.main_buffer = None
+        self.main_savepoint = None
+        super().reset()
+
+
+class VTSession:
+    """The pyte engine: parses output and commands and reports what changed since the last call"""
+
+    def __init__(self, columns=80, lines=24):
+        self.screen = SessionScreen(columns, lines)
+        self.closing = False
+        self.stream = create_stream(self, self.screen)
+        patch_screen(self, self.screen)
+        # How many scrolled-off lines changes() hands over; older ones are dropped
+        self.scrollback_limit = 1000
+        self._rows = {}  # last reported row tuples, to drop rows that did not change
+
+    @property
+    def columns(self):
+        return self.screen.columns
+
+    @property
+    def lines(self):
+        return self.screen.lines
+
+    @property
+    def alternate(self):
+        return self.screen.alternate
+
+    def feed(self, text):
+        self.stream.feed(text)
+
+    def apply(self, item):
+        """Parse a string or run a ('resize', columns, lines) / ('reset',) command
+
+        Returns True when the whole screen has to be redrawn.
+        """
+        screen = self.screen
+        if isinstance(item, str):
+            self.feed(item)
+            return False
+        if item[0] == 'resize':
+            _, columns, lines = item
+            if (columns, lines) != (screen.columns, screen.lines):
+                screen.resize(lines, columns)
+                return True
+        elif item[0] == 'reset':
+            screen.reset()
+            screen.scrolled_off.clear()
+            return True
+        return False
+
+    def changes(self, full):
+        """(rows, scrolled): changed rows as Char tuples and the pyte lines scrolled off"""
+        screen = self.screen
+        columns = screen.columns
+        buffer = screen.buffer
+        previous = self._rows
+
+        if full:
+            changed_rows = range(screen.lines)
+            previous.clear()
+        else:
+            changed_rows = screen.dirty
+        blank = screen.default_char
+        rows = {}
+        for y in changed_rows:
+            if y >= screen.lines:
+                continue
+            line = buffer[y]
+            row = screen_row(line, columns, blank)
+            if getattr(line, 'wrapped', False):
+                row = WrappedRow(row)
+            if full or previous.get(y) != row:
+                rows[y] = previous[y] = row
+        screen.dirty.clear()
+
+        # Handed over as pyte lines: nothing writes to a line once it has left
+        # the buffer, and most of a flood is never looked at again.
+        scrolled = []
+        if screen.scrolled_off:
+            scrolled = screen.scrolled_off[-self.scrollback_limit:]
+            screen.scrolled_off = []
+        return rows, scrolled
+
+    def state(self):
+        """(cursor, cursor_hidden, alternate, bracketed_paste, history)"""
+        screen = self.screen
+        mode = screen.mode
+        return ((screen.cursor.y, screen.cursor.x), screen.cursor.hidden, self.alternate,
+                2004 in mode or (2004 << 5) in mode, len(screen.history.top))
+
+
+def line_cells(line, columns):
+    """A scrolled line (pyte line or Char tuple) as exactly `columns` Chars, flag kept"""
+    if isinstance(line, tuple):
+        if len(line) == columns:
+            return line
+        cells = line[:columns] if len(line) > columns else line + (BLANK,) * (columns - len(line))
+    else:
+        cells = screen_row(line, columns, BLANK)
+    return WrappedRow(cells) if is_wrapped(line) else cells
+
+
+def _row_cells(line):
+    """A row or scrolled line as a Char tuple of its own width"""
+    if isinstance(line, tuple):
+        return line
+    return screen_row(line, max(line, default=-1) + 1, BLANK)
+
+
+def _fits(line, columns):
+    """True if a line that ends its logical line is already no wider than `columns`"""
+    if isinstance(line, tuple):
+        return len(line) <= columns
+    return not line or max(line) < columns
+
+
+def rewrap(rows, columns, cursor=None):
+    """Rows (Char tuples or pyte lines) rewrapped to `columns`
+
+    Soft-wrapped rows are joined with the rows they run on into and cut again
+    at the new width, without splitting a wide character from its stub; a
+    line's trailing blanks are dropped first. A last row that is itself
+    wrapped continues beyond `rows` and stays wrapped. Lines that already
+    fit are kept as they are. Returns the new rows and where the cell at
+    `cursor` (row, column) ended up, or None without a cursor.
+    """
+    reflowed = []
+    moved = None
+    count = len(rows)
+    y = 0
+    while y < count:
+        first = y
+        while y < count - 1 and is_wrapped(rows[y]):
+            y += 1
+        last = rows[y]
+        y += 1
+        holds_cursor = cursor is not None and first <= cursor[0] < y
+        if first == y - 1 and not holds_cursor and not is_wrapped(last) and _fits(last, columns):
+            reflowed.append(last)
+            continue
+
+        cells = []
+        offset = 0
+        for index in range(first, y):
+            if holds_cursor and index == cursor[0]:
+                offset = len(cells) + cursor[1]
+            cells.extend(_row_cells(rows[index]))
+        wrapped = is_wrapped(last)
+        if not wrapped:
+            while cells and cells[-1] == BLANK:
+                cells.pop()
+        if holds_cursor and len(cells) < offset:
+            cells.extend([BLANK] * (offset - len(cells)))
+
+        top = len(reflowed)
+        starts = _split(cells, columns, wrapped, reflowed)
+        if holds_cursor:
+            index = bisect_right(starts, offset) - 1
+            moved = (top + index, min(offset - starts[index], columns - 1))
+    return reflowed, moved
+
+
+def _split(cells, columns, wrapped, out):
+    """Append cells to out as rows of at most `columns`; returns where each row starts"""
+    starts = []
+    start = 0
+    count = len(cells)
+    while True:
+        starts.append(start)
+        end = start + columns
+        if end >= count:
+            row = tuple(cells[start:])
+            out.append(WrappedRow(row) if wrapped else row)
+            return starts
+        if cells[end].data == '' and end - 1 > start:
+            end -= 1  # the wide character before its stub moves down with it
+        row = cells[start:end]
+        row.extend([BLANK] * (columns - len(row)))
+        out.append(WrappedRow(row))
+        start = end
+
+
+def reflow_screen(rows, columns, lines, cursor):
+    """A screen's rows rewrapped to `columns` and fitted into `lines`
+
+    rows are Char tuples, WrappedRow where the row runs on into the next,
+    and cursor is a (row, column) in them. Blank rows below both the text
+    and the cursor are not carried over. Returns (rows, cursor, overflow):
+    exactly `lines` rows `columns` wide, the cursor's new position and the
+    rows pushed off the top to keep the cursor on screen, oldest first.
+    """
+    cursor = (max(0, min(cursor[0], len(rows) - 1)), max(0, cursor[1]))
+    used = cursor[0] + 1
+    for y in range(len(rows) - 1, cursor[0], -1):
+        if any(char != BLANK for char in rows[y]):
+            used = y + 1
+            break
+    reflowed, (y, x) = rewrap(rows[:used], columns, cursor)
+
+    # Rows above the cursor scroll off; beyond that, the ones at the bottom are dropped
+    drop = min(max(0, len(reflowed) - lines), y)
+    overflow = reflowed[:drop]
+    reflowed = reflowed[drop:drop + lines]
+    y -= drop
+
+    fitted = []
+    for row in reflowed:
+        if len(row) < columns:
+            padded = row + (BLANK,) * (columns - len(row))
+            row = WrappedRow(padded) if type(row) is WrappedRow else padded
+        fitted.append(row)
+    fitted.extend([(BLANK,) * columns] * (lines - len(fitted)))
+    return fitted, (y, x), overflow
+
+
+def screen_row(line, columns, blank):
+    """A pyte line as a tuple of Chars; only the cells that were written are looked up"""
+    row = [blank] * columns
+    for x, char in line.items():
+        if x < columns:
+            row[x] = char
+    return tuple(row)
+
+
+def create_stream(owner, screen):
+    """A pyte stream whose feed logs and skips parser errors instead of raising"""
+    stream = pyte.Stream(screen)
+    original_feed = stream.feed
+
+    def safe_feed(data):
+        if owner.closing:
+            return
+        try:
+            return original_feed(data)
+        except TypeError as e:
+            if 'unexpected keyword argument' in str(e):
+                log.warning("Pyte compatibility error (continuing): %s", e)
+                return
+            raise
+        except Exception as e:
+            log.warning("Pyte feed error (continuing): %s", e)
+
+    stream.feed = safe_feed
+    return stream
+
+
+def patch_screen(owner, screen):
+    """Make the screen handlers tolerate the private/intermediate arguments newer streams pass"""
+    try:
+        original_sgr = screen.select_graphic_rendition
+
+        def patched_sgr(*args, **kwargs):
+            if owner.closing:
+                return None
+            kwargs.pop('private', None)
+            kwargs.pop('intermediate', None)
+            try:
+                return original_sgr(*args, **kwargs)
+            except Exception as e:
+                log.warning("SGR error (continuing): %s", e)
+                return None
+
+        screen.select_graphic_rendition = patched_sgr
+
+        for method_name in ('set_mode', 'reset_mode', 'set_margins', 'cursor_position'):
+            if hasattr(screen, method_name):
+                original_method = getattr(screen, method_name)
+
+                def create_patched_method(orig_method, name):
+                    def patched_method(*args, **kwargs):
+                        if owner.closing:
+                            return None
+                        kwargs.pop('private', None)
+                        kwargs.pop('intermediate', None)
+                        try:
+                            return orig_method(*args, **kwargs)
+                        except Exception as e:
+                            log.warning("%s error (continuing): %s", name, e)
+                            return None
+                    return patched_method
+
+                setattr(screen, method_name, create_patched_method(original_method, method_name))
+
+        log.debug("Applied comprehensive pyte compatibility patches")
+
+    except Exception as e:
+        log.error("Pyte patch failed: %s", e)
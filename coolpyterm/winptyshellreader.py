@@ -8,6 +8,11 @@ import time
 from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot, QTimer
 from PyQt6.QtWidgets import QMessageBox
 
+from coolpyterm import tracing
+from coolpyterm.app_logging import get_logger, TRACE
+
+log = get_logger('pty')
+
 
 class WinPtyReaderThread(QThread):
     """
@@ -26,7 +31,7 @@ class WinPtyReaderThread(QThread):
 
     def run(self):
         """Main thread loop - reads from WinPTY process"""
-        print("🔥 WinPtyReaderThread started")
+        log.debug("WinPtyReaderThread started")
 
         while self.running and self.pty_process and self.pty_process.isalive():
             try:
@@ -36,31 +41,37 @@ class WinPtyReaderThread(QThread):
                     data = self.pty_process.read(self.buffer_size)
 
                     if data:
-                        # Convert bytes to string if needed
-                        if isinstance(data, bytes):
-                            try:
-                                text_data = data.decode('utf-8', errors='replace')
-                            except UnicodeDecodeError:
-                                text_data = data.decode('latin-1', errors='replace')
-                        else:
-                            text_data = data
-
-                        if text_data:
-                            print(f"🔥 WinPtyReaderThread emitting {len(text_data)} chars")
-                            self.data_ready.emit(text_data)
+                        with tracing.span('recv', 'reader', bytes=len(data)):
+                            # Convert bytes to string if needed
+                            if isinstance(data, bytes):
+                                try:
+                                    text_data = data.decode('utf-8', errors='replace')
+                                except UnicodeDecodeError:
+                                    text_data = data.decode('latin-1', errors='replace')
+                            else:
+                                text_data = data
+
+                            received = getattr(self.parent_widget, 'on_raw_received', None)
+                            if received is not None:
+                                received(data, text_data)
+
+                            if text_data:
+                                if __debug__ and log.isEnabledFor(TRACE):
+                                    log.log(TRACE, "WinPtyReaderThread emitting %d chars", len(text_data))
+                                self.data_ready.emit(text_data)
                     else:
                         # No data available, small sleep to prevent CPU spinning
                         time.sleep(0.01)
                 else:
-                    print("WinPTY process is no longer alive")
+                    log.info("WinPTY process is no longer alive")
                     break
 
             except Exception as e:
-                print(f"Error in WinPtyReaderThread: {e}")
+                log.error("Error in WinPtyReaderThread: %s", e)
                 self.error_occurred.emit(str(e))
                 break
 
-        print("🔥 WinPtyReaderThread stopped")
+        log.debug("WinPtyReaderThread stopped")
 
     def stop(self):
         """Stop the reader thread"""
@@ -92,19 +103,19 @@ class WindowsTerminalBackend(QObject):
         self.reader_thread = None
         self.is_connected = False
 
-        print(f"Initializing Windows Terminal Backend: {shell_path}")
+        log.info("Initializing Windows Terminal Backend: %s", shell_path)
 
         # Connect immediately like your SSH backend
         try:
             self._attempt_connection()
         except Exception as e:
             error_msg = f"Windows Terminal Connection Error: {str(e)}"
-            print(error_msg)
+            log.error("%s", error_msg)
             QTimer.singleShot(10, lambda: self.connection_failed.emit(error_msg))
 
     def _attempt_connection(self):
         """Attempt Windows terminal connection using WinPTY"""
-        print("Starting Windows terminal connection...")
+        log.debug("Starting Windows terminal connection...")
 
         try:
             # Import WinPTY - handle if not available
@@ -116,8 +127,8 @@ class WindowsTerminalBackend(QObject):
             # Determine shell command and arguments
             shell_cmd = self._get_shell_command()
 
-            print(f"Starting: {shell_cmd}")
-            print(f"Working directory: {self.working_dir}")
+            log.info("Starting: %s", shell_cmd)
+            log.debug("Working directory: %s", self.working_dir)
 
             # Create WinPTY process
             self.pty_process = PtyProcess.spawn(
@@ -126,14 +137,14 @@ class WindowsTerminalBackend(QObject):
                 env=self._prepare_environment()
             )
 
-            print("WinPTY process started successfully")
+            log.info("WinPTY process started successfully")
             self.is_connected = True
 
             # Signal connection ready - same pattern as SSH backend
             QTimer.singleShot(50, self._signal_connection_ready)
 
         except Exception as e:
-            print(f"Failed to start Windows terminal: {e}")
+            log.error("Failed to start Windows terminal: %s", e)
             raise
 
     def _get_shell_command(self):
@@ -170,7 +181,7 @@ class WindowsTerminalBackend(QObject):
 
     def _signal_connection_ready(self):
         """Signal connection ready - exactly like SSH backend"""
-        print("Emitting connection_established signal...")
+        log.debug("Emitting connection_established signal...")
         self.connection_established.emit()
 
         # Start reader thread after signals are connected
@@ -179,45 +190,43 @@ class WindowsTerminalBackend(QObject):
     def _start_reader_thread(self):
         """Start the reader thread - mirrors SSH backend pattern"""
         if self.pty_process is not None:
-            print("=== STARTING WINPTY READER THREAD ===")
-            print("Signals should be connected by now...")
+            log.debug("Starting WinPTY reader thread, signals should be connected by now")
 
             # Create reader thread using WinPTY process
             self.reader_thread = WinPtyReaderThread(self.pty_process, self.parent_widget)
 
-            print("Connecting WinPtyReaderThread.data_ready to WindowsTerminalBackend.send_output...")
+            log.debug("Connecting WinPtyReaderThread.data_ready to WindowsTerminalBackend.send_output...")
             self.reader_thread.data_ready.connect(self._on_data_received)
             self.reader_thread.error_occurred.connect(self._on_error)
 
-            print("Starting WinPtyReaderThread...")
+            log.debug("Starting WinPtyReaderThread...")
             self.reader_thread.start()
-            print("✅ WinPtyReaderThread started successfully")
+            log.debug("WinPtyReaderThread started successfully")
 
             # Send startup command if specified
             if self.startup_command:
                 QTimer.singleShot(500, lambda: self.write_data(self.startup_command + "\n"))
         else:
-            print("❌ No WinPTY process available for reader thread")
+            log.error("No WinPTY process available for reader thread")
 
     def _on_data_received(self, data):
         """Handle data from WinPtyReaderThread - exactly like SSH backend"""
-        print(f"🔥 Windows Terminal Backend received data: {len(data)} chars")
-        print(f"First 50 chars: {repr(data[:50])}")
+        if __debug__ and log.isEnabledFor(TRACE):
+            log.log(TRACE, "Windows Terminal Backend received %d chars: %r", len(data), data[:50])
 
         # Forward to UI via signal
         self.send_output.emit(data)
-        print("✅ Data forwarded to UI via send_output signal")
 
     def _on_error(self, error_msg):
         """Handle errors from reader thread"""
-        print(f"Error from WinPtyReaderThread: {error_msg}")
+        log.error("Error from WinPtyReaderThread: %s", error_msg)
         self.connection_failed.emit(error_msg)
 
     @pyqtSlot(str)
     def write_data(self, data):
         """Write data to WinPTY process - matches SSH backend API exactly"""
         if not self.is_connected:
-            print("Error: Not connected to terminal")
+            log.error("Error: Not connected to terminal")
             return
 
         if self.pty_process and self.pty_process.isalive():
@@ -229,12 +238,13 @@ class WindowsTerminalBackend(QObject):
                     data_bytes = data
 
                 self.pty_process.write(data_bytes)
-                print(f"✅ Sent data to terminal: {repr(data[:50])}")
+                if __debug__ and log.isEnabledFor(TRACE):
+                    log.log(TRACE, "Sent data to terminal: %r", data[:50])
             except Exception as e:
-                print(f"Error writing to terminal: {e}")
+                log.error("Error writing to terminal: %s", e)
                 self.is_connected = False
         else:
-            print("Error: Terminal process is not alive")
+            log.error("Error: Terminal process is not alive")
 
 
 
@@ -253,37 +263,38 @@ class WindowsTerminalBackend(QObject):
                 rows = int(rows.split(":")[1])
 
                 self.pty_process.setwinsize(rows, cols)
-                print(f"Windows terminal pty resize -> cols:{cols} rows:{rows}")
+                log.debug("Windows terminal pty resize -> cols:%s rows:%s", cols, rows)
             except Exception as e:
-                print(f"Error setting terminal pty size: {e}")
+                log.error("Error setting terminal pty size: %s", e)
 
     def close(self):
         """Clean up resources - matches SSH backend pattern"""
         self.is_connected = False
-        print("Closing Windows terminal backend...")
+        log.info("Closing Windows terminal backend...")
 
         try:
             if self.reader_thread and self.reader_thread.isRunning():
-                print("Stopping reader thread...")
+                log.debug("Stopping reader thread...")
                 self.reader_thread.stop()
-                print("Reader thread stopped")
+                log.debug("Reader thread stopped")
         except Exception as e:
-            print(f"Error stopping reader thread: {e}")
+            log.error("Error stopping reader thread: %s", e)
 
         try:
             if self.pty_process and self.pty_process.isalive():
-                print("Terminating WinPTY process...")
+                log.debug("Terminating WinPTY process...")
                 self.pty_process.terminate()
-                print("WinPTY process terminated")
+                log.debug("WinPTY process terminated")
         except Exception as e:
-            print(f"Error terminating WinPTY process: {e}")
+            log.error("Error terminating WinPTY process: %s", e)
 
     # Add this method to your WindowsTerminalBackend class in winptyshellreader.py
     # (Just add this one method - don't replace the whole class)
 
     def send_command(self, data):
         """Compatibility method for KeyHandler - matches SSH backend exactly"""
-        print(f"🔑 WindowsTerminalBackend.send_command called with: {repr(data)}")
+        if __debug__ and log.isEnabledFor(TRACE):
+            log.log(TRACE, "WindowsTerminalBackend.send_command called with: %r", data)
 
         if isinstance(data, bytes):
             data_str = data.decode('utf-8')
@@ -302,7 +313,7 @@ class WindowsTerminalBackend(QObject):
     def write_data(self, data):
         """Write data to WinPTY process - matches SSH backend API exactly"""
         if not self.is_connected:
-            print("Error: Not connected to terminal")
+            log.error("Error: Not connected to terminal")
             return
 
         if self.pty_process and self.pty_process.isalive():
@@ -313,27 +324,26 @@ class WindowsTerminalBackend(QObject):
                 else:
                     data_str = data
 
-                print(f"✅ Writing to WinPTY (as string): {repr(data_str[:50])}")
                 self.pty_process.write(data_str)  # Send string, not bytes
-                print(f"✅ Successfully sent to terminal: {repr(data_str[:50])}")
+                if __debug__ and log.isEnabledFor(TRACE):
+                    log.log(TRACE, "Sent to WinPTY (as string): %r", data_str[:50])
             except Exception as e:
-                print(f"Error writing to terminal: {e}")
-                import traceback
-                traceback.print_exc()
+                log.exception("Error writing to terminal: %s", e)
                 self.is_connected = False
         else:
-            print("Error: Terminal process is not alive")
+            log.error("Error: Terminal process is not alive")
             if self.pty_process:
-                print(f"Process alive status: {self.pty_process.isalive()}")
+                log.debug("Process alive status: %s", self.pty_process.isalive())
             else:
-                print("No pty_process available")
+                log.debug("No pty_process available")
 
 
 # Also update your send_command method to be consistent:
 
     def send_command(self, data):
         """Compatibility method for KeyHandler - matches SSH backend exactly"""
-        print(f"🔑 WindowsTerminalBackend.send_command called with: {repr(data)}")
+        if __debug__ and log.isEnabledFor(TRACE):
+            log.log(TRACE, "WindowsTerminalBackend.send_command called with: %r", data)
 
         # Convert bytes to string if needed, then call write_data
         if isinstance(data, bytes):
@@ -341,7 +351,6 @@ class WindowsTerminalBackend(QObject):
         else:
             data_str = data
 
-        print(f"🔑 Converted to string: {repr(data_str)}")
         self.write_data(data_str)  # Always pass string to write_data
 def get_available_windows_shells():
     """
@@ -409,7 +418,7 @@ def get_available_windows_shells():
                     })
 
     except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
-        print("WSL not available or not accessible")
+        log.warning("WSL not available or not accessible")
 
     return shells
 
@@ -0,0 +1,4 @@
+import os
+
+# Set before anything imports PyQt6, so a plain pytest run works headless
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
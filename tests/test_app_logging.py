@@ -0,0 +1,32 @@
+"""Subsystem loggers"""
+import importlib
+import logging
+import pkgutil
+
+import pytest
+
+import coolpyterm
+from coolpyterm.app_logging import ROOT, SUBSYSTEMS, configure, get_logger
+
+
+def test_unknown_subsystem_rejected():
+    with pytest.raises(ValueError):
+        get_logger('term')
+
+
+def test_every_module_logs_under_a_subsystem():
+    for module in pkgutil.iter_modules(coolpyterm.__path__):
+        log = getattr(importlib.import_module(f"coolpyterm.{module.name}"), 'log', None)
+        if isinstance(log, logging.Logger):
+            assert log.name.split('.')[1] in SUBSYSTEMS, module.name
+
+
+def test_override_reaches_engine_logger():
+    from coolpyterm import fast_engine, parser_worker, vt_session
+    configure('warning,terminal=debug')
+    try:
+        for module in (vt_session, fast_engine, parser_worker):
+            assert module.log.getEffectiveLevel() == logging.DEBUG
+        assert logging.getLogger(f"{ROOT}.render").getEffectiveLevel() == logging.WARNING
+    finally:
+        configure()
@@ -0,0 +1,71 @@
+"""The pyte and fast engines render the same output the same way"""
+import pytest
+
+from coolpyterm.vt_session import create_session
+
+COLUMNS, LINES = 20, 8
+
+NUMBERED = "".join(f"row{i}\r\n" for i in range(9))
+
+STREAMS = {
+    'sgr': ("\x1b[1;31mred\x1b[0m \x1b[4;44munder\x1b[m \x1b[38;5;200mx\x1b[38;2;1;2;3my"
+            "\x1b[7mrev\x1b[27m\x1b[9ms\x1b[0m\r\n\x1b[3mit\x1b[23m \x1b[5mbl\x1b[25m"),
+    'cursor': "abc\x1b[5;10Hx\x1b[2Ay\x1b[3Dz\x1b[Bw\x1b[2Cv\x1b[H\x1b[4Gu",
+    'erase': NUMBERED + "\x1b[3;5H\x1b[K\x1b[5;3H\x1b[1K\x1b[7;1H\x1b[2K\x1b[2;2H\x1b[3X",
+    'scroll_region': "".join(f"{i}\r\n" for i in range(10)) + "\x1b[3;7r\x1b[7;1H\nA\nB\x1b[3;1H\x1bMC\x1b[r",
+    'insert_lines': NUMBERED + "\x1b[3;1H\x1b[2L",
+    'insert_lines_in_region': NUMBERED + "\x1b[2;6r\x1b[3;1H\x1b[2L\x1b[r",
+    'delete_lines': NUMBERED + "\x1b[3;1H\x1b[2M",
+    'delete_lines_in_region': NUMBERED + "\x1b[2;6r\x1b[3;1H\x1b[2M\x1b[r",
+    'delete_lines_colored': NUMBERED + "\x1b[44m\x1b[3;1H\x1b[2M\x1b[m",
+    'alternate_screen': "main\r\n\x1b[?1049h\x1b[Halt screen\x1b[?1049lback",
+    'alternate_screen_open': "main\r\n\x1b[?1049h\x1b[2J\x1b[Hfull screen app",
+    'wide': "中文字符\r\nab中\x1b[1;4Hx",
+    'wide_at_edge': "x" * 19 + "中y",
+    'wrap': "x" * 25 + "y" * 30 + "\r\n" + "z" * 20,
+    'no_autowrap': "\x1b[?7l" + "x" * 25 + "\x1b[?7h",
+    'modes': "\x1b[?25l\x1b[?2004habc",
+    'modes_reset': "\x1b[?25l\x1b[?2004h\x1b[?25h\x1b[?2004lx",
+}
+
+
+def render(engine, text, chunk=None):
+    session = create_session(engine, COLUMNS, LINES)
+    if chunk is None:
+        session.apply(text)
+    else:
+        # Escape sequences cut across feeds, as reads from a backend cut them
+        for start in range(0, len(text), chunk):
+            session.apply(text[start:start + chunk])
+    rows, _ = session.changes(True)
+    cursor, cursor_hidden, alternate, bracketed_paste, _ = session.state()
+    return [tuple(rows[y]) for y in range(LINES)], cursor, (cursor_hidden, alternate, bracketed_paste)
+
+
+def display(rows):
+    return ["".join(char.data for char in row).rstrip() for row in rows]
+
+
+@pytest.mark.parametrize('chunk', [None, 3])
+@pytest.mark.parametrize('name', list(STREAMS))
+def test_engines_agree(name, chunk):
+    pyte_rows, pyte_cursor, pyte_modes = render('pyte', STREAMS[name], chunk)
+    fast_rows, fast_cursor, fast_modes = render('fast', STREAMS[name], chunk)
+    assert display(fast_rows) == display(pyte_rows)
+    # Whole Chars: colors and attributes as well as text
+    assert fast_rows == pyte_rows
+    assert fast_cursor == pyte_cursor
+    assert fast_modes == pyte_modes
+
+
+def test_delete_lines_below_unwritten_rows():
+    """pyte's DL only moves up rows it has buffered, so rows below the
+    written ones are not pulled up and what was there stays on screen;
+    the fast engine blanks them, as xterm does. Nothing writes to the
+    lower rows here, so the difference shows."""
+    text = "row0\r\nrow1\r\nrow2\r\nrow3\x1b[2;1H\x1b[3M"
+    pyte_rows, pyte_cursor, _ = render('pyte', text)
+    fast_rows, fast_cursor, _ = render('fast', text)
+    assert display(pyte_rows)[:4] == ["row0", "row1", "row2", "row3"]
+    assert display(fast_rows) == ["row0"] + [""] * (LINES - 1)
+    assert fast_cursor == pyte_cursor == (1, 0)
@@ -0,0 +1,63 @@
+"""LatencyTracker: matching keys to frames, and expiring keys that never echo"""
+import pytest
+
+from coolpyterm import latency
+from coolpyterm.latency import LatencyTracker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(latency.time, 'perf_counter', lambda: now[0])
+    return now
+
+
+def echoed_key(tracker):
+    tracker.key_pressed()
+    tracker.key_handled()
+    tracker.mark_sent()
+    tracker.mark_received()
+    tracker.mark_parsed()
+
+
+def test_echoed_key_becomes_a_sample(clock):
+    tracker = LatencyTracker()
+    echoed_key(tracker)
+    clock[0] += 0.016
+    tracker.mark_presented()
+    assert tracker.pending == 0
+    assert tracker.stage_samples()['render'] == [pytest.approx(0.016)]
+
+
+def test_unechoed_key_expires_on_the_next_frame(clock):
+    tracker = LatencyTracker(probe_timeout=2.0)
+    # A password keystroke: sent, never echoed
+    tracker.key_pressed()
+    tracker.key_handled()
+    tracker.mark_sent()
+    clock[0] += 3.0
+    tracker.mark_presented()
+    assert tracker.pending == 0 and tracker.unmatched == 1
+
+    # The next key is measured from its own stamps, not the stale probe's
+    echoed_key(tracker)
+    clock[0] += 0.010
+    tracker.mark_presented()
+    assert tracker.stage_samples()['total'] == [pytest.approx(0.010)]
+
+
+def test_stale_probe_does_not_take_a_later_echo(clock):
+    tracker = LatencyTracker(probe_timeout=2.0)
+    tracker.key_pressed()
+    tracker.key_handled()
+    tracker.mark_sent()
+    clock[0] += 0.5
+    tracker.mark_presented()
+    assert tracker.pending == 1  # still within the timeout
+    clock[0] += 2.0
+    # Output that is not an echo (a prompt redraw, say) arrives after the timeout
+    tracker.mark_received()
+    tracker.mark_parsed()
+    tracker.mark_presented()
+    assert tracker.stage_samples()['total'] == []
+    assert tracker.pending == 0 and tracker.unmatched == 1
@@ -0,0 +1,24 @@
+"""terminal_memory_report reads the GUI's frame copy, never the parser's screen"""
+from PyQt6.QtWidgets import QApplication
+
+from coolpyterm import cpt
+from coolpyterm.memory_stats import terminal_memory_report
+
+
+def test_report_sizes_screen_and_history_from_frames():
+    app = QApplication.instance() or QApplication([])
+    terminal = cpt.TerminalWithHardwareGrid(parse_mode='inline', scrollback_lines=100)
+    try:
+        empty = terminal_memory_report(terminal)
+        assert empty['history'] == 0
+
+        terminal.parser.feed("".join(f"line {i}\r\n" for i in range(200)))
+        assert terminal.frame_rows and terminal.history_lines
+        report = terminal_memory_report(terminal)
+        assert report['screen'] > 0 and report['scrollback'] > 0
+        per_line = report['screen'] // len(terminal.frame_rows)
+        assert abs(report['history'] - per_line * terminal.history_lines) <= terminal.history_lines
+        assert report['total'] == sum(size for name, size in report.items() if name != 'total')
+    finally:
+        terminal.close()
+        app.processEvents()
@@ -0,0 +1,44 @@
+"""PerfHud counters"""
+import threading
+import time
+
+from coolpyterm.perf_hud import PerfHud
+
+
+class Widget:
+    def __init__(self):
+        self.overlay_sections = {}
+
+
+def hud_line(hud, label):
+    return next(line for line in hud.lines if line.startswith(label))
+
+
+def test_multibyte_output_leaves_no_backlog():
+    hud = PerfHud(Widget())
+    text = "╭─ é 漢字 ─╮\r\n" * 1000
+    data = text.encode('utf-8')
+    assert len(data) > len(text)
+
+    # Reader threads count what they decoded; the GUI counts what it parsed
+    readers = [threading.Thread(target=hud.chars_received, args=(len(text) // 2,)) for _ in range(2)]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+    hud.chars_ingested(len(text), dirty_rows=range(24))
+    hud._publish(time.perf_counter() + 1)
+
+    assert hud.received_total == hud.ingested_total == len(text)
+    assert hud_line(hud, "backlog").split()[1] == "0.0"
+
+
+def test_backlog_is_what_has_not_been_parsed():
+    hud = PerfHud(Widget())
+    hud.chars_received(5000)
+    hud.chars_ingested(3000)
+    hud._publish(time.perf_counter() + 1)
+    assert hud_line(hud, "backlog").split()[1:] == ["2.0", "kchar"]
+    hud.chars_ingested(2000)
+    hud._publish(time.perf_counter() + 2)
+    assert hud_line(hud, "backlog").split()[1] == "0.0"
@@ -0,0 +1,56 @@
+"""Exit detection for local shells"""
+import os
+import sys
+import time
+
+import pytest
+from PyQt6.QtCore import QCoreApplication
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason="POSIX PTY backend")
+
+from coolpyterm import posixptyshellreader  # noqa: E402
+
+
+class Backend:
+    def __init__(self):
+        self.exit_codes = []
+
+    def _on_child_exited(self, code):
+        self.exit_codes.append(code)
+
+
+def wait_for(condition, timeout=5.0):
+    app = QCoreApplication.instance() or QCoreApplication([])
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+def test_exit_before_registration_is_reaped():
+    posixptyshellreader._install_sigchld_handler()
+    pid = os.fork()
+    if pid == 0:
+        os._exit(3)
+    # The child exits and its SIGCHLD is handled before the pid is registered
+    time.sleep(0.2)
+    backend = Backend()
+    posixptyshellreader._register_child(pid, backend)
+    assert wait_for(lambda: backend.exit_codes)
+    assert backend.exit_codes == [3]
+    assert pid not in posixptyshellreader._children
+
+
+def test_exit_after_registration_is_reported_once():
+    posixptyshellreader._install_sigchld_handler()
+    pid = os.fork()
+    if pid == 0:
+        time.sleep(0.5)
+        os._exit(5)
+    backend = Backend()
+    posixptyshellreader._register_child(pid, backend)
+    assert pid in posixptyshellreader._children
+    assert wait_for(lambda: backend.exit_codes)
+    wait_for(lambda: False, 0.2)
+    assert backend.exit_codes == [5]
@@ -0,0 +1,84 @@
+"""Backend readers hand every output chunk to the terminal's on_raw_received()"""
+import os
+import sys
+import time
+
+import pytest
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication
+
+from coolpyterm import cpt
+from coolpyterm.latency import LatencyTracker
+from coolpyterm.perf_hud import PerfHud
+
+
+class Parent:
+    def __init__(self):
+        self.chunks = []
+
+    def on_raw_received(self, data, text):
+        self.chunks.append((data, text))
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="POSIX PTY backend")
+def test_posix_reader_reports_raw_and_decoded_chunks():
+    from coolpyterm.posixptyshellreader import PosixPtyReaderThread
+
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    parent = Parent()
+    emitted = []
+    reader = PosixPtyReaderThread(read_fd, parent)
+    reader.data_ready.connect(emitted.append, Qt.ConnectionType.DirectConnection)
+    reader.start()
+    try:
+        # A character split across two reads is emitted once it is complete
+        os.write(write_fd, "caf".encode() + b"\xc3")
+        time.sleep(0.3)
+        os.write(write_fd, b"\xa9\n")
+        end = time.monotonic() + 5
+        while "".join(emitted) != "café\n" and time.monotonic() < end:
+            time.sleep(0.01)
+    finally:
+        os.close(write_fd)
+        reader.wait(2000)
+        os.close(read_fd)
+
+    assert "".join(emitted) == "café\n"
+    assert b"".join(data for data, _ in parent.chunks) == "café\n".encode()
+    assert "".join(text for _, text in parent.chunks) == "café\n"
+
+
+class Widget:
+    def __init__(self):
+        self.overlay_sections = {}
+
+
+class Recorder:
+    def __init__(self):
+        self.output = []
+
+    def record_output(self, data):
+        self.output.append(data)
+
+
+def test_terminal_feeds_every_probe():
+    app = QApplication.instance() or QApplication([])
+    terminal = cpt.TerminalWithHardwareGrid(parse_mode='inline')
+    try:
+        terminal.latency_tracker = tracker = LatencyTracker()
+        tracker.key_pressed()
+        tracker.key_handled()
+        tracker.mark_sent()
+        terminal.session_recorder = recorder = Recorder()
+        terminal.perf_hud = hud = PerfHud(Widget())
+
+        terminal.on_raw_received("é\r\n".encode(), "é\r\n")
+
+        assert recorder.output == [b"\xc3\xa9\r\n"]
+        assert hud._chars_received == 3
+        assert 'received' in tracker._pending[0]
+    finally:
+        terminal.latency_tracker = terminal.session_recorder = terminal.perf_hud = None
+        terminal.close()
+        app.processEvents()
@@ -0,0 +1,198 @@
+"""ScrollbackBuffer ring and reflow, and the rewrap helpers it is built on"""
+import gc
+
+from coolpyterm.scrollback import ScrollbackBuffer
+from coolpyterm.vt_session import BLANK, WrappedRow, is_wrapped, reflow_screen, rewrap
+from pyte.screens import Char
+
+
+def row(text, wrapped=False, columns=None):
+    cells = tuple(Char(c, "default", "default") for c in text)
+    if columns is not None:
+        cells += (BLANK,) * (columns - len(cells))
+    return WrappedRow(cells) if wrapped else cells
+
+
+def text(line):
+    return "".join(char.data for char in line).rstrip()
+
+
+def texts(lines):
+    return [text(line) for line in lines]
+
+
+def logical(lines):
+    """Lines joined back along their soft wraps"""
+    joined = [""]
+    for line in lines:
+        joined[-1] += "".join(char.data for char in line) if is_wrapped(line) else text(line)
+        if not is_wrapped(line):
+            joined.append("")
+    return joined[:-1]
+
+
+# --- Ring -------------------------------------------------------------------------
+
+def test_full_ring_overwrites_the_oldest():
+    buffer = ScrollbackBuffer(3)
+    for i in range(5):
+        buffer.append(row(f"line {i}"))
+    assert len(buffer) == 3
+    assert texts(buffer) == ["line 2", "line 3", "line 4"]
+    assert text(buffer[0]) == "line 2" and text(buffer[-1]) == "line 4"
+    assert texts(buffer.window(1, 5)) == ["line 3", "line 4"]
+
+
+def test_extend_keeps_only_what_fits():
+    buffer = ScrollbackBuffer(2)
+    buffer.extend([row(f"line {i}") for i in range(4)])
+    assert texts(buffer) == ["line 2", "line 3"]
+
+
+def test_capacity_changes_keep_the_newest():
+    buffer = ScrollbackBuffer(5)
+    for i in range(7):
+        buffer.append(row(f"line {i}"))
+    buffer.set_capacity(3)
+    assert texts(buffer) == ["line 4", "line 5", "line 6"]
+    buffer.set_capacity(4)
+    buffer.append(row("line 7"))
+    buffer.append(row("line 8"))
+    assert texts(buffer) == ["line 5", "line 6", "line 7", "line 8"]
+
+
+# --- Rewrap -----------------------------------------------------------------------
+
+def test_rewrap_narrower_and_back():
+    rows = [row("abcdefghij"), row("short")]
+    narrow, _ = rewrap(rows, 4)
+    assert texts(narrow) == ["abcd", "efgh", "ij", "shor", "t"]
+    assert [is_wrapped(line) for line in narrow] == [True, True, False, True, False]
+    wide, _ = rewrap(narrow, 10)
+    assert texts(wide) == ["abcdefghij", "short"]
+    assert not any(is_wrapped(line) for line in wide)
+
+
+def test_rewrap_keeps_wide_characters_whole():
+    wide = (Char("中", "default", "default"), Char("", "default", "default"))
+    rows = [row("abc") + wide]
+    narrow, _ = rewrap(rows, 4)
+    assert texts(narrow) == ["abc", "中"]
+
+
+def test_reflow_screen_narrowing_pushes_rows_above_the_cursor_off():
+    rows = [row("0123456789", columns=10), row("$ ", columns=10)] + [row("", columns=10)] * 2
+    fitted, cursor, overflow = reflow_screen(rows, 5, 4, (1, 2))
+    assert texts(overflow) == []
+    assert texts(fitted) == ["01234", "56789", "$", ""]
+    assert cursor == (2, 2)
+
+    fitted, cursor, overflow = reflow_screen(rows, 3, 4, (1, 2))
+    assert texts(overflow) == ["012"]
+    assert texts(fitted) == ["345", "678", "9", "$"]
+    assert cursor == (3, 2)
+    assert all(len(line) == 3 for line in fitted)
+
+
+def test_reflow_screen_widening_joins_wrapped_rows():
+    rows = [row("01234", wrapped=True), row("56789", columns=5), row("$", columns=5), row("", columns=5)]
+    fitted, cursor, overflow = reflow_screen(rows, 10, 4, (2, 1))
+    assert texts(fitted) == ["0123456789", "$", "", ""]
+    assert cursor == (1, 1) and overflow == []
+    assert all(len(line) == 10 for line in fitted)
+
+
+# --- Reflow -----------------------------------------------------------------------
+
+def filled(count, capacity=None, width=12):
+    buffer = ScrollbackBuffer(capacity or count)
+    for i in range(count):
+        buffer.append(row(f"line {i:04d} " + "x" * (width - 10)))
+    return buffer
+
+
+def test_reflow_narrows_newest_first_in_slices():
+    buffer = filled(100)
+    lines = logical(buffer)
+    buffer.reflow(8)
+    assert buffer.reflowing
+    assert buffer.reflow_step(10)
+    # The newest lines are rewrapped, the rest still waiting at the old width;
+    # it reads as the newest `capacity` rows throughout
+    assert len(buffer[-1]) <= 8 and len(buffer[0]) == 12
+    assert len(buffer) == 100
+    assert logical(buffer) == lines[-len(logical(buffer)):]
+    while buffer.reflow_step(10):
+        pass
+    assert not buffer.reflowing
+    assert len(buffer) == 100  # the capacity, of 200 rewrapped rows
+    assert logical(buffer) == lines[50:]
+    assert all(len(line) <= 8 for line in buffer)
+
+
+def test_reflow_widening_rejoins_lines():
+    buffer = filled(10, capacity=30, width=12)
+    lines = logical(buffer)
+    buffer.reflow(8)
+    while buffer.reflow_step(100):
+        pass
+    buffer.reflow(20)
+    while buffer.reflow_step(100):
+        pass
+    assert logical(buffer) == lines
+    assert len(buffer) == 10
+
+
+def test_lines_appended_during_a_reflow_come_last():
+    buffer = filled(5, capacity=20)
+    buffer.reflow(8)
+    buffer.append(row("new"))
+    assert text(buffer[-1]) == "new"
+    buffer.reflow_view(3)
+    while buffer.reflow_step(1):
+        pass
+    assert text(buffer[-1]) == "new"
+    assert logical(buffer)[:-1] == [f"line {i:04d} xx" for i in range(5)]
+
+
+def test_reflow_view_rewraps_the_lines_in_view_only():
+    buffer = filled(50)
+    buffer.reflow(8)
+    assert buffer.reflow_view(6)
+    assert all(len(buffer[-i]) <= 8 for i in range(1, 7))
+    assert len(buffer[0]) == 12
+
+
+def test_stop_reflow_keeps_lines_partly_rewrapped():
+    buffer = filled(50)
+    lines = logical(buffer)
+    buffer.reflow(8)
+    buffer.reflow_step(5)
+    buffer.stop_reflow()
+    assert not buffer.reflowing
+    assert not buffer.reflow_step(5)
+    assert logical(buffer) == lines[-len(logical(buffer)):]
+    assert len(buffer[0]) == 12 and len(buffer[-1]) <= 8
+    buffer.append(row("after"))
+    assert text(buffer[-1]) == "after"
+
+
+def test_collection_is_only_held_within_a_slice():
+    assert gc.isenabled()
+    buffer = filled(50)
+    buffer.reflow(8)
+    buffer.reflow_step(5)
+    assert gc.isenabled()
+    # A buffer dropped mid-reflow leaves nothing held
+    del buffer
+    assert gc.isenabled()
+
+    gc.disable()
+    try:
+        buffer = filled(50)
+        buffer.reflow(8)
+        buffer.reflow_step(5)
+        # Not turned on behind the back of whoever turned it off
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
@@ -0,0 +1,99 @@
+"""SendQueueThread: coalescing, ordering and stopping"""
+import threading
+
+from PyQt6.QtCore import Qt
+
+from coolpyterm.send_queue import SendQueueThread
+
+
+class Transport:
+    """send_func that records each send; the first one waits until released"""
+
+    def __init__(self, fail=False):
+        self.sends = []
+        self.release = threading.Event()
+        self.first = threading.Event()
+        self.fail = fail
+
+    def __call__(self, data):
+        if not self.first.is_set():
+            self.first.set()
+            self.release.wait(5)
+        if self.fail:
+            raise OSError("connection reset")
+        self.sends.append(data)
+
+
+def run_queue(transport, writes, **kwargs):
+    queue = SendQueueThread(transport, **kwargs)
+    queue.start()
+    queue.enqueue(b"first")
+    assert transport.first.wait(5)
+    # Everything queued while the transport is busy goes out together
+    for data in writes:
+        queue.enqueue(data)
+    return queue
+
+
+def finish(queue, transport):
+    transport.release.set()
+    for _ in range(500):
+        if not queue.bytes_pending:
+            break
+        threading.Event().wait(0.01)
+    queue.stop()
+
+
+def test_small_writes_coalesce_in_order():
+    transport = Transport()
+    queue = run_queue(transport, [b"a", "b", b"cd", b"", "é"])
+    assert queue.queue_length == 4
+    finish(queue, transport)
+    assert transport.sends == [b"first", b"abcd\xc3\xa9"]
+    assert queue.bytes_sent == 11 and queue.sends == 2
+    assert not queue.isRunning()
+
+
+def test_large_writes_split_at_max_chunk():
+    transport = Transport()
+    queue = run_queue(transport, [b"x" * 10, b"y" * 10], max_chunk=8, high_water=16)
+    assert queue.is_backlogged
+    finish(queue, transport)
+    assert transport.sends[1:] == [b"xxxxxxxx", b"xxyyyyyy", b"yyyy"]
+    assert b"".join(transport.sends) == b"first" + b"x" * 10 + b"y" * 10
+    assert not queue.is_backlogged
+
+
+def test_clear_drops_unsent():
+    transport = Transport()
+    queue = run_queue(transport, [b"dropped"])
+    queue.clear()
+    assert queue.bytes_pending == len(b"first")
+    finish(queue, transport)
+    assert transport.sends == [b"first"]
+
+
+def test_stop_discards_queued_writes():
+    transport = Transport()
+    queue = run_queue(transport, [b"never sent"])
+    queue.request_stop()
+    transport.release.set()
+    assert queue.wait(2000)
+    assert transport.sends == [b"first"]
+    # The unsent write is left behind and nothing more is accepted
+    queue.enqueue(b"after stop")
+    assert queue.queue_length == 1
+
+
+def test_send_failure_stops_the_thread():
+    transport = Transport(fail=True)
+    errors = []
+    queue = SendQueueThread(transport)
+    queue.send_failed.connect(errors.append, Qt.ConnectionType.DirectConnection)
+    queue.start()
+    queue.enqueue(b"data")
+    transport.release.set()
+    assert queue.wait(2000)
+    assert errors == ["connection reset"]
+    queue.enqueue(b"more")
+    assert queue.queue_length == 0
@@ -0,0 +1,78 @@
+"""
+A terminal created with nothing saved in QSettings gets the declared defaults
+"""
+import pytest
+from PyQt6.QtCore import QSettings
+from PyQt6.QtWidgets import QApplication
+
+from coolpyterm import cpt
+from coolpyterm.settings_manager import SettingsManager
+
+
+@pytest.fixture(scope='module')
+def window(tmp_path_factory):
+    app = QApplication.instance() or QApplication([])
+    # A settings location of its own, so nothing saved on this machine is read
+    QSettings.setPath(QSettings.Format.NativeFormat, QSettings.Scope.UserScope,
+                      str(tmp_path_factory.mktemp('settings')))
+    patch = pytest.MonkeyPatch()
+    patch.setattr(cpt.HardwareTerminalWindow, 'show_connection_dialog', lambda self: None)
+    patch.setattr(cpt.HardwareTerminalWindow, 'setup_signal_handlers', lambda self: None)
+    window = cpt.HardwareTerminalWindow()
+    yield window
+    window.close()
+    app.processEvents()
+    patch.undo()
+
+
+@pytest.fixture(scope='module')
+def defaults():
+    return SettingsManager().defaults
+
+
+@pytest.fixture(scope='module')
+def terminal(window):
+    return window.new_tab()
+
+
+def test_get_int_falls_back_to_defaults(window, defaults):
+    assert window.settings_manager.get_int('paste/chunk_size') == defaults['paste/chunk_size']
+    assert window.settings_manager.get_float('effects/curvature') == defaults['effects/curvature']
+
+
+def test_paste_chunk_size(terminal, defaults):
+    assert terminal.paste_chunk_size == defaults['paste/chunk_size'] == 4096
+
+
+def test_session_log_rotation(terminal, defaults):
+    options = terminal.session_log_options
+    assert options['max_bytes'] == defaults['logging/max_bytes'] == 10 * 1024 * 1024
+    assert options['backup_count'] == defaults['logging/backup_count'] == 5
+    assert options['max_age'] == defaults['logging/max_age']
+
+
+def test_background_tab_releases_gl(terminal, defaults):
+    assert terminal.gl_release_idle_ms == defaults['tabs/gl_release_seconds'] * 1000 == 300000
+    terminal.suspend_rendering()
+    try:
+        assert terminal.gl_release_timer.isActive()
+        assert terminal.gl_release_timer.interval() == 300000
+    finally:
+        terminal.resume_rendering()
+    assert not terminal.gl_release_timer.isActive()
+
+
+def test_scrollback_defaults(terminal, defaults):
+    assert terminal.scrollback_buffer.capacity == defaults['terminal/scrollback_lines'] == 1000
+    assert terminal.parser.scrollback_limit == terminal.scrollback_buffer.capacity
+    assert terminal.wheel_lines == defaults['terminal/wheel_lines'] == 3
+
+
+@pytest.mark.parametrize('engine', ['pyte', 'fast'])
+def test_burst_keeps_scrollback_lines(window, engine):
+    terminal = cpt.TerminalWithHardwareGrid(parse_mode='inline', engine=engine, scrollback_lines=10000)
+    try:
+        terminal.parser.feed("".join(f"line {i}\r\n" for i in range(5000)))
+        assert len(terminal.scrollback_buffer) == 5000 + 1 - terminal.rows
+    finally:
+        terminal.close()
@@ -0,0 +1,122 @@
+"""Process parsing mode: SharedScreen segments, with serve() run on a thread"""
+import queue
+import threading
+import time
+
+import pytest
+
+from coolpyterm import parser_pool
+from coolpyterm.parser_pool import ProcessParser
+from coolpyterm.shared_screen import RING_ROWS, SCROLLED, TAKEN, segment_size, serve
+
+
+class Pool:
+    """Stands in for ParserPool: one serve() loop on a thread instead of a process"""
+
+    def __init__(self):
+        self.inboxes = [queue.Queue()]
+        self.thread = threading.Thread(target=serve, args=(self.inboxes[0],), daemon=True)
+        self.thread.start()
+
+    def attach(self, parser):
+        return 0
+
+    def detach(self, parser, index):
+        pass
+
+
+@pytest.fixture
+def parser(monkeypatch):
+    pool = Pool()
+    monkeypatch.setattr(parser_pool, 'parser_pool', lambda processes=0: pool)
+    parser = ProcessParser(80, 24)
+    parser.scrollback_limit = 100
+    parser.start()
+    yield parser
+    parser.stop()
+    pool.inboxes[0].put(None)
+    pool.thread.join(2)
+
+
+def frames(parser, until, timeout=5.0):
+    """Take frames until until(frames) is true; returns them all"""
+    taken = []
+    end = time.monotonic() + timeout
+    while not until(taken) and time.monotonic() < end:
+        frame = parser.take_frame()
+        if frame is None:
+            time.sleep(0.005)
+        else:
+            taken.append(frame)
+    assert until(taken)
+    return taken
+
+
+def text(row):
+    return "".join(char.data for char in row).rstrip()
+
+
+def scrolled_text(taken):
+    return [text(line) for frame in taken for line in frame.scrolled]
+
+
+def test_segment_is_sized_for_the_screen(parser):
+    assert parser.shared.max_columns == 80 and parser.shared.max_lines == 24
+    # The ring is a fixed size, not the scrollback limit
+    assert parser.shared.ring_rows == RING_ROWS
+    assert segment_size(80, 24, RING_ROWS) <= parser.shared_bytes < segment_size(81, 24, RING_ROWS)
+
+
+def test_resize_past_the_segment_moves_to_a_bigger_one(parser):
+    parser.feed("".join(f"line {i}\r\n" for i in range(40)))
+    taken = frames(parser, lambda taken: len(scrolled_text(taken)) >= 17)
+    assert scrolled_text(taken) == [f"line {i}" for i in range(17)]
+
+    old = parser.shared
+    # Scrolled while the GUI is not looking, then the window grows
+    parser.feed("".join(f"more {i}\r\n" for i in range(10)))
+    time.sleep(0.2)
+    assert int(old.header[SCROLLED]) > int(old.header[TAKEN])
+    parser.resize(120, 30)
+    assert parser.shared is not old
+    assert (parser.shared.max_columns, parser.shared.max_lines) == (120, 30)
+
+    taken = frames(parser, lambda taken: any(frame.full for frame in taken))
+    full = next(frame for frame in taken if frame.full)
+    assert (full.columns, full.lines) == (120, 30)
+    # What scrolled off in the old segment arrives from the new one, in order
+    assert scrolled_text(taken) == [f"line {i}" for i in range(17, 27)]
+    screen = [text(row) for _, row in sorted(full.rows.items())]
+    assert screen[:23] == [f"line {i}" for i in range(27, 40)] + [f"more {i}" for i in range(10)]
+
+
+def test_shrinking_keeps_the_segment(parser):
+    old = parser.shared
+    parser.resize(60, 20)
+    assert parser.shared is old
+    parser.feed("after\r\n")
+    frames(parser, lambda taken: any(frame.lines == 20 and frame.columns == 60 for frame in taken))
+
+
+def test_flood_waits_for_room_in_the_ring(parser):
+    parser.scrollback_limit = 5000
+    parser.feed("".join(f"line {i}\r\n" for i in range(3000)))
+    shared = parser.shared
+    end = time.monotonic() + 5
+    while int(shared.header[SCROLLED]) < RING_ROWS and time.monotonic() < end:
+        time.sleep(0.01)
+    time.sleep(0.2)
+    # Full, and nothing written over while the GUI has not read it
+    assert int(shared.header[SCROLLED]) - int(shared.header[TAKEN]) == RING_ROWS
+    taken = frames(parser, lambda taken: len(scrolled_text(taken)) >= 3000 - 23)
+    assert scrolled_text(taken) == [f"line {i}" for i in range(3000 - 23)]
+
+
+def test_lines_past_the_scrollback_limit_are_dropped_oldest_first(parser):
+    parser.feed("".join(f"line {i}\r\n" for i in range(3000)))
+    taken = frames(parser, lambda taken: "line 2976" in scrolled_text(taken))
+    lines = scrolled_text(taken)
+    # The GUI keeps the last 100, and those all arrive
+    assert lines[-100:] == [f"line {i}" for i in range(2877, 2977)]
+    numbers = [int(line.split()[1]) for line in lines]
+    assert numbers == sorted(set(numbers))